@@ -1,7 +1,9 @@
 import os
 import sys
 import json
-from typing import Dict, Any
+from contextvars import ContextVar
+from typing import Dict, Any, Optional
+from fastapi import Header, Query
 
 # --- PATH TUNING ---
 BRAIN_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -27,10 +29,14 @@ from workflow.gamestate_machine import SagaGameLoop
 from core.ecs import world_ecs
 from core.world_grid import WorldGrid
 from core.definition_registry import DefinitionRegistry
+from core.combat.sessions import CombatSessionManager, DEFAULT_SESSION
 
 LORE_PATH = os.path.join(DATA_DIR, "lore.json")
 GAMESTATE_PATH = os.path.join(DATA_DIR, "gamestate.json")
 
+# Combat session of the request being served; read by the game loop's combat provider
+current_session: ContextVar[str] = ContextVar("combat_session", default=DEFAULT_SESSION)
+
 class WorldDatabase:
     def __init__(self):
         self.lore = []
@@ -44,12 +50,13 @@ class WorldDatabase:
         self.item_gen = ItemGenerator(os.path.join(DATA_DIR, "Item_Builder.json"))
         self.enemy_gen = EnemyGenerator(os.path.join(DATA_DIR, "Enemy_Builder.json"))
         self.quests = QuestManager(os.path.join(DATA_DIR, "quests.json"))
-        self.db = PersistenceLayer(os.path.join(DATA_DIR, "world_state.db"))
+        self.db = PersistenceLayer(os.path.join(DATA_DIR, "world_state.db"), wal=True)
+        world_ecs.db.enable_wal() # Request threads read while ticks write
         self.world_grid = WorldGrid(width=100, height=100, save_path=os.path.join(DATA_DIR, "world_grid.json"))
         self.definitions = DefinitionRegistry(DATA_DIR)
         
         # State & Logic
-        self.active_combat = None
+        self.combat = CombatSessionManager(self.db, registry=world_ecs) # One CombatEngine per table/player, see core/combat/sessions.py
         self.sim = None
         self.memory = None
         self.graph = None
@@ -87,7 +94,7 @@ class WorldDatabase:
             if SagaGameLoop and self.sensory:
                 self.loop = SagaGameLoop(
                     self.sensory, 
-                    lambda: self.active_combat,
+                    lambda: self.combat.get(current_session.get()),
                     self.rag, 
                     self.memory,
                     self.sim,
@@ -96,8 +103,8 @@ class WorldDatabase:
                     self.graph
                 )
 
-            # 4. Restore ECS (SQLite)
-            world_ecs.load_all()
+            # 4. Restore ECS (SQLite): only the global layer; zones hydrate on demand
+            world_ecs.hydrate_region(0, None, pin=True)
             
             # 5. Load Asset Definitions
             self.definitions.load_all()
@@ -105,11 +112,25 @@ class WorldDatabase:
         except Exception as e:
             print(f"[ERROR] Database Hydration Failed: {e}")
 
+    @property
+    def active_combat(self):
+        """Legacy single-table access: the default session's engine."""
+        return self.combat.get(DEFAULT_SESSION)
+
+    @active_combat.setter
+    def active_combat(self, engine):
+        if engine is None: self.combat.drop(DEFAULT_SESSION)
+        else: self.combat.create(DEFAULT_SESSION, engine)
+
 # Global Singleton
 db = WorldDatabase()
 
 def get_db():
     return db
 
+def get_session_id(session: Optional[str] = Query(None), x_session_id: Optional[str] = Header(None)):
+    """Combat session for a request: ?session=..., else the X-Session-Id header, else the default table."""
+    return session or x_session_id or DEFAULT_SESSION
+
 def get_ecs():
     return world_ecs
@@ -2,6 +2,7 @@ import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from brain.dependencies import db
+from core.ecs import world_ecs
 from brain.routers import architect, tactical, narrative, character_creator, combat_api
 
 # --- APP INITIALIZATION ---
@@ -25,8 +26,16 @@ app.add_middleware(
 async def startup_event():
     print("[SERVER] Taleweavers Brain v2.0 booting up...")
     db.load()
+    world_ecs.start_autoflush()
     print("[SERVER] World State Hydrated.")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    world_ecs.stop_autoflush() # Final write-behind flush
+    world_ecs.db.close()
+    db.combat.save_all() # Park live encounters so they survive the restart
+    db.db.close()
+
 # --- ROUTER REGISTRATION ---
 app.include_router(architect.router)
 app.include_router(tactical.router)
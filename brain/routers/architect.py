@@ -19,6 +19,10 @@ class SimulationRequest(BaseModel):
     entities: List[Dict[str, Any]]
     years: int = 100
 
+class PreviewRequest(BaseModel):
+    years: int = 10
+    commit: bool = False
+
 class PaintRequest(BaseModel):
     x: int
     y: int
@@ -82,7 +86,7 @@ async def run_world_simulation(req: SimulationRequest, db=Depends(get_db)):
         
         master_export = os.path.join(DATA_DIR, "master_export.json")
         importer.import_entities(master_export)
-        world_ecs.load_all() # Refresh registry
+        world_ecs.hydrate_region(0, None, pin=True) # Refresh registry
         
         # Local Layer Simulation (Python Side)
         from core.systems.settlement import SettlementSystem
@@ -90,14 +94,46 @@ async def run_world_simulation(req: SimulationRequest, db=Depends(get_db)):
         for _ in range(req.years):
             settlement_sim.process_tick()
             
-        # Optional: Save back the updated state after python sim
-        for entity in world_ecs.entities.values():
-            world_ecs.db.save_entity(entity.id, entity.name, entity.to_dict())
+        # Each tick flushed what it touched; persist anything still queued
+        world_ecs.flush()
         
         return {"status": "success", "log": proc.stdout.splitlines()[-5:], "years_simulated": req.years}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/simulate/preview")
+async def preview_world_simulation(req: PreviewRequest, db=Depends(get_db)):
+    """
+    Runs the Python settlement simulation on a copy-on-write fork of the live
+    world and reports the outcome; the live world is untouched unless `commit` is set.
+    """
+    from core.ecs import Demographics, Economy
+    from core.systems.settlement import SettlementSystem
+    world_ecs.hydrate_region(0, None, pin=True)
+    sim = world_ecs.fork()
+    try:
+        settlement_sim = SettlementSystem(sim, db.definitions)
+        for _ in range(req.years):
+            settlement_sim.process_tick()
+
+        settlements = []
+        for e in sim.get_entities_with(Demographics):
+            econ = e.get_component(Economy)
+            settlements.append({
+                "id": e.id, "name": e.name,
+                "population": e.get_component(Demographics).pop_total,
+                "wealth": econ.wealth if econ else 0
+            })
+        result = {"status": "success", "years_simulated": req.years, "settlements": settlements}
+        if req.commit:
+            result["applied"] = sim.commit()
+            world_ecs.flush()
+        return result
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        if not sim.closed: sim.discard()
+
 @router.get("/history/list")
 async def list_world_history():
     history_dir = os.path.join(DATA_DIR, "history")
@@ -127,7 +163,7 @@ async def load_historical_year(year: int):
         importer = WorldImporter()
         importer.clear_world()
         importer.import_entities(os.path.join(DATA_DIR, "master_export.json"))
-        world_ecs.load_all()
+        world_ecs.hydrate_region(0, None, pin=True)
         return {"status": "success", "year": year}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -185,6 +221,7 @@ def create_local_zone(req: LocalZoneRequest, db=Depends(get_db)):
 def get_player_map(map_id: str, db=Depends(get_db)):
     m = db.db.get_player_map(map_id)
     if not m: raise HTTPException(status_code=404, detail="Map not found")
+    world_ecs.hydrate_region(3, map_id) # Player-layer entities on this map
     return m
 
 @router.post("/map")
@@ -5,7 +5,7 @@ from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 
-from brain.dependencies import get_db, DATA_DIR
+from brain.dependencies import get_db, get_session_id, DATA_DIR
 from core.ecs import world_ecs, Position, Vitals, Stats, Renderable
 from core.combat.mechanics import CombatEngine
 
@@ -14,6 +14,15 @@ router = APIRouter(prefix="/combat", tags=["combat"])
 class CombatLoadRequest(BaseModel):
     character_name: str
 
+class BatchSimRequest(BaseModel):
+    team_a: List[str] # Unit specs, see core/combat/batch_sim.py
+    team_b: List[str]
+    fights: int = 200
+    seed: int = 0
+    workers: Optional[int] = 1
+    size: int = 12
+    max_rounds: int = 50
+
 class CombatActionRequest(BaseModel):
     action: str # MOVE, ATTACK
     target_id: Optional[str] = None
@@ -29,7 +38,7 @@ def list_saves():
     return [f.replace(".json", "") for f in os.listdir(saves_dir) if f.endswith(".json")]
 
 @router.post("/load")
-def load_character(req: CombatLoadRequest, db=Depends(get_db)):
+def load_character(req: CombatLoadRequest, db=Depends(get_db), sid: str = Depends(get_session_id)):
     save_path = os.path.join(DATA_DIR, "Saves", f"{req.character_name}.json")
     if not os.path.exists(save_path):
         raise HTTPException(status_code=404, detail="Character not found.")
@@ -56,39 +65,46 @@ def load_character(req: CombatLoadRequest, db=Depends(get_db)):
             grid[ry][rx] = 130
             terrain[(rx, ry)] = "DIFFICULT"
             
-    db.active_combat = CombatEngine(cols=width, rows=height)
-    db.active_combat.walls = walls
-    db.active_combat.terrain = terrain
-    db.active_combat.grid_cells = grid # Store the visual grid reference
-    
-    # Create ECS Entity
-    char_entity = world_ecs.create_character(char_data)
-    char_entity.add_tag("hero")
-    char_entity.x, char_entity.y = 2, 2
-    db.active_combat.combatants.append(char_entity)
+    engine = CombatEngine(cols=width, rows=height)
+    engine.walls = walls
+    engine.terrain = terrain
+    engine.grid_cells = grid # Store the visual grid reference
     
-    # Add a Target Dummy
-    dummy = world_ecs.create_character({
-        "Name": "Target Dummy",
-        "Stats": {"Vitality": 10, "Fortitude": 10, "Endurance": 10, "Reflexes": 5},
-        "Team": "Enemy"
-    })
-    dummy.x, dummy.y = 7, 7
-    db.active_combat.combatants.append(dummy)
+    with world_ecs.lock: # Autoflush sees the units whole
+        # Create ECS Entity
+        char_entity = world_ecs.create_character(char_data)
+        char_entity.add_tag("hero")
+        char_entity.x, char_entity.y = 2, 2
+
+        # Add a Target Dummy
+        dummy = world_ecs.create_character({
+            "Name": "Target Dummy",
+            "Stats": {"Vitality": 10, "Fortitude": 10, "Endurance": 10, "Reflexes": 5},
+            "Team": "Enemy"
+        })
+        dummy.x, dummy.y = 7, 7
+    engine.combatants.append(char_entity)
+    engine.combatants.append(dummy)
+    engine.start_recording() # In memory; GET /combat/replay exports it
+    db.combat.create(sid, engine)
     
     return {
         "status": "success",
+        "session": sid,
         "character": char_entity.to_dict(),
         "grid": {"cols": 10, "rows": 10, "cells": grid}
     }
 
 @router.get("/state")
-def get_combat_state(db=Depends(get_db)):
-    if not db.active_combat:
-        return {"status": "inactive"}
-    
+def get_combat_state(db=Depends(get_db), sid: str = Depends(get_session_id)):
+    with db.combat.use(sid) as engine:
+        if not engine:
+            return {"status": "inactive"}
+        return _state_payload(engine)
+
+def _state_payload(engine):
     entities = []
-    for c in db.active_combat.combatants:
+    for c in engine.combatants:
         entities.append({
             "id": c.id,
             "name": c.name,
@@ -109,31 +125,94 @@ def get_combat_state(db=Depends(get_db)):
         "status": "active",
         "entities": entities,
         "grid": {
-            "cols": db.active_combat.cols,
-            "rows": db.active_combat.rows,
-            "cells": db.active_combat.grid_cells
+            "cols": engine.cols,
+            "rows": engine.rows,
+            "cells": engine.grid_cells
         },
-        "round": db.active_combat.round_count,
-        "log": db.active_combat.replay_log
+        "round": engine.round_count,
+        "log": engine.replay_log
     }
 
+@router.get("/visibility")
+def get_team_visibility(team: Optional[str] = None, db=Depends(get_db), sid: str = Depends(get_session_id)):
+    """Fog-of-war grid (rows of 0/1) for a team; defaults to the hero's side."""
+    with db.combat.use(sid) as engine:
+        if not engine:
+            raise HTTPException(status_code=400, detail="No active combat.")
+        if team is None:
+            hero = next((c for c in engine.combatants if "hero" in c.tags), None)
+            if not hero:
+                raise HTTPException(status_code=400, detail="Player not found.")
+            team = engine.team_of(hero)
+        return {"team": team, "cols": engine.cols, "rows": engine.rows, "visible": engine.team_visibility(team)}
+
+@router.get("/preview")
+def preview_attack(target_id: str, attacker_id: Optional[str] = None, skill: Optional[str] = None, db=Depends(get_db), sid: str = Depends(get_session_id)):
+    """Exact hit/crit/kill odds and expected damage of an attack before it is committed."""
+    with db.combat.use(sid) as engine:
+        if not engine:
+            raise HTTPException(status_code=400, detail="No active combat.")
+        units = {c.id: c for c in engine.combatants}
+        attacker = units.get(attacker_id) if attacker_id else next((c for c in engine.combatants if "hero" in c.tags), None)
+        target = units.get(target_id)
+        if not attacker or not target:
+            raise HTTPException(status_code=404, detail="Combatant not found.")
+        result = engine.attack_odds(attacker, target, skill_used=skill)
+        result.update({"attacker": attacker.id, "target": target.id, "los": engine.has_los(attacker.x, attacker.y, target.x, target.y)})
+        return result
+
+@router.get("/replay")
+def export_replay(db=Depends(get_db), sid: str = Depends(get_session_id)):
+    """The active encounter's recording as JSON lines (replay with scripts/replay_combat.py)."""
+    from fastapi.responses import PlainTextResponse
+    with db.combat.use(sid) as engine:
+        if not engine or not engine.recorder:
+            raise HTTPException(status_code=400, detail="No recorded combat.")
+        body = "\n".join(engine.recorder.lines) + "\n"
+    return PlainTextResponse(body, media_type="application/x-ndjson")
+
+@router.get("/sessions")
+def list_sessions(db=Depends(get_db)):
+    """Live and parked combat sessions with their estimated memory footprint."""
+    return db.combat.stats()
+
+@router.delete("/session")
+def end_session(db=Depends(get_db), sid: str = Depends(get_session_id)):
+    db.combat.drop(sid)
+    return {"status": "success", "session": sid}
+
+@router.post("/simulate")
+def simulate_battles(req: BatchSimRequest):
+    """Headless seeded AI-vs-AI batch for balance tuning; returns win rates, rounds and damage distributions."""
+    from core.combat.batch_sim import run_batch
+    if not 1 <= req.fights <= 20000:
+        raise HTTPException(status_code=400, detail="fights must be between 1 and 20000.")
+    try:
+        return run_batch(req.team_a, req.team_b, fights=req.fights, seed=req.seed, workers=req.workers,
+                         cols=req.size, rows=req.size, max_rounds=req.max_rounds)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=f"Save not found: {e.filename}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.post("/action")
-def execute_combat_action(req: CombatActionRequest, db=Depends(get_db)):
-    if not db.active_combat:
-        raise HTTPException(status_code=400, detail="No active combat.")
-    
-    player = next((c for c in db.active_combat.combatants if "hero" in c.tags), None)
-    if not player:
-        raise HTTPException(status_code=400, detail="Player not found.")
-    
-    intent = {
-        "action": req.action,
-        "target": req.target_id,
-        "parameters": {"dx": req.dx, "dy": req.dy, "x": req.x, "y": req.y}
-    }
-    
-    narrative, updates = db.active_combat.process_intent(intent)
-    db.active_combat.replay_log.append(narrative)
+def execute_combat_action(req: CombatActionRequest, db=Depends(get_db), sid: str = Depends(get_session_id)):
+    with db.combat.use(sid) as engine:
+        if not engine:
+            raise HTTPException(status_code=400, detail="No active combat.")
+        
+        player = next((c for c in engine.combatants if "hero" in c.tags), None)
+        if not player:
+            raise HTTPException(status_code=400, detail="Player not found.")
+        
+        intent = {
+            "action": req.action,
+            "target": req.target_id,
+            "parameters": {"dx": req.dx, "dy": req.dy, "x": req.x, "y": req.y}
+        }
+        
+        narrative, updates = engine.process_intent(intent)
+        engine.replay_log.append(narrative)
     
     return {
         "status": "success",
@@ -142,17 +221,18 @@ def execute_combat_action(req: CombatActionRequest, db=Depends(get_db)):
     }
 
 @router.post("/end_turn")
-def end_turn(db=Depends(get_db)):
-    if not db.active_combat:
-        raise HTTPException(status_code=400, detail="No active combat.")
-    
-    # 1. AI Actions
-    db.active_combat.run_ai_turn()
-    updates = db.active_combat.pending_updates
-    
-    # 2. End Round (Regen, etc)
-    db.active_combat.end_round()
-    
-    return {"status": "success", "round": db.active_combat.round_count, "updates": updates}
+def end_turn(db=Depends(get_db), sid: str = Depends(get_session_id)):
+    with db.combat.use(sid) as engine:
+        if not engine:
+            raise HTTPException(status_code=400, detail="No active combat.")
+        
+        # 1. AI Actions
+        engine.run_ai_turn()
+        updates = engine.pending_updates
+        
+        # 2. End Round (Regen, etc)
+        engine.end_round()
+        
+        return {"status": "success", "round": engine.round_count, "updates": updates}
 
 
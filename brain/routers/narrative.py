@@ -2,7 +2,7 @@ from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from typing import Dict, Any, Optional
 
-from brain.dependencies import get_db
+from brain.dependencies import get_db, get_session_id, current_session
 
 router = APIRouter(prefix="/dm", tags=["narrative"])
 
@@ -14,31 +14,36 @@ class DMActionRequest(BaseModel):
 # --- ENDPOINTS ---
 
 @router.post("/action")
-async def dm_action(req: DMActionRequest, db=Depends(get_db)):
+async def dm_action(req: DMActionRequest, db=Depends(get_db), sid: str = Depends(get_session_id)):
     """
     Primary endpoint for the AI Dungeon Master. Orchestrates RAG context, 
     intent resolution, and narrative generation.
     """
     if not db.loop: raise HTTPException(status_code=503, detail="Game Loop Offline.")
     try:
-        from core.ecs import world_ecs, Position
+        from core.ecs import world_ecs
         player_data = req.context.get("player", {})
         player_pos = player_data.get("pos", [500, 500])
         
         nearby = []
-        if db.active_combat:
-            for c in db.active_combat.combatants:
+        combat = db.combat.get(sid)
+        if combat:
+            for c in combat.combatants:
                 if c.id != player_data.get("id"):
                     nearby.append({"id": c.id, "name": c.name, "tags": list(c.tags) if hasattr(c, 'tags') else []})
         else:
-            for e in world_ecs.entities.values():
-                p = e.get_component(Position)
-                if p and abs(p.x - player_pos[0]) < 20 and abs(p.y - player_pos[1]) < 20:
-                    if e.id != player_data.get("id"):
-                        nearby.append({"id": e.id, "name": e.name, "tags": list(e.tags) if hasattr(e, 'tags') else []})
+            px, py = player_pos[0], player_pos[1]
+            for e in world_ecs.entities_in_rect(px - 20, py - 20, px + 20, py + 20):
+                if e.id != player_data.get("id"):
+                    nearby.append({"id": e.id, "name": e.name, "tags": list(e.tags) if hasattr(e, 'tags') else []})
                         
         req.context["environment"] = nearby
-        return db.loop.process_turn(req.message, req.context)
+        token = current_session.set(sid) # Routes the loop's combat provider to this table
+        try:
+            with db.combat.lock(sid):
+                return db.loop.process_turn(req.message, req.context)
+        finally:
+            current_session.reset(token)
     except Exception as e:
         print(f"[ERROR] Narrative Engine Failure: {e}")
         raise HTTPException(status_code=500, detail=str(e))
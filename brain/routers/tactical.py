@@ -5,7 +5,7 @@ from fastapi import APIRouter, HTTPException, Depends, Query
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 
-from brain.dependencies import get_db, DATA_DIR
+from brain.dependencies import get_db, get_session_id, DATA_DIR
 from core.ecs import Entity, Position, Renderable, Vitals, Stats, world_ecs
 from core.combat.mechanics import CombatEngine
 
@@ -60,7 +60,7 @@ class TacticalStateResponse(BaseModel):
 # --- ENDPOINTS ---
 
 @router.get("/generate")
-def generate_tactical_map(node_id: Optional[str] = None, poi_id: Optional[str] = None, player_name: Optional[str] = None, db=Depends(get_db)):
+def generate_tactical_map(node_id: Optional[str] = None, poi_id: Optional[str] = None, player_name: Optional[str] = None, db=Depends(get_db), sid: str = Depends(get_session_id)):
     width, height = 20, 20
     
     # 1. Resolve World Location
@@ -78,10 +78,10 @@ def generate_tactical_map(node_id: Optional[str] = None, poi_id: Optional[str] =
             
     grid = [[896 if (gx == 0 or gx == width-1 or gy == 0 or gy == height-1 or random.random() < 0.1) else 128 for gx in range(width)] for gy in range(height)]
     
-    db.active_combat = CombatEngine(cols=width, rows=height)
-    db.active_combat.walls = {(gx, gy) for gy in range(height) for gx in range(width) if grid[gy][gx] == 896}
+    engine = CombatEngine(cols=width, rows=height)
+    engine.walls = {(gx, gy) for gy in range(height) for gx in range(width) if grid[gy][gx] == 896}
     
-    nearby = [e for e in world_ecs.entities.values() if e.has_component(Position)]
+    nearby = world_ecs.entities_in_rect(x - 50, y - 50, x + 50, y + 50)
     vtt_entities = []
     for e in nearby:
         p = e.get_component(Position)
@@ -105,11 +105,12 @@ def generate_tactical_map(node_id: Optional[str] = None, poi_id: Optional[str] =
     if os.path.exists(player_path):
         with open(player_path, 'r', encoding='utf-8') as f:
             player_data = json.load(f)
-            player_c = world_ecs.create_character(player_data)
             p_name = player_data.get("Name", "Hero")
-            player_c.name = f"player_{p_name.lower().replace(' ', '_')}"
-            player_c.x, player_c.y = 5, 5
-            db.active_combat.combatants.append(player_c)
+            with world_ecs.lock: # Autoflush sees the player whole
+                player_c = world_ecs.create_character(player_data)
+                player_c.name = f"player_{p_name.lower().replace(' ', '_')}"
+                player_c.x, player_c.y = 5, 5
+            engine.combatants.append(player_c)
             vtt_entities.append({
                 "id": player_c.id, "name": p_name, "type": 'player',
                 "pos": [5, 5], "hp": player_c.hp, "maxHp": player_c.max_hp,
@@ -152,7 +153,7 @@ def generate_tactical_map(node_id: Optional[str] = None, poi_id: Optional[str] =
                         enemy_e.add_component(sys_stats)
                         enemy_e.add_component(Renderable(icon=enemy["icon"]))
                         
-                        db.active_combat.combatants.append(enemy_e)
+                        engine.combatants.append(enemy_e)
                         continue
                     else:
                         icon, poi_type, tags = "sheet:5076", "enemy", ["poi", "interactable", "hostile"]
@@ -164,7 +165,9 @@ def generate_tactical_map(node_id: Optional[str] = None, poi_id: Optional[str] =
                     "pos": [lx, ly], "icon": icon, "tags": tags, "description": poi.description
                 })
 
+    db.combat.create(sid, engine)
     return {
+        "session": sid,
         "meta": {"title": "Wilderness Encounter", "world_pos": [x, y], "description": "You scan the tactical area..."},
         "map": {"width": width, "height": height, "grid": grid, "biome": "forest"},
         "entities": vtt_entities,
@@ -172,9 +175,13 @@ def generate_tactical_map(node_id: Optional[str] = None, poi_id: Optional[str] =
     }
 
 @router.get("/state", response_model=TacticalStateResponse)
-def get_tactical_state(db=Depends(get_db)):
-    if not db.active_combat: raise HTTPException(status_code=404, detail="No active session.")
-    player_c = next((c for c in db.active_combat.combatants if "player" in c.name), None)
+def get_tactical_state(db=Depends(get_db), sid: str = Depends(get_session_id)):
+    with db.combat.use(sid) as engine:
+        if not engine: raise HTTPException(status_code=404, detail="No active session.")
+        return _tactical_state(engine)
+
+def _tactical_state(engine):
+    player_c = next((c for c in engine.combatants if "player" in c.name), None)
     if not player_c: raise HTTPException(status_code=404, detail="Player not found.")
     
     return TacticalStateResponse(
@@ -192,7 +199,7 @@ def get_tactical_state(db=Depends(get_db)):
                 id=c.id, name=c.name, type="Enemy",
                 health=TacticalHealth(current=c.hp, max=c.max_hp),
                 coordinates=TacticalCoords(x=c.x, y=c.y)
-            ) for c in db.active_combat.combatants if "player" not in c.name
+            ) for c in engine.combatants if "player" not in c.name
         ]
     )
 
@@ -208,23 +215,24 @@ def get_character(name: str):
     raise HTTPException(status_code=404, detail="Character not found.")
 
 @router.post("/interact")
-def interact_with_object(target_id: str, action_type: str = "SEARCH", player_name: str = "Burt", db=Depends(get_db)):
+def interact_with_object(target_id: str, action_type: str = "SEARCH", player_name: str = "Burt", db=Depends(get_db), sid: str = Depends(get_session_id)):
     """
     Handles mechanical interactions like SEARCH, OPEN, or LOOT.
     Matches logic from legacy resolve_mechanical_interaction.
     """
-    if not db.active_combat:
-        raise HTTPException(status_code=400, detail="No active tactical session.")
+    with db.combat.use(sid) as engine:
+        if not engine:
+            raise HTTPException(status_code=400, detail="No active tactical session.")
         
+        # In tactical.py context, we check combatants or world_objects
+        target = next((c for c in engine.combatants if c.id == target_id), None)
+        is_object = False
+        if not target and hasattr(engine, 'world_objects'):
+            target = next((o for o in engine.world_objects if o['id'] == target_id), None)
+            is_object = True
+
     visual_updates = []
     res = "The world remains still."
-    
-    # In tactical.py context, we check combatants or world_objects
-    target = next((c for c in db.active_combat.combatants if c.id == target_id), None)
-    is_object = False
-    if not target and hasattr(db.active_combat, 'world_objects'):
-        target = next((o for o in db.active_combat.world_objects if o['id'] == target_id), None)
-        is_object = True
 
     if not target:
         raise HTTPException(status_code=404, detail="Target not found in current area.")
@@ -275,7 +283,7 @@ def process_tactical_feedback(req: TacticalFeedback, db=Depends(get_db)):
     return {"status": "success", "message": f"Combat outcome: {req.outcome} recorded."}
 
 @router.post("/travel")
-def travel_to_node(db=Depends(get_db)):
+def travel_to_node(db=Depends(get_db), sid: str = Depends(get_session_id)):
     new_node_id = None
     if db.campaign_gen and db.campaign_gen.current_campaign:
         for poi in db.campaign_gen.current_campaign.pois:
@@ -291,19 +299,23 @@ def travel_to_node(db=Depends(get_db)):
 
     if getattr(db, 'sim', None) and 'world_pos' in db.meta:
         db.sim.advance_time(8, db.meta['world_pos'])
-    return generate_tactical_map(node_id=new_node_id, db=db)
+    return generate_tactical_map(node_id=new_node_id, db=db, sid=sid)
 
 @router.post("/action")
-def execute_system_action(req: CombatActionRequest, db=Depends(get_db)):
-    if not db.active_combat: raise HTTPException(status_code=400, detail="No active combat.")
-    player_c = next((c for c in db.active_combat.combatants if "player" in c.name), None)
+def execute_system_action(req: CombatActionRequest, db=Depends(get_db), sid: str = Depends(get_session_id)):
+    with db.combat.use(sid) as engine:
+        if not engine: raise HTTPException(status_code=400, detail="No active combat.")
+        return _system_action(req, db, engine)
+
+def _system_action(req, db, engine):
+    player_c = next((c for c in engine.combatants if "player" in c.name), None)
     if not player_c: raise HTTPException(status_code=400, detail="Player not found in combat.")
     updates = []
     log_msg = ""
     if req.action_type == "skill":
-        target = next((c for c in db.active_combat.combatants if req.target_id and c.id == req.target_id), None)
+        target = next((c for c in engine.combatants if req.target_id and c.id == req.target_id), None)
         if target:
-            logs, v_updates = db.active_combat.attack_target(player_c, target, skill_used=req.skill_id)
+            logs, v_updates = engine.attack_target(player_c, target, skill_used=req.skill_id)
             log_msg = f"You cast {req.skill_id}! " + " ".join(logs)
             updates.extend(v_updates)
             updates.append({"type": "UPDATE_HP", "id": target.id, "hp": target.hp})
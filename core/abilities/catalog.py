@@ -0,0 +1,138 @@
+import re
+import weakref
+
+DEFAULT_RANGE = 6 # Tiles; what the AI assumed for every power before ranges were compiled
+FEET_PER_TILE = 5
+
+COST_PATTERN = re.compile(r"Cost:? (\d+) (SP|FP|CMP|HP)", re.IGNORECASE)
+FEET_PATTERN = re.compile(r"(\d+)\s*(?:ft|feet)", re.IGNORECASE)
+
+# Lookup precedence matches the old linear scan: talents, then schools, then generic skills
+SOURCES = (
+    ("talents", "Talent_Name", "talent"),
+    ("schools", "Name", "school"),
+    ("skills", "Skill_Name", "skill"),
+)
+
+class AbilityInfo:
+    """One compiled ability row: the raw data plus the fields the AI and hooks ask for."""
+    __slots__ = ("name", "kind", "data", "type", "offensive", "range", "cost", "resource")
+
+    def __init__(self, name, kind, data, loader):
+        self.name = name
+        self.kind = kind
+        self.data = data
+        self.type = str(data.get("Type") or "").lower()
+        self.offensive = self.type == "offense"
+        self.range = parse_range(data, loader)
+        self.cost, self.resource = parse_cost(data, loader)
+
+    def affordable(self, combatant):
+        if not self.resource or not self.cost: return True
+        return getattr(combatant, self.resource.lower(), 0) >= self.cost
+
+    def __repr__(self):
+        return f"<AbilityInfo {self.name} {self.type or '?'} r{self.range} {self.cost}{self.resource or ''}>"
+
+def parse_range(data, loader):
+    """Reach in tiles from a Range column ('Melee', '30 ft', 4) or the tier's power shape."""
+    text = data.get("Range")
+    if text is None and data.get("Tier") is not None:
+        try:
+            text = loader.power_shapes.get(int(data["Tier"]), {}).get("range")
+        except (TypeError, ValueError):
+            text = None
+    if isinstance(text, (int, float)): return max(1, int(text))
+    if not text: return DEFAULT_RANGE
+    text = str(text)
+    if "melee" in text.lower() or "touch" in text.lower(): return 1
+    m = FEET_PATTERN.search(text)
+    if m: return max(1, int(m.group(1)) // FEET_PER_TILE)
+    return DEFAULT_RANGE
+
+def parse_cost(data, loader):
+    """(amount, resource) from a Cost column, an inline 'Cost: 2 FP', or the tier's cost."""
+    cost = data.get("Cost")
+    if isinstance(cost, (int, float)):
+        return int(cost), str(data.get("Resource") or "").upper() or None
+    for text in (cost, data.get("Description"), data.get("Effect")):
+        if not text: continue
+        m = COST_PATTERN.search(str(text))
+        if m: return int(m.group(1)), m.group(2).upper()
+    if data.get("Tier") is not None:
+        try:
+            return int(loader.get_tier_cost(int(data["Tier"]))), str(data.get("Resource") or "").upper() or None
+        except (TypeError, ValueError):
+            pass
+    return 0, None
+
+class AbilityCatalog:
+    """
+    Case-folded index over the DataLoader's talents, schools and skills.
+    Rebuilt whenever one of the loader's lists is replaced or grows, so callers
+    never see stale rows after a reload.
+    """
+    def __init__(self, loader):
+        self.loader = loader
+        self.index = {}
+        self.version = 0
+        self._signature = None
+        self._offense = weakref.WeakKeyDictionary() # combatant -> [key, offensive infos, pools used, pool values, usable infos]
+        self.stats = {"builds": 0, "hits": 0, "misses": 0}
+
+    def _current_signature(self):
+        return tuple((id(lst), len(lst)) for lst in (getattr(self.loader, attr, ()) for attr, _, _ in SOURCES))
+
+    def refresh(self, force=False):
+        sig = self._current_signature()
+        if not force and sig == self._signature: return False
+        index = {}
+        for attr, column, kind in SOURCES:
+            for row in getattr(self.loader, attr, ()):
+                name = row.get(column)
+                if not name: continue
+                index.setdefault(str(name).casefold(), AbilityInfo(str(name), kind, row, self.loader))
+        self.index = index
+        self._signature = sig
+        self.version += 1
+        self.stats["builds"] += 1
+        return True
+
+    def get(self, name):
+        """AbilityInfo for a name in any case, or None."""
+        if not name: return None
+        self.refresh()
+        return self.index.get(str(name).casefold())
+
+    def data(self, name):
+        info = self.get(name)
+        return info.data if info else None
+
+    def usable_offense(self, combatant):
+        """
+        The combatant's offensive powers it can currently pay for, in powers order.
+        Cached per combatant; the entry is rebuilt when the catalog, the powers
+        list or any resource pool those powers draw on changes.
+        """
+        self.refresh()
+        powers = tuple(getattr(combatant, "powers", None) or ())
+        try:
+            entry = self._offense.get(combatant)
+        except TypeError: # Not weak-referenceable: compute uncached
+            entry = None
+        if entry is None or entry[0] != (self.version, powers):
+            infos = [info for info in (self.index.get(str(p).casefold()) for p in powers) if info and info.offensive]
+            pools = tuple(sorted({info.resource for info in infos if info.resource}))
+            entry = [(self.version, powers), infos, pools, None, None]
+            try:
+                self._offense[combatant] = entry
+            except TypeError:
+                pass
+        pools = tuple(getattr(combatant, r.lower(), 0) for r in entry[2])
+        if entry[3] == pools:
+            self.stats["hits"] += 1
+            return entry[4]
+        self.stats["misses"] += 1
+        entry[3] = pools
+        entry[4] = [info for info in entry[1] if info.affordable(combatant)]
+        return entry[4]
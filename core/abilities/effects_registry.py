@@ -1,16 +1,117 @@
 import re
 import random
+from collections import OrderedDict
+try:
+    from re import _parser as sre_parse
+except ImportError: # Python < 3.11
+    import sre_parse
 # Import mechanics modules
 from .mechanics import damage, status, healing, movement, defense, utility, summoning, meta
 
+PLAN_CACHE_SIZE = 4096 # Distinct effect descriptions kept with their resolved plans
+
+def required_literals(regex):
+    """
+    A set of lowercase strings at least one of which occurs in any text the
+    regex matches, or None when no such set can be read off the pattern.
+    """
+    try:
+        return _required(sre_parse.parse(regex, re.IGNORECASE))
+    except Exception:
+        return None
+
+def _required(items):
+    best, run = None, []
+
+    def consider(opts):
+        nonlocal best
+        if opts and all(opts) and (best is None or min(map(len, opts)) > min(map(len, best))):
+            best = opts
+
+    for op, av in items:
+        name = str(op)
+        if name == "LITERAL":
+            run.append(chr(av))
+            continue
+        if run:
+            consider({"".join(run).casefold()})
+            run = []
+        if name == "SUBPATTERN":
+            consider(_required(av[-1]))
+        elif name == "ATOMIC_GROUP":
+            consider(_required(av))
+        elif name == "BRANCH":
+            alts = [_required(b) for b in av[1]]
+            if all(alts): consider(set().union(*alts))
+        elif name in ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT") and av[0] >= 1:
+            consider(_required(av[2]))
+    if run:
+        consider({"".join(run).casefold()})
+    return best
+
 class EffectRegistry:
     def __init__(self):
         # List of (regex_pattern, handler_function)
         self.patterns = []
+        # Prefilter: one alternation over every pattern's required keywords
+        self._keywords = None # Compiled lookahead alternation, rebuilt after register_pattern
+        self._by_keyword = {} # keyword -> pattern indices needing it (or a keyword it contains)
+        self._unfiltered = [] # Pattern indices with no usable keyword: always tried
+        self._plans = OrderedDict() # description -> ((handler, match), ...)
+        self.stats = {"plans": 0, "plan_hits": 0, "candidates": 0}
         self._register_defaults()
 
     def register_pattern(self, regex, handler):
         self.patterns.append((re.compile(regex, re.IGNORECASE), handler))
+        self._keywords = None
+        self._plans.clear()
+
+    def _compile_prefilter(self):
+        by_keyword, unfiltered = {}, []
+        for i, (pattern, _) in enumerate(self.patterns):
+            keys = required_literals(pattern.pattern)
+            if not keys:
+                unfiltered.append(i)
+                continue
+            for k in keys:
+                by_keyword.setdefault(k, set()).add(i)
+        # The alternation reports the longest keyword starting at each position;
+        # every shorter keyword inside it occurs too, so fold those patterns in.
+        keys = sorted(by_keyword, key=len, reverse=True)
+        self._by_keyword = {k: frozenset().union(*(by_keyword[o] for o in keys if o in k)) for k in keys}
+        self._unfiltered = unfiltered
+        self._keywords = re.compile("(?=(" + "|".join(map(re.escape, keys)) + "))") if keys else None
+
+    def candidates(self, effect_desc):
+        """Indices, in registration order, of the patterns that could match effect_desc."""
+        if self._keywords is None:
+            self._compile_prefilter()
+        found = set(self._unfiltered)
+        if self._keywords is not None:
+            for k in set(self._keywords.findall(effect_desc.casefold())):
+                found |= self._by_keyword[k]
+        return sorted(found)
+
+    def plan(self, effect_desc):
+        """The (handler, match) pairs effect_desc resolves to, computed once per description."""
+        plan = self._plans.get(effect_desc)
+        if plan is not None:
+            self._plans.move_to_end(effect_desc)
+            self.stats["plan_hits"] += 1
+            return plan
+        steps = []
+        cands = self.candidates(effect_desc)
+        for i in cands:
+            pattern, handler = self.patterns[i]
+            match = pattern.search(effect_desc)
+            if match: steps.append((handler, match))
+        plan = tuple(steps)
+        self._plans[effect_desc] = plan
+        if len(self._plans) > PLAN_CACHE_SIZE:
+            self._plans.popitem(last=False)
+        self.stats["plans"] += 1
+        self.stats["candidates"] += len(cands)
+        return plan
 
     def resolve(self, effect_desc, context):
         """
@@ -20,17 +121,14 @@ class EffectRegistry:
         if not effect_desc: return False
         
         handled = False
-        for pattern, handler in self.patterns:
-            match = pattern.search(effect_desc)
-            if match:
-                # Pass match groups + context to handler
-                try:
-                    handler(match, context)
-                    handled = True
-                    # Don't break immediately, allow multiple patterns to match (e.g. Damage + Status)
-                    # break 
-                except Exception as e:
-                    print(f"[EffectRegistry] Error handling '{effect_desc}': {e}")
+        # Allow multiple patterns to match (e.g. Damage + Status), in registration order
+        for handler, match in self.plan(effect_desc):
+            # Pass match groups + context to handler
+            try:
+                handler(match, context)
+                handled = True
+            except Exception as e:
+                print(f"[EffectRegistry] Error handling '{effect_desc}': {e}")
         
         if not handled:
             # Fallback for logging
@@ -1,15 +1,94 @@
 
+from collections import OrderedDict
+
 from .effects_registry import registry
 from .data_loader import DataLoader
+from .catalog import AbilityCatalog
 
 # Global loader to keep data in memory
 loader = DataLoader()
+catalog = AbilityCatalog(loader)
+
+PROFILE_CACHE_SIZE = 1024 # Distinct loadouts (species, skills, powers, traits) kept compiled
+HOOK_TYPES = ("ON_ATTACK", "ON_HIT", "ON_DEFEND") # Bucketed when a profile is built
+# Words an effect must mention to fire on a hook; hooks not listed get every effect
+HOOK_KEYWORDS = {
+    "ON_ATTACK": ("attack", "heal", "regain", "damage", "push", "teleport", "stun", "poison", "fear", "charm", "grapple"),
+}
+
+def bucket_effects(effects, hook_type):
+    keys = HOOK_KEYWORDS.get(hook_type)
+    if not keys: return tuple(effects)
+    return tuple(e for e in effects if any(k in e.lower() for k in keys))
+
+class EffectProfile:
+    """A loadout's effect strings, collected once and pre-bucketed by hook type."""
+    __slots__ = ("effects", "buckets")
+
+    def __init__(self, effects):
+        self.effects = tuple(effects)
+        self.buckets = {hook: bucket_effects(self.effects, hook) for hook in HOOK_TYPES}
+
+    def for_hook(self, hook_type):
+        bucket = self.buckets.get(hook_type)
+        return bucket if bucket is not None else bucket_effects(self.effects, hook_type)
+
+class EffectList(list):
+    """A get_entity_effects() result; remembers the cached profile it was copied from."""
+    __slots__ = ("profile",)
+
+    def __init__(self, profile):
+        super().__init__(profile.effects)
+        self.profile = profile
+
+_profiles = OrderedDict() # loadout key -> EffectProfile
+_profiles_data = None # (catalog version, species table) the cached profiles were built against
+
+def loadout_key(combatant):
+    return (
+        getattr(combatant, "species", "Unknown"),
+        tuple(getattr(combatant, "skills", []) or ()),
+        tuple(getattr(combatant, "powers", []) or ()),
+        tuple(getattr(combatant, "traits", []) or ()),
+    )
+
+def entity_profile(combatant):
+    """
+    The combatant's compiled EffectProfile. Shared by every combatant with the
+    same loadout; all profiles are dropped when the loader's data changes.
+    """
+    global _profiles_data
+    catalog.refresh()
+    data = (catalog.version, id(loader.species_skills), len(loader.species_skills))
+    if data != _profiles_data:
+        _profiles.clear()
+        _profiles_data = data
+    try:
+        key = loadout_key(combatant)
+        profile = _profiles.get(key)
+    except TypeError: # Unhashable entries in a list: compile without caching
+        return EffectProfile(collect_entity_effects(combatant))
+    if profile is None:
+        profile = _profiles[key] = EffectProfile(collect_entity_effects(combatant))
+        if len(_profiles) > PROFILE_CACHE_SIZE:
+            _profiles.popitem(last=False)
+    else:
+        _profiles.move_to_end(key)
+    return profile
 
 def get_entity_effects(combatant):
     """
     Collects all effect strings from a combatant's species, skills, and talents.
     """
     if not combatant: return []
+    return EffectList(entity_profile(combatant))
+
+def collect_entity_effects(combatant):
+    """
+    Scans the loader for a combatant's effect strings (species skills, skills,
+    talents, schools). entity_profile() caches the result per loadout.
+    """
+    if not combatant: return []
     effects = []
     
     # Species Skills
@@ -54,35 +133,20 @@ def apply_hooks(combatant, hook_type, context):
     hook_type: 'ON_ATTACK', 'ON_HIT', 'ON_DEFEND', etc.
     context: dict
     """
-    all_effs = get_entity_effects(combatant)
+    effects = get_entity_effects(combatant)
+    profile = getattr(effects, "profile", None)
+    if profile is None: # Not from the cache (tests inject effects by patching get_entity_effects)
+        profile = EffectProfile(effects)
+    effs = profile.for_hook(hook_type)
     
-    for eff in all_effs:
-        low = eff.lower()
-        if hook_type == "ON_ATTACK":
-            if not any(k in low for k in ["attack", "heal", "regain", "damage", "push", "teleport", "stun", "poison", "fear", "charm", "grapple"]): 
-                continue
+    for eff in effs:
         print(f"[DEBUG] resolving effect: {eff}")
         res = registry.resolve(eff, context)
         print(f"[DEBUG] resolve result: {res}")
 
 def get_ability_data(ability_name):
     """
-    Search schools, talents, and skills for a data dictionary matching the name.
-    Returns the dict or None.
+    Search talents, schools, and skills (in that order) for a data dictionary
+    matching the name, case-insensitively. Returns the dict or None.
     """
-    # Check Talents
-    for t in loader.talents:
-        if t.get("Talent_Name", "").lower() == ability_name.lower():
-             return t
-    
-    # Check Schools/Powers
-    for s in loader.schools: 
-        if s.get("Name", "").lower() == ability_name.lower(): 
-            return s
-                
-    # Check Generic Skills
-    for sk in loader.skills:
-        if sk.get("Skill_Name", "").lower() == ability_name.lower():
-            return sk
-            
-    return None
+    return catalog.data(ability_name)
@@ -0,0 +1,12 @@
+import random
+
+def rng_for(ctx):
+    """
+    The RNG an effect should roll on: the context's own stream, else the
+    combat engine's seeded stream (so replays reproduce effect rolls), else
+    the global module for callers outside combat.
+    """
+    rng = ctx.get("rng")
+    if rng is None:
+        rng = getattr(ctx.get("engine"), "rng", None)
+    return rng or random
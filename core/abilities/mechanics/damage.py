@@ -1,4 +1,4 @@
-import random
+from . import rng_for
 
 def handle_deal_damage(match, ctx):
     """
@@ -16,7 +16,7 @@ def handle_deal_damage(match, ctx):
     if die_str:
         num = int(amt_str_1) if amt_str_1 else 1
         sides = int(die_str)
-        damage = sum(random.randint(1, sides) for _ in range(num))
+        damage = sum(rng_for(ctx).randint(1, sides) for _ in range(num))
     else:
         damage = int(amt_str_1) if amt_str_1 else 0
         
@@ -66,42 +66,42 @@ def handle_auto_damage(match, ctx):
 def handle_fire_damage(match, ctx):
     target = ctx.get("target")
     if target and hasattr(target, "take_damage"):
-        dmg = random.randint(1, 6) # Default small burn
+        dmg = rng_for(ctx).randint(1, 6) # Default small burn
         target.take_damage(dmg)
         if "log" in ctx: ctx["log"].append(f"Burning! Takes {dmg} Fire damage.")
 
 def handle_cold_damage(match, ctx):
     target = ctx.get("target")
     if target and hasattr(target, "take_damage"):
-        dmg = random.randint(1, 6)
+        dmg = rng_for(ctx).randint(1, 6)
         target.take_damage(dmg)
         if "log" in ctx: ctx["log"].append(f"Freezing! Takes {dmg} Cold damage.")
 
 def handle_lightning_damage(match, ctx):
     target = ctx.get("target")
     if target and hasattr(target, "take_damage"):
-        dmg = random.randint(1, 6)
+        dmg = rng_for(ctx).randint(1, 6)
         target.take_damage(dmg)
         if "log" in ctx: ctx["log"].append(f"Shocked! Takes {dmg} Lightning damage.")
         
 def handle_acid_damage(match, ctx):
     target = ctx.get("target")
     if target and hasattr(target, "take_damage"):
-        dmg = random.randint(1, 4)
+        dmg = rng_for(ctx).randint(1, 4)
         target.take_damage(dmg)
         if "log" in ctx: ctx["log"].append(f"Melting! Takes {dmg} Acid damage.")
 
 def handle_force_damage(match, ctx):
     target = ctx.get("target")
     if target and hasattr(target, "take_damage"):
-        dmg = random.randint(1, 4)
+        dmg = rng_for(ctx).randint(1, 4)
         target.take_damage(dmg)
         if "log" in ctx: ctx["log"].append(f"Force Burst! Takes {dmg} Force damage.")
 
 def handle_sonic_damage(match, ctx):
     target = ctx.get("target")
     if target and hasattr(target, "take_damage"):
-        dmg = random.randint(1, 4)
+        dmg = rng_for(ctx).randint(1, 4)
         target.take_damage(dmg)
         # Sonic bypasses armor often
         if "log" in ctx: ctx["log"].append(f"Shatter! Takes {dmg} Sonic damage.")
@@ -109,7 +109,7 @@ def handle_sonic_damage(match, ctx):
 def handle_nuclear_damage(match, ctx):
     target = ctx.get("target")
     if target and hasattr(target, "take_damage"):
-        dmg = random.randint(10, 40) # 4d10
+        dmg = rng_for(ctx).randint(10, 40) # 4d10
         target.take_damage(dmg)
         if "log" in ctx: ctx["log"].append(f"NUCLEAR FISSION! Takes {dmg} Radiant/Force damage.")
 
@@ -1,4 +1,4 @@
-import random
+from . import rng_for
 
 def handle_heal(match, ctx):
     """
@@ -18,7 +18,7 @@ def handle_heal(match, ctx):
     if die_str:
         num = int(amt_str)
         sides = int(die_str)
-        heal = sum(random.randint(1, sides) for _ in range(num))
+        heal = sum(rng_for(ctx).randint(1, sides) for _ in range(num))
     else:
         heal = int(amt_str) if amt_str else 0
         
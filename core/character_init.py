@@ -33,7 +33,8 @@ class LegacyAdapter:
             return getattr(self._entity, name)
         
         # Check components
-        for comp in self._entity.components.values():
+        for c_name in list(self._entity.components):
+            comp = self._entity.get_component_by_name(c_name)
             if hasattr(comp, name):
                 return getattr(comp, name)
         
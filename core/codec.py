@@ -0,0 +1,37 @@
+"""
+JSON codec for persisted ECS state.
+
+Uses orjson when it is installed (several times faster on the large entity
+blobs written by flush() and read at hydration) and falls back to the
+standard library otherwise. Set TALEWEAVERS_JSON=json to force the fallback.
+Both produce standard JSON, so databases written by either are interchangeable.
+"""
+import os
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None and os.environ.get("TALEWEAVERS_JSON", "").lower() != "json":
+    NAME = "orjson"
+    _OPTS = orjson.OPT_NON_STR_KEYS # json.dumps stringifies int keys; match it
+
+    def dumps(obj) -> str:
+        return orjson.dumps(obj, option=_OPTS).decode("utf-8")
+
+    loads = orjson.loads
+else:
+    NAME = "json"
+    dumps = json.dumps
+    loads = json.loads
+
+def loads_many(blobs):
+    """
+    Decodes a batch of JSON documents with a single parser call by splicing
+    them into one array (one C-level parse instead of len(blobs) calls).
+    """
+    if not blobs:
+        return []
+    return loads("[" + ",".join(blobs) + "]")
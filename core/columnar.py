@@ -0,0 +1,236 @@
+"""
+Struct-of-arrays storage for hot ECS components.
+
+When an ECSRegistry is created with columnar=True, the components listed in
+COLUMNAR_FIELDS are not kept as per-entity Python objects. Their numeric
+fields live in NumPy columns indexed by a dense per-component slot, other
+fields (resource dicts, culture names, ...) in parallel Python lists, and
+entity.components[name] holds just the slot number. get_component() hands
+out a lightweight view over the slot, so the Entity property adapters and
+systems written against the object API keep working. Systems can also
+operate on whole columns at once through ECSRegistry.bulk().
+"""
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# component name -> numeric fields held in columns
+COLUMNAR_FIELDS = {
+    "Position": ("x", "y", "z"),
+    "Vitals": ("hp", "max_hp", "sp", "max_sp", "fp", "max_fp", "cmp", "max_cmp"),
+    "Logistics": ("population", "last_tick"),
+    "Demographics": ("pop_total", "pop_capacity", "growth_rate", "social_unrest"),
+    "Economy": ("wealth", "tax_rate"),
+}
+# Fields that are genuinely fractional; everything else reads back as int when whole
+FLOAT_FIELDS = {"growth_rate", "social_unrest", "tax_rate"}
+
+class ColumnStore:
+    """Columns for one component type, with slot allocation and a free list."""
+    def __init__(self, cls, capacity=1024):
+        self.cls = cls
+        self.name = cls.__name__
+        self.fields = COLUMNAR_FIELDS[self.name]
+        # Non-numeric fields of a default instance (resources, culture, ...) live in lists
+        self.extras = tuple(k for k in vars(cls()) if k not in self.fields and not k.startswith("_"))
+        self.capacity = capacity
+        self.dtype = np.dtype("float64") # Exact for every int a component holds, and for fractional HP/SP
+        self.cols = {f: np.zeros(capacity, dtype=self.dtype) for f in self.fields}
+        self.objs = {f: [None] * capacity for f in self.extras}
+        self.live = np.zeros(capacity, dtype=bool)
+        self.owners = [None] * capacity # slot -> Entity
+        self.overflow = {} # slot -> ad-hoc attributes not in the class defaults
+        self.size = 0 # High-water mark; slots >= size were never used
+        self._free = []
+        self.view_cls = _view_class(self)
+
+    def __len__(self): return self.size - len(self._free)
+
+    def _grow(self):
+        new_cap = self.capacity + self.capacity // 2
+        for f, col in self.cols.items():
+            grown = np.zeros(new_cap, dtype=self.dtype)
+            grown[:self.capacity] = col
+            self.cols[f] = grown
+        live = np.zeros(new_cap, dtype=bool)
+        live[:self.capacity] = self.live
+        self.live = live
+        pad = [None] * (new_cap - self.capacity)
+        for values in self.objs.values():
+            values.extend(pad)
+        self.owners.extend(pad)
+        self.capacity = new_cap
+
+    def alloc(self, owner):
+        if self._free:
+            slot = self._free.pop()
+        else:
+            if self.size == self.capacity:
+                self._grow()
+            slot = self.size
+            self.size += 1
+        self.live[slot] = True
+        self.owners[slot] = owner
+        return slot
+
+    def release(self, slot):
+        self.live[slot] = False
+        self.owners[slot] = None
+        for values in self.objs.values():
+            values[slot] = None
+        self.overflow.pop(slot, None)
+        self._free.append(slot)
+
+    def get(self, field, slot):
+        v = self.cols[field].item(slot)
+        return v if field in FLOAT_FIELDS or not v.is_integer() else int(v)
+
+    def view(self, slot):
+        view = self.view_cls.__new__(self.view_cls)
+        object.__setattr__(view, "_slot", slot)
+        return view
+
+    def attach(self, component, owner):
+        """Copies a component object into a new slot and returns the slot."""
+        state = dict(vars(component))
+        state.pop("_owner", None)
+        if self.name == "Position":
+            state.setdefault("x", state.pop("_x", 0))
+            state.setdefault("y", state.pop("_y", 0))
+        slot = self.alloc(owner)
+        for f in self.fields:
+            self.cols[f][slot] = state.pop(f, 0) or 0
+        for f in self.extras:
+            self.objs[f][slot] = state.pop(f, None)
+        if state:
+            self.overflow[slot] = state
+        return slot
+
+    def materialize(self, slot):
+        """A plain component object holding a copy of the slot's state."""
+        comp = self.cls.__new__(self.cls)
+        state = vars(comp)
+        state.update(self.to_dict(slot))
+        if self.name == "Position":
+            state["_x"] = state.pop("x")
+            state["_y"] = state.pop("y")
+            state["_owner"] = None
+        return comp
+
+    def detach(self, slot):
+        """Rebuilds a plain component object from a slot and releases it."""
+        comp = self.materialize(slot)
+        if self.name == "Position":
+            comp._owner = self.owners[slot]
+        self.release(slot)
+        return comp
+
+    def to_dict(self, slot):
+        state = dict(self.overflow.get(slot, {}))
+        for f in self.extras:
+            state[f] = self.objs[f][slot]
+        for f in self.fields:
+            state[f] = self.get(f, slot)
+        return state
+
+    def column(self, field):
+        """The column over every allocated slot (mask with live_slots()/live[:size])."""
+        return self.cols[field][:self.size]
+
+    def live_slots(self):
+        return np.flatnonzero(self.live[:self.size])
+
+    def nbytes(self):
+        return sum(col.nbytes for col in self.cols.values()) + self.live.nbytes
+
+class ColumnarView:
+    """A component-shaped window onto one slot of a ColumnStore."""
+    __slots__ = ("_slot",)
+    _store = None # Bound per ColumnStore by _view_class()
+
+    def to_dict(self): return self._store.to_dict(self._slot)
+
+    def copy(self):
+        """Detached plain-object snapshot of this component."""
+        return self._store.materialize(self._slot)
+
+    def __getattr__(self, name):
+        # Ad-hoc attributes set on the original object
+        try:
+            return self._store.overflow[self._slot][name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __setattr__(self, name, val):
+        if hasattr(type(self), name):
+            object.__setattr__(self, name, val)
+        else:
+            self._store.overflow.setdefault(self._slot, {})[name] = val
+
+    def __repr__(self):
+        return f"<{self._store.name} view slot={self._slot} {self.to_dict()}>"
+
+def _numeric_field(field, notify):
+    def fget(self):
+        return self._store.get(field, self._slot)
+    def fset(self, val):
+        store = self._store
+        store.cols[field][self._slot] = val
+        if notify:
+            owner = store.owners[self._slot]
+            if owner is not None: owner._position_changed()
+    return property(fget, fset)
+
+def _object_field(field):
+    def fget(self): return self._store.objs[field][self._slot]
+    def fset(self, val): self._store.objs[field][self._slot] = val
+    return property(fget, fset)
+
+def _view_class(store):
+    """View type for a store; subclasses the component class so isinstance() still holds."""
+    attrs = {"__slots__": (), "_store": store}
+    for f in store.fields:
+        attrs[f] = _numeric_field(f, notify=(store.name == "Position" and f != "z"))
+    for f in store.extras:
+        attrs[f] = _object_field(f)
+    return type(f"{store.name}View", (ColumnarView, store.cls), attrs)
+
+class ColumnBatch:
+    """
+    Vectorized access to one component across every live entity:
+      batch = registry.bulk("Vitals")
+      batch["hp"] = np.minimum(batch["hp"] + 1, batch["max_hp"])
+      batch.commit() # marks the touched entities dirty
+    """
+    def __init__(self, registry, store):
+        self.registry = registry
+        self.store = store
+        self.slots = store.live_slots()
+        self._written = set()
+
+    def __len__(self): return len(self.slots)
+
+    def __getitem__(self, field):
+        return self.store.cols[field][self.slots]
+
+    def __setitem__(self, field, values):
+        self.store.cols[field][self.slots] = values
+        self._written.add(field)
+
+    def entities(self):
+        owners = self.store.owners
+        return [owners[s] for s in self.slots.tolist()]
+
+    def commit(self, changed=None):
+        """Marks entities dirty for this component; `changed` (bool array over slots) narrows it."""
+        if not self._written: return 0
+        slots = self.slots if changed is None else self.slots[changed]
+        owners = self.store.owners
+        touched = [owners[s] for s in slots.tolist()]
+        self.registry.mark_dirty_many(touched, self.store.name)
+        if self.store.name == "Position":
+            for e in touched:
+                self.registry._spatial_move(e)
+        self._written.clear()
+        return len(slots)
@@ -2,6 +2,25 @@
 import random
 import math
 
+from core.combat.battlefield import summary_for
+from core.combat.planner import MIN_ITERATIONS as MIN_PLAN_ITERATIONS
+
+_hooks = None
+
+def _ability_catalog():
+    """The shared AbilityCatalog from abilities.engine_hooks, imported once (None if unavailable)."""
+    global _hooks
+    if _hooks is None:
+        try:
+            from abilities import engine_hooks
+        except ImportError:
+            try:
+                from core.abilities import engine_hooks
+            except ImportError:
+                engine_hooks = False
+        _hooks = engine_hooks
+    return _hooks.catalog if _hooks else None
+
 class AIDecisionEngine:
     """
     Handles tactical decision making for AI combatants.
@@ -33,44 +52,31 @@ class AIDecisionEngine:
     def analyze_battlefield(self, me, engine):
         """
         Gathers context: visible enemies, allies, health states, clusters.
+        Reads the engine's shared BattlefieldSummary (core/combat/battlefield.py),
+        so only the per-unit distances are computed here.
         """
+        summary = summary_for(engine)
+        my_team = summary.team(me)
         enemies = []
         allies = []
         
-        my_team = getattr(me, "team", "Enemy") 
-        
-        for c in engine.combatants:
-            if not c.is_alive(): continue
-            if c == me: continue
-            
-            c_team = getattr(c, "team", "Player")
-            dist = max(abs(me.x - c.x), abs(me.y - c.y))
-            
-            info = {"obj": c, "dist": dist, "hp_pct": c.hp / c.max_hp}
-            
-            if c_team == my_team:
-                allies.append(info)
-            else:
-                enemies.append(info)
-                
-        # Find Clusters
-        clusters = []
-        for e in enemies:
-            count = 0
-            start_x, start_y = e["obj"].x, e["obj"].y
-            for other in enemies:
-                if max(abs(start_x - other["obj"].x), abs(start_y - other["obj"].y)) <= 2:
-                    count += 1
-            if count > 1:
-                clusters.append({"center": e["obj"], "count": count})
+        for team in summary.teams():
+            hostile = summary.hostile(my_team, team)
+            for c in summary.targets(team):
+                if c is me: continue
+                info = {"obj": c, "dist": max(abs(me.x - c.x), abs(me.y - c.y)), "hp_pct": summary.hp_pct(c)}
+                (enemies if hostile else allies).append(info)
         
+        # Largest enemy clusters first
+        clusters = [cl for team in summary.teams() if summary.hostile(my_team, team) for cl in summary.clusters(team)]
         clusters.sort(key=lambda x: x["count"], reverse=True)
         
         return {
-            "enemies": sorted(enemies, key=lambda x: x["dist"]),
+            "enemies": sorted(enemies, key=lambda x: (x["dist"], x["hp_pct"])),
             "allies": sorted(allies, key=lambda x: x["hp_pct"]),
             "clusters": clusters,
-            "my_hp_pct": me.hp / me.max_hp
+            "my_hp_pct": me.hp / me.max_hp,
+            "summary": summary
         }
 
     # ==================== WEAPON DETECTION ====================
@@ -110,20 +116,14 @@ class AIDecisionEngine:
         """
         Check if ability is Offense type (worth using in combat).
         """
-        try:
-            from abilities import engine_hooks
-            data = engine_hooks.get_ability_data(ability_name)
-            if data:
-                ability_type = data.get("Type", "").lower()
-                return ability_type == "offense"
-        except:
-            pass
-        return False  # Default: don't use if we can't verify
+        catalog = _ability_catalog()
+        info = catalog.get(ability_name) if catalog else None
+        return bool(info and info.offensive)  # Default: don't use if we can't verify
 
     def _try_use_ability(self, me, target, engine, log, template):
         """
         Attempts to use an OFFENSIVE ability from powers list.
-        Only tries offensive abilities, skips utility/defense.
+        Only tries offensive abilities the unit can pay for and reach; skips utility/defense.
         Returns True if ability was SUCCESSFULLY used.
         """
         if template == "Opportunist":
@@ -133,16 +133,16 @@ class AIDecisionEngine:
         if not self._has_resources(me):
             return False
         
-        # Try each power - but only OFFENSIVE ones
-        for power in me.powers:
-            # Skip non-offensive abilities
-            if not self._is_offensive_ability(power, engine):
-                continue
-            
+        catalog = _ability_catalog()
+        if catalog is None:
+            return False
+        
+        dist = max(abs(me.x - target.x), abs(me.y - target.y))
+        for info in catalog.usable_offense(me):
             # Check range
-            dist = max(abs(me.x - target.x), abs(me.y - target.y))
-            if dist > 6:
+            if dist > info.range:
                 continue
+            power = info.name
             
             try:
                 result = engine.activate_ability(me, power, target)
@@ -179,10 +179,22 @@ class AIDecisionEngine:
         new_x, new_y = me.x + step_x, me.y + step_y
         new_x = max(0, min(engine.cols - 1, new_x))
         new_y = max(0, min(engine.rows - 1, new_y))
+
+        # Of the tiles that open the gap, back off into the one the enemy threat map rates safest
+        summary = getattr(engine, "battlefield", None)
+        if summary is not None:
+            dist = max(abs(dx), abs(dy))
+            team = summary.team(me)
+            options = [(me.x + sx, me.y + sy) for sx in (-1, 0, 1) for sy in (-1, 0, 1)
+                       if (sx or sy) and 0 <= me.x + sx < engine.cols and 0 <= me.y + sy < engine.rows
+                       and max(abs(me.x + sx - target.x), abs(me.y + sy - target.y)) > dist]
+            if options:
+                new_x, new_y = min(options, key=lambda t: (summary.threat_at(team, *t), t != (new_x, new_y)))
         
         success, msg = engine.move_char(me, new_x, new_y)
         if success:
             log.append(f"[AI] Kiting: {msg}")
+            if summary is not None: summary.update(me)
         return success
 
     # ==================== ATTACK ROUTINES ====================
@@ -218,13 +230,24 @@ class AIDecisionEngine:
 
     def _melee_attack_routine(self, me, target, engine, log):
         dist = max(abs(me.x - target.x), abs(me.y - target.y))
+
+        # Engines with a flow-field service share one distance map per target across all attackers
+        field = engine.flow_field([(target.x, target.y)]) if hasattr(engine, "flow_field") else None
+        if field is None: occupied = ()
+        elif hasattr(engine, "occupancy"): occupied = engine.occupancy.blocked_tiles(exclude=me)
+        else: occupied = {(c.x, c.y) for c in engine.combatants if c is not me and c.is_alive()}
         
         while dist > 1 and me.movement_remaining >= 5:
-            dx, dy = target.x - me.x, target.y - me.y
-            step_x = 1 if dx > 0 else -1 if dx < 0 else 0
-            step_y = 1 if dy > 0 else -1 if dy < 0 else 0
-            
-            new_x, new_y = me.x + step_x, me.y + step_y
+            step = field.next_step(me.x, me.y, occupied) if field else None
+            if step:
+                new_x, new_y = step
+            elif field and field.distance(me.x, me.y) is not None:
+                break # Route exists but every closer tile is taken
+            else:
+                dx, dy = target.x - me.x, target.y - me.y
+                step_x = 1 if dx > 0 else -1 if dx < 0 else 0
+                step_y = 1 if dy > 0 else -1 if dy < 0 else 0
+                new_x, new_y = me.x + step_x, me.y + step_y
             success, msg = engine.move_char(me, new_x, new_y)
             if not success:
                 break
@@ -257,7 +280,19 @@ class AIDecisionEngine:
             log.append("[AI] No targets visible.")
             return log
             
+        # Tacticians search whole move/attack sequences instead (core/combat/planner.py)
+        if template == "Tactician" and hasattr(engine, "plan_turn"):
+            steps, stats = engine.plan_turn(me)
+            if stats["iterations"] >= MIN_PLAN_ITERATIONS:
+                log.append(f"[AI] Planned {len(steps)} step(s) from {stats['iterations']} playouts.")
+                log.extend(engine.execute_plan(me, steps)[0])
+                return log
+            
         target = ctx["enemies"][0]["obj"]
+        # Several foes in reach: let the engine's exact odds pick the best swing
+        in_reach = [e["obj"] for e in ctx["enemies"] if e["dist"] <= 1]
+        if len(in_reach) > 1 and hasattr(engine, "best_target"):
+            target = engine.best_target(me, in_reach)
         
         # Step 1: Try ONE offensive ability (but don't return - keep going)
         if template != "Opportunist":
@@ -368,10 +368,7 @@ class ArenaApp:
     def handle_grid_click(self, gx, gy):
         if self.state == "TARGETING":
             # Find target
-            target = None
-            for c in self.engine.combatants:
-                 if c.is_alive() and c.x == gx and c.y == gy:
-                     target = c; break
+            target = self.engine.unit_at(gx, gy)
             if target:
                 self.activate_power_execute(target)
             else:
@@ -385,11 +382,7 @@ class ArenaApp:
         if not actor: return
 
         # Check if clicked on enemy -> Attack
-        target = None
-        for c in self.engine.combatants:
-            if c.is_alive() and c.x == gx and c.y == gy:
-                target = c
-                break
+        target = self.engine.unit_at(gx, gy)
         
         if target:
             if target == actor: return # self click
@@ -455,10 +448,7 @@ class ArenaApp:
 
     def open_context_menu(self, gx, gy, screen_pos):
         options = []
-        target = None
-        for c in self.engine.combatants:
-            if c.is_alive() and c.x == gx and c.y == gy:
-                target = c; break
+        target = self.engine.unit_at(gx, gy)
         
         active = self.engine.get_active_char()
         
@@ -0,0 +1,218 @@
+"""
+Headless AI-vs-AI battle simulator for balance runs.
+
+Builds two teams, drops them on opposite edges of a CombatEngine map and lets
+both sides fight until one is wiped out (or max_rounds passes: a draw). Every
+fight is a pure function of its seed, so a batch can be spread over a process
+pool and any single fight re-run or recorded for replay.
+
+Team specs are lists of strings, optionally suffixed with "*count":
+
+    save:Burt                       -- data/Saves/Burt.json
+    enemy:FODDER/BERZERKER          -- EnemyGenerator; rank/role/offense/defense/tactic,
+                                       omitted or "?" parts are rolled per fight
+    spawner:Goblin                  -- the enemy_spawner prefab
+
+Units act like CombatEngine.run_ai_turn's NPCs: walk the shared flow field
+toward the nearest foe, attack when adjacent (the best target by exact odds
+when several are). (AIDecisionEngine drives the
+legacy Combatant wrapper, not ECS entities, so it cannot run here.)
+"""
+import os
+import json
+import time
+import random
+import statistics
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
+
+from core.ecs import ECSRegistry
+from core.enemy_generator import EnemyGenerator
+from core.combat.enemy_spawner import EnemySpawner
+from core.combat.mechanics import CombatEngine
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "data")
+ENEMY_BUILDER = os.path.join(DATA_DIR, "Enemy_Builder.json")
+ATTACK_SP = 2 # attack_target()'s SP cost; movement keeps this in reserve
+
+_generators: Dict[str, EnemyGenerator] = {} # Per-process, so workers load Enemy_Builder.json once
+
+def _generator(path):
+    gen = _generators.get(path)
+    if gen is None:
+        gen = _generators[path] = EnemyGenerator(path)
+    return gen
+
+def parse_spec(spec: str, saves_dir=None):
+    """'kind:name*count' -> (kind, payload, count). Save files are read here, once, in the parent."""
+    spec, _, count = spec.partition("*")
+    kind, _, name = spec.strip().partition(":")
+    kind = kind.lower()
+    if kind == "save":
+        path = os.path.join(saves_dir or os.path.join(DATA_DIR, "Saves"), f"{name}.json")
+        with open(path, 'r', encoding='utf-8') as f:
+            payload = json.load(f)
+    elif kind == "enemy":
+        parts = [p.strip().upper() for p in name.split("/")] if name else []
+        picks = dict(zip(("rank", "role", "offense", "defense", "tactic"), parts))
+        payload = {k: v for k, v in picks.items() if v and v != "?"}
+    elif kind == "spawner":
+        payload = EnemySpawner.template(name or "Goblin")
+    else:
+        raise ValueError(f"Unknown unit kind '{kind}' in spec '{spec}' (save/enemy/spawner)")
+    return kind, payload, int(count or 1)
+
+def _enemy_data(gen, picks, rng):
+    """EnemyGenerator output -> create_character() data."""
+    enemy = gen.generate_enemy(rng=rng, **picks)
+    role = gen.config.get("2_ROLE", {}).get("options", {}).get(enemy["stats"].get("Role"), {})
+    return {
+        "Name": enemy["name"],
+        "Stats": {stat: 14 for stat in role.get("stat_priority", [])}, # Unlisted stats default to 10
+        "HP": enemy["hp"],
+        "Stamina": enemy["sp"],
+        "DamageMult": enemy.get("damageMult", 1.0),
+        "ArmorBonus": enemy.get("acBonus", 0),
+    }
+
+def _build_team(registry, units, team, rng, builder):
+    members = []
+    for kind, payload, count in units:
+        for i in range(count):
+            if kind == "enemy":
+                data = _enemy_data(_generator(builder), payload, rng)
+            else:
+                data = dict(payload)
+            data["Team"] = team
+            data["Name"] = f"{data.get('Name', kind)} {team}{len(members) + 1}"
+            members.append(registry.create_character(data))
+    return members
+
+def _deploy(engine, members, column, rng):
+    """Lines a team up along one map edge, in random order."""
+    rows = list(range(engine.rows))
+    rng.shuffle(rows)
+    for i, unit in enumerate(members):
+        engine.place(unit, column + (i // engine.rows) * (1 if column == 0 else -1), rows[i % engine.rows])
+
+def simulate_fight(seed, team_a, team_b, cols=12, rows=12, max_rounds=50, builder=ENEMY_BUILDER, record=None):
+    """
+    One seeded fight between two parsed team specs. Returns a plain dict
+    (picklable, for the pool): winner ("A", "B" or None), rounds, damage dealt
+    per team, attacks/hits/crits per team. `record` is a path to write the
+    fight's replay to (see core/combat/replay.py).
+    """
+    rng = random.Random(seed) # Team building and turn order; combat rolls use the engine's own stream
+    registry = ECSRegistry(":memory:")
+    engine = CombatEngine(cols, rows, seed=seed)
+    engine.rank_scaling = True # Enemy_Builder damageMult/acBonus count in balance runs
+    a = _build_team(registry, team_a, "A", rng, builder)
+    b = _build_team(registry, team_b, "B", rng, builder)
+    engine.combatants = a + b
+    _deploy(engine, a, 0, rng)
+    _deploy(engine, b, cols - 1, rng)
+    if record: engine.start_recording(record)
+    team = {id(u): "A" for u in a}
+    team.update({id(u): "B" for u in b})
+    stats = {t: {"damage": 0, "attacks": 0, "hits": 0, "crits": 0} for t in "AB"}
+
+    winner = None
+    while engine.round_count <= max_rounds:
+        order = [u for u in engine.combatants if u.hp > 0]
+        rng.shuffle(order)
+        order.sort(key=lambda u: u.get_component_by_name("Stats").get("Reflexes"), reverse=True)
+        for unit in order:
+            if unit.hp <= 0: continue
+            foes = [u for u in engine.combatants if u.hp > 0 and team[id(u)] != team[id(unit)]]
+            if not foes: break
+            foe = min(foes, key=lambda u: (max(abs(u.x - unit.x), abs(u.y - unit.y)), u.hp))
+            if max(abs(foe.x - unit.x), abs(foe.y - unit.y)) > 1:
+                # Fields are cached per goal set, so everyone chasing the same foe shares one
+                field = engine.flow_field([(foe.x, foe.y)])
+                occupied = engine.occupancy.blocked_tiles(exclude=unit)
+                while unit.sp > ATTACK_SP and max(abs(foe.x - unit.x), abs(foe.y - unit.y)) > 1:
+                    step = field.next_step(unit.x, unit.y, occupied)
+                    if step is None or not engine.move_char(unit, *step)[0]: break
+            in_reach = [u for u in foes if max(abs(u.x - unit.x), abs(u.y - unit.y)) <= 1]
+            if in_reach:
+                foe = engine.best_target(unit, in_reach)
+                hp_before = foe.hp
+                logs, _ = engine.attack_target(unit, foe)
+                side = stats[team[id(unit)]]
+                if any("too tired" in line for line in logs): continue
+                side["attacks"] += 1
+                side["damage"] += hp_before - max(foe.hp, 0)
+                if foe.hp < hp_before: side["hits"] += 1
+                if any(line.startswith("CRITICAL") for line in logs): side["crits"] += 1
+        alive = {team[id(u)] for u in engine.combatants if u.hp > 0}
+        if len(alive) < 2:
+            winner = alive.pop() if alive else None
+            break
+        engine.end_round()
+    engine.stop_recording()
+    registry.db.close()
+    return {"seed": seed, "winner": winner, "rounds": min(engine.round_count, max_rounds), "teams": stats}
+
+def _run_chunk(args):
+    seeds, team_a, team_b, kwargs, record_dir = args
+    return [simulate_fight(seed, team_a, team_b, **kwargs,
+                           record=os.path.join(record_dir, f"fight_{seed}.jsonl.gz") if record_dir else None)
+            for seed in seeds]
+
+def _percentiles(values):
+    if not values: return {"mean": 0, "p50": 0, "p90": 0, "min": 0, "max": 0}
+    ordered = sorted(values)
+    return {
+        "mean": round(statistics.fmean(ordered), 2),
+        "p50": ordered[len(ordered) // 2],
+        "p90": ordered[min(len(ordered) - 1, int(len(ordered) * 0.9))],
+        "min": ordered[0],
+        "max": ordered[-1],
+    }
+
+def summarize(results: List[Dict], elapsed=None):
+    """Aggregates simulate_fight() results into win rates, round counts and damage distributions."""
+    n = len(results)
+    report = {
+        "fights": n,
+        "win_rate": {t: round(sum(r["winner"] == t for r in results) / n, 4) if n else 0 for t in "AB"},
+        "draw_rate": round(sum(r["winner"] is None for r in results) / n, 4) if n else 0,
+        "rounds": _percentiles([r["rounds"] for r in results]),
+        "teams": {},
+    }
+    for t in "AB":
+        sides = [r["teams"][t] for r in results]
+        attacks = sum(s["attacks"] for s in sides)
+        report["teams"][t] = {
+            "damage_per_fight": _percentiles([s["damage"] for s in sides]),
+            "hit_rate": round(sum(s["hits"] for s in sides) / attacks, 4) if attacks else 0,
+            "crit_rate": round(sum(s["crits"] for s in sides) / attacks, 4) if attacks else 0,
+        }
+    if elapsed:
+        report["seconds"] = round(elapsed, 3)
+        report["fights_per_sec"] = round(n / elapsed, 1)
+    return report
+
+def run_batch(team_a: List[str], team_b: List[str], fights=1000, seed=0, workers=None, chunk=None,
+              record_dir=None, **kwargs):
+    """
+    Runs `fights` seeded fights (seeds seed .. seed + fights - 1) over a process
+    pool (workers=1 runs inline) and returns summarize()'s report. With
+    `record_dir`, each fight's replay is written there as fight_<seed>.jsonl.gz.
+    """
+    a = [parse_spec(s) for s in team_a]
+    b = [parse_spec(s) for s in team_b]
+    workers = workers or os.cpu_count() or 1
+    seeds = list(range(seed, seed + fights))
+    chunk = chunk or max(1, min(250, fights // (workers * 4) or 1))
+    if record_dir: os.makedirs(record_dir, exist_ok=True)
+    jobs = [(seeds[i:i + chunk], a, b, kwargs, record_dir) for i in range(0, fights, chunk)]
+    start = time.perf_counter()
+    if workers == 1:
+        results = [r for job in jobs for r in _run_chunk(job)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = [r for part in pool.map(_run_chunk, jobs) for r in part]
+    report = summarize(results, time.perf_counter() - start)
+    report.update({"team_a": team_a, "team_b": team_b, "seed": seed, "workers": workers})
+    return report
@@ -0,0 +1,220 @@
+"""
+Shared per-turn battlefield analysis for AIDecisionEngine.
+
+analyze_battlefield() used to rescan every combatant for every AI unit and
+find clusters with an all-pairs loop: O(n^2) per unit, O(n^3) per round.
+BattlefieldSummary does that work once for the whole field and keeps it
+current as units act:
+
+- clusters: units binned into CLUSTER_RADIUS + 1 sized cells, so each unit's
+  neighbour count only looks at the 3x3 bins around it. Counts are adjusted
+  for the movers' old and new neighbours only.
+- threat: one influence grid per team -- each living unit adds
+  THREAT_RADIUS + 1 - distance to the tiles around it. threat_at(team, x, y)
+  sums the other teams' grids; movers restamp only their own square.
+- targets: each team's living units by HP ratio, weakest first, re-sorted
+  only after an HP change.
+
+sync() diffs every unit's (x, y, hp, alive) against the last look and
+updates only the ones that changed, so one AI unit's move or a player's
+attack costs a handful of tile updates instead of a full re-analysis.
+"""
+from typing import Dict, List
+
+CLUSTER_RADIUS = 2 # Chebyshev tiles; matches the old clustering loop
+THREAT_RADIUS = 4
+
+def _dist(ax, ay, bx, by):
+    return max(abs(ax - bx), abs(ay - by))
+
+def team_of(engine, unit):
+    """Legacy Combatants carry .team; ECS entities go through the engine's FactionMember / hero-tag rule."""
+    team = getattr(unit, "team", None)
+    if team is None and hasattr(engine, "team_of"):
+        team = engine.team_of(unit)
+    return team
+
+class _Rec:
+    __slots__ = ("x", "y", "hp", "hp_pct", "alive", "team", "cluster")
+
+class BattlefieldSummary:
+    """
+    One engine's field state, shared by every AI unit. Built lazily by
+    summary_for(); call sync() (cheap) before reading after anything acted.
+    """
+    def __init__(self, engine):
+        self.engine = engine
+        self.cols, self.rows = engine.cols, engine.rows
+        self.round = getattr(engine, "round_count", None)
+        self._recs: Dict[object, _Rec] = {}
+        self._bins: Dict[tuple, List] = {} # (bx, by) -> living units
+        self._threat: Dict[object, List[int]] = {} # team -> flat influence grid
+        self._targets: Dict[object, List] = {} # team -> living units, weakest first
+        self._clusters: Dict[object, List] = {}
+        self.stats = {"syncs": 0, "updates": 0}
+        for unit in engine.combatants:
+            self._add(unit)
+
+    # --- QUERIES ---
+    def team(self, unit):
+        rec = self._recs.get(unit)
+        return rec.team if rec else team_of(self.engine, unit)
+
+    def hostile(self, a_team, b_team):
+        """Units with no team at all treat everyone as hostile, as the old analysis did."""
+        return a_team is None or b_team is None or a_team != b_team
+
+    def hp_pct(self, unit):
+        return self._recs[unit].hp_pct
+
+    def cluster_size(self, unit):
+        """Living same-team units (itself included) within CLUSTER_RADIUS."""
+        rec = self._recs.get(unit)
+        return rec.cluster if rec and rec.alive else 0
+
+    def clusters(self, team) -> List[Dict]:
+        """[{"center": unit, "count": n}] for `team`'s units with company, largest first."""
+        cached = self._clusters.get(team)
+        if cached is None:
+            cached = [{"center": u, "count": r.cluster} for u, r in self._recs.items()
+                      if r.alive and r.team == team and r.cluster > 1]
+            cached.sort(key=lambda c: c["count"], reverse=True)
+            self._clusters[team] = cached
+        return cached
+
+    def targets(self, team) -> List:
+        """`team`'s living units, lowest HP ratio first."""
+        cached = self._targets.get(team)
+        if cached is None:
+            cached = [u for u, r in self._recs.items() if r.alive and r.team == team]
+            cached.sort(key=lambda u: self._recs[u].hp_pct)
+            self._targets[team] = cached
+        return cached
+
+    def teams(self) -> List:
+        """Teams with living units, in a stable order."""
+        return sorted({r.team for r in self._recs.values() if r.alive}, key=str)
+
+    def threat_at(self, team, x, y) -> int:
+        """Combined influence of every team hostile to `team` on tile (x, y)."""
+        if not (0 <= x < self.cols and 0 <= y < self.rows):
+            return 0
+        i = y * self.cols + x
+        return sum(grid[i] for t, grid in self._threat.items() if self.hostile(team, t))
+
+    def influence(self, team) -> List[int]:
+        """`team`'s own flat (row-major) influence grid. Shared: do not modify."""
+        return self._threat.get(team) or [0] * (self.cols * self.rows)
+
+    # --- MAINTENANCE ---
+    def sync(self) -> int:
+        """Picks up moves, HP changes, deaths, spawns and removals since the last look. Returns units updated."""
+        self.stats["syncs"] += 1
+        self.round = getattr(self.engine, "round_count", None)
+        changed = 0
+        seen = set()
+        for unit in self.engine.combatants:
+            seen.add(unit)
+            rec = self._recs.get(unit)
+            if rec is None:
+                self._add(unit)
+                changed += 1
+            elif (rec.x, rec.y, rec.hp, rec.alive) != (unit.x, unit.y, unit.hp, unit.is_alive()):
+                self.update(unit)
+                changed += 1
+        for unit in [u for u in self._recs if u not in seen]:
+            self._remove(unit)
+            changed += 1
+        return changed
+
+    def update(self, unit):
+        """Re-reads one unit after it moved, took damage or died."""
+        rec = self._recs.get(unit)
+        if rec is None:
+            return self._add(unit)
+        self.stats["updates"] += 1
+        alive = unit.is_alive()
+        hp_pct = unit.hp / unit.max_hp if unit.max_hp else 0.0
+        if hp_pct != rec.hp_pct or alive != rec.alive:
+            self._targets.pop(rec.team, None)
+        rec.hp, rec.hp_pct = unit.hp, hp_pct
+        if (rec.x, rec.y, rec.alive) == (unit.x, unit.y, alive):
+            return
+        if rec.alive:
+            self._unplace(unit, rec)
+        rec.x, rec.y, rec.alive = unit.x, unit.y, alive
+        if alive:
+            self._place(unit, rec)
+
+    def _add(self, unit):
+        rec = self._recs[unit] = _Rec()
+        rec.x, rec.y, rec.hp = unit.x, unit.y, unit.hp
+        rec.hp_pct = unit.hp / unit.max_hp if unit.max_hp else 0.0
+        rec.alive = unit.is_alive()
+        rec.team = team_of(self.engine, unit)
+        rec.cluster = 0
+        self._targets.pop(rec.team, None)
+        if rec.alive:
+            self._place(unit, rec)
+
+    def _remove(self, unit):
+        rec = self._recs.pop(unit)
+        self._targets.pop(rec.team, None)
+        if rec.alive:
+            self._unplace(unit, rec)
+
+    def _bin(self, x, y):
+        size = CLUSTER_RADIUS + 1
+        return (x // size, y // size)
+
+    def _neighbours(self, unit, rec):
+        """Living same-team units within CLUSTER_RADIUS of rec's tile (excluding `unit`)."""
+        bx, by = self._bin(rec.x, rec.y)
+        for nx in (bx - 1, bx, bx + 1):
+            for ny in (by - 1, by, by + 1):
+                for other in self._bins.get((nx, ny), ()):
+                    if other is unit: continue
+                    o = self._recs[other]
+                    if o.team == rec.team and _dist(rec.x, rec.y, o.x, o.y) <= CLUSTER_RADIUS:
+                        yield other, o
+
+    def _place(self, unit, rec):
+        rec.cluster = 1
+        for _, o in self._neighbours(unit, rec):
+            o.cluster += 1
+            rec.cluster += 1
+        self._bins.setdefault(self._bin(rec.x, rec.y), []).append(unit)
+        self._stamp(rec, 1)
+        self._clusters.pop(rec.team, None)
+
+    def _unplace(self, unit, rec):
+        self._bins[self._bin(rec.x, rec.y)].remove(unit)
+        for _, o in self._neighbours(unit, rec):
+            o.cluster -= 1
+        rec.cluster = 0
+        self._stamp(rec, -1)
+        self._clusters.pop(rec.team, None)
+
+    def _stamp(self, rec, sign):
+        grid = self._threat.get(rec.team)
+        if grid is None:
+            grid = self._threat[rec.team] = [0] * (self.cols * self.rows)
+        cols = self.cols
+        for y in range(max(0, rec.y - THREAT_RADIUS), min(self.rows, rec.y + THREAT_RADIUS + 1)):
+            dy = abs(y - rec.y)
+            row = y * cols
+            for x in range(max(0, rec.x - THREAT_RADIUS), min(cols, rec.x + THREAT_RADIUS + 1)):
+                grid[row + x] += sign * (THREAT_RADIUS + 1 - max(dy, abs(x - rec.x)))
+
+def summary_for(engine):
+    """
+    The engine's shared BattlefieldSummary, synced. Kept on the engine itself
+    (engine.battlefield) so every AIDecisionEngine driving it shares one.
+    """
+    summary = getattr(engine, "battlefield", None)
+    if summary is None or summary.engine is not engine:
+        summary = BattlefieldSummary(engine)
+        engine.battlefield = summary
+    else:
+        summary.sync()
+    return summary
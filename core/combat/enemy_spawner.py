@@ -6,8 +6,9 @@ class EnemySpawner:
     Prefab Factory for spawning ECS-native enemies.
     """
     @staticmethod
-    def spawn_at(name, x, y, sprite="sheet:5076", faction="Hostile"):
-        data = {
+    def template(name, x=0, y=0, sprite="sheet:5076", faction="Hostile"):
+        """The character data spawn_at() registers (also used by the headless battle simulator)."""
+        return {
             "Name": name,
             "x": x,
             "y": y,
@@ -18,6 +19,10 @@ class EnemySpawner:
                 "Reflexes": 10, "Knowledge": 5, "Logic": 5, "Willpower": 8
             }
         }
+
+    @staticmethod
+    def spawn_at(name, x, y, sprite="sheet:5076", faction="Hostile"):
+        data = EnemySpawner.template(name, x, y, sprite, faction)
         # This registers the entity in the global ECS AND saves to SQLite
         entity = world_ecs.create_character(data)
         entity.add_tag("hostile")
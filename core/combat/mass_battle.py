@@ -0,0 +1,325 @@
+"""
+Army-scale battles: thousands of units on a large grid, resolved in bulk.
+
+CombatEngine plays out skirmishes one entity and one die roll at a time.
+MassBattle holds its units as NumPy columns (position, pools, stats, side)
+plus an occupancy grid of unit indices, and resolves a round side by side
+with whole-array operations:
+
+    1. Distance field: Chebyshev steps to the nearest enemy over the
+       walkable grid, grown by 8-neighbour dilation from every enemy tile.
+    2. Casters (units with an AoE radius) aim at the densest enemy spot in
+       range; every blast is a disk mask, summed into one damage grid.
+    3. Movement: everyone not yet in reach steps downhill on the field,
+       one tile per sub-step; contested tiles go to one random claimant.
+    4. Attacks: units next to a foe swing at the weakest adjacent enemy,
+       with attack_target()'s dice, damage and SP cost.
+
+Sides act in turn, the lead rotating each round; SP recovers as in
+CombatEngine.end_round(). Armies are mustered from settlement and faction
+entities with levy(). Every battle is a pure function of its seed.
+"""
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from core.ecs import Stats, FactionMember, Logistics, Demographics, Infrastructure
+
+ATTACK_SP = 2 # attack_target()'s SP cost; movement keeps this in reserve
+HIT_DMG, CRIT_DMG, CRIT_MARGIN = 8, 15, 10
+SP_REGEN = 5
+MOVE_STEPS = 4 # Sub-steps per side turn
+CAST_SP = 4
+CAST_RANGE = 6
+CAST_MIN_TARGETS = 2 # A blast has to catch at least this many foes
+SAVE_DC = 15 # d20 + Reflexes//2 at or above halves blast damage
+LEVY_SHARE = 0.1 # Fraction of a population that takes the field
+
+UNIT_FIELDS = {
+    "x": "int32", "y": "int32", "side": "int16",
+    "hp": "float32", "max_hp": "float32", "sp": "float32", "max_sp": "float32",
+    "might": "int32", "reflexes": "int32", "armor": "int32", "dmg_mult": "float32",
+    "aoe_radius": "int32", "aoe_dmg": "float32",
+}
+
+# Orthogonal steps first, so ties prefer them
+NEIGHBORS = ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1))
+
+def disk(radius):
+    """(dx, dy) offsets of a filled disk."""
+    r2 = radius * radius + radius # Rounder than a plain r^2 cut-off at small radii
+    return [(dx, dy) for dy in range(-radius, radius + 1) for dx in range(-radius, radius + 1) if dx * dx + dy * dy <= r2]
+
+def _shift_add(out, src, dx, dy):
+    """out[y, x] += src[y - dy, x - dx], clipped at the edges."""
+    rows, cols = src.shape
+    if abs(dx) >= cols or abs(dy) >= rows: return
+    ys, yd = (slice(0, rows - dy), slice(dy, rows)) if dy >= 0 else (slice(-dy, rows), slice(0, rows + dy))
+    xs, xd = (slice(0, cols - dx), slice(dx, cols)) if dx >= 0 else (slice(-dx, cols), slice(0, cols + dx))
+    out[yd, xd] += src[ys, xs]
+
+def spread(grid, radius):
+    """Sum of grid over a disk around every tile: density maps and blast footprints."""
+    out = np.zeros(grid.shape, dtype=np.float32)
+    for dx, dy in disk(radius):
+        _shift_add(out, grid, dx, dy)
+    return out
+
+class MassBattle:
+    def __init__(self, cols=200, rows=200, seed=None, walls=None):
+        if np is None:
+            raise RuntimeError("MassBattle needs NumPy")
+        self.cols, self.rows = cols, rows
+        self.rng = np.random.default_rng(seed)
+        self.walls = np.zeros((rows, cols), dtype=bool)
+        for x, y in walls or ():
+            self.walls[y, x] = True
+        self.occ = np.full((rows, cols), -1, dtype=np.int32) # Tile -> unit index
+        self.units = {f: np.zeros(0, dtype=t) for f, t in UNIT_FIELDS.items()}
+        self.alive = np.zeros(0, dtype=bool)
+        self.sides = [] # side id -> name
+        self.labels = [] # unit index -> where it was mustered from
+        self.round_count = 0
+        self.history = []
+
+    def __len__(self): return len(self.alive)
+
+    # --- MUSTERING ---
+    def side_id(self, name):
+        if name not in self.sides:
+            self.sides.append(name)
+        return self.sides.index(name)
+
+    def add_units(self, side, count, region=None, hp=20, sp=10, might=10, reflexes=10, armor=0,
+                  dmg_mult=1.0, aoe_radius=0, aoe_dmg=0, label=None):
+        """
+        Places count identical units of side on free tiles of region
+        ((x0, y0, x1, y1), inclusive; the whole map if omitted). Returns their indices.
+        """
+        x0, y0, x1, y1 = region or (0, 0, self.cols - 1, self.rows - 1)
+        x0, y0 = max(0, x0), max(0, y0)
+        x1, y1 = min(self.cols - 1, x1), min(self.rows - 1, y1)
+        free = np.argwhere((self.occ[y0:y1 + 1, x0:x1 + 1] < 0) & ~self.walls[y0:y1 + 1, x0:x1 + 1])
+        if count > len(free):
+            raise ValueError(f"Region {region} has {len(free)} free tiles for {count} units")
+        picks = free[self.rng.permutation(len(free))[:count]]
+        start = len(self.alive)
+        new = {"x": picks[:, 1] + x0, "y": picks[:, 0] + y0, "side": self.side_id(side),
+               "hp": hp, "max_hp": hp, "sp": sp, "max_sp": sp, "might": might, "reflexes": reflexes,
+               "armor": armor, "dmg_mult": dmg_mult, "aoe_radius": aoe_radius, "aoe_dmg": aoe_dmg}
+        for f, t in UNIT_FIELDS.items():
+            self.units[f] = np.concatenate([self.units[f], np.broadcast_to(np.asarray(new[f], dtype=t), (count,))])
+        self.alive = np.concatenate([self.alive, np.ones(count, dtype=bool)])
+        self.labels.extend([label or side] * count)
+        idx = np.arange(start, start + count)
+        self.occ[self.units["y"][idx], self.units["x"][idx]] = idx
+        return idx
+
+    def levy(self, entity, side=None, region=None, share=LEVY_SHARE, **overrides):
+        """
+        Musters a share of a settlement's (Demographics) or faction's (Logistics)
+        population. Stats come from the entity's Stats; walls (Infrastructure
+        defense_level) become armor. Side defaults to the FactionMember faction.
+        """
+        demo, logi = entity.get_component(Demographics), entity.get_component(Logistics)
+        population = demo.pop_total if demo else (logi.population if logi else 0)
+        count = int(population * share)
+        if count <= 0: return np.zeros(0, dtype=np.int64)
+        fm = entity.get_component(FactionMember)
+        side = side or (fm.faction_name if fm else entity.name)
+        stats = entity.get_component(Stats)
+        infra = entity.get_component(Infrastructure)
+        kw = {"might": stats.get("Might") if stats else 10, "reflexes": stats.get("Reflexes") if stats else 10,
+              "armor": max(0, infra.defense_level - 1) if infra else 0}
+        kw.update(overrides)
+        print(f"[MASS] {entity.name} musters {count} for {side}")
+        return self.add_units(side, count, region=region, label=entity.name, **kw)
+
+    # --- QUERIES ---
+    def counts(self):
+        """side name -> units still standing."""
+        alive_sides = np.bincount(self.units["side"][self.alive], minlength=len(self.sides))
+        return {name: int(alive_sides[i]) for i, name in enumerate(self.sides)}
+
+    def winner(self):
+        standing = [name for name, n in self.counts().items() if n]
+        return standing[0] if len(standing) == 1 else None
+
+    def distance_to(self, targets):
+        """Chebyshev steps from every walkable tile to the nearest True tile of targets (-1: unreachable)."""
+        dist = np.full(targets.shape, -1, dtype=np.int32)
+        open_ = ~self.walls
+        frontier = targets & open_
+        seen = frontier.copy()
+        d = 0
+        while frontier.any():
+            dist[frontier] = d
+            grown = frontier.copy()
+            for dx, dy in NEIGHBORS:
+                _shift_add(grown, frontier, dx, dy)
+            frontier = grown & open_ & ~seen
+            seen |= frontier
+            d += 1
+        return dist
+
+    def burst_mask(self, cx, cy, radius):
+        """Tiles a blast of radius centred on (cx, cy) covers."""
+        centre = np.zeros((self.rows, self.cols), dtype=np.float32)
+        centre[cy, cx] = 1
+        return spread(centre, radius) > 0
+
+    # --- RESOLUTION ---
+    def apply_aoe(self, damage_grid, sides=None, save=True):
+        """
+        Deals damage_grid[y, x] to the unit on each tile (optionally only units of
+        the given side ids); a Reflex save halves it. A boolean mask times an
+        amount works as a grid. Returns the number of units hit.
+        """
+        victims = self.occ[damage_grid > 0]
+        victims = victims[victims >= 0]
+        victims = victims[self.alive[victims]]
+        if sides is not None:
+            victims = victims[np.isin(self.units["side"][victims], list(sides))]
+        if not len(victims): return 0
+        dmg = damage_grid[self.units["y"][victims], self.units["x"][victims]].astype(np.float32)
+        if save:
+            saved = self.rng.integers(1, 21, len(victims)) + self.units["reflexes"][victims] // 2 >= SAVE_DC
+            dmg = np.where(saved, np.floor(dmg / 2), dmg)
+        self._hurt(victims, dmg)
+        return len(victims)
+
+    def _hurt(self, idx, dmg):
+        np.subtract.at(self.units["hp"], idx, dmg)
+        dead = idx[self.units["hp"][idx] <= 0]
+        if len(dead):
+            dead = np.unique(dead)
+            dead = dead[self.alive[dead]]
+            self.alive[dead] = False
+            self.occ[self.units["y"][dead], self.units["x"][dead]] = -1
+
+    def _cast(self, s, dist, report):
+        u = self.units
+        casters = np.flatnonzero(self.alive & (u["side"] == s) & (u["aoe_radius"] > 0) & (u["sp"] >= CAST_SP))
+        if not len(casters): return casters
+        here = dist[u["y"][casters], u["x"][casters]]
+        casters = casters[(here >= 0) & (here <= CAST_RANGE)]
+        if not len(casters): return casters
+        foes = self._foe_grid(s).astype(np.float32)
+        window = np.array([(dx, dy) for dy in range(-CAST_RANGE, CAST_RANGE + 1) for dx in range(-CAST_RANGE, CAST_RANGE + 1)])
+        damage = np.zeros((self.rows, self.cols), dtype=np.float32)
+        cast = []
+        for radius in np.unique(u["aoe_radius"][casters]):
+            group = casters[u["aoe_radius"][casters] == radius]
+            density = spread(foes, int(radius))
+            tx = np.clip(u["x"][group][:, None] + window[:, 0], 0, self.cols - 1)
+            ty = np.clip(u["y"][group][:, None] + window[:, 1], 0, self.rows - 1)
+            scores = density[ty, tx]
+            best = scores.argmax(axis=1)
+            rows = np.arange(len(group))
+            fire = scores[rows, best] >= CAST_MIN_TARGETS
+            group, best, rows = group[fire], best[fire], rows[fire]
+            centres = np.zeros((self.rows, self.cols), dtype=np.float32)
+            np.add.at(centres, (ty[rows, best], tx[rows, best]), u["aoe_dmg"][group])
+            damage += spread(centres, int(radius))
+            cast.append(group)
+        cast = np.concatenate(cast) if cast else casters[:0]
+        u["sp"][cast] -= CAST_SP
+        report["casts"] += len(cast)
+        report["blasted"] += self.apply_aoe(damage, sides=[i for i in range(len(self.sides)) if i != s])
+        return cast
+
+    def _foe_grid(self, s):
+        foe = self.alive & (self.units["side"] != s)
+        grid = np.zeros((self.rows, self.cols), dtype=bool)
+        grid[self.units["y"][foe], self.units["x"][foe]] = True
+        return grid
+
+    def _move(self, s, dist, skip, report):
+        u = self.units
+        flat_dist = np.where(dist < 0, np.iinfo(np.int32).max, dist)
+        for _ in range(MOVE_STEPS):
+            movers = np.flatnonzero(self.alive & (u["side"] == s) & (u["sp"] >= ATTACK_SP + 1))
+            movers = np.setdiff1d(movers, skip, assume_unique=True)
+            here = flat_dist[u["y"][movers], u["x"][movers]]
+            movers, here = movers[here > 1], here[here > 1]
+            if not len(movers): return
+            best_d, best_x, best_y = here.copy(), u["x"][movers].copy(), u["y"][movers].copy()
+            for dx, dy in NEIGHBORS:
+                nx, ny = u["x"][movers] + dx, u["y"][movers] + dy
+                inside = (nx >= 0) & (nx < self.cols) & (ny >= 0) & (ny < self.rows)
+                nx, ny = np.clip(nx, 0, self.cols - 1), np.clip(ny, 0, self.rows - 1)
+                d = np.where(inside & (self.occ[ny, nx] < 0), flat_dist[ny, nx], np.iinfo(np.int32).max)
+                better = d < best_d
+                best_d = np.where(better, d, best_d)
+                best_x, best_y = np.where(better, nx, best_x), np.where(better, ny, best_y)
+            going = best_d < here
+            movers, best_x, best_y = movers[going], best_x[going], best_y[going]
+            if not len(movers): return
+            # One claimant per tile, picked at random
+            order = self.rng.permutation(len(movers))
+            _, first = np.unique((best_y * self.cols + best_x)[order], return_index=True)
+            won = order[first]
+            movers, best_x, best_y = movers[won], best_x[won], best_y[won]
+            self.occ[u["y"][movers], u["x"][movers]] = -1
+            u["x"][movers], u["y"][movers] = best_x, best_y
+            self.occ[best_y, best_x] = movers
+            u["sp"][movers] -= 1
+            report["moves"] += len(movers)
+
+    def _attack(self, s, skip, report):
+        u = self.units
+        attackers = np.flatnonzero(self.alive & (u["side"] == s) & (u["sp"] >= ATTACK_SP))
+        attackers = np.setdiff1d(attackers, skip, assume_unique=True)
+        if not len(attackers): return
+        target = np.full(len(attackers), -1)
+        target_hp = np.full(len(attackers), np.inf, dtype=np.float32)
+        for dx, dy in NEIGHBORS:
+            nx, ny = u["x"][attackers] + dx, u["y"][attackers] + dy
+            inside = (nx >= 0) & (nx < self.cols) & (ny >= 0) & (ny < self.rows)
+            o = self.occ[np.clip(ny, 0, self.rows - 1), np.clip(nx, 0, self.cols - 1)]
+            foe = inside & (o >= 0) & (u["side"][o] != s)
+            hp = np.where(foe, u["hp"][o], np.inf)
+            weaker = hp < target_hp
+            target, target_hp = np.where(weaker, o, target), np.where(weaker, hp, target_hp)
+        swing = target >= 0
+        attackers, target = attackers[swing], target[swing]
+        if not len(attackers): return
+        u["sp"][attackers] -= ATTACK_SP
+        atk = self.rng.integers(1, 21, len(attackers)) + u["might"][attackers] // 2
+        dfn = self.rng.integers(1, 21, len(attackers)) + u["reflexes"][target] // 2 + u["armor"][target]
+        margin = atk - dfn
+        base = np.where(margin >= CRIT_MARGIN, CRIT_DMG, np.where(margin > 0, HIT_DMG, 0))
+        dmg = np.where(base > 0, np.maximum(1, np.floor(base * u["dmg_mult"][attackers])), 0)
+        report["attacks"] += len(attackers)
+        report["hits"] += int((base > 0).sum())
+        self._hurt(target, dmg)
+
+    def side_turn(self, s, report):
+        dist = self.distance_to(self._foe_grid(s))
+        cast = self._cast(s, dist, report)
+        self._move(s, dist, cast, report)
+        self._attack(s, cast, report)
+
+    def round(self):
+        """Resolves one round for every side; returns the round's tallies."""
+        report = {"round": self.round_count, "moves": 0, "attacks": 0, "hits": 0, "casts": 0, "blasted": 0}
+        before = int(self.alive.sum())
+        lead = self.round_count % max(1, len(self.sides))
+        for s in self.sides[lead:] + self.sides[:lead]:
+            self.side_turn(self.sides.index(s), report)
+        u = self.units
+        u["sp"] = np.where(self.alive, np.minimum(u["max_sp"], u["sp"] + SP_REGEN), u["sp"])
+        report["killed"] = before - int(self.alive.sum())
+        report["standing"] = self.counts()
+        self.round_count += 1
+        self.history.append(report)
+        return report
+
+    def run(self, max_rounds=200):
+        """Fights until one side stands or max_rounds pass; returns the winner (None for a draw)."""
+        while self.round_count < max_rounds and self.winner() is None and len(self.sides) > 1:
+            self.round()
+        winner = self.winner()
+        print(f"[MASS] {winner or 'Draw'} after {self.round_count} rounds: {self.counts()}")
+        return winner
@@ -1,55 +1,208 @@
+import time
 import random
+from collections import OrderedDict
 from typing import List, Dict, Any, Tuple
-from core.ecs import Entity, Stats, Position, Vitals
+from core.ecs import Entity, Stats, Position, Vitals, FactionMember
+from core.combat.pathfinding import NavGrid, FlowField, astar, jps
+from core.combat.visibility import Visibility
+from core.combat.occupancy import Occupancy, Roster
+from core.combat.replay import ReplayRecorder, recorded
+from core.combat import odds, planner
+from core.combat.reactions import ReactionTable, EMPTY as REACTIONS_NONE
 
 class CombatEngine:
-    def __init__(self, cols: int, rows: int, combatants: List[Entity] = None):
+    PATH_CACHE_SIZE = 512 # Cached (start, goal) paths per map version
+    FLOW_CACHE_SIZE = 16 # Cached flow fields (one per target/team) per map version
+
+    def __init__(self, cols: int, rows: int, combatants: List[Entity] = None, seed: int = None):
         self.cols = cols
         self.rows = rows
+        self.seed = seed if seed is not None else random.randrange(1 << 63)
+        self.rng = random.Random(self.seed) # Every roll in this encounter; see core/combat/replay.py
+        self.recorder = None
+        self.occupancy = Occupancy(cols, rows) # Who stands where, see core/combat/occupancy.py
         self.combatants = combatants if combatants is not None else []
+        self.map_version = 0 # Bumped whenever walls/terrain change; keys the path cache
+        self._nav = None
+        self._path_cache = OrderedDict()
+        self._flow_cache = OrderedDict()
+        self.visibility = Visibility(cols, rows, set()) # Cached FOV/LOS, see core/combat/visibility.py
         self.terrain = {}
         self.walls = set()
         self.grid_cells = None
         self.round_count = 1
         self.reactions_used = set()
+        self.rank_scaling = False # Honour Enemy_Builder ArmorBonus/DamageMult metadata (batch_sim balance runs only)
+        self.battlefield = None # Shared AI analysis, see core/combat/battlefield.py
+        self.planner_budget_ms = planner.BUDGET_MS # Per "Tactician" NPC turn, see core/combat/planner.py
+        self.ai_turn_budget_ms = 150 # All planning in one run_ai_turn()
+        self.planner_pool = None # Optional thread/process pool for root-parallel planning
+        self._reaction_tables = {} # unit id -> (Traits dict, len, ReactionTable)
         self.replay_log = []
         self.pending_updates = []
+        self.pending_world_updates = [] # Terrain changes queued by ability effects (core/abilities/mechanics/summoning.py)
+
+    @property
+    def combatants(self): return self._combatants
+    @combatants.setter
+    def combatants(self, val):
+        self._combatants = Roster(self.occupancy, val)
+
+    @property
+    def walls(self): return self._walls
+    @walls.setter
+    def walls(self, val):
+        self._walls = set(val)
+        self.invalidate_paths()
+        self.visibility.reset(self._walls)
+
+    @property
+    def terrain(self): return self._terrain
+    @terrain.setter
+    def terrain(self, val):
+        self._terrain = dict(val)
+        self.invalidate_paths()
 
     def set_map(self, grid_cells: List[List[int]], walls: List[Tuple[int, int]]):
         self.grid_cells = grid_cells
         self.walls = set(walls)
 
-    def find_path(self, start: Tuple[int, int], end: Tuple[int, int]) -> List[Tuple[int, int]]:
-        """A* implementation placeholder."""
-        path = []
-        curr_x, curr_y = start
-        tx, ty = end
-        
-        while (curr_x != tx or curr_y != ty) and len(path) < 20:
-            if curr_x < tx: curr_x += 1
-            elif curr_x > tx: curr_x -= 1
-            elif curr_y < ty: curr_y += 1
-            elif curr_y > ty: curr_y -= 1
-            
-            if (curr_x, curr_y) in self.walls: break
-            path.append((curr_x, curr_y))
-            
-        return path
+    def start_recording(self, path=None):
+        """Logs every top-level engine call from here on (to `path`, or in memory) for replay()."""
+        self.stop_recording()
+        self.recorder = ReplayRecorder(self, path)
+        return self.recorder
 
-    def has_los(self, x1, y1, x2, y2):
-        """Line of Sight check."""
-        dx = x2 - x1
-        dy = y2 - y1
-        steps = max(abs(dx), abs(dy))
-        if steps == 0: return True
-        
-        for i in range(1, steps):
-            tx = int(x1 + (dx * i / steps))
-            ty = int(y1 + (dy * i / steps))
-            if (tx, ty) in self.walls:
-                return False
+    def stop_recording(self):
+        """Detaches the recorder; returns the recorded lines when recording in memory."""
+        return self.recorder.close() if self.recorder else None
+
+    @recorded
+    def spawn(self, unit, x=None, y=None):
+        """Adds a combatant mid-encounter (recordings store its full state)."""
+        if x is not None: self.place(unit, x, y)
+        self.combatants.append(unit)
+        return unit
+
+    @recorded
+    def apply_effect(self, effect, source=None, target=None):
+        """Resolves an ability effect string against this encounter (rolls on self.rng). Returns its log."""
+        from core.abilities.effects_registry import registry
+        log = []
+        registry.resolve(effect, {"engine": self, "attacker": source, "target": target, "log": log})
+        return log
+
+    @recorded
+    def set_wall(self, x, y, blocking=True):
+        """Adds/removes one wall, invalidating paths and only the FOVs that could see it."""
+        tile = (x, y)
+        if (tile in self._walls) == blocking: return False
+        if blocking: self._walls.add(tile)
+        else: self._walls.discard(tile)
+        self.invalidate_paths()
+        self.visibility.tile_changed(x, y)
         return True
 
+    def apply_world_updates(self):
+        """Applies terrain queued by ability effects; returns GRID_UPDATE messages for the VTT."""
+        updates = []
+        while self.pending_world_updates:
+            u = self.pending_world_updates.pop(0)
+            if u.get("type") != "terrain": continue
+            x, y = int(u["x"]), int(u["y"])
+            if not (0 <= x < self.cols and 0 <= y < self.rows): continue
+            if u.get("subtype") == "wall":
+                self.set_wall(x, y)
+                cell = 896
+            else:
+                self._terrain[(x, y)] = "DIFFICULT"
+                self.invalidate_paths()
+                cell = 130
+            if self.grid_cells: self.grid_cells[y][x] = cell
+            updates.append({"type": "GRID_UPDATE", "x": x, "y": y, "cell": cell})
+        return updates
+
+    def invalidate_paths(self):
+        """Call after editing walls/terrain in place; reassigning them does this automatically."""
+        self.map_version += 1
+        self._nav = None
+        self._path_cache.clear()
+        self._flow_cache.clear()
+
+    @property
+    def nav(self) -> NavGrid:
+        if self._nav is None:
+            self._nav = NavGrid(self.cols, self.rows, self._walls, self._terrain)
+        return self._nav
+
+    def find_path(self, start: Tuple[int, int], end: Tuple[int, int], partial=False) -> List[Tuple[int, int]]:
+        """
+        Cheapest path (in SP) from start to end: tiles after start, end included.
+        Uses JPS on maps without DIFFICULT terrain and A* otherwise. Returns [] if
+        end is unreachable, or with partial=True the path to the closest reachable tile.
+        """
+        start, end = (int(start[0]), int(start[1])), (int(end[0]), int(end[1]))
+        key = (start, end, partial, self.map_version)
+        path = self._path_cache.get(key)
+        if path is None:
+            grid = self.nav
+            if grid.uniform:
+                path = jps(grid, start, end)
+                if not path and partial:
+                    path = astar(grid, start, end, partial=True)
+            else:
+                path = astar(grid, start, end, partial)
+            path = self._path_cache[key] = tuple(path)
+            if len(self._path_cache) > self.PATH_CACHE_SIZE:
+                self._path_cache.popitem(last=False)
+        else:
+            self._path_cache.move_to_end(key)
+        return list(path)
+
+    def flow_field(self, goals) -> FlowField:
+        """
+        Shared distance map toward `goals` (one target's tile, or every tile of a
+        team). Cached per goal set and map version, so all NPCs chasing the same
+        target in a turn reuse one Dijkstra pass.
+        """
+        key = (frozenset((int(x), int(y)) for x, y in goals), self.map_version)
+        field = self._flow_cache.get(key)
+        if field is None:
+            field = self._flow_cache[key] = FlowField(self.nav, key[0])
+            if len(self._flow_cache) > self.FLOW_CACHE_SIZE:
+                self._flow_cache.popitem(last=False)
+        else:
+            self._flow_cache.move_to_end(key)
+        return field
+
+    def has_los(self, x1, y1, x2, y2):
+        """Symmetric line of sight, answered from cached shadowcast FOVs."""
+        return self.visibility.has_los((x1, y1), (x2, y2))
+
+    def unit_fov(self, unit):
+        """Tiles `unit` can see; computed once per origin tile and map state."""
+        return self.visibility.fov(unit.x, unit.y)
+
+    def unit_at(self, x, y, exclude=None):
+        """The living combatant on (x, y), or None."""
+        return self.occupancy.unit_at(x, y, exclude)
+
+    @recorded
+    def place(self, unit, x, y):
+        """Moves a unit's token without SP/terrain rules, keeping occupancy current."""
+        unit.x, unit.y = x, y
+        self.occupancy.move(unit, x, y)
+
+    def team_of(self, c):
+        fm = c.get_component(FactionMember)
+        if fm: return fm.faction_name
+        return "Player" if "hero" in c.tags else "Enemy"
+
+    def team_visibility(self, team):
+        """Row-major 0/1 grid of tiles seen by any living member of `team` (fog of war)."""
+        return self.visibility.grid([(c.x, c.y) for c in self.combatants if c.hp > 0 and self.team_of(c) == team])
+
+    @recorded
     def process_intent(self, player: Entity, intent: Dict[str, Any]):
         action = intent.get("action")
         target_id = intent.get("target")
@@ -58,6 +211,7 @@ class CombatEngine:
 
         updates = []
         log = []
+        self.occupancy.sync(self.combatants)
 
         if action == "ATTACK":
             target = next((c for c in self.combatants if c.id == target_id), None)
@@ -94,38 +248,32 @@ class CombatEngine:
                 updates.append({"type": "GRID_UPDATE", "x": tx, "y": ty, "cell": 128})
                 updates.append({"type": "UPDATE_SP", "id": player.id, "sp": player.sp})
 
+        updates.extend(self.apply_world_updates())
         return " ".join(log), updates
 
+    def reactions_for(self, unit) -> ReactionTable:
+        """A combatant's compiled trait reactions, rebuilt only when its Traits dict changes."""
+        traits = getattr(unit, 'metadata', {}).get("Traits")
+        if not traits: return REACTIONS_NONE
+        key = getattr(unit, "id", id(unit))
+        entry = self._reaction_tables.get(key)
+        if entry is None or entry[0] is not traits or entry[1] != len(traits):
+            entry = self._reaction_tables[key] = (traits, len(traits), ReactionTable(traits))
+        return entry[2]
+
+    def traits_changed(self, unit):
+        """Forces a recompile after editing a unit's Traits in place."""
+        self._reaction_tables.pop(getattr(unit, "id", id(unit)), None)
+
     def handle_reactions(self, source: Entity, target: Entity, trigger: str, context: Dict[str, Any]):
-        """Processes Evolutionary Trait Reactions."""
+        """Processes Evolutionary Trait Reactions (core/combat/reactions.py)."""
         logs = []
         v_updates = []
-        traits = getattr(target, 'metadata', {}).get("Traits", {})
-        
-        for name, mechanic in traits.items():
-            if "danger sense" in name.lower() and trigger == "BEFORE_ATTACK":
-                reaction_key = f"{target.id}_dangersense_{self.round_count}"
-                if reaction_key not in self.reactions_used:
-                    self.reactions_used.add(reaction_key)
-                    bonus = 5
-                    context["def_bonus"] = context.get("def_bonus", 0) + bonus
-                    logs.append(f"[REACTION] {target.name}'s Danger Sense flares up! (+{bonus} Defense)")
-                    v_updates.append({"type": "FCT", "text": "DANGER SENSE", "pos": [target.x, target.y], "style": "react"})
-
-            if ("thorns" in name.lower() or "spines" in name.lower()) and trigger == "POST_DAMAGE":
-                recoil = 2
-                source.hp -= recoil
-                logs.append(f"[REACTION] {source.name} is pricked by {target.name}'s spines! ({recoil} Recoil DMG)")
-                v_updates.append({"type": "FCT", "text": f"-{recoil} RECOIL", "pos": [source.x, source.y], "style": "dmg"})
-
-            if "reactive camo" in name.lower() and trigger == "BEFORE_ATTACK":
-                if random.random() < 0.25:
-                    context["force_miss"] = True
-                    logs.append(f"[REACTION] {target.name}'s Camo blurs their form!")
-                    v_updates.append({"type": "FCT", "text": "BLURRED", "pos": [target.x, target.y], "style": "react"})
-
+        for handler in self.reactions_for(target).by_trigger.get(trigger, ()):
+            handler(self, source, target, context, logs, v_updates)
         return logs, v_updates
 
+    @recorded
     def smash_tile(self, char, tx, ty):
         """Might-based environmental destruction."""
         if (tx, ty) not in self.walls:
@@ -140,24 +288,76 @@ class CombatEngine:
             
         stats = char.get_component(Stats)
         might = stats.get("Might", 10) if stats else 10
-        check = random.randint(1, 20) + (might // 2)
+        check = self.rng.randint(1, 20) + (might // 2)
         char.sp -= sp_cost
         
         if check >= 15:
-            self.walls.remove((tx, ty))
+            self.set_wall(tx, ty, False)
             if self.grid_cells: self.grid_cells[ty][tx] = 129
             return True, f"{char.name} SMASHES the obstacle!", [{"type": "SHAKE", "intensity": 8}, {"type": "FCT", "text": "SMASH!", "pos": [tx, ty], "style": "crit"}]
         else:
             return False, f"{char.name} fails to break the obstacle.", [{"type": "FCT", "text": "CLANG", "pos": [tx, ty], "style": "dmg"}]
 
-    def run_ai_turn(self):
+    def plan_turn(self, unit, budget_ms=None):
+        """Monte Carlo planned turn for `unit` within `budget_ms` (core/combat/planner.py): (steps, stats)."""
+        budget = self.planner_budget_ms if budget_ms is None else budget_ms
+        return planner.plan(self, unit, budget_ms=budget, executor=self.planner_pool)
+
+    def execute_plan(self, unit, steps):
+        """Plays plan_turn() steps through move_char()/attack_target(), stopping at the first that no longer applies."""
+        logs, updates = [], []
+        for step in steps:
+            if step[0] == "MOVE":
+                ok, msg = self.move_char(unit, step[1], step[2])
+                if not ok: break
+                updates.append({"type": "MOVE_TOKEN", "id": unit.id, "pos": [unit.x, unit.y]})
+            elif step[0] == "ATTACK":
+                target = step[1]
+                if target.hp <= 0 or max(abs(unit.x - target.x), abs(unit.y - target.y)) > 1: break
+                results, v_updates = self.attack_target(unit, target, skill_used=step[2])
+                logs.extend(results)
+                updates.extend(v_updates)
+                updates.append({"type": "UPDATE_HP", "id": target.id, "hp": target.hp})
+                updates.append({"type": "UPDATE_HP", "id": unit.id, "hp": unit.hp})
+        return logs, updates
+
+    @recorded
+    def run_ai_turn(self, plans=None):
+        """
+        NPCs act against the hero. "Tactician" NPCs (metadata AI) play a planned
+        turn within the shared ai_turn_budget_ms; when recording, their plans
+        are logged so replays repeat them (`plans`: unit id -> steps).
+        """
         hero = next((c for c in self.combatants if "hero" in c.tags), None)
         if not hero: return
-        self.pending_updates = []
-        for npc in [c for c in self.combatants if "hero" not in c.tags]:
+        self.pending_updates = self.apply_world_updates()
+        self.occupancy.sync(self.combatants)
+        # One flow field toward the hero serves every NPC; occupied tiles come from the occupancy index
+        field = self.flow_field([(hero.x, hero.y)])
+        occupied = self.occupancy.blocked_tiles()
+        npcs = [c for c in self.combatants if "hero" not in c.tags]
+        tacticians = [c for c in npcs if getattr(c, 'metadata', {}).get("AI") == "Tactician"]
+        chosen = {} if tacticians else None
+        deadline = time.perf_counter() + self.ai_turn_budget_ms / 1000
+        for npc in npcs:
             if npc.hp <= 0: continue
             dist = max(abs(npc.x - hero.x), abs(npc.y - hero.y))
             self.pending_updates.append({"type": "ACTION_START", "id": npc.id})
+            if npc in tacticians:
+                tacticians.remove(npc)
+                if plans is not None:
+                    steps = plans.get(npc.id)
+                else:
+                    share = (deadline - time.perf_counter()) * 1000 / (len(tacticians) + 1)
+                    steps, stats = self.plan_turn(npc, min(self.planner_budget_ms, share))
+                    if stats["iterations"] < planner.MIN_ITERATIONS: steps = None # Out of time: act like any NPC
+                if steps is not None:
+                    chosen[npc.id] = steps
+                    results, v_updates = self.execute_plan(npc, steps)
+                    self.replay_log.extend(results)
+                    self.pending_updates.extend(v_updates)
+                    occupied = self.occupancy.blocked_tiles()
+                    continue
             if dist <= 1:
                 results, v_updates = self.attack_target(npc, hero)
                 self.replay_log.extend(results)
@@ -165,22 +365,41 @@ class CombatEngine:
                 self.pending_updates.append({"type": "UPDATE_HP", "id": hero.id, "hp": hero.hp})
                 self.pending_updates.append({"type": "UPDATE_HP", "id": npc.id, "hp": npc.hp})
             elif npc.sp >= 1:
-                path = self.find_path((npc.x, npc.y), (hero.x, hero.y))
-                if path:
-                    for i in range(len(path)):
-                        if i >= npc.sp: break
-                        if path[i] == (hero.x, hero.y): break
-                        tx, ty = path[i]
-                        if not any(c.x == tx and c.y == ty for c in self.combatants):
-                            npc.x, npc.y = tx, ty
+                start = pos = (npc.x, npc.y)
+                if field.distance(*pos) is not None:
+                    for _ in range(npc.sp):
+                        step = field.next_step(*pos, occupied)
+                        if step is None: break
+                        pos = step
+                else:
+                    # Hero walled off: close in as far as the map allows
+                    for step in self.find_path(pos, (hero.x, hero.y), partial=True)[:npc.sp]:
+                        if step in occupied: break
+                        pos = step
+                if pos != start:
+                    occupied.discard(start)
+                    occupied.add(pos)
+                    self.place(npc, *pos)
                     self.pending_updates.append({"type": "MOVE_TOKEN", "id": npc.id, "pos": [npc.x, npc.y]})
+        if chosen is not None and plans is None and self.recorder is not None:
+            self.recorder.note("plans", chosen)
 
+    @recorded
     def end_round(self):
         self.round_count += 1
         self.reactions_used.clear()
         for c in self.combatants:
             if c.hp > 0: c.sp = min(c.max_sp, c.sp + 5)
 
+    def attack_odds(self, attacker, target, skill_used=None):
+        """Exact miss/hit/crit odds and expected damage of attack_target() right now (core/combat/odds.py)."""
+        return odds.preview(self, attacker, target, skill_used)
+
+    def best_target(self, attacker, targets, skill_used=None):
+        """The target attack_target() is most likely to kill, then to hurt most."""
+        return odds.best_target(self, attacker, targets, skill_used)
+
+    @recorded
     def attack_target(self, attacker, target, skill_used=None):
         logs = []
         v_updates = []
@@ -207,19 +426,23 @@ class CombatEngine:
         atk_might = atk_stats.get("Might", 10) if atk_stats else 10
         def_reflex = (def_stats.get("Reflexes", 10) if def_stats else 10) + context["def_bonus"]
         
-        atk_roll = random.randint(1, 20) + (atk_might // 2) + context["skill_bonus"] if not context["force_miss"] else 1
-        def_roll = random.randint(1, 20) + (def_reflex // 2)
+        atk_roll = self.rng.randint(1, 20) + (atk_might // 2) + context["skill_bonus"] if not context["force_miss"] else 1
+        armor, dmg_mult = 0, 1.0
+        if self.rank_scaling: # Enemy_Builder rank scaling
+            armor = getattr(target, 'metadata', {}).get("ArmorBonus", 0)
+            dmg_mult = getattr(attacker, 'metadata', {}).get("DamageMult", 1.0)
+        def_roll = self.rng.randint(1, 20) + (def_reflex // 2) + armor
         margin = atk_roll - def_roll
         
         if margin >= 10: 
-            dmg = 15 if not skill_used else 25
+            dmg = max(1, int((15 if not skill_used else 25) * dmg_mult))
             target.take_damage(dmg)
             logs.append(f"CRITICAL! {target.name} takes {dmg} DMG.")
             v_updates.extend([{"type": "FCT", "text": f"-{dmg} HP!", "pos": [target.x, target.y], "style": "crit"},{"type": "SHAKE", "intensity": 5}])
             dr_logs, dr_updates = self.handle_reactions(attacker, target, "POST_DAMAGE", {})
             logs.extend(dr_logs); v_updates.extend(dr_updates)
         elif margin > 0: 
-            dmg = 8 if not skill_used else 14
+            dmg = max(1, int((8 if not skill_used else 14) * dmg_mult))
             target.take_damage(dmg)
             logs.append(f"HIT! {target.name} takes {dmg} DMG.")
             v_updates.append({"type": "FCT", "text": f"-{dmg}", "pos": [target.x, target.y], "style": "dmg"})
@@ -231,11 +454,13 @@ class CombatEngine:
             
         return logs, v_updates
 
+    @recorded
     def move_char(self, char, tx, ty):
         if not (0 <= tx < self.cols and 0 <= ty < self.rows): return False, "Boundaries reached."
         if (tx, ty) in self.walls: return False, "Path blocked."
+        if self.occupancy.is_occupied(tx, ty, exclude=char): return False, "Tile occupied."
         sp_needed = max(abs(char.x - tx), abs(char.y - ty)) * (2 if self.terrain.get((tx, ty)) == "DIFFICULT" else 1)
         if char.sp < sp_needed: return False, f"Not enough SP! ({sp_needed} required)"
         char.sp -= sp_needed
-        char.x, char.y = tx, ty
+        self.place(char, tx, ty)
         return True, f"Moved to {tx},{ty}."
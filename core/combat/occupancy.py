@@ -0,0 +1,220 @@
+"""
+Tile occupancy index for the tactical CombatEngine.
+
+Replaces "scan self.combatants for someone at (x, y)" with dict lookups:
+tile -> units standing there, plus unit -> indexed tile. The engine keeps it
+current on spawns (Roster appends), its own moves (CombatEngine.place) and
+deaths; sync() re-indexes anything moved behind its back (routers writing
+unit.x directly) in one O(n) pass.
+
+Dead units stay in the roster but are never returned: lookups drop them from
+the index lazily, so a unit killed by an ability effect frees its tile on the
+next query without the effect knowing about occupancy.
+"""
+from typing import Dict, Iterable, List, Set, Tuple
+
+def _alive(unit):
+    return unit.hp > 0
+
+class Occupancy:
+    """Units by tile for a cols x rows map. Stacked units (spawn overlap) are allowed."""
+    def __init__(self, cols: int, rows: int, units: Iterable = ()):
+        self.cols = cols
+        self.rows = rows
+        self._tiles: Dict[Tuple[int, int], List] = {}
+        self._where: Dict[object, Tuple[int, int]] = {}
+        for unit in units:
+            self.add(unit)
+
+    def __len__(self): return len(self._where)
+    def __contains__(self, unit): return unit in self._where
+
+    # --- MAINTENANCE ---
+    def add(self, unit):
+        if unit in self._where:
+            return self.move(unit, unit.x, unit.y)
+        tile = (int(unit.x), int(unit.y))
+        self._where[unit] = tile
+        self._tiles.setdefault(tile, []).append(unit)
+
+    def remove(self, unit):
+        tile = self._where.pop(unit, None)
+        if tile is None: return
+        here = self._tiles[tile]
+        here.remove(unit)
+        if not here: del self._tiles[tile]
+
+    def move(self, unit, x, y):
+        """Re-indexes `unit` at (x, y); does not touch the unit's own coordinates."""
+        tile = (int(x), int(y))
+        old = self._where.get(unit)
+        if old == tile: return
+        if old is not None: self.remove(unit)
+        self._where[unit] = tile
+        self._tiles.setdefault(tile, []).append(unit)
+
+    def clear(self):
+        self._tiles.clear()
+        self._where.clear()
+
+    def rebuild(self, units: Iterable):
+        self.clear()
+        for unit in units:
+            self.add(unit)
+
+    def sync(self, units: Iterable):
+        """
+        Brings the index in line with `units` (the roster): re-indexes anyone
+        moved outside the engine, drops the dead, re-adds the revived. Returns
+        the number of units re-indexed.
+        """
+        moved = 0
+        for unit in units:
+            tile = self._where.get(unit)
+            if not _alive(unit):
+                if tile is not None: self.remove(unit)
+            elif tile != (unit.x, unit.y):
+                self.move(unit, unit.x, unit.y)
+                moved += 1
+        return moved
+
+    # --- QUERIES ---
+    def at(self, x, y) -> List:
+        """Living units on (x, y)."""
+        tile = (x, y)
+        here = self._tiles.get(tile)
+        if not here: return []
+        if not all(map(_alive, here)):
+            for unit in [u for u in here if not _alive(u)]:
+                self.remove(unit)
+            here = self._tiles.get(tile, [])
+        return list(here)
+
+    def unit_at(self, x, y, exclude=None):
+        """First living unit on (x, y) other than `exclude`, or None."""
+        for unit in self.at(x, y):
+            if unit is not exclude: return unit
+        return None
+
+    def is_occupied(self, x, y, exclude=None) -> bool:
+        return self.unit_at(x, y, exclude) is not None
+
+    def tile_of(self, unit):
+        return self._where.get(unit)
+
+    def blocked_tiles(self, exclude=None) -> Set[Tuple[int, int]]:
+        """Tiles holding a living unit (other than `exclude`): the `occupied` set for FlowField.next_step()."""
+        return {tile for tile, here in self._tiles.items() if any(u is not exclude and _alive(u) for u in here)}
+
+    def in_tiles(self, tiles: Iterable[Tuple[int, int]]) -> List:
+        """Living units on any of `tiles` (an AoE template)."""
+        found = []
+        for x, y in tiles:
+            found.extend(self.at(x, y))
+        return found
+
+    def in_rect(self, x0, y0, x1, y1) -> List:
+        """Living units inside the inclusive rectangle."""
+        x0, x1 = max(0, min(x0, x1)), min(self.cols - 1, max(x0, x1))
+        y0, y1 = max(0, min(y0, y1)), min(self.rows - 1, max(y0, y1))
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > len(self._tiles):
+            # Sparse board: walking the occupied tiles beats walking the area
+            return self.in_tiles([t for t in list(self._tiles) if x0 <= t[0] <= x1 and y0 <= t[1] <= y1])
+        return self.in_tiles((x, y) for y in range(y0, y1 + 1) for x in range(x0, x1 + 1))
+
+    def in_radius(self, x, y, radius) -> List:
+        """Living units within Chebyshev `radius` of (x, y) (a square burst, matching movement)."""
+        return self.in_rect(x - radius, y - radius, x + radius, y + radius)
+
+    def neighbors(self, unit, radius=1) -> List:
+        """Living units within `radius` of `unit`, excluding it."""
+        return [u for u in self.in_radius(int(unit.x), int(unit.y), radius) if u is not unit]
+
+def burst(x, y, radius) -> List[Tuple[int, int]]:
+    """Square AoE template centred on (x, y)."""
+    return [(x + dx, y + dy) for dy in range(-radius, radius + 1) for dx in range(-radius, radius + 1)]
+
+def cone(x, y, dx, dy, length) -> List[Tuple[int, int]]:
+    """
+    Cone template from (x, y) facing (dx, dy) in {-1, 0, 1}: each step out
+    widens by one tile either side (straight facings) or fills the diagonal
+    quadrant (diagonal facings). The origin tile is excluded.
+    """
+    tiles = []
+    for d in range(1, length + 1):
+        if dx and dy:
+            tiles.extend((x + dx * i, y + dy * j) for i in range(d + 1) for j in range(d + 1) if max(i, j) == d)
+        elif dx:
+            tiles.extend((x + dx * d, y + o) for o in range(-d, d + 1))
+        else:
+            tiles.extend((x + o, y + dy * d) for o in range(-d, d + 1))
+    return tiles
+
+def line(x0, y0, x1, y1) -> List[Tuple[int, int]]:
+    """Bresenham tiles from (x0, y0) to (x1, y1), origin excluded."""
+    tiles = []
+    dx, dy = abs(x1 - x0), -abs(y1 - y0)
+    sx, sy = (1 if x0 < x1 else -1), (1 if y0 < y1 else -1)
+    err = dx + dy
+    x, y = x0, y0
+    while (x, y) != (x1, y1):
+        e2 = 2 * err
+        if e2 >= dy: err += dy; x += sx
+        if e2 <= dx: err += dx; y += sy
+        tiles.append((x, y))
+    return tiles
+
+class Roster(list):
+    """
+    CombatEngine.combatants: a plain list that also keeps an Occupancy index in
+    step with spawns/removals (routers append units directly).
+    """
+    def __init__(self, occupancy: Occupancy, units=()):
+        super().__init__(units)
+        self.occupancy = occupancy
+        occupancy.rebuild(self)
+
+    def _resync(self):
+        self.occupancy.rebuild(self)
+
+    def append(self, unit):
+        super().append(unit)
+        self.occupancy.add(unit)
+
+    def insert(self, index, unit):
+        super().insert(index, unit)
+        self.occupancy.add(unit)
+
+    def extend(self, units):
+        units = list(units)
+        super().extend(units)
+        for unit in units:
+            self.occupancy.add(unit)
+
+    def __iadd__(self, units):
+        self.extend(units)
+        return self
+
+    def remove(self, unit):
+        super().remove(unit)
+        if unit not in self: self.occupancy.remove(unit)
+
+    def pop(self, index=-1):
+        unit = super().pop(index)
+        if unit not in self: self.occupancy.remove(unit)
+        return unit
+
+    def clear(self):
+        super().clear()
+        self.occupancy.clear()
+
+    def __setitem__(self, index, value):
+        super().__setitem__(index, value)
+        self._resync()
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self._resync()
+
+    def __reduce__(self):
+        return (list, (list(self),)) # Copies/pickles are plain lists
@@ -0,0 +1,168 @@
+"""
+Exact outcome odds for CombatEngine.attack_target().
+
+An attack is d20 + Might//2 + skill bonus against d20 + (Reflexes + Danger
+Sense)//2 (+ ArmorBonus on rank_scaling engines); a margin of 10+ crits, 1+ hits. Both dice
+are uniform, so the margin is the triangular d20-d20 distribution shifted by
+one integer offset, and every (attacker, defender, bonus) combination reduces
+to a lookup in two small tables indexed by that offset. Reactive Camo's 25%
+forced miss scales the hit/crit chances; thorns recoil and (rank_scaling)
+damage multipliers are applied on top.
+
+preview() gives the VTT its "hit 55% / crit 12% / ~6.1 dmg" line;
+score_targets() ranks a list of targets in one vectorized pass for the AI.
+Uses NumPy when installed, with an identical pure-Python fallback.
+"""
+from functools import lru_cache
+from typing import Dict, List
+
+from core.combat.reactions import DANGER_SENSE_BONUS, CAMO_CHANCE as CAMO_MISS, THORNS_RECOIL as RECOIL
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+STAT_MAX = 30 # stat_table() covers 0..STAT_MAX for both sides
+CRIT_MARGIN = 10
+SKILL_BONUS = 2
+# (normal, skill) damage and SP cost, as in attack_target()
+HIT_DMG = (8, 14)
+CRIT_DMG = (15, 25)
+SP_COST = (2, 4)
+
+_SPAN = 80 # Offsets beyond +-_SPAN are certain (clipped)
+
+def _build_offset_tables():
+    """p_crit[k], p_hit[k] (hit excludes crit) for offset k = index - _SPAN."""
+    # d20 - d20: 20 - |d| ways out of 400 for d in -19..19
+    diffs = [(d, (20 - abs(d)) / 400) for d in range(-19, 20)]
+    crit, hit = [], []
+    for k in range(-_SPAN, _SPAN + 1):
+        pc = sum(p for d, p in diffs if d + k >= CRIT_MARGIN)
+        ph = sum(p for d, p in diffs if 1 <= d + k < CRIT_MARGIN)
+        crit.append(pc)
+        hit.append(ph)
+    if np is not None:
+        return np.array(crit), np.array(hit)
+    return crit, hit
+
+P_CRIT, P_HIT = _build_offset_tables()
+
+def _index(offset):
+    return min(max(offset, -_SPAN), _SPAN) + _SPAN
+
+def offset_of(might, reflexes, skill=False, def_bonus=0, armor=0):
+    """Attack minus defense modifiers; reaction bonuses add to Reflexes before halving, armor after."""
+    return might // 2 + (SKILL_BONUS if skill else 0) - (reflexes + def_bonus) // 2 - armor
+
+def odds(might, reflexes, skill=False, def_bonus=0, camo=False, armor=0):
+    """(miss, hit, crit) probabilities for one attack_target() roll."""
+    i = _index(offset_of(int(might), int(reflexes), skill, def_bonus, armor))
+    scale = 1 - CAMO_MISS if camo else 1.0
+    crit, hit = float(P_CRIT[i]) * scale, float(P_HIT[i]) * scale
+    return 1 - hit - crit, hit, crit
+
+@lru_cache(maxsize=None)
+def stat_table(skill=False, def_bonus=0, armor=0):
+    """
+    (hit, crit) tables over every Might x Reflexes pair 0..STAT_MAX: row =
+    attacker Might, column = defender Reflexes. NumPy arrays when available
+    (cached and shared: do not modify).
+    """
+    stats = range(STAT_MAX + 1)
+    if np is not None:
+        s = np.arange(STAT_MAX + 1)
+        offsets = (s[:, None] // 2 + (SKILL_BONUS if skill else 0)) - (s[None, :] + def_bonus) // 2 - armor
+        idx = np.clip(offsets, -_SPAN, _SPAN) + _SPAN
+        return P_HIT[idx], P_CRIT[idx]
+    hit = [[P_HIT[_index(offset_of(m, r, skill, def_bonus, armor))] for r in stats] for m in stats]
+    crit = [[P_CRIT[_index(offset_of(m, r, skill, def_bonus, armor))] for r in stats] for m in stats]
+    return hit, crit
+
+def _damage(base, mult):
+    return max(1, int(base * mult))
+
+def _reactions(engine, target):
+    names = engine.reactions_for(target).names
+    return "danger_sense" in names, "thorns" in names, "reactive_camo" in names
+
+def _stat(unit, name):
+    stats = unit.get_component_by_name("Stats") if hasattr(unit, "get_component_by_name") else None
+    return stats.get(name, 10) if stats else 10
+
+def _damage_mult(engine, attacker):
+    return getattr(attacker, 'metadata', {}).get("DamageMult", 1.0) if engine.rank_scaling else 1.0
+
+def _inputs(engine, attacker, target, skill):
+    """Everything attack_target() would consult, as plain numbers."""
+    danger, thorns, camo = _reactions(engine, target)
+    armor = getattr(target, 'metadata', {}).get("ArmorBonus", 0) if engine.rank_scaling else 0
+    def_bonus = 0
+    if danger and f"{target.id}_dangersense_{engine.round_count}" not in engine.reactions_used:
+        def_bonus = DANGER_SENSE_BONUS
+    offset = offset_of(_stat(attacker, "Might"), _stat(target, "Reflexes"), skill, def_bonus, armor)
+    return offset, camo, thorns
+
+def preview(engine, attacker, target, skill_used=None) -> Dict:
+    """
+    Outcome odds of engine.attack_target(attacker, target, skill_used) as it
+    stands right now (round, reactions already spent, attacker SP).
+    """
+    skill = bool(skill_used)
+    mult = _damage_mult(engine, attacker)
+    hit_dmg, crit_dmg = _damage(HIT_DMG[skill], mult), _damage(CRIT_DMG[skill], mult)
+    can_attack = attacker.sp >= SP_COST[skill]
+    offset, camo, thorns = _inputs(engine, attacker, target, skill)
+    miss, hit, crit = (1.0, 0.0, 0.0)
+    if can_attack:
+        i = _index(offset)
+        scale = 1 - CAMO_MISS if camo else 1.0
+        crit, hit = float(P_CRIT[i]) * scale, float(P_HIT[i]) * scale
+        miss = 1 - hit - crit
+    p_kill = (hit if hit_dmg >= target.hp else 0.0) + (crit if crit_dmg >= target.hp else 0.0)
+    return {
+        "can_attack": can_attack,
+        "sp_cost": SP_COST[skill],
+        "miss": round(miss, 4),
+        "hit": round(hit, 4),
+        "crit": round(crit, 4),
+        "damage": {"hit": hit_dmg, "crit": crit_dmg},
+        "expected_damage": round(hit * min(hit_dmg, target.hp) + crit * min(crit_dmg, target.hp), 3),
+        "kill": round(p_kill, 4),
+        "expected_recoil": round((hit + crit) * RECOIL, 3) if thorns else 0.0,
+    }
+
+def score_targets(engine, attacker, targets: List, skill_used=None):
+    """
+    Expected damage and kill chance against each of `targets`, computed in one
+    pass over the offset tables. Returns (expected_damage, kill) sequences.
+    """
+    skill = bool(skill_used)
+    if not targets or attacker.sp < SP_COST[skill]:
+        return [0.0] * len(targets), [0.0] * len(targets)
+    mult = _damage_mult(engine, attacker)
+    hit_dmg, crit_dmg = _damage(HIT_DMG[skill], mult), _damage(CRIT_DMG[skill], mult)
+    rows = [_inputs(engine, attacker, t, skill) for t in targets]
+    if np is None:
+        dmg, kill = [], []
+        for (offset, camo, _), t in zip(rows, targets):
+            i, scale = _index(offset), 1 - CAMO_MISS if camo else 1.0
+            h, c = P_HIT[i] * scale, P_CRIT[i] * scale
+            dmg.append(h * min(hit_dmg, t.hp) + c * min(crit_dmg, t.hp))
+            kill.append((h if hit_dmg >= t.hp else 0.0) + (c if crit_dmg >= t.hp else 0.0))
+        return dmg, kill
+    idx = np.clip([r[0] for r in rows], -_SPAN, _SPAN) + _SPAN
+    scale = np.where([r[1] for r in rows], 1 - CAMO_MISS, 1.0)
+    hp = np.array([t.hp for t in targets], dtype=float)
+    h, c = P_HIT[idx] * scale, P_CRIT[idx] * scale
+    dmg = h * np.minimum(hit_dmg, hp) + c * np.minimum(crit_dmg, hp)
+    kill = h * (hit_dmg >= hp) + c * (crit_dmg >= hp)
+    return dmg, kill
+
+def best_target(engine, attacker, targets: List, skill_used=None):
+    """The target with the best kill chance, then expected damage; None if `targets` is empty."""
+    if not targets: return None
+    if len(targets) == 1: return targets[0]
+    dmg, kill = score_targets(engine, attacker, targets, skill_used)
+    return targets[max(range(len(targets)), key=lambda i: (kill[i], dmg[i]))]
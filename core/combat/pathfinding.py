@@ -0,0 +1,265 @@
+"""
+Grid pathfinding for the tactical CombatEngine.
+
+Movement is 8-directional with Chebyshev costs, matching move_char(): every
+step costs 1 SP, or 2 when it enters a DIFFICULT tile. Diagonal steps may
+pass between two walls, since move_char() allows any single-tile move.
+
+    astar()   -- weighted A*; handles terrain costs, optional closest-approach paths
+    jps()     -- Jump Point Search; uniform-cost maps only, far fewer node
+                 expansions on open maps
+    FlowField -- one Dijkstra distance map toward a target (or a whole team);
+                 any number of movers then descend it in O(1) per step
+
+All operate on a NavGrid, a flat snapshot of the engine's walls and terrain
+that the engine rebuilds once per map version.
+"""
+import heapq
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+DIFFICULT_COST = 2 # SP per step into a DIFFICULT tile (see CombatEngine.move_char)
+
+_DIRS = ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1))
+
+class NavGrid:
+    """
+    Flat walkability/cost arrays for a cols x rows map; node id = y * cols + x.
+    `padded` is the same wall map inside a one-tile blocked border (row width
+    cols + 2), so JPS can step without bounds checks.
+    """
+    def __init__(self, cols: int, rows: int, walls=(), terrain: Optional[Dict] = None):
+        self.cols = cols
+        self.rows = rows
+        self.blocked = bytearray(cols * rows)
+        self.cost = bytearray(b"\x01" * (cols * rows))
+        width = cols + 2
+        self.padded = bytearray(b"\x01" * (width * (rows + 2)))
+        for y in range(rows):
+            self.padded[(y + 1) * width + 1:(y + 1) * width + 1 + cols] = bytes(cols)
+        for x, y in walls:
+            if 0 <= x < cols and 0 <= y < rows:
+                self.blocked[y * cols + x] = 1
+                self.padded[(y + 1) * width + x + 1] = 1
+        self.uniform = True
+        for (x, y), kind in (terrain or {}).items():
+            if kind == "DIFFICULT" and 0 <= x < cols and 0 <= y < rows:
+                self.cost[y * cols + x] = DIFFICULT_COST
+                self.uniform = False
+
+    def walkable(self, x, y):
+        return 0 <= x < self.cols and 0 <= y < self.rows and not self.blocked[y * self.cols + x]
+
+def path_cost(grid: NavGrid, path: List[Tuple[int, int]]) -> int:
+    """SP needed to walk `path` (steps after the start tile)."""
+    return sum(grid.cost[y * grid.cols + x] for x, y in path)
+
+def _unwind(came, node, cols):
+    path = []
+    while node in came:
+        path.append((node % cols, node // cols))
+        node = came[node]
+    path.reverse()
+    return path
+
+def astar(grid: NavGrid, start, goal, partial=False) -> List[Tuple[int, int]]:
+    """
+    Cheapest path from start to goal as a list of tiles (start excluded, goal
+    included); [] if the goal is unreachable. With partial=True an unreachable
+    goal yields the path to the reachable tile closest to it instead.
+    """
+    cols, rows, blocked, cost = grid.cols, grid.rows, grid.blocked, grid.cost
+    (sx, sy), (gx, gy) = start, goal
+    if start == goal or not grid.walkable(gx, gy) and not partial:
+        return []
+    s, t = sy * cols + sx, gy * cols + gx
+    g = {s: 0}
+    came = {}
+    best, best_h = s, max(abs(sx - gx), abs(sy - gy))
+    open_heap = [(best_h, best_h, s)]
+    while open_heap:
+        _, h, node = heapq.heappop(open_heap)
+        if node == t:
+            return _unwind(came, t, cols)
+        if h < best_h:
+            best, best_h = node, h
+        y, x = divmod(node, cols)
+        base = g[node]
+        for dx, dy in _DIRS:
+            nx, ny = x + dx, y + dy
+            if not (0 <= nx < cols and 0 <= ny < rows): continue
+            n = ny * cols + nx
+            if blocked[n]: continue
+            ng = base + cost[n]
+            if ng < g.get(n, ng + 1):
+                g[n] = ng
+                came[n] = node
+                nh = max(abs(nx - gx), abs(ny - gy))
+                heapq.heappush(open_heap, (ng + nh, nh, n))
+    return _unwind(came, best, cols) if partial else []
+
+def _jump(pad, w, n, dx, dy, goal):
+    """Next jump point from padded node n heading (dx, dy), or None if the ray hits a wall/edge."""
+    step = dx + dy * w
+    while True:
+        n += step
+        if pad[n]: return None
+        if n == goal: return n
+        if dx and dy:
+            if (not pad[n - dx + dy * w] and pad[n - dx]) or (not pad[n + dx - dy * w] and pad[n - dy * w]):
+                return n
+            # A diagonal stops wherever a straight jump from it would find something
+            if _jump(pad, w, n, dx, 0, goal) is not None or _jump(pad, w, n, 0, dy, goal) is not None:
+                return n
+        elif dx:
+            if (not pad[n + dx + w] and pad[n + w]) or (not pad[n + dx - w] and pad[n - w]):
+                return n
+        else:
+            if (not pad[n + 1 + step] and pad[n + 1]) or (not pad[n - 1 + step] and pad[n - 1]):
+                return n
+
+def _successor_dirs(pad, w, n, dx, dy):
+    """Natural + forced neighbour directions given the direction we arrived from."""
+    if dx and dy:
+        dirs = [(dx, 0), (0, dy), (dx, dy)]
+        if pad[n - dx]: dirs.append((-dx, dy))
+        if pad[n - dy * w]: dirs.append((dx, -dy))
+    elif dx:
+        dirs = [(dx, 0)]
+        if pad[n + w]: dirs.append((dx, 1))
+        if pad[n - w]: dirs.append((dx, -1))
+    else:
+        dirs = [(0, dy)]
+        if pad[n + 1]: dirs.append((1, dy))
+        if pad[n - 1]: dirs.append((-1, dy))
+    return dirs
+
+def jps(grid: NavGrid, start, goal) -> List[Tuple[int, int]]:
+    """
+    Jump Point Search for uniform-cost maps (grid.uniform). Returns the same
+    path length as astar() while only expanding jump points.
+    """
+    (sx, sy), (gx, gy) = start, goal
+    if start == goal or not grid.walkable(gx, gy):
+        return []
+    pad, w = grid.padded, grid.cols + 2
+    s, t = (sy + 1) * w + sx + 1, (gy + 1) * w + gx + 1
+    g = {s: 0}
+    came = {}
+    open_heap = [(max(abs(sx - gx), abs(sy - gy)), 0, s)]
+    while open_heap:
+        _, _, node = heapq.heappop(open_heap)
+        if node == t:
+            return _expand(came, t, w)
+        y, x = divmod(node, w)
+        parent = came.get(node)
+        if parent is None:
+            dirs = _DIRS
+        else:
+            py, px = divmod(parent, w)
+            dirs = _successor_dirs(pad, w, node, (x > px) - (x < px), (y > py) - (y < py))
+        base = g[node]
+        for dx, dy in dirs:
+            jp = _jump(pad, w, node, dx, dy, t)
+            if jp is None: continue
+            jy, jx = divmod(jp, w)
+            ng = base + max(abs(jx - x), abs(jy - y))
+            if ng < g.get(jp, ng + 1):
+                g[jp] = ng
+                came[jp] = node
+                nh = max(abs(jx - gx - 1), abs(jy - gy - 1))
+                heapq.heappush(open_heap, (ng + nh, nh, jp))
+    return []
+
+def _expand(came, goal, w):
+    """Fills in the straight/diagonal runs between consecutive jump points (padded ids -> tiles)."""
+    jumps = [goal]
+    while jumps[-1] in came:
+        jumps.append(came[jumps[-1]])
+    jumps.reverse()
+    path = []
+    for a, b in zip(jumps, jumps[1:]):
+        (y0, x0), (y1, x1) = divmod(a, w), divmod(b, w)
+        dx, dy = (x1 > x0) - (x1 < x0), (y1 > y0) - (y1 < y0)
+        for i in range(1, max(abs(x1 - x0), abs(y1 - y0)) + 1):
+            path.append((x0 + dx * i - 1, y0 + dy * i - 1))
+    return path
+
+UNREACHABLE = 1 << 30
+
+class FlowField:
+    """
+    SP cost from every tile to the nearest goal tile (multi-source Dijkstra;
+    plain BFS on uniform-cost maps). Built once per target per turn and shared
+    by every NPC heading there: next_step() just picks the cheapest neighbour.
+    """
+    def __init__(self, grid: NavGrid, goals, max_cost=None):
+        self.grid = grid
+        self.goals = frozenset((int(x), int(y)) for x, y in goals)
+        cols, rows, blocked, cost = grid.cols, grid.rows, grid.blocked, grid.cost
+        dist = self.dist = [UNREACHABLE] * (cols * rows)
+        limit = max_cost if max_cost is not None else UNREACHABLE
+        seeds = [y * cols + x for x, y in self.goals if 0 <= x < cols and 0 <= y < rows]
+        for n in seeds:
+            dist[n] = 0
+        # Walking v -> u costs cost[u], so relaxing outward from u adds cost[u]
+        if grid.uniform:
+            queue = deque(seeds)
+            while queue:
+                u = queue.popleft()
+                nd = dist[u] + 1
+                if nd > limit: continue
+                y, x = divmod(u, cols)
+                for dx, dy in _DIRS:
+                    nx, ny = x + dx, y + dy
+                    if 0 <= nx < cols and 0 <= ny < rows:
+                        v = ny * cols + nx
+                        if nd < dist[v] and not blocked[v]:
+                            dist[v] = nd
+                            queue.append(v)
+        else:
+            heap = [(0, n) for n in seeds]
+            while heap:
+                d, u = heapq.heappop(heap)
+                if d > dist[u]: continue
+                nd = d + cost[u]
+                if nd > limit: continue
+                y, x = divmod(u, cols)
+                for dx, dy in _DIRS:
+                    nx, ny = x + dx, y + dy
+                    if 0 <= nx < cols and 0 <= ny < rows:
+                        v = ny * cols + nx
+                        if nd < dist[v] and not blocked[v]:
+                            dist[v] = nd
+                            heapq.heappush(heap, (nd, v))
+
+    def distance(self, x, y):
+        """SP cost from (x, y) to the nearest goal, or None if unreachable."""
+        grid = self.grid
+        if not (0 <= x < grid.cols and 0 <= y < grid.rows): return None
+        d = self.dist[int(y) * grid.cols + int(x)]
+        return d if d < UNREACHABLE else None
+
+    def next_step(self, x, y, occupied=()):
+        """
+        The neighbour of (x, y) on a cheapest route to a goal, skipping tiles in
+        `occupied` (falls back to the next-best neighbour that still makes
+        progress). None when already at a goal, unreachable, or boxed in.
+        """
+        grid = self.grid
+        cols, rows, cost, dist = grid.cols, grid.rows, grid.cost, self.dist
+        x, y = int(x), int(y)
+        here = dist[y * cols + x] if 0 <= x < cols and 0 <= y < rows else UNREACHABLE
+        if here == 0 or here >= UNREACHABLE: return None
+        best, best_d = None, UNREACHABLE
+        for dx, dy in _DIRS:
+            nx, ny = x + dx, y + dy
+            if not (0 <= nx < cols and 0 <= ny < rows): continue
+            n = ny * cols + nx
+            d = dist[n]
+            if d >= here: continue
+            if (nx, ny) in occupied: continue
+            d += cost[n]
+            if d < best_d:
+                best, best_d = (nx, ny), d
+        return best
@@ -0,0 +1,347 @@
+"""
+Time-budgeted Monte Carlo tree search for "Tactician" AI combatants.
+
+The planner searches over the acting unit's whole turn -- a sequence of
+walks (toward one of the nearest foes, or away from them), attacks and skill
+attacks (attack_target's skill_used: +2 to hit, 4 SP, heavier damage), ended
+by END -- on a SimState: a fork of the engine's units as flat lists, sharing
+its walls and terrain. Forking one costs a list copy per unit, so every
+iteration starts from a fresh fork.
+
+Each iteration walks the tree by UCT (open loop: the dice are rerolled each
+time, so a node is an action sequence, not a state), expands one new action,
+finishes the turn and plays ROLLOUT_ROUNDS further rounds with the same
+greedy policy as CombatEngine.run_ai_turn's NPCs, then scores the HP and
+kills swing between the two sides. Rolls follow attack_target()'s rules
+(core/combat/odds.py constants, reactions from core/combat/reactions.py).
+
+Search stops at the time budget (milliseconds) or the iteration cap,
+whichever comes first. With an executor (thread or process pool) the budget
+runs on several independent trees, one per worker, with different seeds;
+their root statistics are merged before the plan is read off (root
+parallelization). The planner draws from its own seeded RNG, never the
+engine's, so planning does not disturb the encounter's roll stream.
+"""
+import math
+import time
+import random
+import zlib
+from typing import Dict, List, Tuple
+
+from core.combat.odds import CRIT_MARGIN, SKILL_BONUS, HIT_DMG, CRIT_DMG, SP_COST
+from core.combat.reactions import DANGER_SENSE_BONUS, CAMO_CHANCE, THORNS_RECOIL
+
+BUDGET_MS = 25
+MAX_ITERATIONS = 5000
+MIN_ITERATIONS = 20 # Fewer than this (budget exhausted) and callers fall back to the plain NPC policy
+MAX_STEPS = 4 # Actions per planned turn (walks count as one)
+APPROACH_CHOICES = 3 # Nearest foes considered as walk targets
+RETREAT_STEPS = 2
+ROLLOUT_ROUNDS = 2
+EXPLORATION = 1.2
+KILL_VALUE = 0.5 # On top of the HP fraction lost
+SKILL_NAME = "Power Strike" # skill_used passed to attack_target() for skill attacks
+
+END = ("END",)
+_STEPS = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy]
+
+# SimState unit fields
+X, Y, HP, MAX_HP, SP, MAX_SP, MIGHT, REFLEXES, TEAM, MULT, ARMOR, DANGER, THORNS, CAMO, SENSED = range(15)
+
+class SimState:
+    """Planner-side copy of an encounter: units as lists (see the field indexes above), map shared."""
+    __slots__ = ("cols", "rows", "walls", "difficult", "units")
+
+    def __init__(self, cols, rows, walls, difficult, units):
+        self.cols, self.rows = cols, rows
+        self.walls, self.difficult = walls, difficult
+        self.units = units
+
+    def copy(self):
+        return SimState(self.cols, self.rows, self.walls, self.difficult, [u[:] for u in self.units])
+
+def _stat(unit, name):
+    stats = unit.get_component_by_name("Stats") if hasattr(unit, "get_component_by_name") else None
+    return stats.get(name, 10) if stats else 10
+
+def fork_state(engine) -> Tuple[SimState, List]:
+    """(SimState, units): units[i] is the engine combatant behind state.units[i]."""
+    units = list(engine.combatants)
+    rows = []
+    for c in units:
+        names = engine.reactions_for(c).names
+        meta = getattr(c, "metadata", {}) if engine.rank_scaling else {} # Same rules as attack_target()
+        rows.append([c.x, c.y, max(c.hp, 0), c.max_hp or 1, c.sp, c.max_sp, _stat(c, "Might"), _stat(c, "Reflexes"),
+                     engine.team_of(c), meta.get("DamageMult", 1.0), meta.get("ArmorBonus", 0),
+                     "danger_sense" in names, "thorns" in names, "reactive_camo" in names,
+                     f"{c.id}_dangersense_{engine.round_count}" in engine.reactions_used])
+    difficult = frozenset(t for t, kind in engine.terrain.items() if kind == "DIFFICULT")
+    return SimState(engine.cols, engine.rows, frozenset(engine.walls), difficult, rows), units
+
+# --- RULES ---
+def _dist(a, b):
+    return max(abs(a[X] - b[X]), abs(a[Y] - b[Y]))
+
+def _foes(state, me):
+    u = state.units[me]
+    return [j for j, o in enumerate(state.units) if o[HP] > 0 and o[TEAM] != u[TEAM]]
+
+def _free(state, x, y):
+    if not (0 <= x < state.cols and 0 <= y < state.rows) or (x, y) in state.walls:
+        return False
+    return not any(o[HP] > 0 and o[X] == x and o[Y] == y for o in state.units)
+
+def _move_cost(state, x, y):
+    return 2 if (x, y) in state.difficult else 1
+
+def _walk(state, me, target) -> List[Tuple[int, int]]:
+    """Greedy steps toward unit `target` until adjacent, keeping attack SP in reserve. Returns the tiles stepped on."""
+    u, t = state.units[me], state.units[target]
+    tiles = []
+    while _dist(u, t) > 1 and u[SP] > SP_COST[0]:
+        best = None
+        for dx, dy in _STEPS:
+            x, y = u[X] + dx, u[Y] + dy
+            if _free(state, x, y) and u[SP] >= _move_cost(state, x, y):
+                d = (max(abs(t[X] - x), abs(t[Y] - y)), (t[X] - x) ** 2 + (t[Y] - y) ** 2) # Straightest line on ties
+                if d[0] < _dist(u, t) and (best is None or d < best[0]):
+                    best = (d, x, y)
+        if best is None: break
+        u[SP] -= _move_cost(state, best[1], best[2])
+        u[X], u[Y] = best[1], best[2]
+        tiles.append((best[1], best[2]))
+    return tiles
+
+def _retreat(state, me) -> List[Tuple[int, int]]:
+    """Up to RETREAT_STEPS steps that each increase the distance to the nearest foe."""
+    u = state.units[me]
+    foes = [state.units[j] for j in _foes(state, me)]
+    tiles = []
+    for _ in range(RETREAT_STEPS):
+        here = min(_dist(u, f) for f in foes)
+        best = None
+        for dx, dy in _STEPS:
+            x, y = u[X] + dx, u[Y] + dy
+            if _free(state, x, y) and u[SP] >= _move_cost(state, x, y):
+                d = min(max(abs(f[X] - x), abs(f[Y] - y)) for f in foes)
+                if d > here and (best is None or d > best[0]):
+                    best = (d, x, y)
+        if best is None: break
+        u[SP] -= _move_cost(state, best[1], best[2])
+        u[X], u[Y] = best[1], best[2]
+        tiles.append((best[1], best[2]))
+    return tiles
+
+def legal_actions(state, me) -> List[Tuple]:
+    """
+    ("ATTACK", foe, skill) for foes in reach, ("APPROACH", foe) for the
+    APPROACH_CHOICES nearest others, ("RETREAT",) and END. Walks are macro
+    actions so the tree stays narrow; expand() turns them into tile moves.
+    """
+    u = state.units[me]
+    if u[HP] <= 0: return [END]
+    actions = []
+    foes = _foes(state, me)
+    far = []
+    for j in foes:
+        d = _dist(u, state.units[j])
+        if d <= 1:
+            if u[SP] >= SP_COST[0]: actions.append(("ATTACK", j, 0))
+            if u[SP] >= SP_COST[1]: actions.append(("ATTACK", j, 1))
+        else:
+            far.append((d, j))
+    if u[SP] > SP_COST[0]:
+        actions.extend(("APPROACH", j) for _, j in sorted(far)[:APPROACH_CHOICES])
+    if foes and u[SP] >= 1:
+        actions.append(("RETREAT",))
+    actions.append(END)
+    return actions
+
+def attack(state, a, t, skill, rng):
+    """attack_target() on the SimState: same dice, reactions and damage."""
+    atk, tgt = state.units[a], state.units[t]
+    if atk[SP] < SP_COST[skill]: return
+    def_bonus = 0
+    if tgt[DANGER] and not tgt[SENSED]:
+        tgt[SENSED] = True
+        def_bonus = DANGER_SENSE_BONUS
+    force_miss = tgt[CAMO] and rng.random() < CAMO_CHANCE
+    atk[SP] -= SP_COST[skill]
+    atk_roll = 1 if force_miss else rng.randint(1, 20) + atk[MIGHT] // 2 + (SKILL_BONUS if skill else 0)
+    margin = atk_roll - (rng.randint(1, 20) + (tgt[REFLEXES] + def_bonus) // 2 + tgt[ARMOR])
+    if margin <= 0: return
+    base = CRIT_DMG[skill] if margin >= CRIT_MARGIN else HIT_DMG[skill]
+    tgt[HP] = max(0, tgt[HP] - max(1, int(base * atk[MULT])))
+    if tgt[THORNS]:
+        atk[HP] -= THORNS_RECOIL
+
+def apply(state, me, action, rng):
+    """Plays one action; returns the tiles moved through (for expand())."""
+    kind = action[0]
+    if kind == "ATTACK":
+        attack(state, me, action[1], action[2], rng)
+    elif kind == "APPROACH":
+        return _walk(state, me, action[1])
+    elif kind == "RETREAT":
+        return _retreat(state, me)
+    return []
+
+def greedy_turn(state, me, rng):
+    """run_ai_turn's NPC policy: walk to the nearest foe (keeping attack SP), then swing once at the weakest in reach."""
+    u = state.units[me]
+    if u[HP] <= 0: return
+    foes = _foes(state, me)
+    if not foes: return
+    _walk(state, me, min(foes, key=lambda j: (_dist(u, state.units[j]), state.units[j][HP])))
+    in_reach = [j for j in foes if _dist(u, state.units[j]) <= 1 and state.units[j][HP] > 0]
+    if in_reach:
+        attack(state, me, min(in_reach, key=lambda j: state.units[j][HP]), 0, rng)
+
+def end_round(state):
+    for u in state.units:
+        u[SENSED] = False
+        if u[HP] > 0: u[SP] = min(u[MAX_SP], u[SP] + 5)
+
+def evaluate(state, root, team) -> float:
+    """0..1: HP fraction (plus KILL_VALUE per death) lost by the other side minus our own, per unit."""
+    ours = theirs = 0.0
+    n_ours = n_theirs = 0
+    for u, r in zip(state.units, root.units):
+        if r[HP] <= 0: continue
+        loss = (r[HP] - max(u[HP], 0)) / r[MAX_HP] + (KILL_VALUE if u[HP] <= 0 else 0.0)
+        if u[TEAM] == team: ours += loss; n_ours += 1
+        else: theirs += loss; n_theirs += 1
+    swing = theirs / max(1, n_theirs) - ours / max(1, n_ours)
+    return 0.5 + swing / (2 * (1 + KILL_VALUE))
+
+# --- SEARCH ---
+class _Node:
+    __slots__ = ("children", "visits", "value")
+
+    def __init__(self):
+        self.children: Dict[Tuple, "_Node"] = {}
+        self.visits = 0
+        self.value = 0.0
+
+    def export(self):
+        return [self.visits, self.value, {a: c.export() for a, c in self.children.items()}]
+
+def _uct(parent, child):
+    return child.value / child.visits + EXPLORATION * math.sqrt(math.log(parent.visits) / child.visits)
+
+def _iterate(root_state, me, tree, rng):
+    state = root_state.copy()
+    node, path, done = tree, [tree], False
+    for _ in range(MAX_STEPS):
+        legal = legal_actions(state, me)
+        untried = [a for a in legal if a not in node.children]
+        if untried:
+            action = untried[rng.randrange(len(untried))]
+            node.children[action] = _Node()
+        else:
+            action = max(legal, key=lambda a: _uct(node, node.children[a]))
+        node = node.children[action]
+        path.append(node)
+        apply(state, me, action, rng)
+        if action == END or untried:
+            done = action == END
+            break
+    if not done:
+        greedy_turn(state, me, rng)
+    order = sorted(range(len(state.units)), key=lambda i: -state.units[i][REFLEXES])
+    passed = [i for i in order if i != me] # The rest of this round, then full rounds
+    for _ in range(ROLLOUT_ROUNDS):
+        for i in passed:
+            greedy_turn(state, i, rng)
+        end_round(state)
+        passed = order
+    score = evaluate(state, root_state, root_state.units[me][TEAM])
+    for n in path:
+        n.visits += 1
+        n.value += score
+
+def search(state, me, budget_ms=BUDGET_MS, iterations=MAX_ITERATIONS, seed=0, until=None):
+    """
+    One tree. Returns (exported tree, iterations run). `until` is an absolute
+    time.time() deadline (pool workers: the caller's budget, not their own).
+    Module-level so process pools can pickle it.
+    """
+    rng = random.Random(seed)
+    tree = _Node()
+    if until is None and budget_ms:
+        until = time.time() + budget_ms / 1000
+    n = 0
+    while n < iterations and (until is None or time.time() < until):
+        _iterate(state, me, tree, rng)
+        n += 1
+    return tree.export(), n
+
+def _merge(into, other):
+    into[0] += other[0]
+    into[1] += other[1]
+    for a, sub in other[2].items():
+        if a in into[2]: _merge(into[2][a], sub)
+        else: into[2][a] = sub
+    return into
+
+def best_sequence(tree, min_visits=2) -> List[Tuple]:
+    """Most-visited path from the root, ending in END or cut where the statistics run thin."""
+    actions = []
+    node = tree
+    while node[2]:
+        action, child = max(node[2].items(), key=lambda kv: (kv[1][0], kv[1][1]))
+        if child[0] < min_visits: break
+        actions.append(action)
+        if action == END: break
+        node = child
+    return actions
+
+def expand(state, me, actions, units) -> List[Tuple]:
+    """
+    Planner actions -> engine steps: walks become ("MOVE", x, y) per tile,
+    attacks name their unit. A sequence cut short is finished the way the
+    playouts finished it, with the greedy policy.
+    """
+    state = state.copy()
+    u = state.units[me]
+    steps = []
+    for action in actions:
+        if action == END:
+            return steps
+        if action[0] == "ATTACK":
+            steps.append(("ATTACK", units[action[1]], SKILL_NAME if action[2] else None))
+            u[SP] -= SP_COST[action[2]] # Not rolled: the outcome is the engine's to decide
+        else:
+            steps.extend(("MOVE", x, y) for x, y in apply(state, me, action, None))
+    foes = _foes(state, me)
+    if foes:
+        steps.extend(("MOVE", x, y) for x, y in _walk(state, me, min(foes, key=lambda j: (_dist(u, state.units[j]), state.units[j][HP]))))
+        in_reach = [j for j in foes if _dist(u, state.units[j]) <= 1]
+        if in_reach and u[SP] >= SP_COST[0]:
+            steps.append(("ATTACK", units[min(in_reach, key=lambda j: state.units[j][HP])], None))
+    return steps
+
+def plan(engine, unit, budget_ms=BUDGET_MS, iterations=MAX_ITERATIONS, executor=None, workers=None):
+    """
+    The planned turn for `unit`: [("MOVE", x, y) | ("ATTACK", target, skill_used)]
+    plus a stats dict (iterations, seconds, expected value). See execute_plan().
+    """
+    start = time.perf_counter()
+    state, units = fork_state(engine)
+    me = units.index(unit)
+    seed = zlib.crc32(f"{engine.seed}:{engine.round_count}:{unit.id}".encode("utf-8"))
+    if executor is None:
+        tree, n = search(state, me, budget_ms, iterations, seed)
+    else:
+        workers = workers or getattr(executor, "_max_workers", 1)
+        share = max(1, iterations // workers)
+        until = time.time() + budget_ms / 1000 if budget_ms else None
+        futures = [executor.submit(search, state, me, budget_ms, share, seed + i, until) for i in range(workers)]
+        tree, n = [0, 0.0, {}], 0
+        for f in futures:
+            sub, k = f.result()
+            _merge(tree, sub)
+            n += k
+    steps = expand(state, me, best_sequence(tree), units)
+    value = tree[1] / tree[0] if tree[0] else 0.5
+    return steps, {"iterations": n, "seconds": round(time.perf_counter() - start, 4), "value": round(value, 4)}
@@ -0,0 +1,72 @@
+"""
+Evolutionary trait reactions for CombatEngine.handle_reactions().
+
+Reactions are registered declaratively with @reaction(name, trigger,
+*keywords): a trait whose lowercased name contains any keyword gets the
+handler. Each combatant's traits are compiled once into a ReactionTable, a
+trigger -> handlers dispatch dict, so handle_reactions() only touches the
+handlers for its trigger (usually none) however long the trait list is.
+Tables are rebuilt when the Traits dict is replaced or changes size;
+CombatEngine.traits_changed() forces a rebuild after an in-place rename.
+
+Handlers run in trait order, then registration order -- the order the
+original substring checks ran in, so RNG draws (and replays) line up.
+"""
+from typing import Dict, Tuple
+
+DANGER_SENSE_BONUS = 5 # Added to Reflexes before halving
+CAMO_CHANCE = 0.25 # Forced miss
+THORNS_RECOIL = 2
+
+REACTIONS = [] # (name, trigger, keywords, handler) in registration order
+
+def reaction(name, trigger, *keywords):
+    """Registers `handler(engine, source, target, context, logs, v_updates)` for traits matching `keywords`."""
+    def register(handler):
+        REACTIONS.append((name, trigger, tuple(k.lower() for k in keywords), handler))
+        return handler
+    return register
+
+class ReactionTable:
+    """One combatant's compiled reactions: by_trigger[trigger] -> handlers; names -> reaction names present."""
+    __slots__ = ("by_trigger", "names")
+
+    def __init__(self, traits):
+        by_trigger: Dict[str, list] = {}
+        names = set()
+        for trait in traits:
+            low = trait.lower()
+            for name, trigger, keywords, handler in REACTIONS:
+                if any(k in low for k in keywords):
+                    by_trigger.setdefault(trigger, []).append(handler)
+                    names.add(name)
+        self.by_trigger: Dict[str, Tuple] = {t: tuple(h) for t, h in by_trigger.items()}
+        self.names = frozenset(names)
+
+EMPTY = ReactionTable(())
+
+# --- REGISTERED REACTIONS ---
+
+@reaction("danger_sense", "BEFORE_ATTACK", "danger sense")
+def _danger_sense(engine, source, target, context, logs, v_updates):
+    reaction_key = f"{target.id}_dangersense_{engine.round_count}"
+    if reaction_key not in engine.reactions_used:
+        engine.reactions_used.add(reaction_key)
+        bonus = DANGER_SENSE_BONUS
+        context["def_bonus"] = context.get("def_bonus", 0) + bonus
+        logs.append(f"[REACTION] {target.name}'s Danger Sense flares up! (+{bonus} Defense)")
+        v_updates.append({"type": "FCT", "text": "DANGER SENSE", "pos": [target.x, target.y], "style": "react"})
+
+@reaction("thorns", "POST_DAMAGE", "thorns", "spines")
+def _thorns(engine, source, target, context, logs, v_updates):
+    recoil = THORNS_RECOIL
+    source.hp -= recoil
+    logs.append(f"[REACTION] {source.name} is pricked by {target.name}'s spines! ({recoil} Recoil DMG)")
+    v_updates.append({"type": "FCT", "text": f"-{recoil} RECOIL", "pos": [source.x, source.y], "style": "dmg"})
+
+@reaction("reactive_camo", "BEFORE_ATTACK", "reactive camo")
+def _reactive_camo(engine, source, target, context, logs, v_updates):
+    if engine.rng.random() < CAMO_CHANCE:
+        context["force_miss"] = True
+        logs.append(f"[REACTION] {target.name}'s Camo blurs their form!")
+        v_updates.append({"type": "FCT", "text": "BLURRED", "pos": [target.x, target.y], "style": "react"})
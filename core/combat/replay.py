@@ -0,0 +1,216 @@
+"""
+Deterministic combat recording and headless replay.
+
+Every CombatEngine owns a seeded RNG stream (engine.rng) that all of its rolls
+and the ability effect handlers draw from, so an encounter is fully determined
+by its starting state, its seed and the ordered list of engine calls made on
+it. A recording is exactly that, as JSON lines:
+
+    {"v": 1, "seed": ..., "cols": .., "rows": .., "walls": [...], "terrain": [...], "units": [...], ...}
+    ["move_char", [{"@": "<unit id>"}, 3, 4], {}, 2749218113]
+    ["attack_target", [{"@": "..."}, {"@": "..."}], {}, 1028330817]
+    ["end_round", [], {}, 3920161001]
+
+The header is a snapshot taken when recording starts; each action line is the
+method name, its arguments (units as {"@": id}; units added with spawn() are
+stored whole) and a CRC of every unit's position/HP/SP afterwards. Only
+top-level calls are logged -- move_char() calling place(), or process_intent()
+calling attack_target(), replays itself. Decisions that depend on wall-clock
+time (run_ai_turn's planned turns) are added to their call's keyword
+arguments with ReplayRecorder.note().
+
+replay() rebuilds the engine and re-issues the calls with no rendering or
+prose beyond what the engine already does, checking each CRC to find the
+first action where a changed rule set diverges.
+"""
+import gzip
+import time
+import random
+import zlib
+import functools
+from typing import Dict, Iterable
+
+from core import codec
+from core.ecs import Entity
+
+FORMAT_VERSION = 1
+
+def recorded(method):
+    """CombatEngine method decorator: logs top-level calls while a recorder is attached."""
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(engine, *args, **kwargs):
+        rec = engine.recorder
+        if rec is None or rec.depth:
+            return method(engine, *args, **kwargs)
+        rec.depth += 1
+        try:
+            result = method(engine, *args, **kwargs)
+        finally:
+            rec.depth -= 1
+        if rec.notes:
+            kwargs, rec.notes = {**kwargs, **rec.notes}, {}
+        rec.log(name, args, kwargs)
+        return result
+    return wrapper
+
+def state_hash(engine) -> int:
+    """CRC32 of round, walls and every unit's (id, x, y, hp, sp): cheap enough to take per action."""
+    units = sorted((c.id, c.x, c.y, c.hp, c.sp) for c in engine.combatants)
+    return zlib.crc32(repr((engine.round_count, len(engine.walls), units)).encode("utf-8"))
+
+def _encode(value):
+    if hasattr(value, "components") and hasattr(value, "id"):
+        return {"@": value.id}
+    if isinstance(value, (list, tuple)):
+        return [_encode(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _encode(v) for k, v in value.items()}
+    return value
+
+def _decode(value, units):
+    if isinstance(value, dict):
+        if len(value) == 1 and "@" in value:
+            return units[value["@"]]
+        return {k: _decode(v, units) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_decode(v, units) for v in value]
+    return value
+
+def snapshot(engine) -> Dict:
+    """Replay header: everything replay() needs to rebuild the engine as it is now."""
+    return {
+        "v": FORMAT_VERSION,
+        "seed": engine.seed,
+        "cols": engine.cols,
+        "rows": engine.rows,
+        "round": engine.round_count,
+        "walls": sorted(engine.walls),
+        "terrain": [[x, y, kind] for (x, y), kind in sorted(engine.terrain.items())],
+        "grid": engine.grid_cells,
+        "reactions_used": sorted(engine.reactions_used),
+        "rank_scaling": engine.rank_scaling,
+        "pending_world_updates": engine.pending_world_updates,
+        "units": [c.to_dict() for c in engine.combatants],
+    }
+
+def _open(path, mode):
+    if str(path).endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+class ReplayRecorder:
+    """
+    Attached as engine.recorder by CombatEngine.start_recording(). If the
+    engine has already rolled, its stream is re-seeded from itself so that the
+    header's seed alone reproduces every roll that follows; recording a fresh
+    engine leaves its rolls untouched.
+    """
+    def __init__(self, engine, path=None):
+        self.engine = engine
+        self.path = path
+        self.depth = 0
+        self.actions = 0
+        self.notes = {}
+        if engine.rng.getstate() != random.Random(engine.seed).getstate():
+            engine.seed = engine.rng.getrandbits(63)
+            engine.rng.seed(engine.seed)
+        self.header = snapshot(engine)
+        self.lines = [codec.dumps(self.header)]
+        self._file = _open(path, "w") if path else None
+        if self._file: self._file.write(self.lines.pop() + "\n")
+
+    @classmethod
+    def resume(cls, engine, lines=None, path=None, actions=0):
+        """Re-attaches a recording to an engine rebuilt mid-encounter (see core/combat/sessions.py); no re-seed, no new header."""
+        rec = cls.__new__(cls)
+        rec.engine, rec.path, rec.depth, rec.actions = engine, path, 0, actions
+        rec.notes = {}
+        rec.lines = list(lines or ())
+        rec.header = codec.loads(rec.lines[0]) if rec.lines else None
+        rec._file = _open(path, "a") if path else None
+        engine.recorder = rec
+        return rec
+
+    def note(self, key, value):
+        """
+        Adds keyword argument `key` to the top-level call being recorded, so
+        replay() hands back a decision (a time-budgeted AI plan) instead of
+        remaking it.
+        """
+        self.notes[key] = value
+
+    def log(self, name, args, kwargs):
+        if name == "spawn":
+            args = (args[0].to_dict(),) + tuple(args[1:]) # Unknown to the header: store it whole
+        line = codec.dumps([name, _encode(args), _encode(kwargs), state_hash(self.engine)])
+        self.actions += 1
+        if self._file: self._file.write(line + "\n")
+        else: self.lines.append(line)
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+        if self.engine.recorder is self:
+            self.engine.recorder = None
+        return self.lines
+
+def _read(source) -> Iterable[str]:
+    if isinstance(source, (list, tuple)):
+        return source
+    with _open(source, "r") as f:
+        return f.read().splitlines()
+
+def load(header, registry=None):
+    """
+    Engine rebuilt from a replay header. Units are fresh, unregistered entities,
+    except that with a registry, units it knows by id are the registry's own
+    entities (the world copy is authoritative; the header's copy is ignored).
+    """
+    from core.combat.mechanics import CombatEngine
+    engine = CombatEngine(header["cols"], header["rows"], seed=header["seed"])
+    engine.walls = {tuple(w) for w in header["walls"]}
+    engine.terrain = {(x, y): kind for x, y, kind in header["terrain"]}
+    engine.grid_cells = header.get("grid")
+    engine.round_count = header.get("round", 1)
+    engine.reactions_used = set(header.get("reactions_used", ()))
+    engine.rank_scaling = header.get("rank_scaling", False)
+    engine.pending_world_updates = list(header.get("pending_world_updates", ()))
+    engine.combatants = [_bind(u, registry) for u in header["units"]]
+    return engine
+
+def _bind(unit, registry):
+    entity = registry.get_entity(unit.get("id")) if registry is not None else None
+    return entity if entity is not None else Entity.from_dict(unit)
+
+def replay(source, verify=True):
+    """
+    Re-runs a recording (file path, .gz path or list of lines) at full speed.
+    Returns (engine, report); report["diverged_at"] is the 1-based index of
+    the first action whose resulting state hash differs, or None.
+    """
+    lines = _read(source)
+    header = codec.loads(lines[0])
+    if header.get("v") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported replay version {header.get('v')}")
+    engine = load(header)
+    units = {c.id: c for c in engine.combatants}
+    report = {"actions": 0, "diverged_at": None, "expected": None, "got": None}
+    start = time.perf_counter()
+    for i, line in enumerate(lines[1:], 1):
+        if not line: continue
+        name, args, kwargs, expected = codec.loads(line)
+        if name == "spawn":
+            unit = units[args[0]["id"]] = Entity.from_dict(args[0])
+            args = [{"@": unit.id}] + args[1:]
+        getattr(engine, name)(*_decode(args, units), **_decode(kwargs, units))
+        report["actions"] = i
+        if verify:
+            got = state_hash(engine)
+            if got != expected:
+                report.update(diverged_at=i, expected=expected, got=got)
+                break
+    report["seconds"] = time.perf_counter() - start
+    return engine, report
@@ -0,0 +1,283 @@
+"""
+Many concurrent CombatEngines in one Brain process.
+
+CombatSessionManager holds one engine per session id (a table, a player, a
+VTT tab) instead of the old single WorldDatabase.active_combat. Live engines
+sit in an LRU; when there are more than `max_live` of them, when their
+estimated footprint passes `max_bytes`, or when one has been idle for
+`idle_seconds`, the least recently used are parked in SQLite (the
+combat_sessions table) and rebuilt transparently on their next get().
+
+Each session has its own RLock: routers mutate an engine inside
+`with sessions.use(session_id) as engine:` so two requests for the same
+table serialize while different tables run in parallel. Eviction never
+touches a session whose lock is held. Locks exist only while some thread
+holds or waits on them, and reads of unknown ids take none, so client-
+chosen session ids cannot grow the lock table.
+
+A parked engine is its replay header (core/combat/replay.py) plus the RNG
+state, combat log and any in-progress recording, so a rebuilt encounter
+rolls and records exactly as if it had never left memory. Given a registry
+(the Brain passes world_ecs), units that are world entities come back as
+those same registered entities, so HP/SP spent after a restore still lands
+on the world copy; other units come back as fresh, unregistered entities.
+"""
+import time
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from core.combat import replay
+
+DEFAULT_SESSION = "default"
+
+# Footprint estimate (tracemalloc on data/Saves/Burt.json characters)
+ENGINE_BYTES = 5 * 1024 # Empty 20x20 engine: occupancy, visibility, caches
+UNIT_BYTES = 3 * 1024 # Entity + components + tags
+CELL_BYTES = 8 # Per map cell, per flow field / nav grid / visual grid
+PATH_STEP_BYTES = 64 # Cached path step or visible tile
+LINE_BYTES = 128 # Log / recording line overhead beyond its text
+
+def footprint(engine) -> int:
+    """Estimated bytes held by `engine`: units, grids, path/flow/FOV caches, logs and recording."""
+    cells = engine.cols * engine.rows
+    size = ENGINE_BYTES + UNIT_BYTES * len(engine.combatants)
+    size += CELL_BYTES * cells * (len(engine._flow_cache) + (engine._nav is not None) + (engine.grid_cells is not None))
+    size += PATH_STEP_BYTES * sum(len(p) for p in engine._path_cache.values() if p)
+    size += PATH_STEP_BYTES * sum(len(e[1]) for e in engine.visibility._fov.values())
+    size += sum(LINE_BYTES + len(str(line)) for line in engine.replay_log)
+    if engine.recorder is not None:
+        size += sum(LINE_BYTES + len(line) for line in engine.recorder.lines)
+    return size
+
+def dump_engine(engine) -> Dict:
+    """Everything needed to rebuild `engine` mid-encounter (closes a file recording; restore_engine() reopens it)."""
+    state = replay.snapshot(engine)
+    version, internal, gauss = engine.rng.getstate()
+    extra = {"rng": [version, list(internal), gauss], "log": engine.replay_log}
+    if hasattr(engine, "world_objects"):
+        extra["world_objects"] = engine.world_objects
+    rec = engine.recorder
+    if rec is not None:
+        extra["recording"] = {"path": rec.path, "actions": rec.actions, "lines": rec.lines}
+        rec.close()
+    state["session"] = extra
+    return state
+
+def restore_engine(state: Dict, registry=None):
+    """Inverse of dump_engine(); units known to `registry` are re-bound to its entities."""
+    engine = replay.load(state, registry)
+    extra = state.get("session", {})
+    if "rng" in extra:
+        version, internal, gauss = extra["rng"]
+        engine.rng.setstate((version, tuple(internal), gauss))
+    engine.replay_log = list(extra.get("log", ()))
+    if "world_objects" in extra:
+        engine.world_objects = extra["world_objects"]
+    rec = extra.get("recording")
+    if rec:
+        replay.ReplayRecorder.resume(engine, rec["lines"], rec["path"], rec["actions"])
+    return engine
+
+class _Session:
+    __slots__ = ("engine", "last_used", "bytes")
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.last_used = time.monotonic()
+        self.bytes = footprint(engine)
+
+class CombatSessionManager:
+    """
+    Session id -> CombatEngine, with LRU/idle eviction to a PersistenceLayer
+    (core/database.py). `store=None` keeps evicted sessions nowhere: they are
+    simply dropped (tests, throwaway servers). `registry` is the ECSRegistry
+    restored units are re-bound to.
+    """
+    def __init__(self, store=None, max_live=16, max_bytes=256 * 1024 * 1024, idle_seconds=30 * 60, registry=None):
+        self.store = store
+        self.registry = registry
+        self.max_live = max_live
+        self.max_bytes = max_bytes
+        self.idle_seconds = idle_seconds
+        self._live: "OrderedDict[str, _Session]" = OrderedDict() # LRU first
+        self._parked = {sid for sid, _ in store.list_combat_sessions()} if store is not None else set() # Ids saved in the store
+        self._locks: Dict[str, list] = {} # session id -> [RLock, holders + waiters]; dropped at zero
+        self._lock = threading.Lock() # Guards _live, _parked and _locks only; never held across engine work
+        self.stats_counters = {"loads": 0, "evictions": 0, "idle_evictions": 0}
+
+    def __contains__(self, session_id):
+        with self._lock:
+            return session_id in self._live or session_id in self._parked
+
+    def _acquire(self, session_id, blocking=True) -> bool:
+        with self._lock:
+            entry = self._locks.get(session_id)
+            if entry is None:
+                entry = self._locks[session_id] = [threading.RLock(), 0]
+            entry[1] += 1
+        if entry[0].acquire(blocking):
+            return True
+        self._release(session_id, locked=False)
+        return False
+
+    def _release(self, session_id, locked=True):
+        with self._lock:
+            entry = self._locks[session_id]
+            if locked:
+                entry[0].release()
+            entry[1] -= 1
+            if not entry[1]:
+                del self._locks[session_id]
+
+    @contextmanager
+    def lock(self, session_id):
+        """`with sessions.lock(sid):` -- hold the session's lock while mutating its engine."""
+        self._acquire(session_id)
+        try:
+            yield
+        finally:
+            self._release(session_id)
+
+    # --- ACCESS ---
+    def get(self, session_id) -> Optional[object]:
+        """The session's engine, rebuilt from SQLite if it was evicted; None if there is none."""
+        with self._lock:
+            s = self._live.get(session_id)
+            if s is not None:
+                self._live.move_to_end(session_id)
+                s.last_used = time.monotonic()
+                return s.engine
+        if self.store is None or session_id not in self:
+            return None
+        with self.lock(session_id):
+            with self._lock:
+                s = self._live.get(session_id) # Loaded by another thread while we waited
+                if s is not None:
+                    return s.engine
+            state = self.store.load_combat_session(session_id)
+            if state is None:
+                with self._lock:
+                    self._parked.discard(session_id)
+                return None
+            engine = restore_engine(state, self.registry)
+            self.store.delete_combat_session(session_id)
+            with self._lock:
+                self._live[session_id] = _Session(engine)
+                self._parked.discard(session_id)
+            self.stats_counters["loads"] += 1
+            print(f"[SESSIONS] Restored '{session_id}' ({len(engine.combatants)} units)")
+        self.enforce(keep=session_id)
+        return engine
+
+    def create(self, session_id, engine):
+        """Installs `engine` as the session's encounter, replacing any previous one."""
+        with self.lock(session_id):
+            if self.store is not None:
+                self.store.delete_combat_session(session_id)
+            with self._lock:
+                old = self._live.pop(session_id, None)
+                self._live[session_id] = _Session(engine)
+                self._parked.discard(session_id)
+            if old is not None and old.engine is not engine:
+                old.engine.stop_recording()
+        self.enforce(keep=session_id)
+        return engine
+
+    def drop(self, session_id):
+        """Ends the session's encounter, live or parked."""
+        if session_id not in self:
+            return
+        with self.lock(session_id):
+            with self._lock:
+                old = self._live.pop(session_id, None)
+                self._parked.discard(session_id)
+            if old is not None:
+                old.engine.stop_recording()
+            if self.store is not None:
+                self.store.delete_combat_session(session_id)
+
+    @contextmanager
+    def use(self, session_id):
+        """`with sessions.use(sid) as engine:` -- the engine (or None) under the session lock; re-measured on exit."""
+        if session_id not in self:
+            yield None
+            return
+        with self.lock(session_id):
+            engine = self.get(session_id)
+            try:
+                yield engine
+            finally:
+                with self._lock:
+                    s = self._live.get(session_id)
+                if s is not None and s.engine is engine:
+                    s.bytes = footprint(engine)
+                    s.last_used = time.monotonic()
+        self.enforce(keep=session_id)
+
+    # --- EVICTION ---
+    def evict(self, session_id, blocking=True) -> bool:
+        """Parks a live session in SQLite (or drops it without a store). False if busy or not live."""
+        if session_id not in self._live or not self._acquire(session_id, blocking):
+            return False
+        try:
+            with self._lock:
+                s = self._live.pop(session_id, None)
+                if s is not None and self.store is not None:
+                    self._parked.add(session_id) # Readers wait on the session lock until it is saved
+            if s is None:
+                return False
+            if self.store is not None:
+                self.store.save_combat_session(session_id, dump_engine(s.engine))
+            else:
+                s.engine.stop_recording()
+            self.stats_counters["evictions"] += 1
+            print(f"[SESSIONS] Evicted '{session_id}' (~{s.bytes // 1024} KB)")
+            return True
+        finally:
+            self._release(session_id)
+
+    def enforce(self, keep=None, now=None) -> int:
+        """Evicts idle sessions, then LRU sessions until within max_live/max_bytes. Returns the number evicted."""
+        now = time.monotonic() if now is None else now
+        evicted = 0
+        with self._lock:
+            candidates = [(sid, s.last_used) for sid, s in self._live.items() if sid != keep]
+        for sid, last_used in candidates:
+            if self.idle_seconds is not None and now - last_used > self.idle_seconds:
+                if self.evict(sid, blocking=False):
+                    self.stats_counters["idle_evictions"] += 1
+                    evicted += 1
+                continue
+            with self._lock:
+                over = len(self._live) > self.max_live or self.live_bytes() > self.max_bytes
+            if not over:
+                break
+            evicted += self.evict(sid, blocking=False)
+        return evicted
+
+    def save_all(self):
+        """Parks every live session (shutdown)."""
+        for sid in list(self._live):
+            self.evict(sid)
+
+    # --- ACCOUNTING ---
+    def live_bytes(self) -> int:
+        return sum(s.bytes for s in list(self._live.values()))
+
+    def stats(self) -> Dict:
+        now = time.monotonic()
+        with self._lock:
+            live = {sid: {"units": len(s.engine.combatants), "round": s.engine.round_count,
+                          "bytes": s.bytes, "idle_seconds": round(now - s.last_used, 1)}
+                    for sid, s in self._live.items()}
+        parked = [sid for sid, _ in self.store.list_combat_sessions()] if self.store is not None else []
+        return {
+            "live": live,
+            "parked": parked,
+            "live_bytes": sum(s["bytes"] for s in live.values()),
+            "max_bytes": self.max_bytes,
+            "max_live": self.max_live,
+            **self.stats_counters,
+        }
@@ -0,0 +1,134 @@
+"""
+Field of view and line of sight for the tactical CombatEngine.
+
+FOV uses symmetric shadowcasting (Albert Ford's variant of the recursive
+shadowcasting algorithm), run per quadrant with integer slopes: a floor tile B
+is visible from A exactly when A is visible from B, so LOS checks can be
+answered from whichever FOV is already cached. Walls are opaque and revealed
+when lit; sight range is Chebyshev, like movement.
+
+FOVs are cached per origin tile together with the set of tiles the scan
+examined. A wall change only drops the cached FOVs whose scan examined the
+changed tile (tile_changed()); wholesale map replacement calls reset().
+"""
+from collections import OrderedDict
+from typing import Dict, Iterable, Set, Tuple
+
+def _quadrants(ox, oy):
+    return (
+        lambda depth, col: (ox + col, oy - depth), # North
+        lambda depth, col: (ox + col, oy + depth), # South
+        lambda depth, col: (ox + depth, oy + col), # East
+        lambda depth, col: (ox - depth, oy + col), # West
+    )
+
+def shadowcast(origin, radius, cols, rows, walls, lit=None) -> Set[Tuple[int, int]]:
+    """
+    Tiles of a cols x rows map visible from `origin` within Chebyshev `radius`;
+    `walls` and the map edge block sight. If given, `lit` collects every tile
+    the scan examined: only a change to one of those can alter the result.
+    """
+    visible = {origin}
+    for transform in _quadrants(*origin):
+        # Rows as (depth, start slope, end slope); a slope n/d is kept as an integer pair
+        stack = [(1, -1, 1, 1, 1)]
+        while stack:
+            depth, sn, sd, en, ed = stack.pop()
+            if depth > radius: continue
+            min_col = (2 * depth * sn + sd) // (2 * sd) # round half up
+            max_col = -((ed - 2 * depth * en) // (2 * ed)) # round half down
+            prev_wall = None
+            for col in range(min_col, max_col + 1):
+                tile = transform(depth, col)
+                inside = 0 <= tile[0] < cols and 0 <= tile[1] < rows
+                wall = not inside or tile in walls
+                if inside:
+                    if lit is not None: lit.add(tile)
+                    if wall or (col * sd >= depth * sn and col * ed <= depth * en):
+                        visible.add(tile)
+                if prev_wall and not wall:
+                    sn, sd = 2 * col - 1, 2 * depth
+                elif prev_wall is False and wall:
+                    stack.append((depth + 1, sn, sd, 2 * col - 1, 2 * depth))
+                prev_wall = wall
+            if prev_wall is False:
+                stack.append((depth + 1, sn, sd, en, ed))
+    return visible
+
+class Visibility:
+    """
+    Cached FOV/LOS over a map's wall set. `walls` is the engine's live set;
+    callers report edits through tile_changed() or reset().
+    """
+    CACHE_SIZE = 256 # Cached origins
+
+    def __init__(self, cols: int, rows: int, walls: Set[Tuple[int, int]], radius: int = None):
+        self.cols = cols
+        self.rows = rows
+        self.walls = walls
+        self.radius = radius or max(cols, rows)
+        self.version = 0
+        self._fov: Dict[Tuple[int, int], Tuple[int, Set, Set]] = OrderedDict() # origin -> (radius, visible, lit)
+        self.stats = {"hits": 0, "misses": 0, "dropped": 0}
+
+    def fov(self, x, y, radius=None) -> Set[Tuple[int, int]]:
+        """Visible tiles from (x, y). Shared cached set: do not mutate."""
+        origin, radius = (int(x), int(y)), radius or self.radius
+        entry = self._fov.get(origin)
+        if entry is not None and entry[0] >= radius:
+            self._fov.move_to_end(origin)
+            self.stats["hits"] += 1
+            tiles = entry[1]
+            if entry[0] == radius: return tiles
+            # Rows are scanned outward, so a wider FOV truncated to `radius` is exact
+            return {t for t in tiles if max(abs(t[0] - origin[0]), abs(t[1] - origin[1])) <= radius}
+        self.stats["misses"] += 1
+        lit = set()
+        tiles = shadowcast(origin, radius, self.cols, self.rows, self.walls, lit)
+        self._fov[origin] = (radius, tiles, lit)
+        self._fov.move_to_end(origin)
+        if len(self._fov) > self.CACHE_SIZE:
+            self._fov.popitem(last=False)
+        return tiles
+
+    def has_los(self, a, b) -> bool:
+        """Symmetric LOS between two tiles (answered from either endpoint's cached FOV)."""
+        a, b = (int(a[0]), int(a[1])), (int(b[0]), int(b[1]))
+        dist = max(abs(a[0] - b[0]), abs(a[1] - b[1]))
+        if dist <= 1: return True
+        entry = self._fov.get(b)
+        if entry is not None and entry[0] >= dist and b not in self.walls and a not in self.walls:
+            self.stats["hits"] += 1
+            return a in entry[1]
+        return b in self.fov(a[0], a[1], max(dist, self.radius))
+
+    def visible_from(self, origins: Iterable[Tuple[int, int]], radius=None) -> Set[Tuple[int, int]]:
+        """Union of the FOVs of several viewers (a team's shared sight)."""
+        seen = set()
+        for x, y in origins:
+            seen |= self.fov(x, y, radius)
+        return seen
+
+    def grid(self, origins, radius=None):
+        """Row-major 0/1 visibility grid for fog of war."""
+        seen = self.visible_from(origins, radius)
+        return [[1 if (x, y) in seen else 0 for x in range(self.cols)] for y in range(self.rows)]
+
+    def tile_changed(self, x, y):
+        """
+        A wall was added or removed at (x, y): drop only the FOVs whose scan
+        examined that tile. Returns the number dropped.
+        """
+        self.version += 1
+        tile = (x, y)
+        stale = [o for o, (_, _, lit) in self._fov.items() if tile in lit]
+        for o in stale:
+            del self._fov[o]
+        self.stats["dropped"] += len(stale)
+        return len(stale)
+
+    def reset(self, walls=None):
+        self.version += 1
+        if walls is not None:
+            self.walls = walls
+        self._fov.clear()
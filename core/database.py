@@ -1,21 +1,120 @@
 import sqlite3
 import json
 import os
+import threading
+import time
+from . import codec
+
+# Hot-path statements are module constants so sqlite3's per-connection
+# statement cache sees the identical string on every call.
+SQL_UPSERT_ENTITY = '''
+    INSERT OR REPLACE INTO entities (id, name, data, layer_id, location_id)
+    VALUES (?, ?, ?, ?, ?)
+'''
+SQL_DELETE_ENTITY = 'DELETE FROM entities WHERE id = ?'
+SQL_SELECT_ENTITY = 'SELECT name, data, layer_id, location_id FROM entities WHERE id = ?'
+SQL_SELECT_ALL_ENTITIES = 'SELECT id, name, data, layer_id, location_id FROM entities'
+SQL_SELECT_REGION_ENTITIES = '''
+    SELECT id, name, data, layer_id, location_id FROM entities
+    WHERE layer_id = ? AND location_id IS ?
+'''
+
+# Component deltas: one row per (entity, component) changed since the entity's
+# last full write. Overlaid on the entities.data blob at load; folded back in
+# by compact_components().
+SQL_UPSERT_COMPONENT = '''
+    INSERT OR REPLACE INTO entity_components (entity_id, component, data)
+    VALUES (?, ?, ?)
+'''
+SQL_DELETE_ENTITY_COMPONENTS = 'DELETE FROM entity_components WHERE entity_id = ?'
+SQL_SELECT_COMPONENTS = 'SELECT component, data FROM entity_components WHERE entity_id = ?'
+SQL_SELECT_ALL_COMPONENTS = 'SELECT entity_id, component, data FROM entity_components'
+SQL_SELECT_REGION_COMPONENTS = '''
+    SELECT c.entity_id, c.component, c.data FROM entity_components c
+    JOIN entities e ON e.id = c.entity_id
+    WHERE e.layer_id = ? AND e.location_id IS ?
+'''
+
+# Evicted combat encounters (core/combat/sessions.py), one JSON blob per session
+SQL_UPSERT_COMBAT_SESSION = 'INSERT OR REPLACE INTO combat_sessions (id, data, updated) VALUES (?, ?, ?)'
+SQL_SELECT_COMBAT_SESSION = 'SELECT data FROM combat_sessions WHERE id = ?'
+SQL_DELETE_COMBAT_SESSION = 'DELETE FROM combat_sessions WHERE id = ?'
+SQL_SELECT_COMBAT_SESSION_IDS = 'SELECT id, updated FROM combat_sessions ORDER BY updated'
 
 class PersistenceLayer:
     """
     Handles SQLite persistence for the active game world.
     Prevents JSON bottlenecks and corruption.
+
+    Each thread keeps one long-lived connection (cached prepared statements)
+    instead of reconnecting per call. Nothing is opened until the first query;
+    schema migration runs once per database file, on its first connection.
+    world_ecs is built when core.ecs is imported, so importing it must not
+    touch the tracked data/world_state.db.
+
+    WAL journaling is opt-in (`wal=True` or enable_wal()), set by the server at
+    startup: switching journal modes rewrites the database file.
     """
-    def __init__(self, db_path="data/world_state.db"):
+    STATEMENT_CACHE_SIZE = 256
+
+    def __init__(self, db_path="data/world_state.db", wal=False):
         self.db_path = db_path
-        self._init_db()
+        self.wal = wal
+        self._local = threading.local()
+        self._connections = []
+        self._conn_lock = threading.Lock()
+        self._migrated = set()
+
+    def _connect(self):
+        """Returns this thread's connection, opening and migrating it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.path == self.db_path:
+            return conn
 
-    def _init_db(self):
         directory = os.path.dirname(self.db_path)
         if directory:
             os.makedirs(directory, exist_ok=True)
-        conn = sqlite3.connect(self.db_path)
+        # check_same_thread=False only so close() can run from any thread;
+        # each connection is still only used by the thread that opened it.
+        conn = sqlite3.connect(self.db_path, check_same_thread=False,
+                               cached_statements=self.STATEMENT_CACHE_SIZE)
+        if self.wal:
+            self._use_wal(conn)
+
+        with self._conn_lock:
+            self._connections.append(conn)
+            needs_migration = self.db_path == ":memory:" or self.db_path not in self._migrated
+            if needs_migration:
+                self._create_schema(conn)
+                self._migrated.add(self.db_path)
+
+        self._local.conn = conn
+        self._local.path = self.db_path
+        return conn
+
+    @staticmethod
+    def _use_wal(conn):
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+
+    def enable_wal(self):
+        """
+        Switches the database to WAL (persistent in the file) and this thread's
+        connection to synchronous=NORMAL; connections opened later follow.
+        """
+        self.wal = True
+        self._use_wal(self._connect())
+
+    def close(self):
+        """Closes every pooled connection (call on shutdown)."""
+        with self._conn_lock:
+            for conn in self._connections:
+                try: conn.close()
+                except sqlite3.Error: pass
+            self._connections.clear()
+        self._local = threading.local()
+
+    def _create_schema(self, conn):
         cursor = conn.cursor()
         
         # Entities Table (ECS Pattern) - Updated for 4-Layer Hierarchy
@@ -30,6 +129,17 @@ class PersistenceLayer:
         ''')
         
         self._ensure_columns(cursor)
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_entities_region ON entities (layer_id, location_id)')
+
+        # Per-component deltas for entities (see SQL_UPSERT_COMPONENT)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS entity_components (
+                entity_id TEXT,
+                component TEXT,
+                data TEXT,
+                PRIMARY KEY (entity_id, component)
+            )
+        ''')
         
         # 1. Global Layer (30 Regions)
         cursor.execute('''
@@ -102,9 +212,17 @@ class PersistenceLayer:
                 FOREIGN KEY(entity_id) REFERENCES entities(id)
             )
         ''')
+
+        # Combat Sessions Table (idle encounters parked by CombatSessionManager)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS combat_sessions (
+                id TEXT PRIMARY KEY,
+                data TEXT, -- Serialized engine state
+                updated REAL
+            )
+        ''')
         
         conn.commit()
-        conn.close()
 
     def _ensure_columns(self, cursor):
         """Migration helper to ensure columns exist in existing tables."""
@@ -116,139 +234,210 @@ class PersistenceLayer:
         except sqlite3.OperationalError: pass
 
     def save_entity(self, entity_id, name, data_dict, layer_id=0, location_id=None):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        self._ensure_columns(cursor)
+        conn = self._connect()
+        with conn:
+            conn.execute(SQL_UPSERT_ENTITY, (entity_id, name, codec.dumps(data_dict), layer_id, location_id))
 
-        cursor.execute('''
-            INSERT OR REPLACE INTO entities (id, name, data, layer_id, location_id) 
-            VALUES (?, ?, ?, ?, ?)
-        ''', (entity_id, name, json.dumps(data_dict), layer_id, location_id))
-        conn.commit()
-        conn.close()
+    def flush_entities(self, rows, deleted_ids=(), component_rows=()):
+        """
+        Writes a batch in a single transaction (one fsync per flush):
+        rows           -- full (id, name, data_dict, layer_id, location_id) writes;
+                          these supersede any stored component deltas.
+        component_rows -- (entity_id, component_name, component_dict) deltas.
+        deleted_ids    -- entities to remove entirely.
+        Returns the number of serialized bytes written.
+        """
+        written = 0
+        conn = self._connect()
+        with conn:
+            if rows:
+                params = []
+                for eid, name, data, layer_id, location_id in rows:
+                    blob = codec.dumps(data)
+                    written += len(blob)
+                    params.append((eid, name, blob, layer_id, location_id))
+                conn.executemany(SQL_UPSERT_ENTITY, params)
+                conn.executemany(SQL_DELETE_ENTITY_COMPONENTS, [(r[0],) for r in rows])
+            if component_rows:
+                params = []
+                for eid, c_name, c_data in component_rows:
+                    blob = codec.dumps(c_data)
+                    written += len(blob)
+                    params.append((eid, c_name, blob))
+                conn.executemany(SQL_UPSERT_COMPONENT, params)
+            if deleted_ids:
+                ids = [(eid,) for eid in deleted_ids]
+                conn.executemany(SQL_DELETE_ENTITY, ids)
+                conn.executemany(SQL_DELETE_ENTITY_COMPONENTS, ids)
+        return written
 
     def load_entity(self, entity_id):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        self._ensure_columns(cursor)
-        cursor.execute('SELECT name, data FROM entities WHERE id = ?', (entity_id,))
-        row = cursor.fetchone()
-        conn.close()
+        conn = self._connect()
+        row = conn.execute(SQL_SELECT_ENTITY, (entity_id,)).fetchone()
         if row:
-            return {"name": row[0], "data": json.loads(row[1])}
+            data = codec.loads(row[1])
+            for c_name, c_json in conn.execute(SQL_SELECT_COMPONENTS, (entity_id,)):
+                data.setdefault("components", {})[c_name] = codec.loads(c_json)
+            return {"name": row[0], "data": data, "layer_id": row[2], "location_id": row[3]}
         return None
 
+    def iter_entities(self, layer_id=None, location_id=None, batch_size=500):
+        """
+        Streams (id, name, data, layer_id, location_id) rows through a cursor
+        instead of materializing the table. With layer_id set, only that
+        region's rows are read (served by idx_entities_region).
+        """
+        for batch in self.iter_entity_batches(layer_id, location_id, batch_size):
+            yield from batch
+
+    def iter_entity_batches(self, layer_id=None, location_id=None, batch_size=500):
+        """iter_entities(), one fetchmany() list at a time (for batched decoding)."""
+        conn = self._connect()
+        if layer_id is None:
+            cursor = conn.execute(SQL_SELECT_ALL_ENTITIES)
+        else:
+            cursor = conn.execute(SQL_SELECT_REGION_ENTITIES, (layer_id, location_id))
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch: break
+            yield batch
+
+    def load_component_deltas(self, layer_id=None, location_id=None):
+        """Returns {entity_id: {component_name: component_dict}} for stored deltas (optionally one region's)."""
+        conn = self._connect()
+        if layer_id is None:
+            cursor = conn.execute(SQL_SELECT_ALL_COMPONENTS)
+        else:
+            cursor = conn.execute(SQL_SELECT_REGION_COMPONENTS, (layer_id, location_id))
+        deltas = {}
+        for eid, c_name, c_json in cursor:
+            deltas.setdefault(eid, {})[c_name] = codec.loads(c_json)
+        return deltas
+
+    def clear_entities(self):
+        """Deletes every entity row and component delta."""
+        conn = self._connect()
+        with conn:
+            conn.execute('DELETE FROM entities')
+            conn.execute('DELETE FROM entity_components')
+
+    def compact_components(self):
+        """
+        Folds every component delta back into its entity's data blob and clears
+        the delta table. Returns the number of entities rewritten.
+        """
+        conn = self._connect()
+        with conn:
+            deltas = {}
+            for eid, c_name, c_json in conn.execute(SQL_SELECT_ALL_COMPONENTS):
+                deltas.setdefault(eid, {})[c_name] = c_json
+            updates = []
+            for eid, comps in deltas.items():
+                row = conn.execute(SQL_SELECT_ENTITY, (eid,)).fetchone()
+                if not row: continue
+                data = codec.loads(row[1])
+                components = data.setdefault("components", {})
+                for c_name, c_json in comps.items():
+                    components[c_name] = codec.loads(c_json)
+                updates.append((codec.dumps(data), eid))
+            conn.executemany('UPDATE entities SET data = ? WHERE id = ?', updates)
+            conn.execute('DELETE FROM entity_components')
+        return len(updates)
+
     def load_all_entities(self):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        self._ensure_columns(cursor)
-        cursor.execute('SELECT id, name, data, layer_id, location_id FROM entities')
-        rows = cursor.fetchall()
-        conn.close()
-        return rows
+        return self._connect().execute(SQL_SELECT_ALL_ENTITIES).fetchall()
 
     def sync_nodes(self, nodes_list):
         """Batch update world nodes from JSON to SQLite."""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
-        for node in nodes_list:
-            cursor.execute('''
-                INSERT OR REPLACE INTO nodes (id, name, x, y, faction_id, state)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (node.get('id'), node.get('name'), node.get('x'), node.get('y'), 
-                  node.get('faction_id'), json.dumps(node.get('stats', {}))))
+        cursor.executemany('''
+            INSERT OR REPLACE INTO nodes (id, name, x, y, faction_id, state)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', [(node.get('id'), node.get('name'), node.get('x'), node.get('y'),
+               node.get('faction_id'), json.dumps(node.get('stats', {}))) for node in nodes_list])
         conn.commit()
-        conn.close()
         print(f"[DB] Synced {len(nodes_list)} nodes to SQLite.")
 
     def create_global_region(self, region_id, name, grid_x, grid_y, biome_data, political_data=None):
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         cursor.execute('''
             INSERT OR REPLACE INTO global_regions (id, name, grid_x, grid_y, biome_data, political_data)
             VALUES (?, ?, ?, ?, ?, ?)
         ''', (region_id, name, grid_x, grid_y, json.dumps(biome_data), json.dumps(political_data or {})))
         conn.commit()
-        conn.close()
 
     def get_global_regions(self):
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         cursor.execute('SELECT id, name, grid_x, grid_y, biome_data FROM global_regions')
         rows = cursor.fetchall()
-        conn.close()
         return [{"id": r[0], "name": r[1], "grid_x": r[2], "grid_y": r[3], "biome_data": json.loads(r[4])} for r in rows]
 
     def create_local_zone(self, zone_id, global_region_id, region_x, region_y, terrain_data):
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         cursor.execute('''
             INSERT OR REPLACE INTO local_zones (id, global_region_id, region_x, region_y, terrain_data)
             VALUES (?, ?, ?, ?, ?)
         ''', (zone_id, global_region_id, region_x, region_y, json.dumps(terrain_data)))
         conn.commit()
-        conn.close()
 
     def get_local_zones(self, global_region_id):
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         cursor.execute('SELECT id, region_x, region_y, terrain_data FROM local_zones WHERE global_region_id = ?', (global_region_id,))
         rows = cursor.fetchall()
-        conn.close()
         return [{"id": r[0], "region_x": r[1], "region_y": r[2], "terrain_data": json.loads(r[3])} for r in rows]
 
     def create_player_map(self, map_id, local_zone_id, local_x, local_y, map_data):
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         cursor.execute('''
             INSERT OR REPLACE INTO player_maps (id, local_zone_id, local_x, local_y, map_data)
             VALUES (?, ?, ?, ?, ?)
         ''', (map_id, local_zone_id, local_x, local_y, json.dumps(map_data)))
         conn.commit()
-        conn.close()
 
     def get_player_map(self, map_id):
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         cursor.execute('SELECT id, local_zone_id, local_x, local_y, map_data FROM player_maps WHERE id = ?', (map_id,))
         row = cursor.fetchone()
-        conn.close()
         if row:
             return {"id": row[0], "local_zone_id": row[1], "local_x": row[2], "local_y": row[3], "map_data": json.loads(row[4])}
         return None
 
     # --- QUEST PERSISTENCE ---
     def save_quest(self, quest_id, title, description, status, data_dict):
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         cursor.execute('''
             INSERT OR REPLACE INTO quests (id, title, description, status, data)
             VALUES (?, ?, ?, ?, ?)
         ''', (quest_id, title, description, status, json.dumps(data_dict)))
         conn.commit()
-        conn.close()
 
     def load_all_quests(self):
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         cursor.execute('SELECT id, title, description, status, data FROM quests')
         rows = cursor.fetchall()
-        conn.close()
         return [{"id": r[0], "title": r[1], "description": r[2], "status": r[3], "data": json.loads(r[4])} for r in rows]
 
     # --- CONVERSATION PERSISTENCE ---
     def save_chat_turn(self, entity_id, session_id, role, content):
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         cursor.execute('''
             INSERT INTO conversations (entity_id, session_id, role, content)
             VALUES (?, ?, ?, ?)
         ''', (entity_id, session_id, role, content))
         conn.commit()
-        conn.close()
 
     def get_chat_history(self, entity_id=None, session_id=None, limit=50):
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         query = 'SELECT role, content, timestamp FROM conversations'
         params = []
@@ -262,9 +451,28 @@ class PersistenceLayer:
                 query += ' session_id = ?'
                 params.append(session_id)
         
-        query += f' ORDER BY timestamp DESC LIMIT {limit}'
+        query += ' ORDER BY timestamp DESC LIMIT ?'
+        params.append(int(limit))
         cursor.execute(query, params)
         rows = cursor.fetchall()
-        conn.close()
         # Return in chronological order
         return [{"role": r[0], "content": r[1], "timestamp": r[2]} for r in reversed(rows)]
+
+    # --- COMBAT SESSION PERSISTENCE ---
+    def save_combat_session(self, session_id, data_dict):
+        conn = self._connect()
+        conn.execute(SQL_UPSERT_COMBAT_SESSION, (session_id, codec.dumps(data_dict), time.time()))
+        conn.commit()
+
+    def load_combat_session(self, session_id):
+        row = self._connect().execute(SQL_SELECT_COMBAT_SESSION, (session_id,)).fetchone()
+        return codec.loads(row[0]) if row else None
+
+    def delete_combat_session(self, session_id):
+        conn = self._connect()
+        conn.execute(SQL_DELETE_COMBAT_SESSION, (session_id,))
+        conn.commit()
+
+    def list_combat_sessions(self):
+        """[(session_id, updated)] oldest first."""
+        return [tuple(r) for r in self._connect().execute(SQL_SELECT_COMBAT_SESSION_IDS)]
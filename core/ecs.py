@@ -1,8 +1,77 @@
 import uuid
-import json
 import sys
+import time
+import atexit
+import threading
+from collections import OrderedDict
 from typing import Dict, List, Any, Optional
 from .database import PersistenceLayer
+from . import codec
+from .spatial_index import SpatialHash
+from .name_index import NameIndex
+from .columnar import np, COLUMNAR_FIELDS, ColumnStore, ColumnarView, ColumnBatch
+
+class TagSet(set):
+    """A set of tags that reports every change to its owning entity (for indexing and persistence)."""
+    def __init__(self, owner, tags=()):
+        super().__init__(tags)
+        self._owner = owner
+
+    def _changed(self, added=(), removed=()):
+        if added or removed:
+            self._owner._tags_changed(added, removed)
+
+    def add(self, tag):
+        if tag not in self:
+            super().add(tag)
+            self._changed(added=(tag,))
+
+    def discard(self, tag):
+        if tag in self:
+            super().discard(tag)
+            self._changed(removed=(tag,))
+
+    def remove(self, tag):
+        super().remove(tag)
+        self._changed(removed=(tag,))
+
+    def pop(self):
+        tag = super().pop()
+        self._changed(removed=(tag,))
+        return tag
+
+    def clear(self):
+        removed = tuple(self)
+        super().clear()
+        self._changed(removed=removed)
+
+    def update(self, *others):
+        added = {t for o in others for t in o} - self
+        super().update(added)
+        self._changed(added=added)
+
+    def difference_update(self, *others):
+        before = set(self)
+        super().difference_update(*others)
+        self._changed(removed=before - self)
+
+    def intersection_update(self, *others):
+        before = set(self)
+        super().intersection_update(*others)
+        self._changed(removed=before - self)
+
+    def symmetric_difference_update(self, other):
+        before = set(self)
+        super().symmetric_difference_update(other)
+        self._changed(added=self - before, removed=before - self)
+
+    def __ior__(self, other): self.update(other); return self
+    def __isub__(self, other): self.difference_update(other); return self
+    def __iand__(self, other): self.intersection_update(other); return self
+    def __ixor__(self, other): self.symmetric_difference_update(other); return self
+
+    def __reduce__(self):
+        return (set, (list(self),)) # Copies/pickles are plain sets
 
 class Entity:
     """
@@ -10,33 +79,120 @@ class Entity:
     It is merely a container for a unique ID and a collection of Components.
     """
     def __init__(self, name="Unnamed Entity", uid=None):
+        self._registry = None # Set by ECSRegistry.add_entity; receives dirty notifications
         self.id = uid if uid else str(uuid.uuid4())
-        self.name = name
+        self._name = name
         self.components: Dict[str, Any] = {}
-        self.tags = set()
+        self._tags = TagSet(self)
         self.metadata = {} 
+        self.layer_id = 0 # 0: Global, 1: Regional, 2: Local, 3: Player
+        self.location_id = None # Zone/region UUID within the layer
 
-    def add_component(self, component):
-        self.components[type(component).__name__] = component
+    @property
+    def name(self): return self._name
+    @name.setter
+    def name(self, val):
+        old, self._name = self._name, val
+        if self._registry is not None and old != val:
+            self._registry._rename(self)
+            self.mark_dirty()
+
+    @property
+    def tags(self): return self._tags
+    @tags.setter
+    def tags(self, val):
+        old = set(self._tags)
+        self._tags = TagSet(self, val)
+        self._tags_changed(self._tags - old, old - self._tags)
+
+    def _tags_changed(self, added, removed):
+        if self._registry is not None:
+            self._registry._retag(self, added, removed)
+            self.mark_dirty()
+
+    def mark_dirty(self, *components):
+        """
+        Queues this entity for the registry's next write-behind flush.
+        Passing component types (or names) limits the write to those components;
+        no arguments means the whole entity (name, tags, metadata) changed.
+        """
+        if self._registry is not None:
+            self._registry.mark_dirty(self, *components)
         return self
 
+    def add_component(self, component):
+        if isinstance(component, ColumnarView):
+            component = component.copy() # Views belong to another entity's slot
+        name = type(component).__name__
+        old = self.components.get(name)
+        if old is not None and old is not component and self._registry is not None:
+            self._registry._unindex_component(self, name) # Releases the replaced component's slot
+        self.components[name] = component
+        if isinstance(component, Position):
+            component._owner = self
+        if self._registry is not None:
+            self._registry._index_component(self, name)
+        return self.mark_dirty(name)
+
+    def remove_component(self, component_type):
+        name = component_type if isinstance(component_type, str) else component_type.__name__
+        if name not in self.components:
+            return None
+        if self._registry is not None:
+            self._registry._unindex_component(self, name)
+            self.mark_dirty() # Blob rewrite drops the stored component
+        comp = self.components.pop(name)
+        if isinstance(comp, Position):
+            comp._owner = None
+        return comp
+
+    def get_component_by_name(self, name):
+        comp = self.components.get(name)
+        if comp.__class__ is int: # Columnar slot (see core/columnar.py)
+            return self._registry.columns[name].view(comp)
+        return comp
+
     def get_component(self, component_type):
-        return self.components.get(component_type.__name__)
+        return self.get_component_by_name(component_type.__name__)
+
+    def get_component_mut(self, component_type):
+        """get_component() for callers about to modify the component; marks it dirty."""
+        comp = self.get_component_by_name(component_type.__name__)
+        if comp is not None:
+            self.mark_dirty(component_type)
+        return comp
 
     def has_component(self, component_type):
         return component_type.__name__ in self.components
 
     def add_tag(self, tag: str):
-        self.tags.add(tag)
+        self.tags.add(tag) # TagSet marks the entity dirty
+        return self
+
+    def remove_tag(self, tag: str):
+        self.tags.discard(tag)
         return self
 
     def has_tag(self, tag: str):
         return tag in self.tags
 
+    def component_dict(self, name):
+        """Serializable state of a single component, by component name."""
+        comp = self.components[name]
+        if comp.__class__ is int:
+            return self._registry.columns[name].to_dict(comp)
+        return comp.to_dict() if hasattr(comp, "to_dict") else vars(comp)
+
+    def _position_changed(self):
+        """Called by Position on every coordinate write."""
+        if self._registry is not None:
+            self._registry._spatial_move(self)
+            self._registry.mark_dirty(self, Position)
+
     def to_dict(self):
         comp_data = {}
-        for name, comp in self.components.items():
-            comp_data[name] = vars(comp)
+        for name in self.components:
+            comp_data[name] = self.component_dict(name)
         return {
             "id": self.id,
             "name": self.name,
@@ -45,6 +201,18 @@ class Entity:
             "metadata": self.metadata
         }
 
+    @staticmethod
+    def from_dict(data):
+        """Rebuilds an unregistered entity from to_dict() output (replays, what-if copies)."""
+        e = Entity(data.get("name", "Unnamed Entity"), uid=data.get("id"))
+        e._tags = TagSet(e, data.get("tags", ()))
+        e.metadata = data.get("metadata", {})
+        for c_name, c_state in data.get("components", {}).items():
+            cls = COMPONENT_TYPES.get(c_name)
+            if cls is not None:
+                e.add_component(cls.from_state(c_state))
+        return e
+
     # --- CORE BEHAVIORS ---
     def is_alive(self):
         v = self.get_component(Vitals)
@@ -55,6 +223,7 @@ class Entity:
         if not v: return 0
         actual = min(amount, v.hp)
         v.hp -= actual
+        self.mark_dirty(Vitals)
         return actual
 
     # --- CORE PROPERTY ADAPTERS ---
@@ -65,7 +234,7 @@ class Entity:
     @x.setter
     def x(self, val):
         c = self.get_component(Position)
-        if c: c.x = val
+        if c: c.x = val # Position notifies the registry
 
     @property
     def y(self): 
@@ -83,7 +252,9 @@ class Entity:
     @hp.setter
     def hp(self, val):
         c = self.get_component(Vitals)
-        if c: c.hp = val
+        if c:
+            c.hp = val
+            self.mark_dirty(Vitals)
 
     @property
     def max_hp(self):
@@ -97,7 +268,9 @@ class Entity:
     @sp.setter
     def sp(self, val):
         c = self.get_component(Vitals)
-        if c: c.sp = val
+        if c:
+            c.sp = val
+            self.mark_dirty(Vitals)
 
     @property
     def max_sp(self):
@@ -111,7 +284,9 @@ class Entity:
     @fp.setter
     def fp(self, val):
         c = self.get_component(Vitals)
-        if c: c.fp = val
+        if c:
+            c.fp = val
+            self.mark_dirty(Vitals)
 
     @property
     def max_fp(self):
@@ -125,7 +300,9 @@ class Entity:
     @cmp.setter
     def cmp(self, val):
         c = self.get_component(Vitals)
-        if c: c.cmp = val
+        if c:
+            c.cmp = val
+            self.mark_dirty(Vitals)
 
     @property
     def max_cmp(self):
@@ -133,17 +310,94 @@ class Entity:
         return c.max_cmp if c else 0
 
 # --- COMPONENTS ---
+COMPONENT_TYPES: Dict[str, type] = {} # Persisted component name -> class
+
+_MUTABLE_DEFAULTS = (dict, list, set)
+
+def component(cls):
+    """
+    Registers a component class for persistence and gives it a fast
+    from_state(state) constructor unless it defines its own. The constructor
+    skips __init__: it copies a default-instance template (fresh copies of
+    mutable defaults only where the stored state lacks the field) and then
+    the stored fields. __slots__ classes are filled with setattr.
+    """
+    COMPONENT_TYPES[cls.__name__] = cls
+    if "from_state" in cls.__dict__:
+        return cls
+    proto = cls()
+    if "__slots__" in cls.__dict__:
+        template = {k: getattr(proto, k) for k in cls.__slots__ if hasattr(proto, k)}
+    else:
+        template = dict(vars(proto))
+    mutable = tuple(k for k, v in template.items() if isinstance(v, _MUTABLE_DEFAULTS))
+    new = object.__new__
+
+    if "__slots__" in cls.__dict__:
+        def from_state(state):
+            obj = new(cls)
+            for k, v in template.items():
+                setattr(obj, k, v.copy() if k in mutable and k not in state else v)
+            for k, v in state.items():
+                setattr(obj, k, v)
+            return obj
+    else:
+        def from_state(state):
+            obj = new(cls)
+            d = obj.__dict__
+            d.update(template)
+            for k in mutable:
+                if k not in state: d[k] = template[k].copy()
+            d.update(state)
+            return obj
+    cls.from_state = staticmethod(from_state)
+    return cls
+
+@component
 class Position:
-    def __init__(self, x=0, y=0, z=0): self.x = x; self.y = y; self.z = z
+    """
+    Coordinates are properties so that any write (entity.x, pos.x, ...)
+    keeps the registry's spatial index and dirty queue current.
+    """
+    def __init__(self, x=0, y=0, z=0):
+        self._owner = None # Set by Entity.add_component
+        self._x = x; self._y = y; self.z = z
+
+    @property
+    def x(self): return self._x
+    @x.setter
+    def x(self, val):
+        if val != self._x:
+            self._x = val
+            if self._owner is not None: self._owner._position_changed()
 
+    @property
+    def y(self): return self._y
+    @y.setter
+    def y(self, val):
+        if val != self._y:
+            self._y = val
+            if self._owner is not None: self._owner._position_changed()
+
+    def to_dict(self): return {"x": self._x, "y": self._y, "z": self.z}
+
+    @staticmethod
+    def from_state(state):
+        p = object.__new__(Position)
+        p.__dict__.update(_owner=None, _x=state.get("x", 0), _y=state.get("y", 0), z=state.get("z", 0))
+        return p
+
+@component
 class Renderable:
     def __init__(self, icon="sheet:5074", color="#ffffff", scale=1.0):
         self.icon = icon; self.color = color; self.scale = scale
 
+@component
 class Stats:
     def __init__(self, attrs=None): self.attrs = attrs or {}
     def get(self, name, default=10): return self.attrs.get(name, default)
 
+@component
 class Vitals:
     def __init__(self, hp=10, max_hp=10, sp=10, max_sp=10, fp=10, max_fp=10, cmp=10, max_cmp=10):
         self.hp = hp; self.max_hp = max_hp
@@ -151,15 +405,19 @@ class Vitals:
         self.fp = fp; self.max_fp = max_fp
         self.cmp = cmp; self.max_cmp = max_cmp
 
+@component
 class Inventory:
     def __init__(self, capacity=20): self.items = []; self.gold = 0
 
+@component
 class StatusEffects:
     def __init__(self): self.active_effects = []
 
+@component
 class FactionMember:
     def __init__(self, faction="Neutral"): self.faction_name = faction
 
+@component
 class Logistics:
     def __init__(self, resources=None, population=0):
         self.resources = resources or {"Food": 100, "Gold": 100}
@@ -167,6 +425,7 @@ class Logistics:
         self.needs = {"Food": 1.0}
         self.last_tick = 0
 
+@component
 class Demographics:
     def __init__(self, pop_total=100, growth_rate=0.02, culture="Generic", social_unrest=0.0):
         self.pop_total = pop_total
@@ -175,6 +434,7 @@ class Demographics:
         self.culture = culture
         self.social_unrest = social_unrest
         
+@component
 class Economy:
     def __init__(self, wealth=500, primary_export="Wood", primary_import="Iron", tax_rate=0.1):
         self.wealth = wealth
@@ -183,6 +443,7 @@ class Economy:
         self.tax_rate = tax_rate
         self.market_prices = { "Food": 1.0, "Wood": 2.0, "Iron": 5.0, "Stone": 3.0 }
 
+@component
 class Infrastructure:
     def __init__(self, housing_level=1, defense_level=1, trade_level=1):
         self.housing_level = housing_level
@@ -192,38 +453,521 @@ class Infrastructure:
 
 # --- REGISTRY & FACTORIES ---
 class ECSRegistry:
-    def __init__(self, db_path="data/world_state.db"):
+    """
+    Active world state. Writes are write-behind: mutations mark entities dirty
+    and flush() persists every queued change in one SQLite transaction. Flushes
+    happen at simulation tick boundaries, on the optional autoflush timer and
+    at interpreter shutdown.
+
+    `lock` (reentrant) is held by flush() while it serializes and writes, and
+    by mark_dirty()/destroy_entity(). Code that mutates entities from several
+    threads (ticks, request handlers) holds it for the whole mutation, so a
+    flush only ever sees the state between such blocks.
+
+    persist_mode "delta" (default) writes only the components that changed to
+    the entity_components table; "full" rewrites the whole entity blob.
+    """
+    AUTOFLUSH_INTERVAL = 5.0 # Seconds
+    SPATIAL_CELL_SIZE = 16 # World units per spatial hash bucket
+    MAX_REGIONS = 8 # Hydrated (layer_id, location_id) regions kept before LRU eviction
+
+    def __init__(self, db_path="data/world_state.db", persist_mode="delta", max_regions=None, columnar=False):
         self.entities: Dict[str, Entity] = {}
         self.db = PersistenceLayer(db_path)
+        self.persist_mode = persist_mode
+        self.bytes_written = 0
+        self.max_regions = max_regions or self.MAX_REGIONS
+        self._regions = OrderedDict() # (layer_id, location_id) -> resident eids, LRU order
+        self._partial = set() # Region keys holding only get_entity() hydrations so far
+        self._component_index: Dict[str, Dict[str, Entity]] = {} # component name -> {eid: entity}
+        self._views: Dict[frozenset, Dict[str, Entity]] = {} # cached get_entities_with() results
+        self._views_by_component: Dict[str, List[frozenset]] = {}
+        self._spatial: Dict[tuple, SpatialHash] = {} # (layer_id, location_id) -> Position index
+        self._tag_index: Dict[str, Dict[str, Entity]] = {} # tag -> {eid: entity}
+        self._names = NameIndex()
+        self.columns: Dict[str, ColumnStore] = {} # Hot component name -> NumPy columns (columnar mode)
+        if columnar:
+            if np is None:
+                print("[ECS] NumPy not installed; columnar storage disabled.")
+            else:
+                module = sys.modules[__name__]
+                self.columns = {name: ColumnStore(getattr(module, name)) for name in COLUMNAR_FIELDS}
+        self._pinned = set() # Region keys never evicted (e.g. the global layer)
+        self._dirty: Dict[str, Optional[set]] = {} # eid -> changed component names, None = full write
+        self._deleted = set()
+        self.lock = threading.RLock() # Dirty queues + flushes; mutators take it too (see class docstring)
+        self._autoflush_stop = None
+        self.last_load_stats = None # Timings of the last hydrate_region()/load_all()
+
+    def _register(self, entity: Entity):
+        self.entities[entity.id] = entity
+        entity._registry = self
+        for name in entity.components:
+            self._index_component(entity, name)
+        self._retag(entity, entity.tags, ())
+        self._names.add(entity.id, entity.name)
+        region = self._regions.get((entity.layer_id, entity.location_id))
+        if region is not None:
+            region.add(entity.id)
+
+    def _unregister(self, entity: Entity):
+        """Drops an entity from memory and every index (not from the database)."""
+        if self.entities.get(entity.id) is entity:
+            del self.entities[entity.id]
+        entity._registry = None
+        for name in entity.components:
+            self._unindex_component(entity, name)
+        self._retag(entity, (), entity.tags)
+        self._names.remove(entity.id)
+
+    # --- COMPONENT INDEX ---
+    def _index_component(self, entity: Entity, name):
+        self._component_index.setdefault(name, {})[entity.id] = entity
+        store = self.columns.get(name)
+        if store is not None:
+            comp = entity.components[name]
+            if comp.__class__ is not int:
+                entity.components[name] = store.attach(comp, entity)
+        if name == "Position":
+            self._spatial_move(entity)
+        for key in self._views_by_component.get(name, ()):
+            if key.issubset(entity.components):
+                self._views[key][entity.id] = entity
+
+    def _unindex_component(self, entity: Entity, name):
+        self._component_index.get(name, {}).pop(entity.id, None)
+        comp = entity.components.get(name)
+        if comp.__class__ is int:
+            entity.components[name] = self.columns[name].detach(comp)
+        if name == "Position":
+            self._spatial_remove(entity)
+        for key in self._views_by_component.get(name, ()):
+            self._views[key].pop(entity.id, None)
+
+    # --- COLUMNAR ACCESS ---
+    def bulk(self, component):
+        """
+        ColumnBatch over every resident entity holding `component` (type or name)
+        for vectorized updates. Requires columnar=True.
+        """
+        name = component if isinstance(component, str) else component.__name__
+        store = self.columns.get(name)
+        if store is None:
+            raise ValueError(f"{name} is not stored in columns (columnar={bool(self.columns)})")
+        return ColumnBatch(self, store)
+
+    # --- TAG & NAME INDEXES ---
+    def _retag(self, entity: Entity, added, removed):
+        for tag in removed:
+            bucket = self._tag_index.get(tag)
+            if bucket is not None:
+                bucket.pop(entity.id, None)
+                if not bucket: del self._tag_index[tag]
+        for tag in added:
+            self._tag_index.setdefault(tag, {})[entity.id] = entity
+
+    def _rename(self, entity: Entity):
+        self._names.add(entity.id, entity.name)
+
+    def entities_with_tag(self, *tags):
+        """Resident entities carrying every given tag (e.g. entities_with_tag("door", "link_vault"))."""
+        buckets = sorted((self._tag_index.get(t, {}) for t in tags), key=len)
+        if not buckets: return []
+        return [e for eid, e in buckets[0].items() if all(eid in b for b in buckets[1:])]
+
+    def find_by_name(self, name):
+        """Resident entities whose name equals `name`, case-insensitively."""
+        return [self.entities[eid] for eid in self._names.find(name)]
+
+    def match_name(self, query, limit=5):
+        """
+        Resolves a loosely-worded target (typically from the LLM) to entities:
+        exact id, then exact name, name prefix, substring, and finally trigram similarity.
+        """
+        if not query: return []
+        if query in self.entities:
+            return [self.entities[query]]
+        for lookup in (self._names.find, self._names.prefix, self._names.contains):
+            eids = lookup(query)
+            if eids:
+                return [self.entities[eid] for eid in eids[:limit]]
+        return [self.entities[eid] for eid in self._names.fuzzy(query, limit=limit)]
+
+    def _view(self, names: frozenset):
+        """Matching-entity view for a component set, built once and then kept current incrementally."""
+        if not names:
+            return self.entities
+        view = self._views.get(names)
+        if view is None:
+            sets = sorted((self._component_index.get(n, {}) for n in names), key=len)
+            view = {eid: e for eid, e in sets[0].items() if all(eid in s for s in sets[1:])}
+            self._views[names] = view
+            for n in names:
+                self._views_by_component.setdefault(n, []).append(names)
+        return view
 
     def add_entity(self, entity: Entity):
-        self.entities[entity.id] = entity
-        self.db.save_entity(entity.id, entity.name, entity.to_dict())
+        self._register(entity)
+        self.mark_dirty(entity)
         return entity
 
-    def get_entity(self, eid): return self.entities.get(eid)
+    def get_entity(self, eid):
+        """
+        Returns a resident entity, hydrating it alone from the database on a
+        miss. Its region becomes resident (partially) and is LRU-evicted as usual.
+        """
+        entity = self.entities.get(eid)
+        if entity is not None or eid is None or eid in self._deleted:
+            return entity
+        row = self.db.load_entity(eid)
+        if row is None:
+            return None
+        entity, = self._build_entities([(eid, row["name"], row["data"], row["layer_id"], row["location_id"])])
+        self._register(entity)
+        key = (entity.layer_id, entity.location_id)
+        if key not in self._regions:
+            # hydrate_region() completes a partial region
+            self._regions[key] = {eid}
+            self._partial.add(key)
+            self._evict_cold_regions()
+        return entity
 
-    def load_all(self):
-        """Loads all entities from the SQLite persistence layer into the active registry."""
-        rows = self.db.load_all_entities()
-        for eid, name, data_json, layer_id, location_id in rows:
-            data = json.loads(data_json)
+    def destroy_entity(self, eid):
+        """Removes an entity from the active world; the row is deleted on the next flush."""
+        with self.lock:
+            entity = self.entities.get(eid)
+            if entity:
+                self._unregister(entity)
+                self._regions.get((entity.layer_id, entity.location_id), set()).discard(eid)
+            self._dirty.pop(eid, None)
+            self._deleted.add(eid)
+        return entity
+
+    def fork(self):
+        """
+        Copy-on-write fork for what-if simulation (AI lookahead, history previews,
+        balance runs). O(1) to create; see core/ecs_fork.py. Finish it with
+        commit() or discard().
+        """
+        from .ecs_fork import RegistryFork
+        return RegistryFork(self)
+
+    def relocate(self, entity: Entity, layer_id, location_id=None):
+        """Moves an entity to another layer/zone, keeping the region and spatial indexes in step."""
+        self._regions.get((entity.layer_id, entity.location_id), set()).discard(entity.id)
+        self._spatial_remove(entity)
+        entity.layer_id, entity.location_id = layer_id, location_id
+        region = self._regions.get((layer_id, location_id))
+        if region is not None:
+            region.add(entity.id)
+        if entity.has_component(Position):
+            self._spatial_move(entity)
+        self.mark_dirty(entity)
+        return entity
+
+    def clear(self):
+        """Drops every entity from memory and the database (used before a fresh import)."""
+        with self.lock:
+            for e in self.entities.values():
+                e._registry = None
+                for name, comp in e.components.items():
+                    if comp.__class__ is int: e.components[name] = self.columns[name].detach(comp)
+            self.entities = {}
+            self._component_index.clear()
+            self._views.clear()
+            self._views_by_component.clear()
+            self._spatial.clear()
+            self._tag_index.clear()
+            self._names = NameIndex()
+            self._regions.clear()
+            self._partial.clear()
+            self._pinned.clear()
+            self._dirty.clear()
+            self._deleted.clear()
+            self.db.clear_entities()
+
+    # --- SPATIAL INDEX ---
+    def _spatial_move(self, entity: Entity):
+        if self.entities.get(entity.id) is not entity: return
+        key = (entity.layer_id, entity.location_id)
+        grid = self._spatial.get(key)
+        if grid is None:
+            grid = self._spatial[key] = SpatialHash(self.SPATIAL_CELL_SIZE)
+        p = entity.get_component(Position)
+        grid.move(entity.id, p.x, p.y)
+
+    def _spatial_remove(self, entity: Entity):
+        grid = self._spatial.get((entity.layer_id, entity.location_id))
+        if grid is not None:
+            grid.remove(entity.id)
+
+    def _spatial_grids(self, layer_id, location_id):
+        if layer_id is None:
+            return list(self._spatial.values())
+        grid = self._spatial.get((layer_id, location_id))
+        return [grid] if grid is not None else []
+
+    def entities_in_radius(self, x, y, radius, layer_id=None, location_id=None):
+        """Resident entities whose Position is within `radius` of (x, y); layer_id=None searches every layer."""
+        return [self.entities[eid] for grid in self._spatial_grids(layer_id, location_id)
+                for eid in grid.query_radius(x, y, radius)]
+
+    def entities_in_rect(self, x0, y0, x1, y1, layer_id=None, location_id=None):
+        """Resident entities whose Position lies inside the inclusive rect (x0, y0)-(x1, y1)."""
+        return [self.entities[eid] for grid in self._spatial_grids(layer_id, location_id)
+                for eid in grid.query_rect(x0, y0, x1, y1)]
+
+    # --- REGION HYDRATION ---
+    def hydrate_region(self, layer_id=0, location_id=None, pin=False):
+        """
+        Makes one (layer_id, location_id) region resident, streaming its rows
+        from the database. Already-resident entities are kept as-is. Touching
+        a region refreshes its LRU slot; unpinned regions beyond max_regions
+        are evicted (flushed, then dropped from memory).
+        """
+        key = (layer_id, location_id)
+        if pin:
+            self._pinned.add(key)
+        if key in self._regions and key not in self._partial:
+            self._regions.move_to_end(key)
+            return 0
+
+        self.flush() # Region rows on disk must reflect queued moves/deletes
+        region = {e.id for e in self.entities.values() if (e.layer_id, e.location_id) == key}
+        self._regions[key] = region
+        self._regions.move_to_end(key)
+        self._partial.discard(key)
+        stats = self._new_load_stats()
+        deltas = self.db.load_component_deltas(layer_id, location_id)
+        for batch in self.db.iter_entity_batches(layer_id, location_id):
+            entities = self._load_batch([r for r in batch if r[0] not in self.entities], deltas, stats)
+            start = time.perf_counter()
+            for e in entities:
+                self._register(e)
+            stats["index"] += time.perf_counter() - start
+        loaded = self._finish_load_stats(stats)
+        print(f"[ECS] Hydrated region {key}: {loaded} entities loaded, {len(region)} resident. {self.format_load_stats()}")
+
+        self._evict_cold_regions()
+        return loaded
+
+    def _evict_cold_regions(self):
+        cold = [k for k in self._regions if k not in self._pinned]
+        while len(cold) > self.max_regions:
+            self.evict_region(*cold.pop(0))
+
+    def evict_region(self, layer_id, location_id=None):
+        """Flushes a region's pending writes and drops its entities from memory."""
+        key = (layer_id, location_id)
+        with self.lock:
+            region = self._regions.pop(key, None)
+            self._pinned.discard(key)
+            self._partial.discard(key)
+            if region is None:
+                return 0
+            self.flush()
+            for eid in region:
+                entity = self.entities.get(eid)
+                if entity:
+                    self._unregister(entity)
+        print(f"[ECS] Evicted region {key}: {len(region)} entities.")
+        return len(region)
+
+    def resident_regions(self):
+        return list(self._regions)
+
+    # --- WRITE-BEHIND PERSISTENCE ---
+    def mark_dirty(self, entity: Entity, *components):
+        eid = entity.id
+        with self.lock:
+            if not components or self.persist_mode != "delta":
+                self._dirty[eid] = None
+            else:
+                pending = self._dirty.get(eid, ())
+                if pending is not None:
+                    names = {c if isinstance(c, str) else c.__name__ for c in components}
+                    self._dirty[eid] = names.union(pending)
+            self._deleted.discard(eid)
+
+    def mark_dirty_many(self, entities, *components):
+        """mark_dirty() for a batch of entities (e.g. after a vectorized ColumnBatch update)."""
+        with self.lock:
+            if not components or self.persist_mode != "delta":
+                for e in entities:
+                    self._dirty[e.id] = None
+                    self._deleted.discard(e.id)
+                return
+            names = frozenset(c if isinstance(c, str) else c.__name__ for c in components)
+            dirty, deleted = self._dirty, self._deleted
+            for e in entities:
+                eid = e.id
+                pending = dirty.get(eid, ())
+                if pending is not None:
+                    dirty[eid] = names.union(pending)
+                if deleted: deleted.discard(eid)
+
+    def _requeue(self, dirty, deleted):
+        for eid, comps in dirty.items():
+            if eid not in self._dirty:
+                self._dirty[eid] = comps
+            elif comps is None or self._dirty[eid] is None:
+                self._dirty[eid] = None
+            else:
+                self._dirty[eid] |= comps
+        self._deleted |= {eid for eid in deleted if eid not in self._dirty}
+
+    def pending_writes(self):
+        return len(self._dirty) + len(self._deleted)
+
+    def flush(self):
+        """Persists every dirty/destroyed entity in a single transaction."""
+        with self.lock:
+            if not self._dirty and not self._deleted:
+                return 0
+            dirty, self._dirty = self._dirty, {}
+            deleted, self._deleted = self._deleted, set()
+            try:
+                rows = []
+                component_rows = []
+                for eid, comps in dirty.items():
+                    e = self.entities.get(eid)
+                    if e is None: continue
+                    if comps is None or not comps.issubset(e.components):
+                        # New/retagged entity or a removed component: rewrite the blob
+                        rows.append((e.id, e.name, e.to_dict(), e.layer_id, e.location_id))
+                    else:
+                        component_rows.extend((eid, name, e.component_dict(name)) for name in comps)
+                self.bytes_written += self.db.flush_entities(rows, deleted, component_rows)
+            except Exception as ex:
+                # Requeue so the next flush retries; newer marks stay queued as well.
+                self._requeue(dirty, deleted)
+                print(f"[ECS] Flush failed, {len(dirty) + len(deleted)} writes requeued: {ex}")
+                return 0
+            return len(rows) + len(component_rows) + len(deleted)
+
+    def compact(self):
+        """Flushes, then folds stored component deltas back into the entity blobs."""
+        self.flush()
+        with self.lock:
+            count = self.db.compact_components()
+        if count:
+            print(f"[ECS] Compacted component deltas for {count} entities.")
+        return count
+
+    def start_autoflush(self, interval=None):
+        """
+        Starts a daemon thread that flushes pending writes every `interval`
+        seconds. Its flushes take `lock`, so they land between locked ticks and
+        request handlers rather than in the middle of one.
+        """
+        if self._autoflush_stop is not None:
+            return
+        interval = interval or self.AUTOFLUSH_INTERVAL
+        stop = threading.Event()
+        self._autoflush_stop = stop
+
+        def _loop():
+            while not stop.wait(interval):
+                self.flush()
+
+        threading.Thread(target=_loop, name="ecs-autoflush", daemon=True).start()
+
+    def stop_autoflush(self):
+        if self._autoflush_stop is not None:
+            self._autoflush_stop.set()
+            self._autoflush_stop = None
+        self.compact()
+
+    # --- HYDRATION ---
+    def _new_load_stats(self):
+        return {"entities": 0, "seconds": 0.0, "decode": 0.0, "index": 0.0,
+                "codec": codec.NAME, "components": {}, "_start": time.perf_counter()}
+
+    def _finish_load_stats(self, stats):
+        stats["seconds"] = time.perf_counter() - stats.pop("_start")
+        self.last_load_stats = stats
+        return stats["entities"]
+
+    def format_load_stats(self, stats=None):
+        """One-line summary of the last hydration: totals, then per-component construction time."""
+        stats = stats or self.last_load_stats
+        if not stats: return ""
+        per_type = ", ".join(f"{name} {s['count']}x {s['seconds'] * 1000:.1f}ms"
+                             for name, s in sorted(stats["components"].items(), key=lambda i: -i[1]["seconds"]))
+        return (f"[{stats['seconds'] * 1000:.1f}ms: decode ({stats['codec']}) {stats['decode'] * 1000:.1f}ms, "
+                f"index {stats['index'] * 1000:.1f}ms; {per_type or 'no components'}]")
+
+    def _load_batch(self, rows, deltas, stats):
+        """Decodes a fetched batch of entity rows with one parser call, then builds the entities."""
+        start = time.perf_counter()
+        datas = codec.loads_many([r[2] for r in rows])
+        stats["decode"] += time.perf_counter() - start
+        decoded = [(r[0], r[1], data, r[3], r[4]) for r, data in zip(rows, datas)]
+        return self._build_entities(decoded, deltas, stats)
+
+    def _build_entities(self, rows, deltas=None, stats=None):
+        """
+        Builds unregistered entities from decoded (id, name, data, layer_id,
+        location_id) rows. Components are constructed grouped by type through
+        COMPONENT_TYPES[name].from_state, which also yields per-type timings.
+        """
+        entities = []
+        by_type: Dict[str, list] = {}
+        for eid, name, data, layer_id, location_id in rows:
             e = Entity(name, uid=eid)
-            e.tags = set(data.get("tags", []))
+            if data.get("tags"):
+                e._tags = TagSet(e, data["tags"]) # Unregistered: nothing to notify yet
             e.metadata = data.get("metadata", {})
-            
-            # Reconstruct Components
+            e.layer_id = layer_id if layer_id is not None else 0
+            e.location_id = location_id
+
+            # Stored deltas override the blob
             comp_data = data.get("components", {})
-            for c_name, c_vars in comp_data.items():
-                cls = getattr(sys.modules[__name__], c_name, None)
-                if cls:
-                    comp = cls()
-                    for k, v in c_vars.items():
-                        setattr(comp, k, v)
-                    e.add_component(comp)
-            
-            self.entities[eid] = e
-        print(f"[ECS] Restored {len(self.entities)} entities from database.")
+            if deltas and eid in deltas:
+                comp_data.update(deltas[eid])
+            for c_name, c_state in comp_data.items():
+                by_type.setdefault(c_name, []).append((e, c_state))
+            entities.append(e)
+
+        for c_name, items in by_type.items():
+            cls = COMPONENT_TYPES.get(c_name)
+            if cls is None: continue # Component type no longer exists
+            start = time.perf_counter()
+            make = cls.from_state
+            for e, c_state in items:
+                comp = make(c_state)
+                e.components[c_name] = comp
+            if cls is Position:
+                for e, _ in items: e.components[c_name]._owner = e
+            if stats is not None:
+                s = stats["components"].setdefault(c_name, {"count": 0, "seconds": 0.0})
+                s["count"] += len(items)
+                s["seconds"] += time.perf_counter() - start
+        if stats is not None:
+            stats["entities"] += len(entities)
+        return entities
+
+    def load_all(self):
+        """
+        Loads every entity from the SQLite persistence layer into the active
+        registry. Prefer hydrate_region() for large worlds; entities loaded here
+        stay resident unless their region is later hydrated and evicted.
+        """
+        self.flush() # Never let a reload clobber unsaved changes
+        stats = self._new_load_stats()
+        deltas = self.db.load_component_deltas()
+        for batch in self.db.iter_entity_batches():
+            entities = self._load_batch(batch, deltas, stats)
+            start = time.perf_counter()
+            for e in entities:
+                old = self.entities.get(e.id)
+                if old is not None:
+                    self._unregister(old)
+                    self._regions.get((old.layer_id, old.location_id), set()).discard(old.id)
+                self._register(e)
+            stats["index"] += time.perf_counter() - start
+        self._finish_load_stats(stats)
+        print(f"[ECS] Restored {len(self.entities)} entities from database. {self.format_load_stats()}")
 
     def create_character(self, data: Dict) -> Entity:
         """Factory: registers character directly into active world state using TTS formulas."""
@@ -252,8 +996,17 @@ class ECSRegistry:
         return self.add_entity(e)
 
     def get_entities_with(self, *types):
-        for e in self.entities.values():
-            if all(e.has_component(t) for t in types): yield e
+        """
+        Entities holding every given component type. Served from a cached view
+        maintained by add_component/remove_component, so the cost is the size
+        of the result, not of the world. Safe to mutate the registry while iterating.
+        """
+        names = frozenset(t if isinstance(t, str) else t.__name__ for t in types)
+        yield from list(self._view(names).values())
+
+    def count_with(self, *types):
+        return len(self._view(frozenset(t if isinstance(t, str) else t.__name__ for t in types)))
 
 # Singleton
 world_ecs = ECSRegistry()
+atexit.register(world_ecs.flush)
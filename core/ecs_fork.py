@@ -0,0 +1,426 @@
+"""
+Copy-on-write forks of an ECSRegistry for what-if simulation.
+
+    sim = world_ecs.fork()
+    SettlementSystem(sim, definitions).process_tick()  # runs against the fork
+    sim.discard()   # or sim.commit() to apply the outcome to world_ecs
+
+Forking is O(1): nothing is copied up front. An entity is shallow-copied into
+the fork (a ForkEntity) the first time the fork hands it out, and each of its
+components is copied the first time it is read through get_component(), so a
+simulation pays only for the entities and components it actually touches.
+The fork keeps its own small indexes holding just the entities whose
+position, tags, name or component set diverged; queries merge those with the
+parent's indexes.
+
+The parent should not be mutated (or have regions evicted) while a fork is
+live; the fork reads unchanged state through to it. A fork has its own
+`lock`, so a long simulation holding it never blocks the parent's flushes or
+mutators; the parent's lock is taken only while state is copied out of it
+and while commit() writes back. Forks never touch the database: flush() is a
+no-op and commit() hands the changes to the parent, whose own write-behind
+queue persists them.
+"""
+import copy
+import threading
+from collections.abc import Mapping
+from typing import Dict, Optional
+
+from .ecs import Entity, Position, ECSRegistry, TagSet, _MUTABLE_DEFAULTS
+from .spatial_index import SpatialHash
+from .name_index import NameIndex
+
+_SHARED = object() # Placeholder for metadata not yet copied from the parent
+
+def _copy_component(comp, source_registry, name, owner):
+    """Independent copy of a parent component (object or columnar slot)."""
+    if comp.__class__ is int:
+        comp = source_registry.columns[name].materialize(comp)
+    clone = comp.__class__.__new__(comp.__class__)
+    state = clone.__dict__
+    for k, v in vars(comp).items():
+        state[k] = copy.deepcopy(v) if isinstance(v, _MUTABLE_DEFAULTS) else v
+    if isinstance(clone, Position):
+        clone._owner = owner
+    return clone
+
+class ForkEntity(Entity):
+    """
+    A fork's view of a parent entity. Starts out sharing the parent's component
+    objects; get_component() swaps in a private copy before handing one out.
+    """
+    @classmethod
+    def shadow(cls, source: Entity, fork):
+        with fork.parent.lock:
+            return cls._shadow_of(source, fork)
+
+    @classmethod
+    def _shadow_of(cls, source: Entity, fork):
+        e = cls.__new__(cls)
+        e._registry = fork
+        e._source = source
+        e._source_registry = source._registry
+        e.id = source.id
+        e._name = source.name
+        e.components = dict(source.components)
+        e._shared = set(e.components) # Component names still pointing at the parent's objects
+        e._tags = TagSet(e, source.tags)
+        e._metadata = _SHARED
+        e.layer_id = source.layer_id
+        e.location_id = source.location_id
+        return e
+
+    @property
+    def metadata(self):
+        if self._metadata is _SHARED:
+            with self._source_registry.lock:
+                self._metadata = copy.deepcopy(self._source.metadata)
+        return self._metadata
+    @metadata.setter
+    def metadata(self, val):
+        self._metadata = val
+
+    def get_component_by_name(self, name):
+        if name in self._shared:
+            self._shared.discard(name)
+            with self._source_registry.lock:
+                self.components[name] = _copy_component(self.components[name], self._source_registry, name, self)
+        return self.components.get(name)
+
+    def add_component(self, component):
+        self._shared.discard(type(component).__name__)
+        return super().add_component(component)
+
+    def remove_component(self, component_type):
+        name = component_type if isinstance(component_type, str) else component_type.__name__
+        self.get_component_by_name(name) # Never detach the parent's object
+        return super().remove_component(name)
+
+    def component_dict(self, name):
+        if name in self._shared:
+            return self._source.component_dict(name)
+        return super().component_dict(name)
+
+class _ForkEntities(Mapping):
+    """Read-only `registry.entities` stand-in: parent residents plus fork-created, minus destroyed."""
+    def __init__(self, fork):
+        self._fork = fork
+
+    def __getitem__(self, eid):
+        e = self._fork._resident(eid)
+        if e is None: raise KeyError(eid)
+        return e
+
+    def __contains__(self, eid):
+        return self._fork._resident(eid, shadow=False) is not None
+
+    def __iter__(self):
+        fork = self._fork
+        hidden = fork._destroyed | fork._created
+        for eid in list(fork.parent.entities):
+            if eid not in hidden: yield eid
+        yield from list(fork._created)
+
+    def __len__(self):
+        fork, parent = self._fork, self._fork.parent.entities
+        overlap = sum(1 for eid in fork._destroyed | fork._created if eid in parent)
+        return len(parent) - overlap + len(fork._created)
+
+class RegistryFork:
+    """
+    Copy-on-write overlay over an ECSRegistry (see module docstring). Exposes
+    the registry query/mutation API that systems use, so a fork can be passed
+    anywhere a registry is expected.
+    """
+    SPATIAL_CELL_SIZE = ECSRegistry.SPATIAL_CELL_SIZE
+    columns: Dict = {} # Fork-owned components are always plain objects
+
+    def __init__(self, parent: ECSRegistry):
+        self.parent = parent
+        self.db = parent.db
+        self.lock = threading.RLock() # Fork-local; parent.lock is taken only to copy and commit
+        self.entities = _ForkEntities(self)
+        self.closed = False
+        self._local: Dict[str, Entity] = {} # eid -> fork-owned entity (shadow or created)
+        self._created = set()
+        self._destroyed = set()
+        self._dirty: Dict[str, Optional[set]] = {}
+        # Divergence sets: ids whose entry in the parent's index no longer applies
+        self._recomposed = set() # component set changed -> see _local
+        self._moved = set() # position/region changed -> see _spatial
+        self._retagged = set() # tags changed -> see _tag_index
+        self._renamed = set() # name changed -> see _names
+        self._spatial: Dict[tuple, SpatialHash] = {}
+        self._tag_index: Dict[str, Dict[str, Entity]] = {}
+        self._names = NameIndex()
+
+    def __repr__(self):
+        return f"<RegistryFork {len(self._local)} touched, {len(self._created)} created, {len(self._destroyed)} destroyed>"
+
+    def _check_open(self):
+        if self.closed:
+            raise RuntimeError("Fork was already committed or discarded.")
+
+    # --- ENTITY ACCESS ---
+    def _shadow(self, source: Entity):
+        e = self._local.get(source.id)
+        if e is None:
+            e = self._local[source.id] = ForkEntity.shadow(source, self)
+        return e
+
+    def _resident(self, eid, shadow=True):
+        if eid in self._destroyed: return None
+        e = self._local.get(eid)
+        if e is not None: return e
+        source = self.parent.entities.get(eid)
+        if source is None or not shadow: return source
+        return self._shadow(source)
+
+    def _visible(self, pairs, diverged):
+        """Shadows for parent (eid, entity) pairs whose index entry still holds in the fork."""
+        hidden = diverged | self._destroyed
+        return [self._shadow(e) for eid, e in pairs if eid not in hidden]
+
+    def get_entity(self, eid):
+        self._check_open()
+        if eid is None or eid in self._destroyed: return None
+        e = self._local.get(eid)
+        if e is not None: return e
+        source = self.parent.get_entity(eid)
+        return self._shadow(source) if source is not None else None
+
+    def add_entity(self, entity: Entity):
+        self._check_open()
+        eid = entity.id
+        entity._registry = self
+        self._local[eid] = entity
+        self._created.add(eid)
+        self._destroyed.discard(eid)
+        self._recomposed.add(eid)
+        self._retag(entity, (), ())
+        self._rename(entity)
+        self._moved.add(eid)
+        if entity.has_component(Position):
+            self._spatial_move(entity)
+        self.mark_dirty(entity)
+        return entity
+
+    create_character = ECSRegistry.create_character
+
+    def destroy_entity(self, eid):
+        self._check_open()
+        entity = self._resident(eid)
+        if entity is not None:
+            entity._registry = None
+            self._spatial_remove(entity)
+            self._retag(entity, (), entity.tags)
+            self._names.remove(eid)
+            self._local.pop(eid, None)
+        self._dirty.pop(eid, None)
+        if eid in self._created:
+            self._created.discard(eid)
+        elif eid in self.parent.entities or self.parent.get_entity(eid) is not None:
+            self._destroyed.add(eid)
+        return entity
+
+    def relocate(self, entity: Entity, layer_id, location_id=None):
+        self._spatial_remove(entity)
+        entity.layer_id, entity.location_id = layer_id, location_id
+        if entity.has_component(Position):
+            self._spatial_move(entity)
+        self.mark_dirty(entity)
+        return entity
+
+    def hydrate_region(self, layer_id=0, location_id=None, pin=False):
+        """Residency is the parent's concern; hydrating changes no world state."""
+        return self.parent.hydrate_region(layer_id, location_id, pin)
+
+    # --- INDEX HOOKS (called by Entity) ---
+    def _index_component(self, entity: Entity, name):
+        self._recomposed.add(entity.id)
+        if name == "Position":
+            self._spatial_move(entity)
+
+    def _unindex_component(self, entity: Entity, name):
+        self._recomposed.add(entity.id)
+        if name == "Position":
+            self._spatial_remove(entity)
+
+    def _retag(self, entity: Entity, added, removed):
+        eid = entity.id
+        self._retagged.add(eid)
+        for tag in removed:
+            bucket = self._tag_index.get(tag)
+            if bucket is not None:
+                bucket.pop(eid, None)
+                if not bucket: del self._tag_index[tag]
+        if entity._registry is self:
+            for tag in entity.tags:
+                self._tag_index.setdefault(tag, {})[eid] = entity
+
+    def _rename(self, entity: Entity):
+        self._renamed.add(entity.id)
+        self._names.add(entity.id, entity.name)
+
+    def _spatial_move(self, entity: Entity):
+        if self._local.get(entity.id) is not entity: return
+        self._moved.add(entity.id)
+        key = (entity.layer_id, entity.location_id)
+        grid = self._spatial.get(key)
+        if grid is None:
+            grid = self._spatial[key] = SpatialHash(self.SPATIAL_CELL_SIZE)
+        p = entity.get_component(Position)
+        grid.move(entity.id, p.x, p.y)
+
+    def _spatial_remove(self, entity: Entity):
+        self._moved.add(entity.id)
+        grid = self._spatial.get((entity.layer_id, entity.location_id))
+        if grid is not None:
+            grid.remove(entity.id)
+
+    # --- QUERIES ---
+    def get_entities_with(self, *types):
+        names = frozenset(t if isinstance(t, str) else t.__name__ for t in types)
+        out = self._visible(list(self.parent._view(names).items()), self._recomposed)
+        out.extend(self._local[eid] for eid in self._recomposed
+                   if eid in self._local and names.issubset(self._local[eid].components))
+        yield from out
+
+    def count_with(self, *types):
+        names = frozenset(t if isinstance(t, str) else t.__name__ for t in types)
+        view = self.parent._view(names)
+        hidden = sum(1 for eid in self._recomposed | self._destroyed if eid in view)
+        local = sum(1 for eid in self._recomposed
+                    if eid in self._local and names.issubset(self._local[eid].components))
+        return len(view) - hidden + local
+
+    def entities_with_tag(self, *tags):
+        out = self._visible([(e.id, e) for e in self.parent.entities_with_tag(*tags)], self._retagged)
+        buckets = sorted((self._tag_index.get(t, {}) for t in tags), key=len)
+        if buckets:
+            out.extend(e for eid, e in buckets[0].items() if all(eid in b for b in buckets[1:]))
+        return out
+
+    def _spatial_query(self, parent_ids, local_ids):
+        out = self._visible([(eid, self.parent.entities[eid]) for eid in parent_ids], self._moved)
+        out.extend(self._local[eid] for eid in local_ids)
+        return out
+
+    def entities_in_radius(self, x, y, radius, layer_id=None, location_id=None):
+        return self._spatial_query(
+            [eid for grid in self.parent._spatial_grids(layer_id, location_id) for eid in grid.query_radius(x, y, radius)],
+            [eid for grid in self._spatial_grids(layer_id, location_id) for eid in grid.query_radius(x, y, radius)])
+
+    def entities_in_rect(self, x0, y0, x1, y1, layer_id=None, location_id=None):
+        return self._spatial_query(
+            [eid for grid in self.parent._spatial_grids(layer_id, location_id) for eid in grid.query_rect(x0, y0, x1, y1)],
+            [eid for grid in self._spatial_grids(layer_id, location_id) for eid in grid.query_rect(x0, y0, x1, y1)])
+
+    _spatial_grids = ECSRegistry._spatial_grids
+
+    def _name_lookup(self, lookup, query, **kwargs):
+        parent_ids = getattr(self.parent._names, lookup)(query, **kwargs)
+        hidden = self._renamed | self._destroyed
+        eids = [eid for eid in parent_ids if eid not in hidden]
+        eids.extend(getattr(self._names, lookup)(query, **kwargs))
+        return [self._resident(eid) for eid in eids]
+
+    def find_by_name(self, name):
+        return self._name_lookup("find", name)
+
+    def match_name(self, query, limit=5):
+        if not query: return []
+        e = self._resident(query)
+        if e is not None: return [e]
+        for lookup in ("find", "prefix", "contains"):
+            found = self._name_lookup(lookup, query)
+            if found: return found[:limit]
+        return self._name_lookup("fuzzy", query, limit=limit)[:limit]
+
+    # --- WRITE TRACKING ---
+    def mark_dirty(self, entity: Entity, *components):
+        pending = self._dirty.get(entity.id, ())
+        if not components:
+            self._dirty[entity.id] = None
+        elif pending is not None:
+            self._dirty[entity.id] = {c if isinstance(c, str) else c.__name__ for c in components}.union(pending)
+
+    def mark_dirty_many(self, entities, *components):
+        for e in entities:
+            self.mark_dirty(e, *components)
+
+    def flush(self):
+        """Forks never write to the database; commit() hands changes to the parent."""
+        return 0
+
+    def pending_writes(self):
+        return len(self._dirty) + len(self._destroyed)
+
+    # --- RESOLUTION ---
+    def discard(self):
+        """Drops every change made in the fork."""
+        self._check_open()
+        for e in self._local.values():
+            e._registry = None
+        self._local.clear()
+        self.closed = True
+
+    def commit(self):
+        """
+        Applies the fork's outcome to the parent: destroyed and created entities,
+        plus every touched entity's name, tags, metadata, region and components
+        whose state differs from the parent's. Unchanged copies are not written back.
+        Returns {"created": n, "updated": n, "destroyed": n}.
+        """
+        self._check_open()
+        parent = self.parent
+        counts = {"created": 0, "updated": 0, "destroyed": len(self._destroyed)}
+        with self.lock, parent.lock:
+            for eid in self._destroyed:
+                parent.destroy_entity(eid)
+
+            for eid, e in list(self._local.items()):
+                e._registry = None
+                if eid in self._created:
+                    old = parent.entities.get(eid)
+                    if old is not None:
+                        parent.destroy_entity(eid)
+                    parent.add_entity(e)
+                    counts["created"] += 1
+                    continue
+                target = parent.get_entity(eid)
+                if target is None: continue # Destroyed in the parent meanwhile
+                if self._apply(e, target):
+                    counts["updated"] += 1
+
+        self._local.clear()
+        self.closed = True
+        print(f"[ECS] Fork committed: {counts['created']} created, {counts['updated']} updated, {counts['destroyed']} destroyed.")
+        return counts
+
+    def _apply(self, e: ForkEntity, target: Entity):
+        """Copies a shadow's diverged state onto the parent entity; True if anything changed."""
+        changed = False
+        if e.name != target.name:
+            target.name = e.name
+            changed = True
+        if e.tags != target.tags:
+            target.tags = set(e.tags)
+            changed = True
+        if e._metadata is not _SHARED and e._metadata != target.metadata:
+            target.metadata = e._metadata
+            target.mark_dirty()
+            changed = True
+        if (e.layer_id, e.location_id) != (target.layer_id, target.location_id):
+            target._registry.relocate(target, e.layer_id, e.location_id)
+            changed = True
+        for name in [n for n in target.components if n not in e.components]:
+            target.remove_component(name)
+            changed = True
+        for name, comp in e.components.items():
+            if name in e._shared: continue
+            if name in target.components and e.component_dict(name) == target.component_dict(name):
+                continue
+            target.add_component(comp)
+            changed = True
+        return changed
@@ -12,9 +12,15 @@ class EnemyGenerator:
         with open(data_path, 'r', encoding='utf-8') as f:
             self.config = json.load(f).get("enemy_builder_v1", {})
 
-    def generate_enemy(self, species_name="Cultist", icon="sheet:5076", base_hp=25, base_sp=10):
-        """Generates a fully statted enemy entity for the VTT."""
-        
+    def generate_enemy(self, species_name="Cultist", icon="sheet:5076", base_hp=25, base_sp=10,
+                       rank=None, role=None, offense=None, defense=None, tactic=None, rng=None):
+        """
+        Generates a fully statted enemy entity for the VTT. Any of rank/role/
+        offense/defense/tactic pins that option instead of rolling it; `rng`
+        (a random.Random) makes the roll reproducible.
+        """
+        rng = rng or random
+
         ranks = list(self.config.get("1_RANK", {}).get("options", {}).keys())
         roles = list(self.config.get("2_ROLE", {}).get("options", {}).keys())
         offenses = list(self.config.get("3_OFFENSE", {}).get("options", {}).keys())
@@ -24,11 +30,11 @@ class EnemyGenerator:
         # Fallbacks just in case JSON is malformed
         if not ranks: return self._fallback(species_name, icon, base_hp, base_sp)
 
-        rank_key = random.choice(ranks)
-        role_key = random.choice(roles)
-        offense_key = random.choice(offenses)
-        defense_key = random.choice(defenses)
-        tactic_key = random.choice(tactics)
+        rank_key = rank or rng.choice(ranks)
+        role_key = role or rng.choice(roles)
+        offense_key = offense or rng.choice(offenses)
+        defense_key = defense or rng.choice(defenses)
+        tactic_key = tactic or rng.choice(tactics)
 
         rank_data = self.config["1_RANK"]["options"][rank_key]
         role_data = self.config["2_ROLE"]["options"][role_key]
@@ -58,7 +64,7 @@ class EnemyGenerator:
 
         # Build VTT Entity
         return {
-            "id": f"enemy_{random.randint(1000, 99999)}",
+            "id": f"enemy_{rng.randint(1000, 99999)}",
             "name": full_name,
             "type": "enemy",
             "pos": [0, 0], # To be overridden by spawner
@@ -67,6 +73,8 @@ class EnemyGenerator:
             "maxHp": final_hp,
             "sp": base_sp,
             "maxSp": base_sp,
+            "damageMult": dmg_mult,
+            "acBonus": defense_data.get("ac_bonus", 0),
             "stats": stats,
             "tags": ["enemy", "hostile", rank_key.lower()],
             "inventory": []
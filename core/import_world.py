@@ -23,16 +23,7 @@ class WorldImporter:
     def clear_world(self):
         """Wipes the existing world state to prepare for a fresh import."""
         print("[IMPORTER] Wiping existing world_state.db...")
-        # Simple way to clear: delete the records (handled by PersistenceLayer if we add a clear method)
-        # For now, let's just let the persistence layer handle overwrites by ID, 
-        # but a hard wipe is cleaner for a 'Master Export' workflow.
-        import sqlite3
-        conn = sqlite3.connect(self.registry.db.db_path)
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM entities")
-        conn.commit()
-        conn.close()
-        self.registry.entities = {}
+        self.registry.clear()
 
     def import_entities(self, master_export_path: str):
         """
@@ -60,6 +51,7 @@ class WorldImporter:
         for loc in data.get("locations", []):
             self.create_location_entity(loc)
 
+        self.registry.flush()
         print("[IMPORTER] Import complete.")
 
     def create_faction_entity(self, data: Dict):
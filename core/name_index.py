@@ -0,0 +1,108 @@
+import bisect
+from typing import Dict, List
+
+def trigrams(text: str):
+    """Padded character trigrams, so short names and word starts still match."""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def short_grams(text: str):
+    """Every 1- and 2-character substring; serves contains() for needles too short for trigrams."""
+    return {text[i:i + n] for n in (1, 2) for i in range(len(text) - n + 1)}
+
+class NameIndex:
+    """
+    Secondary index over casefolded entity names.
+      exact   -- dict lookup
+      prefix  -- bisect over a name list kept sorted on add/remove
+      contains/fuzzy -- trigram posting lists (1-2 character postings for short
+                        needles), so LLM-provided targets like "the old gate"
+                        or "goblin chef" resolve without a world scan.
+    """
+    def __init__(self):
+        self.exact: Dict[str, Dict[str, None]] = {} # name -> ordered eids
+        self.grams: Dict[str, set] = {} # trigram -> eids
+        self.short: Dict[str, set] = {} # 1-2 character substring -> eids
+        self.names: Dict[str, str] = {} # eid -> indexed name
+        self._sorted: List[tuple] = [] # (name, eid), sorted
+
+    def __len__(self): return len(self.names)
+
+    def add(self, eid, name):
+        if eid in self.names:
+            self.remove(eid)
+        key = (name or "").casefold()
+        self.names[eid] = key
+        self.exact.setdefault(key, {})[eid] = None
+        for g in trigrams(key):
+            self.grams.setdefault(g, set()).add(eid)
+        for g in short_grams(key):
+            self.short.setdefault(g, set()).add(eid)
+        bisect.insort(self._sorted, (key, eid))
+
+    def remove(self, eid):
+        key = self.names.pop(eid, None)
+        if key is None: return
+        bucket = self.exact.get(key)
+        if bucket is not None:
+            bucket.pop(eid, None)
+            if not bucket: del self.exact[key]
+        for postings, grams in ((self.grams, trigrams(key)), (self.short, short_grams(key))):
+            for g in grams:
+                posting = postings.get(g)
+                if posting is not None:
+                    posting.discard(eid)
+                    if not posting: del postings[g]
+        i = bisect.bisect_left(self._sorted, (key, eid))
+        if i < len(self._sorted) and self._sorted[i] == (key, eid):
+            del self._sorted[i]
+
+    def find(self, name):
+        """Ids whose name equals `name` (case-insensitive)."""
+        return list(self.exact.get((name or "").casefold(), ()))
+
+    def prefix(self, text, limit=None):
+        """Ids whose name starts with `text`, in name order."""
+        key = (text or "").casefold()
+        out = []
+        i = bisect.bisect_left(self._sorted, (key, ""))
+        while i < len(self._sorted) and self._sorted[i][0].startswith(key):
+            out.append(self._sorted[i][1])
+            if limit and len(out) >= limit: break
+            i += 1
+        return out
+
+    def _candidates(self, key):
+        """(eid, shared trigram count) for every id sharing a trigram with key."""
+        counts: Dict[str, int] = {}
+        for g in trigrams(key):
+            for eid in self.grams.get(g, ()):
+                counts[eid] = counts.get(eid, 0) + 1
+        return counts
+
+    def contains(self, text, limit=None):
+        """Ids whose name contains `text` as a substring."""
+        key = (text or "").casefold()
+        if not key:
+            return list(self.names)[:limit]
+        if len(key) < 3:
+            out = list(self.short.get(key, ()))
+        else:
+            # Unpadded trigrams of the needle must all appear in a matching name
+            needed = {key[i:i + 3] for i in range(len(key) - 2)}
+            postings = sorted((self.grams.get(g, set()) for g in needed), key=len)
+            out = [eid for eid in postings[0] if all(eid in p for p in postings[1:]) and key in self.names[eid]]
+        out.sort(key=lambda eid: self.names[eid])
+        return out[:limit] if limit else out
+
+    def fuzzy(self, text, limit=5, min_score=0.3):
+        """Ids ranked by trigram Jaccard similarity to `text`."""
+        key = (text or "").casefold()
+        query = trigrams(key)
+        scored = []
+        for eid, shared in self._candidates(key).items():
+            score = shared / (len(query) + len(trigrams(self.names[eid])) - shared)
+            if score >= min_score:
+                scored.append((score, eid))
+        scored.sort(key=lambda s: (-s[0], self.names[s[1]]))
+        return [eid for _, eid in scored[:limit]]
@@ -0,0 +1,80 @@
+from typing import Dict, Tuple
+
+class SpatialHash:
+    """
+    Uniform-grid spatial index over 2D points keyed by entity id.
+    Each point lives in exactly one square bucket of `cell_size` units, so a
+    rect/radius query only visits the buckets it overlaps: O(local), not O(world).
+    """
+    def __init__(self, cell_size=16):
+        self.cell_size = cell_size
+        self.cells: Dict[Tuple[int, int], set] = {}
+        self.points: Dict[str, Tuple[float, float]] = {}
+
+    def __len__(self): return len(self.points)
+
+    def __contains__(self, eid): return eid in self.points
+
+    def _cell(self, x, y):
+        return (int(x // self.cell_size), int(y // self.cell_size))
+
+    def insert(self, eid, x, y):
+        if eid in self.points:
+            return self.move(eid, x, y)
+        self.points[eid] = (x, y)
+        self.cells.setdefault(self._cell(x, y), set()).add(eid)
+
+    def move(self, eid, x, y):
+        old = self.points.get(eid)
+        if old is None:
+            return self.insert(eid, x, y)
+        self.points[eid] = (x, y)
+        old_cell, new_cell = self._cell(*old), self._cell(x, y)
+        if old_cell != new_cell:
+            self._discard(old_cell, eid)
+            self.cells.setdefault(new_cell, set()).add(eid)
+
+    def remove(self, eid):
+        old = self.points.pop(eid, None)
+        if old is not None:
+            self._discard(self._cell(*old), eid)
+
+    def _discard(self, cell, eid):
+        bucket = self.cells.get(cell)
+        if bucket is not None:
+            bucket.discard(eid)
+            if not bucket:
+                del self.cells[cell]
+
+    def _buckets(self, x0, y0, x1, y1):
+        cx0, cy0 = self._cell(x0, y0)
+        cx1, cy1 = self._cell(x1, y1)
+        # Sparse worlds: fewer occupied cells than cells in the window, walk the occupied ones
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > len(self.cells):
+            for (cx, cy), bucket in self.cells.items():
+                if cx0 <= cx <= cx1 and cy0 <= cy <= cy1:
+                    yield bucket
+            return
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                bucket = self.cells.get((cx, cy))
+                if bucket: yield bucket
+
+    def query_rect(self, x0, y0, x1, y1):
+        """Yields ids with x0 <= x <= x1 and y0 <= y <= y1."""
+        points = self.points
+        for bucket in self._buckets(x0, y0, x1, y1):
+            for eid in bucket:
+                x, y = points[eid]
+                if x0 <= x <= x1 and y0 <= y <= y1:
+                    yield eid
+
+    def query_radius(self, x, y, radius):
+        """Yields ids within Euclidean `radius` of (x, y), inclusive."""
+        r2 = radius * radius
+        points = self.points
+        for bucket in self._buckets(x - radius, y - radius, x + radius, y + radius):
+            for eid in bucket:
+                px, py = points[eid]
+                if (px - x) ** 2 + (py - y) ** 2 <= r2:
+                    yield eid
@@ -1,4 +1,5 @@
 from core.ecs import world_ecs, Position, Vitals, Renderable
+from core.name_index import NameIndex
 from typing import Dict, Any, Tuple, List
 import random
 
@@ -8,6 +9,7 @@ class InteractionEngine:
     Applies strict logic to ECS tags (breakable, lockable, container, explosive).
     Returns mechanical logs and state updates, stripping mathematics away from the Narrative LLM.
     """
+    INTERACTION_RADIUS = 20 # World units around the player searched for targets
     
     @staticmethod
     def resolve_interaction(intent: Dict[str, Any], player_data: Dict[str, Any]) -> Tuple[str, List[Dict[str, Any]]]:
@@ -19,10 +21,20 @@ class InteractionEngine:
         player_pos = player_data.get('pos', [500, 500])
         target_entity = None
         
-        for e in world_ecs.entities.values():
-            if target_name.lower() in e.id.lower() or target_name.lower() in e.name.lower():
+        nearby = world_ecs.entities_in_radius(player_pos[0], player_pos[1], InteractionEngine.INTERACTION_RADIUS)
+        needle = target_name.lower()
+        for e in nearby:
+            if needle in e.id.lower() or needle in e.name.lower():
                 target_entity = e
                 break
+
+        if not target_entity and nearby:
+            # Loosely worded targets ("the old gate"): rank only what is in reach by trigram similarity
+            names = NameIndex()
+            for e in nearby:
+                names.add(e.id, e.name)
+            best = names.fuzzy(target_name, limit=1)
+            target_entity = world_ecs.entities[best[0]] if best else None
                 
         if not target_entity:
             return f"System: Could not find '{target_name}' nearby.", []
@@ -56,38 +68,41 @@ class InteractionEngine:
             activated = False
             if 'active' in tags:
                 target_entity.tags.remove('active')
-                target_entity.tags.append('inactive')
+                target_entity.tags.add('inactive')
                 result_log.append(f"System: You deactivated the {target_entity.name}.")
             else:
                 if 'inactive' in tags: target_entity.tags.remove('inactive')
-                target_entity.tags.append('active')
+                target_entity.tags.add('active')
                 result_log.append(f"System: You activated the {target_entity.name}.")
                 activated = True
                 
             # Scan for a linked door / logic gate
             link_tag = next((t for t in tags if str(t).startswith("link_")), None)
             
-            for e in world_ecs.entities.values():
-                # Either global "door" toggle or specific link match
-                if 'door' in e.tags or 'gate' in e.tags:
-                    if link_tag is None or link_tag in e.tags:
-                        if activated:
-                            if 'locked' in e.tags: e.tags.remove('locked')
-                            if 'openable' not in e.tags: e.tags.append('openable')
-                            result_log.append(f"System: The {e.name} unlocks and opens!")
-                            updates.append({"type": "PLAY_ANIMATION", "name": "UNLOCK", "target": e.id})
-                        else:
-                            if 'openable' in e.tags: e.tags.remove('openable')
-                            if 'locked' not in e.tags: e.tags.append('locked')
-                            result_log.append(f"System: The {e.name} slams shut and locks.")
-            world_ecs.save_entity(target_entity.id, target_entity.name, target_entity.to_dict())
+            # Either global "door" toggle or specific link match
+            if link_tag is None:
+                linked = {e.id: e for t in ('door', 'gate') for e in world_ecs.entities_with_tag(t)}.values()
+            else:
+                linked = [e for e in world_ecs.entities_with_tag(link_tag) if 'door' in e.tags or 'gate' in e.tags]
+            for e in linked:
+                if activated:
+                    if 'locked' in e.tags: e.tags.remove('locked')
+                    if 'openable' not in e.tags: e.tags.add('openable')
+                    result_log.append(f"System: The {e.name} unlocks and opens!")
+                    updates.append({"type": "PLAY_ANIMATION", "name": "UNLOCK", "target": e.id})
+                else:
+                    if 'openable' in e.tags: e.tags.remove('openable')
+                    if 'locked' not in e.tags: e.tags.add('locked')
+                    result_log.append(f"System: The {e.name} slams shut and locks.")
+                e.mark_dirty()
+            target_entity.mark_dirty()
             
         elif 'openable' in tags or 'container' in tags:
             if 'locked' in tags:
                 if 'key' in player_data: # Placeholder for inventory check
                     result_log.append(f"System: Used Key. Unlocked {target_entity.name}.")
                     target_entity.tags.remove('locked')
-                    world_ecs.save_entity(target_entity.id, target_entity.name, target_entity.to_dict())
+                    target_entity.mark_dirty()
                 else:
                     result_log.append(f"System: The {target_entity.name} is locked.")
             else:
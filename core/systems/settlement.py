@@ -1,4 +1,4 @@
-from core.ecs import ECSRegistry, Demographics, Economy, Infrastructure, Logistics
+from core.ecs import ECSRegistry, Demographics, Economy, Infrastructure, Logistics, np
 from core.definition_registry import DefinitionRegistry
 
 class SettlementSystem:
@@ -11,17 +11,35 @@ class SettlementSystem:
         self.registry = registry
         self.definitions = definitions
 
+    def _species(self, entity):
+        # Identify active species ruleset
+        species_id = entity.metadata.get("species_id", "human") # Fallback
+        return self.definitions.species.get(species_id)
+
+    def _columnar(self):
+        """True when the registry keeps every component the growth/economy passes touch in NumPy columns."""
+        return np is not None and all(c in self.registry.columns for c in ("Demographics", "Logistics", "Economy"))
+
     def process_tick(self):
         """Advances the simulation by one abstract tick (e.g., a month)."""
-        
+        with self.registry.lock: # No autoflush mid-tick
+            if self._columnar():
+                self.grow_columnar()
+                self.economy_columnar()
+            else:
+                self.grow()
+                self.economy()
+            self.trade()
+
+            # 4. Tick boundary: write every settlement touched this tick in one transaction
+            self.registry.flush()
+
+    def grow(self):
         # 1. Process Population Growth and Logistics (Species Asset Driven)
         for entity in self.registry.get_entities_with(Demographics, Logistics):
             demo = entity.get_component(Demographics)
             logistics = entity.get_component(Logistics)
-            
-            # Identify active species ruleset
-            species_id = entity.properties.get("species_id", "human") # Fallback
-            species_def = self.definitions.species.get(species_id)
+            species_def = self._species(entity)
             
             if not species_def:
                 continue # Skip if no species definition exists
@@ -51,7 +69,45 @@ class SettlementSystem:
                     demo.social_unrest = min(1.0, demo.social_unrest + 0.1) # Unhappy
                     
             logistics.population = demo.pop_total # Sync legacy component
+            entity.mark_dirty(Demographics, Logistics)
+
+    def grow_columnar(self):
+        """grow() as column operations over every settlement; only the resource dicts are touched per entity."""
+        demo = self.registry.bulk(Demographics)
+        logi = self.registry.columns["Logistics"]
+        rows, ents, defs = [], [], []
+        for i, entity in enumerate(demo.entities()):
+            species_def = self._species(entity) if "Logistics" in entity.components else None
+            if species_def:
+                rows.append(i); ents.append(entity); defs.append(species_def)
+        if not rows: return
+        idx = np.array(rows)
+        lslots = np.array([e.components["Logistics"] for e in ents])
+        resources = [logi.objs["resources"][s] for s in lslots.tolist()]
+        rate = np.array([d.growth_rate for d in defs])
+        need = np.array([d.resource_needs.get("food", 1.0) for d in defs])
+        food = np.array([r.get("food", 0) for r in resources], dtype=float)
+
+        pop_col, unrest_col = demo["pop_total"], demo["social_unrest"]
+        pop, unrest = pop_col[idx], unrest_col[idx]
+        growing = pop < demo["pop_capacity"][idx]
+        consumed = pop * need
+        fed = growing & (food >= consumed)
+        starving = growing & ~fed
+        with np.errstate(divide="ignore", invalid="ignore"):
+            starved = np.trunc((consumed - food) / need)
+        new_pop = np.where(fed, pop + np.trunc(pop * rate), np.where(starving, np.maximum(0, pop - starved), pop))
+        unrest = np.where(fed, np.maximum(0.0, unrest - 0.01), np.where(starving, np.minimum(1.0, unrest + 0.1), unrest))
+        left = np.maximum(0, np.trunc(food - consumed))
+        for i in np.flatnonzero(growing).tolist():
+            resources[i]["food"] = int(left[i]) if fed[i] else 0
+
+        pop_col[idx], unrest_col[idx] = new_pop, unrest
+        demo["pop_total"], demo["social_unrest"] = pop_col, unrest_col
+        logi.cols["population"][lslots] = new_pop # Sync legacy component
+        self.registry.mark_dirty_many(ents, Demographics, Logistics)
 
+    def economy(self):
         # 2. Process Economy and Taxation (Faction/Culture Driven)
         for entity in self.registry.get_entities_with(Demographics, Economy):
             demo = entity.get_component(Demographics)
@@ -65,8 +121,7 @@ class SettlementSystem:
             tax_revenue *= efficiency
             
             # Fetch species to determine task weights
-            species_id = entity.properties.get("species_id", "human")
-            species_def = self.definitions.species.get(species_id)
+            species_def = self._species(entity)
             work_efficiency = efficiency
             if species_def:
                 # E.g. If the primary export requires farming, use farm weight
@@ -80,7 +135,40 @@ class SettlementSystem:
                 production_amount = int((demo.pop_total * 0.1) * work_efficiency)
                 current = logistics.resources.get(econ.primary_export, 0)
                 logistics.resources[econ.primary_export] = current + production_amount
+                entity.mark_dirty(Logistics)
+            entity.mark_dirty(Economy)
+
+    def economy_columnar(self):
+        """economy() as column operations; production lands in each resource dict."""
+        demo = self.registry.bulk(Demographics)
+        econ = self.registry.columns["Economy"]
+        rows, ents = [], []
+        for i, entity in enumerate(demo.entities()):
+            if "Economy" in entity.components:
+                rows.append(i); ents.append(entity)
+        if not rows: return
+        idx = np.array(rows)
+        eslots = np.array([e.components["Economy"] for e in ents])
+        farm = np.array([d.task_weights.farm if d else 1.0 for d in map(self._species, ents)])
+
+        pop = demo["pop_total"][idx]
+        efficiency = 1.0 - demo["social_unrest"][idx] # Unrest hurts economy
+        econ.cols["wealth"][eslots] += np.trunc(pop * econ.cols["tax_rate"][eslots] * efficiency)
+        production = np.trunc((pop * 0.1) * (efficiency * farm))
+
+        producers = []
+        logi = self.registry.columns["Logistics"]
+        for i, entity in enumerate(ents):
+            lslot = entity.components.get("Logistics")
+            if lslot is None: continue
+            export = econ.objs["primary_export"][eslots[i]]
+            resources = logi.objs["resources"][lslot]
+            resources[export] = resources.get(export, 0) + int(production[i])
+            producers.append(entity)
+        self.registry.mark_dirty_many(producers, Logistics)
+        self.registry.mark_dirty_many(ents, Economy)
 
+    def trade(self):
         # 3. Process Trade between Settlements (Simple Proximity/Global Model)
         # Note: In a full GIS model, this would use the network graph.
         settlements = list(self.registry.get_entities_with(Economy, Logistics))
@@ -90,7 +178,7 @@ class SettlementSystem:
             s_demo = seller.get_component(Demographics)
             s_infra = seller.get_component(Infrastructure)
             
-            faction_id = seller.properties.get("faction_id", "neutral")
+            faction_id = seller.metadata.get("faction_id", "neutral")
             faction_def = self.definitions.factions.get(faction_id)
             expansion_drive = faction_def.expansion_drive if faction_def else 0.5
             
@@ -100,6 +188,7 @@ class SettlementSystem:
                 if s_econ.wealth > 50:
                     stolen = int(s_econ.wealth * 0.15)
                     s_econ.wealth -= stolen
+                    seller.mark_dirty(Economy)
                     
             export_good = s_econ.primary_export
             export_qty = s_log.resources.get(export_good, 0)
@@ -133,13 +222,17 @@ class SettlementSystem:
                         b_log.resources[import_good] = current_import + qty_to_buy
                         
                         export_qty -= qty_to_buy
+                        seller.mark_dirty(Economy, Logistics)
+                        buyer.mark_dirty(Economy, Logistics)
                         
                         # Infrastructure: High expansion + active trade builds roads
                         if expansion_drive > 0.6:
                             if s_infra:
                                 s_infra.trade_level = min(10.0, s_infra.trade_level + 0.05)
+                                seller.mark_dirty(Infrastructure)
                             b_infra = buyer.get_component(Infrastructure)
                             if b_infra:
                                 b_infra.trade_level = min(10.0, b_infra.trade_level + 0.05)
+                                buyer.mark_dirty(Infrastructure)
                     
                     if export_qty <= 0: break
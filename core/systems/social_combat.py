@@ -7,6 +7,8 @@ class SocialCombatEngine:
     Handles mechanical resolution for conversational encounters.
     Maps attributes like 'Deception', 'Insight', 'Logic', and 'Willpower' to Composure (CMP) damage.
     """
+    TALK_RADIUS = 20 # World units around the player within which an NPC can be addressed
+
     def __init__(self):
         # Maps intents to the offensive stat and defensive stat respectively
         # example: "coerce" uses (Might vs Willpower)
@@ -28,8 +30,14 @@ class SocialCombatEngine:
         if not target_name:
             return "You speak to the air. Nothing happens.", []
 
-        # Find the target entity in the ECS
-        target_entity = next((e for e in world_ecs.entities.values() if e.name.lower() == target_name), None)
+        # Find the target entity in the ECS (name index; when we know where the player is,
+        # the nearest namesake within TALK_RADIUS)
+        candidates = world_ecs.find_by_name(target_name)
+        pos = player_data.get('pos')
+        if pos:
+            dist = lambda e: (e.x - pos[0]) ** 2 + (e.y - pos[1]) ** 2
+            candidates = sorted((e for e in candidates if dist(e) <= self.TALK_RADIUS ** 2), key=dist)
+        target_entity = candidates[0] if candidates else None
         if not target_entity:
             return f"{target_name.capitalize()} is not here.", []
 
@@ -1,6 +1,6 @@
 import math
 import random
-from core.ecs import world_ecs, Logistics
+from core.ecs import world_ecs, Logistics, np
 
 class SimulationManager:
     """
@@ -39,20 +39,28 @@ class SimulationManager:
         if self.narrative_hours % 672 == 0:
             self.tick_global_sim()
             
-        # 5. ECS LOGISTICS BATCH SIM
-        self.batch_logistic_tick(hours)
+        with world_ecs.lock: # No autoflush mid-tick
+            # 5. ECS LOGISTICS BATCH SIM
+            self.batch_logistic_tick(hours)
+
+            # 6. Tick boundary: persist everything the tick touched in one transaction
+            world_ecs.flush()
             
     def _get_dist(self, pos1, pos2):
         return math.sqrt((pos1[0]-pos2[0])**2 + (pos1[1]-pos2[1])**2)
 
-    def batch_logistic_tick(self, delta_hours: int):
+    def batch_logistic_tick(self, delta_hours: int, registry=None):
         """
         Iterates over all ECS entities with Logistics components and 
         processes resource depletion, production, and population shifts.
+        Columnar registries run it as whole-column operations.
         """
+        registry = registry or world_ecs
         print(f"[SIM-BATCH] Processing Logistics for {delta_hours} hours...")
+        if np is not None and "Logistics" in registry.columns:
+            return self._columnar_logistic_tick(registry, delta_hours)
         
-        for entity in world_ecs.get_entities_with(Logistics):
+        for entity in registry.get_entities_with(Logistics):
             log = entity.get_component(Logistics)
             
             # Resource Depletion (Consumption)
@@ -76,6 +84,43 @@ class SimulationManager:
                 log.population += growth
 
             log.last_tick = self.narrative_hours
+            entity.mark_dirty(Logistics)
+
+    def _columnar_logistic_tick(self, registry, delta_hours):
+        batch = registry.bulk(Logistics)
+        if not len(batch): return
+        slots = batch.slots.tolist()
+        store = batch.store
+        needs = [store.objs["needs"][s] for s in slots]
+        resources = [store.objs["resources"][s] for s in slots]
+        pop = batch["population"]
+
+        # Resource Depletion (Consumption), one needed resource at a time
+        for res in dict.fromkeys(k for n in needs for k in n):
+            rows = [i for i, (n, r) in enumerate(zip(needs, resources)) if res in n and res in r]
+            if not rows: continue
+            idx = np.array(rows)
+            rate = np.array([needs[i][res] for i in rows], dtype=float)
+            left = np.array([resources[i][res] for i in rows], dtype=float) - rate * pop[idx] * delta_hours
+            famine = left < 0
+            for j, i in enumerate(rows):
+                resources[i][res] = 0 if famine[j] else left[j].item()
+            if famine.any():
+                # Statistically kill off some pop due to famine
+                hit = idx[famine]
+                deaths = np.trunc(pop[hit] * 0.05 * (delta_hours / 24))
+                pop[hit] = np.maximum(0, pop[hit] - deaths)
+                owners = batch.entities()
+                for i, d in zip(hit.tolist(), deaths.tolist()):
+                    print(f"  -> FAMINE alert in {owners[i].name}: {int(d)} deaths.")
+
+        # Production (Simplified): if they have food, they grow
+        food = np.array([r.get("Food", 0) for r in resources], dtype=float)
+        pop = np.where(food > pop, pop + np.trunc(pop * 0.001 * delta_hours), pop)
+
+        batch["population"] = pop
+        batch["last_tick"] = np.full(len(batch), self.narrative_hours)
+        batch.commit()
 
     def _check_for_catchups(self, player_pos):
         """Finds nodes that just entered the simulation zone and fast-forwards them."""
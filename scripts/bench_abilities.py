@@ -0,0 +1,55 @@
+import sys
+import os
+import time
+import random
+import argparse
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.abilities.data_loader import DataLoader
+from core.abilities.catalog import AbilityCatalog
+
+class Caster:
+    def __init__(self, powers):
+        self.powers, self.fp, self.sp = powers, 6, 6
+
+def legacy_offense(loader, me):
+    """The previous per-turn path: a lowercasing linear scan for every power."""
+    out = []
+    for power in me.powers:
+        data = None
+        for rows, column in ((loader.talents, "Talent_Name"), (loader.schools, "Name"), (loader.skills, "Skill_Name")):
+            data = next((r for r in rows if r.get(column, "").lower() == power.lower()), None)
+            if data: break
+        if data and data.get("Type", "").lower() == "offense": out.append(power)
+    return out
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="AI offensive-ability lookup: linear scans vs compiled catalog.")
+    parser.add_argument("--abilities", type=int, default=500)
+    parser.add_argument("--casters", type=int, default=50)
+    parser.add_argument("--turns", type=int, default=200)
+    args = parser.parse_args()
+    rng = random.Random(1)
+    loader = DataLoader()
+    loader.schools.extend({"Name": f"Power {i}", "Type": rng.choice(["Offense", "Defense", "Utility"]),
+                           "Description": f"Cost: {rng.randint(1, 4)} FP"} for i in range(args.abilities))
+    casters = [Caster([f"power {rng.randrange(args.abilities)}" for _ in range(6)]) for _ in range(args.casters)]
+    catalog = AbilityCatalog(loader)
+
+    start = time.perf_counter()
+    for _ in range(args.turns):
+        for c in casters: legacy_offense(loader, c)
+    old = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for turn in range(args.turns):
+        for c in casters:
+            if turn % 5 == 0: c.fp = rng.randint(0, 6) # Spend/regain now and then
+            catalog.usable_offense(c)
+    new = time.perf_counter() - start
+    calls = args.turns * args.casters
+    print(f"[BENCH] {args.abilities + len(loader.skills)} abilities, {args.casters} casters x {args.turns} turns")
+    print(f"  linear scan: {old / calls * 1e6:8.2f}us/turn   catalog: {new / calls * 1e6:6.2f}us/turn   ({old / new:.1f}x)")
+    print(f"  cache: {catalog.stats}")
@@ -0,0 +1,64 @@
+import sys
+import os
+import time
+import random
+import argparse
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.ecs import Entity, Position, Vitals
+from core.combat.mechanics import CombatEngine
+from core.combat.ai_engine import AIDecisionEngine
+
+def legacy_analyze(me, engine):
+    """The previous analyze_battlefield(): full rescan plus all-pairs clustering, per AI unit."""
+    enemies, allies = [], []
+    my_team = engine.team_of(me)
+    for c in engine.combatants:
+        if not c.is_alive() or c is me: continue
+        info = {"obj": c, "dist": max(abs(me.x - c.x), abs(me.y - c.y)), "hp_pct": c.hp / c.max_hp}
+        (allies if engine.team_of(c) == my_team else enemies).append(info)
+    clusters = []
+    for e in enemies:
+        count = sum(1 for o in enemies if max(abs(e["obj"].x - o["obj"].x), abs(e["obj"].y - o["obj"].y)) <= 2)
+        if count > 1: clusters.append({"center": e["obj"], "count": count})
+    clusters.sort(key=lambda x: x["count"], reverse=True)
+    return {"enemies": sorted(enemies, key=lambda x: x["dist"]), "allies": sorted(allies, key=lambda x: x["hp_pct"]), "clusters": clusters}
+
+def make_engine(units, size, seed):
+    rng = random.Random(seed)
+    engine = CombatEngine(cols=size, rows=size, seed=seed)
+    tiles = rng.sample([(x, y) for x in range(size) for y in range(size)], units)
+    roster = []
+    for i, (x, y) in enumerate(tiles):
+        u = Entity(f"U{i}")
+        u.add_component(Position(x, y))
+        u.add_component(Vitals(hp=30, max_hp=30, sp=30, max_sp=30))
+        if i % 2: u.add_tag("hero")
+        roster.append(u)
+    engine.combatants = roster
+    return engine, rng
+
+def run(analyze, units, size, rounds):
+    engine, rng = make_engine(units, size, 1)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for u in list(engine.combatants):
+            analyze(u, engine)
+            engine.move_char(u, max(0, min(size - 1, u.x + rng.choice((-1, 0, 1)))), max(0, min(size - 1, u.y + rng.choice((-1, 0, 1)))))
+            if rng.random() < 0.2: u.take_damage(1)
+    return (time.perf_counter() - start) / rounds
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-round AI battlefield analysis: full rescan vs shared summary.")
+    parser.add_argument("--units", default="10,50,200")
+    parser.add_argument("--size", type=int, default=40)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    print(f"[BENCH] Every unit analyzes, then moves, {args.size}x{args.size} map")
+    for n in args.units.split(","):
+        n = int(n)
+        old = run(legacy_analyze, n, args.size, args.rounds)
+        new = run(AIDecisionEngine().analyze_battlefield, n, args.size, args.rounds)
+        print(f"  {n:4} units: rescan {old * 1e3:8.2f}ms/round   shared {new * 1e3:7.2f}ms/round   ({old / new:.1f}x)")
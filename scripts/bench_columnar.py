@@ -0,0 +1,81 @@
+import sys
+import os
+import time
+import tracemalloc
+import argparse
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+from core.ecs import ECSRegistry, Entity, Position, Vitals, Logistics
+
+def populate(registry, count):
+    """Registers bare entities, then returns the bytes allocated by attaching the hot components."""
+    entities = [registry.add_entity(Entity(f"Entity {i}", uid=f"ent_{i}")) for i in range(count)]
+    tracemalloc.start()
+    for i, e in enumerate(entities):
+        e.add_component(Position(i % 1000, i // 1000))
+        e.add_component(Vitals(hp=i % 40 + 1, max_hp=50, sp=20, max_sp=20))
+        e.add_component(Logistics(population=100 + i % 900))
+    registry._dirty.clear() # Benchmark measures storage and ticks, not persistence
+    mem = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return mem
+
+def object_tick(registry, ticks):
+    """Per-entity Python loop: regen 1 HP up to max, grow population 0.1%."""
+    for _ in range(ticks):
+        for e in registry.get_entities_with(Vitals):
+            v = e.get_component(Vitals)
+            if v.hp < v.max_hp:
+                v.hp = min(v.max_hp, v.hp + 1)
+                e.mark_dirty(Vitals)
+        for e in registry.get_entities_with(Logistics):
+            log = e.get_component(Logistics)
+            log.population += int(log.population * 0.001)
+            e.mark_dirty(Logistics)
+
+def columnar_tick(registry, ticks):
+    """The same tick as whole-column NumPy operations."""
+    for _ in range(ticks):
+        vitals = registry.bulk(Vitals)
+        hp, max_hp = vitals["hp"], vitals["max_hp"]
+        vitals["hp"] = np.minimum(max_hp, hp + 1)
+        vitals.commit(changed=hp < max_hp)
+        logistics = registry.bulk(Logistics)
+        pop = logistics["population"]
+        logistics["population"] = pop + np.floor(pop * 0.001)
+        logistics.commit()
+
+def bench(count, ticks):
+    print(f"[BENCH] {count} entities (Position + Vitals + Logistics), {ticks} ticks")
+    results = {}
+    for mode in ("objects", "columnar"):
+        registry = ECSRegistry(":memory:", columnar=(mode == "columnar"))
+        mem = populate(registry, count)
+
+        start = time.perf_counter()
+        (columnar_tick if mode == "columnar" else object_tick)(registry, ticks)
+        secs = time.perf_counter() - start
+        results[mode] = (mem, secs, registry)
+        print(f"  {mode:8}: {mem / count:7.0f} B/entity (components + indexes)   tick {secs / ticks * 1000:9.2f}ms")
+
+    # Both backends must agree on the simulated state
+    a = results["objects"][2].entities
+    b = results["columnar"][2].entities
+    for eid in list(a)[:: max(1, count // 100)]:
+        assert a[eid].hp == b[eid].hp
+        assert a[eid].get_component(Logistics).population == b[eid].get_component(Logistics).population
+    print(f"  speedup: {results['objects'][1] / results['columnar'][1]:.1f}x, "
+          f"memory: {results['objects'][0] / results['columnar'][0]:.2f}x less")
+    for _, _, registry in results.values():
+        registry.db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hot-component ticks: per-object loop vs NumPy columns.")
+    parser.add_argument("--sizes", default="10000,100000")
+    parser.add_argument("--ticks", type=int, default=10)
+    args = parser.parse_args()
+    for size in args.sizes.split(","):
+        bench(int(size), args.ticks)
@@ -0,0 +1,46 @@
+import sys
+import os
+import json
+import time
+import argparse
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.abilities.effects_registry import EffectRegistry
+
+SCHOOLS = os.path.join(os.path.dirname(__file__), "..", "data", "tactical_data", "Schools_of_Power.json")
+
+def full_scan(registry, text):
+    """The previous resolve(): every pattern searched against every description."""
+    return [(h, m) for p, h in registry.patterns for m in [p.search(text)] if m]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="EffectRegistry matching throughput over the Schools_of_Power descriptions.")
+    parser.add_argument("--passes", type=int, default=20, help="Resolutions of every description (the hook loop re-resolves)")
+    args = parser.parse_args()
+    with open(SCHOOLS, encoding="utf-8") as f:
+        descs = [s["description"] for school in json.load(f)["schools"].values() for s in school.get("spells", [])]
+    registry = EffectRegistry()
+    calls = len(descs) * args.passes
+    print(f"[BENCH] {len(descs)} descriptions x {args.passes} passes, {len(registry.patterns)} patterns")
+
+    start = time.perf_counter()
+    for _ in range(args.passes):
+        for d in descs: full_scan(registry, d)
+    scan = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(args.passes):
+        registry._plans.clear()
+        for d in descs: registry.plan(d)
+    cold = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(args.passes):
+        for d in descs: registry.plan(d)
+    warm = time.perf_counter() - start
+
+    print(f"  full scan      : {calls / scan:10.0f} desc/s")
+    print(f"  prefilter      : {calls / cold:10.0f} desc/s   ({scan / cold:.1f}x, {registry.stats['candidates'] / registry.stats['plans']:.1f} candidates/desc)")
+    print(f"  cached plans   : {calls / warm:10.0f} desc/s   ({scan / warm:.0f}x)")
@@ -0,0 +1,66 @@
+import sys
+import os
+import time
+import random
+import argparse
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.ecs import Entity, Position, Vitals
+from core.combat.mechanics import CombatEngine
+
+def make_unit(name, x, y):
+    e = Entity(name)
+    e.add_component(Position(x, y))
+    e.add_component(Vitals(hp=30, max_hp=30, sp=6, max_sp=6))
+    return e
+
+def legacy_ai_turn(engine):
+    """The previous run_ai_turn movement: one path search per NPC, any() occupancy scan per step."""
+    hero = next(c for c in engine.combatants if "hero" in c.tags)
+    for npc in [c for c in engine.combatants if "hero" not in c.tags]:
+        engine._path_cache.clear() # Each NPC starts from a different tile; no cache reuse across a turn
+        path = engine.find_path((npc.x, npc.y), (hero.x, hero.y), partial=True)
+        for i in range(len(path)):
+            if i >= npc.sp: break
+            if path[i] == (hero.x, hero.y): break
+            tx, ty = path[i]
+            if not any(c.x == tx and c.y == ty for c in engine.combatants):
+                npc.x, npc.y = tx, ty
+
+def setup(size, npcs, seed):
+    rng = random.Random(seed)
+    engine = CombatEngine(cols=size, rows=size)
+    engine.walls = {(rng.randrange(size), rng.randrange(size)) for _ in range(size * size // 8)} - {(size // 2, size // 2)}
+    hero = make_unit("Hero", size // 2, size // 2)
+    hero.add_tag("hero")
+    engine.combatants.append(hero)
+    spots = [(x, y) for x in range(size) for y in range(size)
+             if (x, y) not in engine.walls and max(abs(x - size // 2), abs(y - size // 2)) > size // 4]
+    for i, (x, y) in enumerate(rng.sample(spots, npcs)):
+        engine.combatants.append(make_unit(f"Goblin {i}", x, y))
+    return engine
+
+def bench(size, npcs, turns, seed):
+    print(f"[BENCH] {size}x{size} map, {npcs} NPCs chasing one hero, {turns} turns")
+    results = {}
+    for label, turn in (("per-NPC A*", legacy_ai_turn), ("flow field", CombatEngine.run_ai_turn)):
+        engine = setup(size, npcs, seed)
+        start = time.perf_counter()
+        for _ in range(turns):
+            engine._flow_cache.clear() # Hero may have moved; rebuild once per turn
+            turn(engine)
+        results[label] = (time.perf_counter() - start) / turns
+        print(f"  {label:11}: {results[label] * 1000:9.2f}ms/turn")
+    print(f"  speedup: {results['per-NPC A*'] / results['flow field']:.1f}x")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="AI movement: per-NPC path search vs a shared flow field.")
+    parser.add_argument("--size", type=int, default=60)
+    parser.add_argument("--npcs", default="10,50,200")
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+    for n in args.npcs.split(","):
+        bench(args.size, int(n), args.turns, args.seed)
@@ -0,0 +1,71 @@
+import sys
+import os
+import time
+import argparse
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.ecs import ECSRegistry, Entity, Position, Vitals, Logistics
+
+def populate(registry, count):
+    for i in range(count):
+        e = registry.add_entity(Entity(f"Entity {i}", uid=f"ent_{i}"))
+        e.add_component(Position(i % 1000, i // 1000))
+        e.add_component(Vitals(hp=20, max_hp=50))
+        e.add_component(Logistics(population=100 + i % 900, resources={"food": 50}))
+    registry._dirty.clear() # Benchmark measures forking, not persistence
+
+def deep_copy(registry):
+    """Baseline: snapshot every entity through its serialized state."""
+    rows = [(e.id, e.name, e.to_dict(), e.layer_id, e.location_id) for e in registry.entities.values()]
+    clone = ECSRegistry(":memory:")
+    for e in clone._build_entities(rows):
+        clone._register(e)
+    return clone
+
+def bench(count, touched):
+    print(f"[BENCH] fork a {count}-entity world, mutate {touched} entities")
+    registry = ECSRegistry(":memory:")
+    populate(registry, count)
+
+    start = time.perf_counter()
+    clone = deep_copy(registry)
+    copy_secs = time.perf_counter() - start
+    clone.db.close()
+
+    start = time.perf_counter()
+    fork = registry.fork()
+    fork_secs = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(0, count, max(1, count // touched)):
+        e = fork.get_entity(f"ent_{i}")
+        e.get_component(Vitals).hp -= 5
+        e.get_component(Logistics).resources["food"] -= 10
+        e.mark_dirty(Vitals, Logistics)
+    touch_secs = time.perf_counter() - start
+
+    start = time.perf_counter()
+    nearby = fork.entities_in_radius(500, 50, 10)
+    query_secs = time.perf_counter() - start
+
+    start = time.perf_counter()
+    fork.commit()
+    commit_secs = time.perf_counter() - start
+    assert registry.get_entity("ent_0").hp == 15
+
+    print(f"  deep copy:  {copy_secs * 1000:10.2f}ms")
+    print(f"  fork():     {fork_secs * 1000:10.3f}ms")
+    print(f"  mutate:     {touch_secs * 1000:10.2f}ms  ({touched} entities, 2 components each)")
+    print(f"  radius:     {query_secs * 1000:10.2f}ms  ({len(nearby)} hits through the overlay)")
+    print(f"  commit:     {commit_secs * 1000:10.2f}ms")
+    registry.db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Copy-on-write registry fork vs a full deep copy.")
+    parser.add_argument("--sizes", default="10000,100000")
+    parser.add_argument("--touched", type=int, default=1000)
+    args = parser.parse_args()
+    for size in args.sizes.split(","):
+        bench(int(size), args.touched)
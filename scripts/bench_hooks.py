@@ -0,0 +1,50 @@
+import sys
+import os
+import time
+import random
+import argparse
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.abilities import engine_hooks
+
+ATTACK_WORDS = ["attack", "heal", "regain", "damage", "push", "teleport", "stun", "poison", "fear", "charm", "grapple"]
+
+class Unit:
+    def __init__(self, skills, powers, traits):
+        self.species, self.skills, self.powers, self.traits = "Human", skills, powers, traits
+
+def legacy_attack_effects(unit):
+    """The previous apply_hooks(ON_ATTACK) selection: full scan, then the keyword filter."""
+    return [e for e in engine_hooks.collect_entity_effects(unit) if any(k in e.lower() for k in ATTACK_WORDS)]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-hook effect selection: rescan + filter vs compiled profiles.")
+    parser.add_argument("--units", type=int, default=100)
+    parser.add_argument("--loadouts", type=int, default=10, help="Distinct skill/power/trait loadouts among the units")
+    parser.add_argument("--hooks", type=int, default=50, help="ON_ATTACK hooks fired per unit")
+    parser.add_argument("--rows", type=int, default=400, help="Extra talent and school rows in the loader")
+    args = parser.parse_args()
+    rng = random.Random(1)
+    loader = engine_hooks.loader
+    loader.talents.extend({"Talent_Name": f"Talent {i}", "Effect": rng.choice(["Deal 1d4 extra damage", "Resist fear", "Move 5ft"])} for i in range(args.rows))
+    loader.schools.extend({"Name": f"Power {i}", "Description": rng.choice(["Push 10ft", "Stun target", "Glow softly"])} for i in range(args.rows))
+    skill_names = [s["Skill_Name"] for s in loader.skills]
+    loadouts = [(rng.sample(skill_names, 4), [f"Power {rng.randrange(args.rows)}" for _ in range(4)], [f"Talent {rng.randrange(args.rows)}" for _ in range(3)])
+                for _ in range(args.loadouts)]
+    units = [Unit(*[list(part) for part in rng.choice(loadouts)]) for _ in range(args.units)]
+    calls = args.units * args.hooks
+
+    start = time.perf_counter()
+    for _ in range(args.hooks):
+        for u in units: legacy_attack_effects(u)
+    old = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(args.hooks):
+        for u in units: engine_hooks.entity_profile(u).for_hook("ON_ATTACK")
+    new = time.perf_counter() - start
+
+    print(f"[BENCH] {args.units} units / {args.loadouts} loadouts, {args.hooks} hooks each, {len(loader.talents)} talents, {len(loader.schools)} schools")
+    print(f"  rescan+filter: {old / calls * 1e6:8.2f}us/hook   profiles: {new / calls * 1e6:6.2f}us/hook   ({old / new:.0f}x)")
@@ -0,0 +1,56 @@
+import sys
+import os
+import time
+import argparse
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.ecs import Entity, Position, Vitals, Stats
+from core.combat.mechanics import CombatEngine
+from core.combat.mass_battle import MassBattle
+
+def mass_round(units, size, rounds):
+    """Two lines a few tiles apart; mean ms per round once they are engaged."""
+    b = MassBattle(size, size, seed=1)
+    depth = max(1, units // 2 // size + 1)
+    mid = size // 2
+    b.add_units("North", units // 2, region=(0, mid - depth - 2, size - 1, mid - 3))
+    b.add_units("South", units - units // 2, region=(0, mid + 2, size - 1, mid + depth + 1))
+    start = time.perf_counter()
+    for _ in range(rounds): b.round()
+    return (time.perf_counter() - start) / rounds * 1000, b.counts()
+
+def engine_round(units, size, rounds):
+    """The same clash through CombatEngine.run_ai_turn; only the NPC half acts (heroes wait for a player)."""
+    engine = CombatEngine(cols=size, rows=size, seed=1)
+    roster = []
+    for i in range(units):
+        u = Entity(f"U{i}")
+        u.add_component(Position(i // 2 % size, size // 2 - 3 if i % 2 else size // 2 + 2))
+        u.add_component(Vitals(hp=20, max_hp=20, sp=10, max_sp=10))
+        u.add_component(Stats({"Might": 10, "Reflexes": 10}))
+        if i % 2: u.add_tag("hero")
+        roster.append(u)
+    engine.combatants = roster
+    start = time.perf_counter()
+    for _ in range(rounds):
+        engine.run_ai_turn()
+        engine.end_round()
+    return (time.perf_counter() - start) / rounds * 1000
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="MassBattle round time by army size (vs CombatEngine for small armies).")
+    parser.add_argument("--units", default="500,2000,5000,10000")
+    parser.add_argument("--size", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--engine-units", type=int, default=2000, help="CombatEngine comparison size (0 to skip)")
+    args = parser.parse_args()
+    print(f"[BENCH] {args.size}x{args.size} map, {args.rounds} rounds")
+    for n in args.units.split(","):
+        ms, standing = mass_round(int(n), args.size, args.rounds)
+        print(f"  MassBattle {int(n):6} units: {ms:8.2f}ms/round   standing {standing}")
+    if args.engine_units:
+        mass_ms, _ = mass_round(args.engine_units, args.size, args.rounds)
+        eng_ms = engine_round(args.engine_units, args.size, args.rounds)
+        print(f"  {args.engine_units} units: CombatEngine {eng_ms:8.2f}ms/round   MassBattle {mass_ms:6.2f}ms/round   ({eng_ms / mass_ms:.1f}x)")
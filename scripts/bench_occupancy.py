@@ -0,0 +1,58 @@
+import sys
+import os
+import time
+import random
+import argparse
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.ecs import Entity, Position, Vitals
+from core.combat.mechanics import CombatEngine
+from core.combat.occupancy import burst
+
+def make_unit(name, x, y):
+    e = Entity(name)
+    e.add_component(Position(x, y))
+    e.add_component(Vitals(hp=30, max_hp=30, sp=6, max_sp=6))
+    return e
+
+def scan_at(engine, x, y):
+    """The previous lookup: walk every combatant."""
+    for c in engine.combatants:
+        if c.is_alive() and c.x == x and c.y == y:
+            return c
+    return None
+
+def bench(size, units, queries, seed):
+    print(f"[BENCH] {size}x{size} map, {units} units, {queries} tile lookups + {queries // 10} radius-2 bursts")
+    rng = random.Random(seed)
+    engine = CombatEngine(cols=size, rows=size)
+    spots = rng.sample([(x, y) for x in range(size) for y in range(size)], units)
+    engine.combatants = [make_unit(f"U{i}", x, y) for i, (x, y) in enumerate(spots)]
+    probes = [(rng.randrange(size), rng.randrange(size)) for _ in range(queries)]
+
+    start = time.perf_counter()
+    found = [scan_at(engine, x, y) for x, y in probes]
+    aoe = [[c for t in burst(x, y, 2) for c in [scan_at(engine, *t)] if c] for x, y in probes[:queries // 10]]
+    scan_secs = time.perf_counter() - start
+
+    start = time.perf_counter()
+    found_idx = [engine.unit_at(x, y) for x, y in probes]
+    aoe_idx = [engine.occupancy.in_radius(x, y, 2) for x, y in probes[:queries // 10]]
+    idx_secs = time.perf_counter() - start
+
+    assert found == found_idx
+    assert [{id(c) for c in a} for a in aoe] == [{id(c) for c in a} for a in aoe_idx]
+    print(f"  scan : {scan_secs * 1000:8.1f}ms")
+    print(f"  index: {idx_secs * 1000:8.1f}ms   ({scan_secs / idx_secs:.0f}x)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Who-is-on-this-tile: combatant scan vs occupancy index.")
+    parser.add_argument("--size", type=int, default=64)
+    parser.add_argument("--units", default="50,500")
+    parser.add_argument("--queries", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    for n in args.units.split(","):
+        bench(args.size, int(n), args.queries, args.seed)
@@ -0,0 +1,62 @@
+import sys
+import os
+import time
+import random
+import argparse
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.ecs import Entity, Position, Vitals, Stats
+from core.combat.mechanics import CombatEngine
+from core.combat import odds
+
+def make_unit(name, might, reflexes, hp):
+    u = Entity(name)
+    u.add_component(Position(0, 0))
+    u.add_component(Vitals(hp=hp, max_hp=hp, sp=20, max_sp=20))
+    u.add_component(Stats({"Might": might, "Reflexes": reflexes}))
+    return u
+
+def monte_carlo_scores(attacker, targets, samples, rng):
+    """What an AI without tables would do: sample the attack roll per target."""
+    scores = []
+    might = attacker.get_component(Stats).get("Might")
+    for t in targets:
+        reflexes, dmg = t.get_component(Stats).get("Reflexes"), 0
+        for _ in range(samples):
+            margin = rng.randint(1, 20) + might // 2 - rng.randint(1, 20) - reflexes // 2
+            dmg += min(15, t.hp) if margin >= 10 else min(8, t.hp) if margin > 0 else 0
+        scores.append(dmg / samples)
+    return scores
+
+def bench(targets, decisions, samples, seed):
+    print(f"[BENCH] {decisions} target choices over {targets} candidates (Monte Carlo: {samples} rolls each)")
+    rng = random.Random(seed)
+    engine = CombatEngine(cols=8, rows=8, seed=seed)
+    attacker = make_unit("Attacker", 14, 10, 30)
+    pool = [make_unit(f"T{i}", 10, rng.randint(4, 20), rng.randint(5, 40)) for i in range(targets)]
+
+    start = time.perf_counter()
+    for _ in range(decisions):
+        mc = monte_carlo_scores(attacker, pool, samples, rng)
+    mc_secs = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(decisions):
+        exact, _ = odds.score_targets(engine, attacker, pool)
+    exact_secs = time.perf_counter() - start
+
+    err = max(abs(a - b) for a, b in zip(mc, exact))
+    print(f"  monte carlo: {mc_secs / decisions * 1e6:9.1f}us/choice   (max error vs exact {err:.3f} dmg)")
+    print(f"  tables     : {exact_secs / decisions * 1e6:9.1f}us/choice   ({mc_secs / exact_secs:.0f}x)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="AI target scoring: sampled rolls vs exact odds tables.")
+    parser.add_argument("--targets", default="4,32")
+    parser.add_argument("--decisions", type=int, default=200)
+    parser.add_argument("--samples", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+    for n in args.targets.split(","):
+        bench(int(n), args.decisions, args.samples, args.seed)
@@ -0,0 +1,71 @@
+import sys
+import os
+import time
+import random
+import argparse
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.combat.mechanics import CombatEngine
+from core.combat.pathfinding import NavGrid, astar, jps, path_cost
+
+def make_map(kind, size, rng):
+    """scatter: 10% random walls; corridors: long walls every 20 columns with one gap; terrain: scatter + 15% DIFFICULT."""
+    walls, terrain = set(), {}
+    if kind == "corridors":
+        for x in range(10, size, 20):
+            gap = rng.randrange(size)
+            walls.update((x, y) for y in range(size) if abs(y - gap) > 1)
+        return walls, terrain
+    for y in range(size):
+        for x in range(size):
+            roll = rng.random()
+            if roll < 0.10: walls.add((x, y))
+            elif kind == "terrain" and roll < 0.25: terrain[(x, y)] = "DIFFICULT"
+    return walls, terrain
+
+def endpoints(size, walls, count, rng):
+    pairs = []
+    while len(pairs) < count:
+        a = (rng.randrange(size), rng.randrange(size))
+        b = (rng.randrange(size), rng.randrange(size))
+        if a not in walls and b not in walls: pairs.append((a, b))
+    return pairs
+
+def timed(fn, pairs):
+    start = time.perf_counter()
+    paths = [fn(a, b) for a, b in pairs]
+    return (time.perf_counter() - start) / len(pairs) * 1000, paths
+
+def bench(size, queries, seed):
+    rng = random.Random(seed)
+    for label in ("scatter", "corridors", "terrain"):
+        walls, terrain = make_map(label, size, rng)
+        pairs = endpoints(size, walls, queries, rng)
+        engine = CombatEngine(cols=size, rows=size)
+        engine.walls, engine.terrain = walls, terrain
+        grid = engine.nav
+
+        print(f"[BENCH] {size}x{size} {label} map ({len(walls)} walls, {len(terrain)} difficult), {queries} queries")
+        a_ms, a_paths = timed(lambda a, b: astar(grid, a, b), pairs)
+        print(f"  A*:          {a_ms:9.2f}ms/query")
+        if grid.uniform:
+            j_ms, j_paths = timed(lambda a, b: jps(grid, a, b), pairs)
+            assert [len(p) for p in a_paths] == [len(p) for p in j_paths]
+            print(f"  JPS:         {j_ms:9.2f}ms/query  ({a_ms / j_ms:.1f}x)")
+        else:
+            costs = [path_cost(grid, p) for p in a_paths if p]
+            print(f"  mean path:   {sum(costs) / max(1, len(costs)):9.1f} SP")
+        timed(engine.find_path, pairs)
+        c_ms, _ = timed(engine.find_path, pairs)
+        print(f"  find_path (cached): {c_ms * 1000:6.1f}us/query")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tactical pathfinding: A* vs JPS vs the engine's path cache.")
+    parser.add_argument("--sizes", default="100,500")
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    for size in args.sizes.split(","):
+        bench(int(size), args.queries, args.seed)
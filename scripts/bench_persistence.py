@@ -0,0 +1,148 @@
+import sys
+import os
+import json
+import time
+import sqlite3
+import tempfile
+import argparse
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core import ecs, codec
+from core.database import PersistenceLayer
+from core.ecs import ECSRegistry, Entity, Position, Vitals, Logistics
+
+def make_payload(i):
+    return {
+        "id": f"ent_{i}",
+        "name": f"Entity {i}",
+        "components": {
+            "Position": {"x": i % 100, "y": i // 100, "z": 0},
+            "Vitals": {"hp": 20, "max_hp": 20, "sp": 15, "max_sp": 15, "fp": 10, "max_fp": 10, "cmp": 12, "max_cmp": 12},
+            "Logistics": {"resources": {"Food": 500, "Gold": 100}, "population": 100, "needs": {"Food": 1.0}, "last_tick": 0}
+        },
+        "tags": ["faction", "simulation_active"],
+        "metadata": {}
+    }
+
+def legacy_save_entity(db_path, entity_id, name, data_dict, layer_id=0, location_id=None):
+    """The pre-pooling write path: connect, probe columns, write, commit, close."""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    for ddl in ('ALTER TABLE entities ADD COLUMN layer_id INTEGER DEFAULT 0',
+                'ALTER TABLE entities ADD COLUMN location_id TEXT'):
+        try: cursor.execute(ddl)
+        except sqlite3.OperationalError: pass
+    cursor.execute('''
+        INSERT OR REPLACE INTO entities (id, name, data, layer_id, location_id)
+        VALUES (?, ?, ?, ?, ?)
+    ''', (entity_id, name, json.dumps(data_dict), layer_id, location_id))
+    conn.commit()
+    conn.close()
+
+def bench(count):
+    with tempfile.TemporaryDirectory() as tmp:
+        # Legacy: rollback journal, one connection per save
+        legacy_path = os.path.join(tmp, "legacy.db")
+        conn = sqlite3.connect(legacy_path)
+        conn.execute("CREATE TABLE entities (id TEXT PRIMARY KEY, name TEXT, layer_id INTEGER DEFAULT 0, location_id TEXT, data TEXT)")
+        conn.commit(); conn.close()
+
+        start = time.perf_counter()
+        for i in range(count):
+            legacy_save_entity(legacy_path, f"ent_{i}", f"Entity {i}", make_payload(i))
+        legacy_secs = time.perf_counter() - start
+
+        # Pooled: WAL, one long-lived connection, cached statements
+        db = PersistenceLayer(os.path.join(tmp, "pooled.db"), wal=True)
+        start = time.perf_counter()
+        for i in range(count):
+            db.save_entity(f"ent_{i}", f"Entity {i}", make_payload(i))
+        pooled_secs = time.perf_counter() - start
+        db.close()
+
+    print(f"[BENCH] save_entity x{count}")
+    print(f"  legacy (connect/ALTER/commit/close): {legacy_secs:8.3f}s  {count / legacy_secs:10.0f} saves/s")
+    print(f"  pooled (WAL + cached statements):    {pooled_secs:8.3f}s  {count / pooled_secs:10.0f} saves/s")
+    print(f"  speedup: {legacy_secs / pooled_secs:.1f}x")
+
+def bench_deltas(count, ticks):
+    """Combat-style ticks that touch only Vitals: full-blob vs component-delta flushes."""
+    print(f"[BENCH] {ticks} ticks x {count} entities, one component changed per tick")
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ("full", "delta"):
+            registry = ECSRegistry(os.path.join(tmp, f"{mode}.db"), persist_mode=mode)
+            for i in range(count):
+                e = Entity(f"Entity {i}")
+                e.add_component(Position(i % 100, i // 100)).add_component(Vitals(hp=50, max_hp=50))
+                e.add_component(Logistics(population=100))
+                e.metadata = {"description": "A settlement of middling importance." * 4}
+                registry.add_entity(e)
+            registry.flush()
+            base = registry.bytes_written
+
+            start = time.perf_counter()
+            for t in range(ticks):
+                for e in registry.entities.values():
+                    e.hp = e.hp - 1
+                registry.flush()
+            secs = time.perf_counter() - start
+            written = registry.bytes_written - base
+            print(f"  {mode:5}: {secs:8.3f}s  {written / 1024:10.1f} KiB written")
+            registry.db.close()
+
+def legacy_build(rows):
+    """The pre-registry loader: json.loads per row, default-construct + setattr per field."""
+    entities = []
+    for eid, name, data_json, layer_id, location_id in rows:
+        data = json.loads(data_json)
+        e = Entity(name, uid=eid)
+        e.tags = set(data.get("tags", []))
+        e.metadata = data.get("metadata", {})
+        for c_name, c_vars in data.get("components", {}).items():
+            cls = getattr(ecs, c_name, None)
+            if cls:
+                comp = cls()
+                for k, v in c_vars.items():
+                    setattr(comp, k, v)
+                e.add_component(comp)
+        entities.append(e)
+    return entities
+
+def bench_hydration(count):
+    print(f"[BENCH] decode + construct {count} entities (registration/indexing excluded)")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "hydrate.db")
+        db = PersistenceLayer(path)
+        db.flush_entities([(f"ent_{i}", f"Entity {i}", make_payload(i), 0, None) for i in range(count)])
+        batches = list(db.iter_entity_batches())
+        db.close()
+
+    start = time.perf_counter()
+    for rows in batches:
+        legacy_build(rows)
+    legacy_secs = time.perf_counter() - start
+
+    registry = ECSRegistry(":memory:")
+    stats = registry._new_load_stats()
+    start = time.perf_counter()
+    for rows in batches:
+        registry._load_batch(rows, None, stats)
+    fast_secs = time.perf_counter() - start
+    registry.db.close()
+
+    print(f"  legacy (json.loads + setattr):       {legacy_secs:8.3f}s")
+    print(f"  registry + loads_many ({codec.NAME:6}):    {fast_secs:8.3f}s  ({legacy_secs / fast_secs:.1f}x)")
+    print(f"    decode {stats['decode'] * 1000:8.1f}ms")
+    for c_name, s in stats["components"].items():
+        print(f"    {c_name:10} {s['count']:8}x {s['seconds'] * 1000:8.1f}ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Entity-save throughput: legacy vs pooled PersistenceLayer.")
+    parser.add_argument("--count", type=int, default=2000)
+    parser.add_argument("--ticks", type=int, default=10)
+    args = parser.parse_args()
+    bench(args.count)
+    bench_deltas(args.count, args.ticks)
+    bench_hydration(args.count * 10)
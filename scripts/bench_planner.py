@@ -0,0 +1,49 @@
+import sys
+import os
+import time
+import argparse
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.ecs import Entity, Position, Vitals, Stats
+from core.combat.mechanics import CombatEngine
+
+def make_unit(name, x, y, hp, hero=False, ai=None):
+    u = Entity(name)
+    u.add_component(Position(x, y))
+    u.add_component(Vitals(hp=hp, max_hp=hp, sp=12, max_sp=12))
+    stats = Stats()
+    stats.attrs = {"Might": 12, "Reflexes": 10}
+    u.add_component(stats)
+    if hero: u.add_tag("hero")
+    if ai: u.metadata["AI"] = ai
+    return u
+
+def skirmish(seed, npcs, ai, budget_ms, rounds):
+    """NPCs vs a passive hero: returns (hero HP lost, slowest run_ai_turn in ms)."""
+    engine = CombatEngine(cols=12, rows=12, seed=seed)
+    engine.planner_budget_ms = budget_ms
+    hero = make_unit("Hero", 6, 6, 400, hero=True)
+    engine.combatants = [hero] + [make_unit(f"N{i}", (i * 5) % 12, (i * 7) % 12 if i % 2 else 0, 30, ai=ai) for i in range(npcs)]
+    slowest = 0.0
+    for _ in range(rounds):
+        start = time.perf_counter()
+        engine.run_ai_turn()
+        slowest = max(slowest, time.perf_counter() - start)
+        engine.end_round()
+    return 400 - hero.hp, slowest * 1000
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tactician (MCTS) vs plain NPC turns: damage dealt and end_turn latency.")
+    parser.add_argument("--npcs", type=int, default=4)
+    parser.add_argument("--budgets", default="10,25,50")
+    parser.add_argument("--fights", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=6)
+    args = parser.parse_args()
+    print(f"[BENCH] {args.npcs} NPCs vs a passive hero, {args.rounds} rounds, {args.fights} fights")
+    runs = [skirmish(s, args.npcs, None, 0, args.rounds) for s in range(args.fights)]
+    print(f"  plain NPCs       : {sum(r[0] for r in runs) / len(runs):6.1f} dmg/fight   slowest turn {max(r[1] for r in runs):7.2f}ms")
+    for budget in args.budgets.split(","):
+        runs = [skirmish(s, args.npcs, "Tactician", int(budget), args.rounds) for s in range(args.fights)]
+        print(f"  tacticians {int(budget):3}ms: {sum(r[0] for r in runs) / len(runs):6.1f} dmg/fight   slowest turn {max(r[1] for r in runs):7.2f}ms")
@@ -0,0 +1,55 @@
+import sys
+import os
+import time
+import argparse
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.ecs import Entity, Position, Vitals
+from core.combat.mechanics import CombatEngine
+
+def make_unit(name, traits):
+    u = Entity(name)
+    u.add_component(Position(1, 1))
+    u.add_component(Vitals(hp=10**9, max_hp=10**9))
+    u.metadata["Traits"] = traits
+    return u
+
+def substring_scan(engine, target, trigger):
+    """The per-call cost of the previous handle_reactions(): lowercase + three substring tests per trait."""
+    hits = 0
+    for name in target.metadata.get("Traits", {}):
+        if "danger sense" in name.lower() and trigger == "BEFORE_ATTACK": hits += 1
+        if ("thorns" in name.lower() or "spines" in name.lower()) and trigger == "POST_DAMAGE": hits += 1
+        if "reactive camo" in name.lower() and trigger == "BEFORE_ATTACK": hits += 1
+    return hits
+
+def bench(traits, calls):
+    engine = CombatEngine(cols=4, rows=4)
+    names = {f"Mutation {i}": "..." for i in range(traits - 1)}
+    names["Danger Sense"] = "..."
+    source, target = make_unit("S", {}), make_unit("T", names)
+
+    start = time.perf_counter()
+    for _ in range(calls):
+        substring_scan(engine, target, "BEFORE_ATTACK")
+        substring_scan(engine, target, "POST_DAMAGE")
+    scan_secs = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(calls):
+        engine.handle_reactions(source, target, "BEFORE_ATTACK", {})
+        engine.handle_reactions(source, target, "POST_DAMAGE", {})
+    table_secs = time.perf_counter() - start
+    print(f"  {traits:4} traits: scan {scan_secs / calls * 1e6:7.2f}us/attack   "
+          f"dispatch {table_secs / calls * 1e6:6.2f}us/attack   ({scan_secs / table_secs:.1f}x)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-attack trait reaction cost: substring scan vs compiled dispatch.")
+    parser.add_argument("--traits", default="1,6,20,100")
+    parser.add_argument("--calls", type=int, default=20000)
+    args = parser.parse_args()
+    print(f"[BENCH] BEFORE_ATTACK + POST_DAMAGE reactions, {args.calls} attacks")
+    for n in args.traits.split(","):
+        bench(int(n), args.calls)
@@ -0,0 +1,59 @@
+import sys
+import os
+import time
+import random
+import tempfile
+import argparse
+import contextlib
+import io
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.ecs import Entity, Position, Vitals
+from core.database import PersistenceLayer
+from core.combat.mechanics import CombatEngine
+from core.combat.sessions import CombatSessionManager
+
+def make_engine(units, size, seed):
+    engine = CombatEngine(cols=size, rows=size, seed=seed)
+    roster = []
+    for i in range(units):
+        u = Entity(f"U{i}")
+        u.add_component(Position(i % size, i // size))
+        u.add_component(Vitals(hp=30, max_hp=30, sp=30, max_sp=30))
+        roster.append(u)
+    engine.combatants = roster
+    engine.start_recording()
+    return engine
+
+def bench(sessions_n, max_live, units, size, requests):
+    store = PersistenceLayer(os.path.join(tempfile.mkdtemp(), "sessions.db"))
+    sessions = CombatSessionManager(store, max_live=max_live)
+    with contextlib.redirect_stdout(io.StringIO()): # Quiet the [SESSIONS] evict/restore lines
+        for s in range(sessions_n):
+            sessions.create(f"table{s}", make_engine(units, size, s))
+        rng = random.Random(0)
+        start = time.perf_counter()
+        for _ in range(requests):
+            with sessions.use(f"table{rng.randrange(sessions_n)}") as engine:
+                a, b = engine.combatants[0], engine.combatants[1]
+                engine.attack_target(a, b)
+        secs = time.perf_counter() - start
+    stats = sessions.stats()
+    print(f"  {sessions_n:4} tables, {max_live:3} live: {secs / requests * 1e3:6.2f}ms/request   "
+          f"loads {stats['loads']:5}   live {stats['live_bytes'] // 1024:6} KB   "
+          f"(~{stats['live_bytes'] // max(1, len(stats['live'])) // 1024} KB/table)")
+    store.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Request latency across many combat sessions with LRU eviction to SQLite.")
+    parser.add_argument("--sessions", type=int, default=64)
+    parser.add_argument("--live", default="64,16,4")
+    parser.add_argument("--units", type=int, default=12)
+    parser.add_argument("--size", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    print(f"[BENCH] {args.requests} random-table attacks, {args.units} units on {args.size}x{args.size}")
+    for live in args.live.split(","):
+        bench(args.sessions, int(live), args.units, args.size, args.requests)
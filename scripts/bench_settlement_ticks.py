@@ -0,0 +1,62 @@
+import sys
+import os
+import time
+import argparse
+import contextlib
+import io
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.ecs import ECSRegistry, Entity, Demographics, Economy, Logistics
+from core.definition_registry import DefinitionRegistry
+from core.models.definitions import SpeciesDefinition
+from core.systems.settlement import SettlementSystem
+from core.world.sim_manager import SimulationManager
+
+def populate(registry, count):
+    for i in range(count):
+        e = Entity(f"Town {i}", uid=f"town_{i}")
+        e.add_component(Demographics(pop_total=100 + i % 900))
+        e.add_component(Economy(wealth=500, primary_export=("Wood", "Iron")[i % 2]))
+        e.add_component(Logistics(resources={"food": (i % 7) * 300, "Food": 1000 + i % 500}, population=100 + i % 900))
+        e.metadata["species_id"] = ("human", "orc")[i % 2]
+        registry.add_entity(e)
+    registry._dirty.clear() # Benchmark measures the ticks, not persistence
+
+def bench(count, ticks, definitions):
+    print(f"[BENCH] {count} settlements, {ticks} ticks (growth + economy passes, logistics tick)")
+    results = {}
+    for mode in ("objects", "columnar"):
+        registry = ECSRegistry(":memory:", columnar=(mode == "columnar"))
+        populate(registry, count)
+        system, sim = SettlementSystem(registry, definitions), SimulationManager({})
+        grow, economy = (system.grow_columnar, system.economy_columnar) if mode == "columnar" else (system.grow, system.economy)
+
+        start = time.perf_counter()
+        for _ in range(ticks):
+            grow(); economy()
+        settle = (time.perf_counter() - start) / ticks
+
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()): # FAMINE alerts
+            for _ in range(ticks):
+                sim.narrative_hours += 1
+                sim.batch_logistic_tick(1, registry)
+        logistic = (time.perf_counter() - start) / ticks
+        results[mode] = (settle, logistic)
+        print(f"  {mode:8}: settlement {settle * 1000:8.2f}ms/tick   logistics {logistic * 1000:8.2f}ms/tick")
+        registry.db.close()
+    (s0, l0), (s1, l1) = results["objects"], results["columnar"]
+    print(f"  speedup: settlement {s0 / s1:.1f}x, logistics {l0 / l1:.1f}x")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Settlement and logistics ticks: per-entity adapters vs ColumnBatch columns.")
+    parser.add_argument("--sizes", default="10000,50000")
+    parser.add_argument("--ticks", type=int, default=5)
+    args = parser.parse_args()
+    definitions = DefinitionRegistry("unused")
+    definitions.species = {"human": SpeciesDefinition(id="human", name="Human", resource_needs={"food": 1.0}),
+                           "orc": SpeciesDefinition(id="orc", name="Orc", growth_rate=0.1, resource_needs={"food": 2.0})}
+    for size in args.sizes.split(","):
+        bench(int(size), args.ticks, definitions)
@@ -0,0 +1,68 @@
+import sys
+import os
+import time
+import random
+import argparse
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.combat.mechanics import CombatEngine
+
+def legacy_has_los(walls, x1, y1, x2, y2):
+    """The previous CombatEngine.has_los: walk an interpolated line per check."""
+    dx, dy = x2 - x1, y2 - y1
+    steps = max(abs(dx), abs(dy))
+    for i in range(1, steps):
+        if (int(x1 + dx * i / steps), int(y1 + dy * i / steps)) in walls:
+            return False
+    return True
+
+def bench(size, units, checks, seed):
+    rng = random.Random(seed)
+    engine = CombatEngine(cols=size, rows=size)
+    engine.walls = {(rng.randrange(size), rng.randrange(size)) for _ in range(size * size // 10)}
+    floors = [(x, y) for x in range(size) for y in range(size) if (x, y) not in engine.walls]
+    spots = rng.sample(floors, units)
+    # A turn's worth of queries: every unit checks random other units, repeatedly
+    pairs = [(rng.choice(spots), rng.choice(spots)) for _ in range(checks)]
+    print(f"[BENCH] {size}x{size} map, {units} units, {checks} LOS checks per turn")
+
+    start = time.perf_counter()
+    legacy = [legacy_has_los(engine.walls, a[0], a[1], b[0], b[1]) for a, b in pairs]
+    legacy_secs = time.perf_counter() - start
+
+    start = time.perf_counter()
+    cold = [engine.has_los(a[0], a[1], b[0], b[1]) for a, b in pairs]
+    cold_secs = time.perf_counter() - start
+    start = time.perf_counter()
+    [engine.has_los(a[0], a[1], b[0], b[1]) for a, b in pairs]
+    warm_secs = time.perf_counter() - start
+
+    # One wall smashed mid-turn: only the FOVs that examined it are recomputed
+    tile = next(w for w in engine.walls if 0 < w[0] < size - 1)
+    dropped = (engine.set_wall(*tile, blocking=False), engine.visibility.stats["dropped"])[1]
+    start = time.perf_counter()
+    [engine.has_los(a[0], a[1], b[0], b[1]) for a, b in pairs]
+    patched_secs = time.perf_counter() - start
+
+    start = time.perf_counter()
+    fog = engine.visibility.grid(spots[: units // 2])
+    fog_secs = time.perf_counter() - start
+
+    disagree = sum(1 for a, b in zip(legacy, cold) if a != b)
+    print(f"  interpolated line: {legacy_secs * 1000:9.2f}ms  ({disagree} of {checks} verdicts differ; the old line test is asymmetric)")
+    print(f"  shadowcast, cold:  {cold_secs * 1000:9.2f}ms  ({units} FOVs)")
+    print(f"  shadowcast, warm:  {warm_secs * 1000:9.2f}ms  ({legacy_secs / warm_secs:.1f}x)")
+    print(f"  after smash:       {patched_secs * 1000:9.2f}ms  ({dropped} of {units} FOVs recomputed)")
+    print(f"  team fog grid:     {fog_secs * 1000:9.2f}ms  ({sum(map(sum, fog))} tiles visible)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="LOS: interpolated line walk vs cached symmetric shadowcasting.")
+    parser.add_argument("--sizes", default="30,100")
+    parser.add_argument("--units", type=int, default=40)
+    parser.add_argument("--checks", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=9)
+    args = parser.parse_args()
+    for size in args.sizes.split(","):
+        bench(int(size), args.units, args.checks, args.seed)
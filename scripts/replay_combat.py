@@ -0,0 +1,34 @@
+import sys
+import os
+import glob
+import time
+import argparse
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.combat.replay import replay
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless replay of recorded encounters; reports the first divergent action.")
+    parser.add_argument("paths", nargs="+", help="Replay files (.jsonl / .jsonl.gz) or directories of them")
+    parser.add_argument("--no-verify", action="store_true", help="Skip per-action state hash checks")
+    args = parser.parse_args()
+
+    files = []
+    for path in args.paths:
+        files.extend(sorted(glob.glob(os.path.join(path, "*.jsonl*"))) if os.path.isdir(path) else [path])
+
+    actions = diverged = 0
+    start = time.perf_counter()
+    for path in files:
+        engine, report = replay(path, verify=not args.no_verify)
+        actions += report["actions"]
+        if report["diverged_at"] is not None:
+            diverged += 1
+            print(f"[REPLAY] {path}: DIVERGED at action {report['diverged_at']} "
+                  f"(expected {report['expected']}, got {report['got']})")
+    secs = time.perf_counter() - start
+    print(f"[REPLAY] {len(files)} encounters, {actions} actions in {secs:.2f}s "
+          f"({actions / secs if secs else 0:.0f} actions/s), {diverged} diverged")
+    sys.exit(1 if diverged else 0)
@@ -0,0 +1,43 @@
+import sys
+import os
+import json
+import argparse
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.combat.batch_sim import run_batch
+
+def print_report(report):
+    print(f"[SIM] {' + '.join(report['team_a'])}  vs  {' + '.join(report['team_b'])}")
+    print(f"  {report['fights']} fights on {report['workers']} workers in {report['seconds']}s ({report['fights_per_sec']} fights/s)")
+    print(f"  win rate  A {report['win_rate']['A']:.1%}   B {report['win_rate']['B']:.1%}   draw {report['draw_rate']:.1%}")
+    r = report["rounds"]
+    print(f"  rounds    mean {r['mean']}  p50 {r['p50']}  p90 {r['p90']}  max {r['max']}")
+    for t, side in report["teams"].items():
+        d = side["damage_per_fight"]
+        print(f"  team {t}    dmg/fight mean {d['mean']}  p50 {d['p50']}  p90 {d['p90']}   "
+              f"hit {side['hit_rate']:.1%}  crit {side['crit_rate']:.1%}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless seeded AI-vs-AI fights for balance tuning.",
+                                     epilog="Unit specs: save:<name>, enemy:<RANK>/<ROLE>/<OFFENSE>/<DEFENSE>/<TACTIC> "
+                                            "('?' or omitted = rolled), spawner:<name>; append *N for N copies.")
+    parser.add_argument("--a", nargs="+", default=["save:Burt"], help="Team A unit specs")
+    parser.add_argument("--b", nargs="+", default=["enemy:FODDER*2"], help="Team B unit specs")
+    parser.add_argument("--fights", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size (default: CPU count; 1 = inline)")
+    parser.add_argument("--size", type=int, default=12, help="Square map size")
+    parser.add_argument("--max-rounds", type=int, default=50)
+    parser.add_argument("--builder", default=None, help="Alternate Enemy_Builder.json to test")
+    parser.add_argument("--record", default=None, metavar="DIR", help="Write every fight's replay to DIR (see scripts/replay_combat.py)")
+    parser.add_argument("--json", action="store_true", help="Print the raw report as JSON")
+    args = parser.parse_args()
+
+    kwargs = {"cols": args.size, "rows": args.size, "max_rounds": args.max_rounds}
+    if args.builder: kwargs["builder"] = os.path.abspath(args.builder)
+    report = run_batch(args.a, args.b, fights=args.fights, seed=args.seed, workers=args.workers,
+                       record_dir=args.record, **kwargs)
+    print(json.dumps(report, indent=2) if args.json else "", end="")
+    if not args.json: print_report(report)
@@ -0,0 +1,71 @@
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.abilities.data_loader import DataLoader
+from core.abilities.catalog import AbilityCatalog, DEFAULT_RANGE
+from core.abilities import engine_hooks
+from core.combat import ai_engine
+
+class Caster:
+    def __init__(self, powers, fp=0, sp=0):
+        self.powers, self.fp, self.sp = powers, fp, sp
+
+def legacy_lookup(loader, name):
+    for t in loader.talents:
+        if t.get("Talent_Name", "").lower() == name.lower(): return t
+    for s in loader.schools:
+        if s.get("Name", "").lower() == name.lower(): return s
+    for sk in loader.skills:
+        if sk.get("Skill_Name", "").lower() == name.lower(): return sk
+    return None
+
+def test_catalog():
+    print("--- Testing Ability Catalog ---")
+    loader = DataLoader()
+    loader.schools.extend([
+        {"Name": "Fire Bolt", "Type": "Offense", "Range": "30 ft", "Description": "Hurl flame. Cost: 2 FP"},
+        {"Name": "Crush", "Type": "Offense", "Range": "Melee", "Cost": 3, "Resource": "SP"},
+        {"Name": "Ward", "Type": "Defense", "Tier": 2},
+    ])
+    loader.talents.append({"Talent_Name": "fire bolt", "Type": "Utility"})
+    catalog = AbilityCatalog(loader)
+
+    # 1. Same answers as the old linear scan, in any case
+    for name in ["Fire Bolt", "FIRE BOLT", "crush", "Ward", "nope"] + [s["Skill_Name"].upper() for s in loader.skills]:
+        assert catalog.data(name) is legacy_lookup(loader, name), name
+    print("PASS: Lookups match linear scan")
+
+    # 2. Precomputed fields
+    bolt, crush, ward = catalog.index["fire bolt"], catalog.get("Crush"), catalog.get("ward")
+    assert bolt.kind == "talent" and not bolt.offensive # Talents shadow schools, as before
+    assert (crush.offensive, crush.range, crush.cost, crush.resource) == (True, 1, 3, "SP")
+    assert (ward.offensive, ward.range, ward.cost) == (False, 3, 2)
+    loader.talents.clear()
+    assert catalog.get("fire bolt").kind == "school" and catalog.stats["builds"] == 2
+    bolt = catalog.get("fire bolt")
+    assert (bolt.range, bolt.cost, bolt.resource) == (6, 2, "FP")
+    assert catalog.get(loader.skills[0]["Skill_Name"]).range == DEFAULT_RANGE
+    print("PASS: Compiled fields")
+
+    # 3. Usable offensive powers follow resource changes, and only those
+    mage = Caster(["Ward", "Fire Bolt", "Crush"], fp=2, sp=1)
+    assert [i.name for i in catalog.usable_offense(mage)] == ["Fire Bolt"]
+    assert [i.name for i in catalog.usable_offense(mage)] == ["Fire Bolt"] and catalog.stats["hits"] == 1
+    mage.sp = 5
+    assert [i.name for i in catalog.usable_offense(mage)] == ["Fire Bolt", "Crush"]
+    mage.fp = 0
+    assert [i.name for i in catalog.usable_offense(mage)] == ["Crush"]
+    mage.powers = ["Ward"]
+    assert catalog.usable_offense(mage) == []
+    print("PASS: Usable offense cache")
+
+    # 4. The AI reads the shared catalog
+    assert ai_engine._ability_catalog() is engine_hooks.catalog
+    assert engine_hooks.get_ability_data("definitely not an ability") is None
+    print("ALL TESTS PASSED")
+
+if __name__ == "__main__":
+    test_catalog()
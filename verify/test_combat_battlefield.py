@@ -0,0 +1,83 @@
+import sys
+import os
+import random
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.ecs import Entity, Position, Vitals
+from core.combat.mechanics import CombatEngine
+from core.combat.ai_engine import AIDecisionEngine
+from core.combat.battlefield import summary_for, CLUSTER_RADIUS, THREAT_RADIUS
+
+def make_unit(name, x, y, hero=False):
+    u = Entity(name)
+    u.add_component(Position(x, y))
+    u.add_component(Vitals(hp=20, max_hp=20, sp=10, max_sp=10))
+    if hero: u.add_tag("hero")
+    return u
+
+def brute_clusters(engine, team):
+    members = [c for c in engine.combatants if c.is_alive() and engine.team_of(c) == team]
+    counts = {}
+    for e in members:
+        n = sum(1 for o in members if max(abs(e.x - o.x), abs(e.y - o.y)) <= CLUSTER_RADIUS)
+        if n > 1: counts[e.id] = n
+    return counts
+
+def brute_threat(engine, team, x, y):
+    return sum(max(0, THREAT_RADIUS + 1 - max(abs(c.x - x), abs(c.y - y)))
+               for c in engine.combatants if c.is_alive() and engine.team_of(c) != team)
+
+def check(engine, ai):
+    hero = next(c for c in engine.combatants if "hero" in c.tags and c.is_alive())
+    ctx = ai.analyze_battlefield(hero, engine)
+    summary = ctx["summary"]
+    foes = [c for c in engine.combatants if c.is_alive() and engine.team_of(c) == "Enemy"]
+    assert [e["obj"] for e in ctx["enemies"]] == sorted(foes, key=lambda c: (max(abs(c.x - hero.x), abs(c.y - hero.y)), c.hp / c.max_hp))
+    assert {c["center"].id: c["count"] for c in ctx["clusters"]} == brute_clusters(engine, "Enemy")
+    assert [c["count"] for c in ctx["clusters"]] == sorted((c["count"] for c in ctx["clusters"]), reverse=True)
+    for x, y in [(0, 0), (5, 7), (hero.x, hero.y), (19, 19)]:
+        assert summary.threat_at("Player", x, y) == brute_threat(engine, "Player", x, y)
+    hps = [summary.hp_pct(c) for c in summary.targets("Enemy")]
+    assert hps == sorted(hps)
+
+def test_battlefield():
+    print("--- Testing Shared Battlefield Summary ---")
+    rng = random.Random(4)
+    engine = CombatEngine(cols=20, rows=20)
+    units = [make_unit("Hero", 10, 10, hero=True), make_unit("Ally", 11, 10, hero=True)]
+    tiles = rng.sample([(x, y) for x in range(20) for y in range(20) if (x, y) not in ((10, 10), (11, 10))], 48)
+    units += [make_unit(f"Orc{i}", x, y) for i, (x, y) in enumerate(tiles)]
+    engine.combatants = units
+    ai = AIDecisionEngine()
+
+    # 1. Clusters, target order and threat agree with a brute-force scan
+    check(engine, ai)
+    print("PASS: Summary matches full scan")
+
+    # 2. Moves, damage, deaths and spawns are picked up incrementally
+    summary = engine.battlefield
+    for step in range(300):
+        u = rng.choice(units[2:])
+        if rng.random() < 0.7:
+            engine.move_char(u, max(0, min(19, u.x + rng.choice((-1, 0, 1)))), max(0, min(19, u.y + rng.choice((-1, 0, 1)))))
+        else:
+            u.take_damage(rng.randint(1, 8))
+        if step % 50 == 0:
+            engine.combatants.append(make_unit(f"Late{step}", rng.randrange(20), rng.randrange(20)))
+        check(engine, ai)
+    assert summary_for(engine) is summary # One summary for the whole fight
+    print("PASS: Incremental updates")
+
+    # 3. A single action costs a single record update
+    before = summary.stats["updates"]
+    orc = next(c for c in units[2:] if c.is_alive())
+    orc.take_damage(1)
+    assert summary.sync() == 1 and summary.stats["updates"] == before + 1
+    assert summary.sync() == 0
+    print("PASS: Unchanged units are skipped")
+    print("ALL TESTS PASSED")
+
+if __name__ == "__main__":
+    test_battlefield()
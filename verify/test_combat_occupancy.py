@@ -0,0 +1,62 @@
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.ecs import Entity, Position, Vitals
+from core.combat.mechanics import CombatEngine
+from core.combat.occupancy import burst, cone, line
+
+def make_unit(name, x, y, hp=10):
+    u = Entity(name)
+    u.add_component(Position(x, y))
+    u.add_component(Vitals(hp=hp, max_hp=10, sp=10, max_sp=10))
+    return u
+
+def test_occupancy():
+    print("--- Testing Occupancy Index ---")
+    # 1. Spawns through the roster and engine moves keep the index current
+    engine = CombatEngine(cols=10, rows=10)
+    a, b = make_unit("A", 1, 1), make_unit("B", 3, 1)
+    engine.combatants = [a]
+    engine.combatants.append(b)
+    assert engine.unit_at(1, 1) is a and engine.unit_at(3, 1) is b
+    ok, _ = engine.move_char(a, 2, 1)
+    assert ok and engine.unit_at(1, 1) is None and engine.unit_at(2, 1) is a
+    ok, msg = engine.move_char(a, 3, 1)
+    assert not ok and msg == "Tile occupied."
+    engine.combatants.remove(b)
+    assert engine.unit_at(3, 1) is None
+    print("PASS: Spawn / move / remove")
+
+    # 2. Deaths free the tile; direct coordinate writes are picked up by sync()
+    engine.combatants.append(b)
+    b.take_damage(10)
+    assert engine.unit_at(3, 1) is None and engine.occupancy.blocked_tiles() == {(2, 1)}
+    a.x = 7
+    assert engine.occupancy.sync(engine.combatants) == 1
+    assert engine.unit_at(7, 1) is a and engine.unit_at(2, 1) is None
+    b.hp = 5 # Revived
+    engine.occupancy.sync(engine.combatants)
+    assert engine.unit_at(3, 1) is b
+    print("PASS: Deaths and external moves")
+
+    # 3. Neighbour and AoE queries agree with a brute-force scan
+    engine = CombatEngine(cols=20, rows=20)
+    engine.combatants = [make_unit(f"U{i}", (i * 7) % 20, (i * 3) % 20) for i in range(60)]
+    def scan(tiles):
+        return {id(c) for c in engine.combatants if (c.x, c.y) in set(tiles)}
+    occ = engine.occupancy
+    assert {id(c) for c in occ.in_radius(10, 10, 3)} == scan(burst(10, 10, 3))
+    assert {id(c) for c in occ.in_rect(0, 0, 19, 19)} == scan(burst(10, 10, 10))
+    assert {id(c) for c in occ.in_tiles(cone(5, 5, 1, 0, 4))} == scan(cone(5, 5, 1, 0, 4))
+    assert len(cone(5, 5, 1, 1, 3)) == 3 + 5 + 7
+    assert line(0, 0, 4, 2)[-1] == (4, 2) and len(line(0, 0, 4, 2)) == 4
+    u = engine.combatants[0]
+    assert u not in occ.neighbors(u) and all(max(abs(n.x - u.x), abs(n.y - u.y)) <= 1 for n in occ.neighbors(u))
+    print("PASS: Neighbour / AoE queries")
+    print("ALL TESTS PASSED")
+
+if __name__ == "__main__":
+    test_occupancy()
@@ -0,0 +1,79 @@
+import sys
+import os
+import itertools
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.ecs import Entity, Position, Vitals, Stats
+from core.combat.mechanics import CombatEngine
+from core.combat import odds
+
+class ScriptedDice:
+    """Stands in for engine.rng: replays a fixed list of d20 results."""
+    def __init__(self, rolls): self.rolls = iter(rolls)
+    def randint(self, a, b): return next(self.rolls)
+    def random(self): return 0.99
+
+def make_unit(name, might, reflexes, hp=30, **metadata):
+    u = Entity(name)
+    u.add_component(Position(0, 0))
+    u.add_component(Vitals(hp=hp, max_hp=hp, sp=50, max_sp=50))
+    u.add_component(Stats({"Might": might, "Reflexes": reflexes}))
+    u.metadata.update(metadata)
+    return u
+
+def enumerate_outcomes(engine, attacker, target, skill=None):
+    """Runs attack_target over all 400 dice pairs; returns (miss, hit, crit) frequencies."""
+    counts = {"miss": 0, "hit": 0, "crit": 0}
+    for a, d in itertools.product(range(1, 21), repeat=2):
+        engine.rng = ScriptedDice([a, d])
+        engine.reactions_used.clear()
+        hp, attacker.sp = target.hp, 50
+        logs, _ = engine.attack_target(attacker, target, skill_used=skill)
+        counts["crit" if any(l.startswith("CRITICAL") for l in logs) else "hit" if target.hp < hp else "miss"] += 1
+        target.hp = hp
+    return counts["miss"] / 400, counts["hit"] / 400, counts["crit"] / 400
+
+def test_attack_odds():
+    print("--- Testing Attack Odds Tables ---")
+    engine = CombatEngine(cols=4, rows=4)
+    engine.rank_scaling = True # ArmorBonus/DamageMult count, as in batch_sim
+    # 1. Tables match an exhaustive run of attack_target for assorted stat pairs and bonuses
+    for might, reflexes, skill, traits in ((10, 10, None, {}), (18, 6, "Lunge", {}), (4, 20, None, {}),
+                                           (14, 12, None, {"Danger Sense": 1})):
+        attacker = make_unit("A", might, 10)
+        target = make_unit("T", 10, reflexes, Traits=traits, ArmorBonus=1)
+        expected = enumerate_outcomes(engine, attacker, target, skill)
+        engine.reactions_used.clear()
+        p = engine.attack_odds(attacker, target, skill)
+        assert (round(expected[0], 4), round(expected[1], 4), round(expected[2], 4)) == (p["miss"], p["hit"], p["crit"]), (might, reflexes, expected, p)
+    print("PASS: Exact against all 400 dice pairs")
+
+    # 2. Stat tables cover every pair and agree with odds()
+    hit, crit = odds.stat_table(skill=True)
+    assert len(hit) == odds.STAT_MAX + 1
+    assert abs(float(hit[16][9]) - odds.odds(16, 9, skill=True)[1]) < 1e-12
+    assert abs(float(crit[30][0]) - odds.odds(30, 0, skill=True)[2]) < 1e-12
+    print("PASS: Stat-pair tables")
+
+    # 3. Damage, kill chance, spent reactions, SP and the target picker
+    brute = make_unit("Brute", 16, 10, DamageMult=2.0)
+    weak, tough = make_unit("Weak", 10, 10, hp=10), make_unit("Tough", 10, 10, hp=40)
+    p = engine.attack_odds(brute, weak)
+    assert p["damage"] == {"hit": 16, "crit": 30} and p["kill"] == round(p["hit"] + p["crit"], 4)
+    assert engine.best_target(brute, [tough, weak]) is weak
+    guard = make_unit("Guard", 10, 10, Traits={"Danger Sense": 1})
+    fresh = engine.attack_odds(brute, guard)["hit"] + engine.attack_odds(brute, guard)["crit"]
+    engine.reactions_used.add(f"{guard.id}_dangersense_{engine.round_count}")
+    spent = engine.attack_odds(brute, guard)
+    assert spent["hit"] + spent["crit"] > fresh
+    live = CombatEngine(cols=4, rows=4) # Live fights ignore Enemy_Builder scaling
+    assert live.attack_odds(brute, weak)["damage"] == {"hit": 8, "crit": 15}
+    brute.sp = 1
+    assert not engine.attack_odds(brute, weak)["can_attack"] and engine.attack_odds(brute, weak)["expected_damage"] == 0
+    print("PASS: Damage / kill / reactions / SP")
+    print("ALL TESTS PASSED")
+
+if __name__ == "__main__":
+    test_attack_odds()
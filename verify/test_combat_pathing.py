@@ -0,0 +1,104 @@
+import sys
+import os
+import random
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.ecs import Entity, Position, Vitals
+from core.combat.mechanics import CombatEngine
+from core.combat.pathfinding import NavGrid, FlowField, astar, jps, path_cost
+
+def test_pathfinding():
+    print("--- Testing Tactical Pathfinding ---")
+    # 1. Routes around a wall instead of stopping at it
+    engine = CombatEngine(cols=10, rows=10)
+    engine.walls = {(5, y) for y in range(9)}
+    path = engine.find_path((0, 0), (9, 0))
+    assert path[-1] == (9, 0) and (5, 9) in path
+    assert all(p not in engine.walls for p in path)
+    print("PASS: Path around wall")
+
+    # 2. Terrain costs: a 3-tile bush band is cheaper to skirt than to cross
+    engine = CombatEngine(cols=10, rows=10)
+    engine.terrain = {(x, y): "DIFFICULT" for x in range(3, 6) for y in range(0, 3)}
+    path = engine.find_path((0, 0), (9, 0))
+    assert path_cost(engine.nav, path) == 9
+    assert not any(engine.terrain.get(p) == "DIFFICULT" for p in path)
+    print("PASS: DIFFICULT terrain avoided when cheaper")
+
+    # 3. Cache keyed by map version; smashing a wall invalidates it
+    engine = CombatEngine(cols=10, rows=10)
+    engine.walls = {(5, y) for y in range(10)}
+    assert engine.find_path((0, 5), (9, 5)) == []
+    assert engine.find_path((0, 5), (9, 5), partial=True)[-1][0] == 4 # Next to the wall
+    version = engine.map_version
+    engine.walls.remove((5, 5))
+    engine.invalidate_paths()
+    assert engine.map_version == version + 1
+    assert len(engine.find_path((0, 5), (9, 5))) == 9
+    print("PASS: Cache invalidated on map change")
+
+    # 4. JPS matches A* path lengths on random open maps
+    rng = random.Random(11)
+    for _ in range(300):
+        cols, rows = rng.randint(2, 30), rng.randint(2, 30)
+        walls = {(x, y) for x in range(cols) for y in range(rows) if rng.random() < 0.3}
+        grid = NavGrid(cols, rows, walls)
+        a = (rng.randrange(cols), rng.randrange(rows))
+        b = (rng.randrange(cols), rng.randrange(rows))
+        if a in walls: continue
+        assert len(jps(grid, a, b)) == len(astar(grid, a, b))
+    print("PASS: JPS agrees with A*")
+    print("ALL TESTS PASSED")
+
+def make_unit(name, x, y):
+    e = Entity(name)
+    e.add_component(Position(x, y))
+    e.add_component(Vitals(hp=30, max_hp=30, sp=4, max_sp=4))
+    return e
+
+def test_flow_field():
+    print("--- Testing Flow Fields ---")
+    # 1. Field distances equal the cheapest A* cost from every tile
+    rng = random.Random(5)
+    walls = {(x, y) for x in range(20) for y in range(20) if rng.random() < 0.2} - {(10, 10)}
+    terrain = {(x, y): "DIFFICULT" for x in range(20) for y in range(20) if rng.random() < 0.2}
+    grid = NavGrid(20, 20, walls, terrain)
+    field = FlowField(grid, [(10, 10)])
+    for x, y in [(0, 0), (19, 19), (3, 15), (17, 2)]:
+        if (x, y) in walls: continue
+        path = astar(grid, (x, y), (10, 10))
+        assert field.distance(x, y) == (path_cost(grid, path) if path else None)
+    print("PASS: Field matches A* costs")
+
+    # 2. Descending the field never enters an occupied tile
+    grid = NavGrid(10, 10)
+    field = FlowField(grid, [(9, 0)])
+    assert field.next_step(0, 0) == (1, 0)
+    assert field.next_step(0, 0, occupied={(1, 0)}) == (1, 1)
+    assert field.next_step(9, 0) is None
+    print("PASS: Occupancy-aware descent")
+
+    # 3. run_ai_turn routes a pack around a wall without stacking
+    engine = CombatEngine(cols=12, rows=12)
+    engine.walls = {(6, y) for y in range(10)}
+    hero = make_unit("Hero", 10, 1)
+    hero.add_tag("hero")
+    goblins = [make_unit(f"Goblin {i}", 1, i) for i in range(4)]
+    engine.combatants = [hero] + goblins
+    field = engine.flow_field([(hero.x, hero.y)])
+    before = [field.distance(g.x, g.y) for g in goblins]
+    for _ in range(3):
+        engine.run_ai_turn()
+    spots = [(g.x, g.y) for g in goblins]
+    assert len(set(spots)) == len(spots) and not set(spots) & engine.walls
+    assert all(field.distance(g.x, g.y) < d for g, d in zip(goblins, before))
+    assert any(g.x > 6 for g in goblins) # Around the wall through the gap at y >= 10
+    assert engine.flow_field([(hero.x, hero.y)]) is field # Reused, not rebuilt
+    print("PASS: Pack shares one field")
+    print("ALL TESTS PASSED")
+
+if __name__ == "__main__":
+    test_pathfinding()
+    test_flow_field()
@@ -0,0 +1,82 @@
+import sys
+import os
+import time
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.ecs import Entity, Position, Vitals, Stats
+from core.combat.mechanics import CombatEngine
+from core.combat.replay import replay
+from core.combat import planner, odds
+
+def make_unit(name, x, y, hp=30, hero=False, ai=None):
+    u = Entity(name, uid=name.lower())
+    u.add_component(Position(x, y))
+    u.add_component(Vitals(hp=hp, max_hp=30, sp=12, max_sp=12))
+    stats = Stats()
+    stats.attrs = {"Might": 12, "Reflexes": 10}
+    u.add_component(stats)
+    if hero: u.add_tag("hero")
+    if ai: u.metadata["AI"] = ai
+    return u
+
+def test_planner():
+    print("--- Testing Monte Carlo Tactical Planner ---")
+    # 1. Simulated attacks follow attack_target()'s exact odds
+    engine = CombatEngine(cols=8, rows=8, seed=1)
+    engine.combatants = [make_unit("Hero", 1, 1, hero=True), make_unit("Orc", 2, 1)]
+    state, _ = planner.fork_state(engine)
+    rng, hits, n = random.Random(5), 0, 20000
+    for _ in range(n):
+        s = state.copy()
+        s.units[1][planner.SP] = 100
+        planner.attack(s, 1, 0, 0, rng)
+        hits += s.units[0][planner.HP] < 30
+    miss, _, _ = odds.odds(12, 10)
+    assert abs(hits / n - (1 - miss)) < 0.015
+    print("PASS: Simulated rolls match exact odds")
+
+    # 2. Obvious calls: finish the wounded foe in reach; planning leaves the engine's dice alone
+    engine = CombatEngine(cols=8, rows=8, seed=2)
+    weak, strong = make_unit("Weak", 3, 3, hp=3, hero=True), make_unit("Strong", 5, 3, hero=True)
+    tactician = make_unit("Tactician", 4, 3, ai="Tactician")
+    engine.combatants = [weak, strong, tactician]
+    rng_state = engine.rng.getstate()
+    steps, stats = planner.plan(engine, tactician, budget_ms=None, iterations=400)
+    assert steps[0][0] == "ATTACK" and steps[0][1] is weak, steps
+    assert stats["iterations"] == 400 and engine.rng.getstate() == rng_state
+    assert (tactician.x, tactician.y, tactician.sp) == (4, 3, 12)
+    print("PASS: Plans the kill")
+
+    # 3. The time budget holds, alone and over a pool
+    start = time.perf_counter()
+    steps, stats = engine.plan_turn(tactician, budget_ms=20)
+    assert time.perf_counter() - start < 0.2 and stats["iterations"] >= planner.MIN_ITERATIONS
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        engine.planner_pool = pool
+        steps, stats = engine.plan_turn(tactician, budget_ms=20)
+        engine.planner_pool = None
+    assert steps and stats["seconds"] < 0.2
+    print("PASS: Time budget")
+
+    # 4. run_ai_turn plays planned turns; recordings carry the plans so replays repeat them exactly
+    engine = CombatEngine(cols=10, rows=10, seed=3)
+    engine.combatants = [make_unit("Hero", 5, 5, hero=True), make_unit("T1", 1, 1, ai="Tactician"),
+                         make_unit("T2", 8, 8, ai="Tactician"), make_unit("Grunt", 5, 8)]
+    engine.start_recording()
+    for _ in range(3):
+        engine.run_ai_turn()
+        engine.end_round()
+    lines = engine.stop_recording()
+    assert '"plans"' in lines[1]
+    assert (engine.combatants[1].x, engine.combatants[1].y) != (1, 1)
+    replayed, report = replay(lines)
+    assert report["diverged_at"] is None and report["actions"] == 6
+    print("PASS: Planned turns replay")
+    print("ALL TESTS PASSED")
+
+if __name__ == "__main__":
+    test_planner()
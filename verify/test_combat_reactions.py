@@ -0,0 +1,83 @@
+import sys
+import os
+import random
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.ecs import Entity, Position, Vitals
+from core.combat.mechanics import CombatEngine
+from core.combat import reactions
+
+def make_unit(name, traits=None):
+    u = Entity(name)
+    u.add_component(Position(1, 1))
+    u.add_component(Vitals(hp=50, max_hp=50))
+    if traits is not None: u.metadata["Traits"] = traits
+    return u
+
+def substring_reactions(engine, source, target, trigger, context):
+    """The pre-dispatch-table implementation, kept as the reference."""
+    logs = []
+    for name in getattr(target, 'metadata', {}).get("Traits", {}):
+        if "danger sense" in name.lower() and trigger == "BEFORE_ATTACK":
+            key = f"{target.id}_dangersense_{engine.round_count}"
+            if key not in engine.reactions_used:
+                engine.reactions_used.add(key)
+                context["def_bonus"] = context.get("def_bonus", 0) + 5
+                logs.append("danger")
+        if ("thorns" in name.lower() or "spines" in name.lower()) and trigger == "POST_DAMAGE":
+            source.hp -= 2
+            logs.append("thorns")
+        if "reactive camo" in name.lower() and trigger == "BEFORE_ATTACK":
+            if engine.rng.random() < 0.25:
+                context["force_miss"] = True
+                logs.append("camo")
+    return logs
+
+def test_reactions():
+    print("--- Testing Reaction Dispatch ---")
+    # 1. Same effects, same RNG draws as the substring scan, over random trait lists
+    pool = ["Danger Sense", "Urchin Spines", "Reactive Camo", "Thick Hide", "Night Vision", "Iron Thorns", "Gills"]
+    rng = random.Random(2)
+    for trial in range(200):
+        traits = {t: "x" for t in rng.sample(pool, rng.randint(0, len(pool)))}
+        old, new = CombatEngine(4, 4, seed=trial), CombatEngine(4, 4, seed=trial)
+        src_a, src_b, tgt = make_unit("S"), make_unit("S"), make_unit("T", traits)
+        for trigger in ("BEFORE_ATTACK", "POST_DAMAGE", "BEFORE_ATTACK"):
+            ctx_a, ctx_b = {}, {}
+            expected = substring_reactions(old, src_a, tgt, trigger, ctx_a)
+            logs, _ = new.handle_reactions(src_b, tgt, trigger, ctx_b)
+            assert len(logs) == len(expected) and ctx_a == ctx_b and src_a.hp == src_b.hp
+        assert old.rng.random() == new.rng.random()
+    print("PASS: Matches substring scan")
+
+    # 2. Tables are compiled once and rebuilt when traits change
+    engine = CombatEngine(4, 4)
+    unit = make_unit("T", {"Danger Sense": 1})
+    table = engine.reactions_for(unit)
+    assert engine.reactions_for(unit) is table and set(table.by_trigger) == {"BEFORE_ATTACK"}
+    unit.metadata["Traits"]["Spiky Thorns"] = 1
+    assert engine.reactions_for(unit).names == {"danger_sense", "thorns"}
+    unit.metadata["Traits"] = {"Gills": 1}
+    assert engine.reactions_for(unit).by_trigger == {}
+    assert engine.reactions_for(make_unit("Plain")) is reactions.EMPTY
+    print("PASS: Compile cache")
+
+    # 3. Declarative registration
+    @reactions.reaction("regrowth", "POST_DAMAGE", "regrow")
+    def _regrowth(engine, source, target, context, logs, v_updates):
+        target.hp += 1
+        logs.append("regrow")
+    try:
+        lizard = make_unit("Lizard", {"Tail Regrowth": 1})
+        hp = lizard.hp
+        logs, _ = engine.handle_reactions(make_unit("S"), lizard, "POST_DAMAGE", {})
+        assert logs == ["regrow"] and lizard.hp == hp + 1
+    finally:
+        reactions.REACTIONS.pop()
+    print("PASS: Registered reaction")
+    print("ALL TESTS PASSED")
+
+if __name__ == "__main__":
+    test_reactions()
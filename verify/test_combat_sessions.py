@@ -0,0 +1,124 @@
+import sys
+import os
+import tempfile
+import threading
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.ecs import ECSRegistry, Entity, Position, Vitals, Stats
+from core.database import PersistenceLayer
+from core.combat.mechanics import CombatEngine
+from core.combat.replay import replay, state_hash
+from core.combat.sessions import CombatSessionManager
+
+def make_unit(name, x, y):
+    u = Entity(name, uid=name.lower())
+    u.add_component(Position(x, y))
+    u.add_component(Vitals(hp=40, max_hp=40, sp=60, max_sp=60))
+    stats = Stats()
+    stats.attrs = {"Might": 12, "Reflexes": 10}
+    u.add_component(stats)
+    return u
+
+def make_engine(seed):
+    engine = CombatEngine(cols=8, rows=8, seed=seed)
+    engine.walls = {(4, 0), (4, 1)}
+    engine.combatants = [make_unit("Hero", 1, 1), make_unit("Orc", 2, 1)]
+    return engine
+
+def fight(engine, rounds):
+    a, b = engine.combatants
+    for _ in range(rounds):
+        engine.attack_target(a, b)
+        engine.attack_target(b, a)
+        engine.end_round()
+
+def test_sessions():
+    print("--- Testing Combat Session Manager ---")
+    tmp = tempfile.mkdtemp()
+    store = PersistenceLayer(os.path.join(tmp, "sessions.db"))
+
+    # 1. LRU eviction parks sessions in SQLite; get() rebuilds them transparently
+    sessions = CombatSessionManager(store, max_live=2)
+    for sid in ("t1", "t2", "t3"):
+        sessions.create(sid, make_engine(seed=7))
+    assert list(sessions._live) == ["t2", "t3"] and [s for s, _ in store.list_combat_sessions()] == ["t1"]
+    assert sessions.get("t1") is not None and "t2" not in sessions._live
+    assert sessions.get("nope") is None
+    print("PASS: LRU eviction and restore")
+
+    # 2. A parked fight resumes mid-stream: same rolls and the same recording as one that never left memory
+    twin = make_engine(seed=11)
+    twin.start_recording()
+    sessions = CombatSessionManager(store, max_live=4)
+    engine = sessions.create("table", make_engine(seed=11))
+    engine.start_recording()
+    fight(twin, 3)
+    fight(engine, 3)
+    assert sessions.evict("table") and "table" not in sessions._live
+    with sessions.use("table") as engine:
+        assert engine.combatants[0].hp == twin.combatants[0].hp
+        fight(engine, 3)
+    fight(twin, 3)
+    assert state_hash(engine) == state_hash(twin)
+    assert engine.recorder.lines[1:] == twin.recorder.lines[1:]
+    _, report = replay(engine.recorder.lines)
+    assert report["diverged_at"] is None and report["actions"] == 9 * 2
+    print("PASS: Deterministic resume")
+
+    # 3. Memory budget and idle timeout
+    sessions = CombatSessionManager(store, max_live=10, idle_seconds=60)
+    for sid in ("a", "b", "c"):
+        sessions.create(sid, make_engine(seed=1))
+    per_engine = sessions.stats()["live"]["a"]["bytes"]
+    sessions.max_bytes = per_engine * 2
+    assert sessions.enforce() == 1 and list(sessions._live) == ["b", "c"]
+    now = sessions._live["c"].last_used + 61
+    assert sessions.enforce(keep="c", now=now) == 1 and list(sessions._live) == ["c"]
+    assert sessions.stats()["idle_evictions"] == 1
+    print("PASS: Byte budget and idle eviction")
+
+    # 4. Per-session locks: concurrent requests on one table serialize, other tables run alongside
+    sessions = CombatSessionManager(store, max_live=2)
+    for sid in ("x", "y", "z"):
+        sessions.create(sid, make_engine(seed=3))
+    def worker(sid):
+        for _ in range(200):
+            with sessions.use(sid) as engine:
+                engine.round_count += 1
+    threads = [threading.Thread(target=worker, args=(sid,)) for sid in ("x", "y", "z") * 3]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    assert all(sessions.get(sid).round_count == 1 + 600 for sid in ("x", "y", "z"))
+    sessions.drop("x")
+    assert "x" not in sessions
+    # Locks live only while held or awaited; unknown ids never get one
+    assert sessions.get("nobody") is None and sessions.evict("nobody") is False
+    with sessions.use("nobody") as engine:
+        assert engine is None and not sessions._locks
+    sessions.drop("nobody")
+    assert not sessions._locks
+    print("PASS: Concurrent sessions")
+
+    # 5. Restored units are the registry's own entities, so damage after a restore reaches the world
+    registry = ECSRegistry(os.path.join(tmp, "world.db"))
+    sessions = CombatSessionManager(store, max_live=1, registry=registry)
+    engine = make_engine(seed=4)
+    hero = engine.combatants[0]
+    registry.add_entity(hero)
+    sessions.create("w", engine)
+    sessions.create("other", make_engine(seed=5))
+    assert "w" not in sessions._live
+    engine = sessions.get("w")
+    assert engine.combatants[0] is registry.get_entity("hero")
+    assert engine.combatants[1] is not None and registry.get_entity("orc") is None
+    fight(engine, 3)
+    assert hero.get_component(Vitals).hp == engine.combatants[0].get_component(Vitals).hp < 40
+    registry.db.close()
+    store.close()
+    print("PASS: Registry re-binding")
+    print("ALL TESTS PASSED")
+
+if __name__ == "__main__":
+    test_sessions()
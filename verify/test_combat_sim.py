@@ -0,0 +1,36 @@
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.combat.batch_sim import parse_spec, simulate_fight, run_batch
+
+def test_batch_sim():
+    print("--- Testing Headless Battle Simulator ---")
+    # 1. Specs resolve saves, pinned generator options and spawner prefabs
+    kind, payload, count = parse_spec("enemy:SWARM/?/REND*3")
+    assert kind == "enemy" and count == 3 and payload == {"rank": "SWARM", "offense": "REND"}
+    assert parse_spec("save:Burt")[1]["Name"] == "Burt"
+    assert parse_spec("spawner:Goblin")[1]["Stats"]["Might"] == 12
+    print("PASS: Spec parsing")
+
+    # 2. A fight is a pure function of its seed
+    a, b = [parse_spec("save:Burt")], [parse_spec("enemy:FODDER*2")]
+    first = simulate_fight(11, a, b)
+    assert simulate_fight(11, a, b) == first
+    assert first["winner"] in ("A", "B", None) and first["rounds"] >= 1
+    assert first["teams"]["A"]["damage"] + first["teams"]["B"]["damage"] > 0
+    print("PASS: Seeded fights replay exactly")
+
+    # 3. Batch report: rates add up, pool and inline agree
+    inline = run_batch(["spawner:Goblin"], ["enemy:SWARM*2"], fights=40, seed=5, workers=1)
+    assert abs(inline["win_rate"]["A"] + inline["win_rate"]["B"] + inline["draw_rate"] - 1) < 1e-6
+    assert inline["rounds"]["min"] <= inline["rounds"]["p50"] <= inline["rounds"]["max"]
+    pooled = run_batch(["spawner:Goblin"], ["enemy:SWARM*2"], fights=40, seed=5, workers=2)
+    assert pooled["win_rate"] == inline["win_rate"] and pooled["teams"] == inline["teams"]
+    print(f"PASS: Batch report ({inline['fights_per_sec']} fights/s inline)")
+    print("ALL TESTS PASSED")
+
+if __name__ == "__main__":
+    test_batch_sim()
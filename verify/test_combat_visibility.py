@@ -0,0 +1,65 @@
+import sys
+import os
+import random
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.ecs import Entity, Position, Vitals, FactionMember
+from core.combat.mechanics import CombatEngine
+from core.combat.visibility import shadowcast
+
+def test_visibility():
+    print("--- Testing FOV / LOS ---")
+    # 1. Walls block sight; LOS is symmetric on random maps
+    engine = CombatEngine(cols=10, rows=10)
+    engine.walls = {(5, y) for y in range(10)}
+    assert not engine.has_los(2, 5, 8, 5)
+    assert engine.has_los(2, 2, 4, 8)
+    rng = random.Random(4)
+    walls = {(x, y) for x in range(20) for y in range(20) if rng.random() < 0.25}
+    floors = [(x, y) for x in range(20) for y in range(20) if (x, y) not in walls]
+    for _ in range(200):
+        a, b = rng.choice(floors), rng.choice(floors)
+        assert (b in shadowcast(a, 20, 20, 20, walls)) == (a in shadowcast(b, 20, 20, 20, walls))
+    print("PASS: Symmetric shadowcasting")
+
+    # 2. FOV cached per origin; repeated LOS checks hit the cache
+    engine = CombatEngine(cols=12, rows=12)
+    engine.walls = {(6, y) for y in range(12) if y != 6}
+    for _ in range(5):
+        engine.has_los(1, 6, 11, 6)
+    assert engine.visibility.stats["misses"] == 1
+    print("PASS: LOS served from cached FOV")
+
+    # 3. Smashing a wall drops only FOVs that examined it
+    engine.set_wall(3, 9)
+    engine.set_wall(3, 10)
+    engine.set_wall(3, 11)
+    engine.set_wall(0, 9), engine.set_wall(1, 9), engine.set_wall(2, 9) # Closet in the corner
+    engine.visibility.fov(1, 1)
+    engine.visibility.fov(1, 10)
+    engine.set_wall(6, 1, blocking=False)
+    assert (1, 10) in engine.visibility._fov and (1, 1) not in engine.visibility._fov
+    for origin, (radius, tiles, _) in engine.visibility._fov.items():
+        assert tiles == shadowcast(origin, radius, 12, 12, engine.walls)
+    assert engine.has_los(1, 1, 11, 1)
+    print("PASS: Incremental invalidation")
+
+    # 4. Summoned walls apply through the engine and reach fog of war
+    engine = CombatEngine(cols=8, rows=8)
+    hero = Entity("Hero")
+    hero.add_component(Position(0, 0))
+    hero.add_component(Vitals(hp=10, max_hp=10))
+    hero.add_component(FactionMember("Party"))
+    engine.combatants = [hero]
+    assert engine.team_visibility("Party")[7][7] == 1
+    engine.pending_world_updates.append({"type": "terrain", "subtype": "wall", "x": 1, "y": 1})
+    assert engine.apply_world_updates() == [{"type": "GRID_UPDATE", "x": 1, "y": 1, "cell": 896}]
+    fog = engine.team_visibility("Party")
+    assert fog[1][1] == 1 and fog[7][7] == 0
+    print("PASS: Team fog of war")
+    print("ALL TESTS PASSED")
+
+if __name__ == "__main__":
+    test_visibility()
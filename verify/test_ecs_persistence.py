@@ -0,0 +1,487 @@
+import sys
+import os
+import threading
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.ecs import ECSRegistry, Entity, Position, Vitals, Logistics, Demographics, Economy, Inventory, COMPONENT_TYPES
+
+def fresh_registry(db_path, **kwargs):
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    return ECSRegistry(db_path, **kwargs)
+
+def cleanup(registry, db_path):
+    registry.db.close()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+
+def test_write_behind_flush():
+    print("Initializing Test Database...")
+    db_path = "test_ecs_persistence.db"
+    registry = fresh_registry(db_path)
+
+    # 1. Adds are queued, not written through
+    hero = Entity("Hero").add_component(Position(3, 4)).add_component(Vitals(hp=20, max_hp=20))
+    registry.add_entity(hero)
+    for i in range(50):
+        registry.add_entity(Entity(f"Goblin {i}").add_component(Vitals()))
+    assert registry.db.load_entity(hero.id) is None
+    assert registry.pending_writes() == 51
+    print("PASS: Adds queued in write-behind buffer")
+
+    # 2. One flush persists the whole batch
+    assert registry.flush() == 51
+    assert registry.pending_writes() == 0
+    assert registry.db.load_entity(hero.id)["data"]["components"]["Position"]["x"] == 3
+    print("PASS: Batch flushed in one transaction")
+
+    # 3. Property adapters mark the entity dirty
+    hero.hp = 7
+    hero.x = 9
+    assert registry.pending_writes() == 1
+    registry.flush()
+    saved = registry.db.load_entity(hero.id)["data"]["components"]
+    assert saved["Vitals"]["hp"] == 7 and saved["Position"]["x"] == 9
+    print("PASS: Dirty tracking via property adapters")
+
+    # 4. Destroyed entities are deleted on flush
+    registry.destroy_entity(hero.id)
+    registry.flush()
+    assert registry.db.load_entity(hero.id) is None
+    print("PASS: Destroyed entity removed on flush")
+
+    # 5. Reload sees flushed state
+    reloaded = ECSRegistry(db_path)
+    reloaded.load_all()
+    assert len(reloaded.entities) == 50
+    reloaded.db.close()
+
+    # 6. Autoflush only runs between locked mutation blocks, so no write is torn or lost
+    goblins = list(registry.entities.values())
+    registry.start_autoflush(interval=0.001)
+    for tick in range(1, 201):
+        with registry.lock:
+            for g in goblins:
+                g.get_component(Vitals).hp = tick
+            registry.mark_dirty_many(goblins, Vitals)
+    registry.stop_autoflush()
+    assert registry.pending_writes() == 0
+    reloaded = ECSRegistry(db_path)
+    reloaded.load_all()
+    assert {e.hp for e in reloaded.entities.values()} == {200}
+    reloaded.db.close()
+    print("PASS: Autoflush alongside locked ticks")
+
+    cleanup(registry, db_path)
+    print("ALL TESTS PASSED")
+
+def test_component_deltas():
+    print("Initializing Test Database...")
+    db_path = "test_ecs_deltas.db"
+    registry = fresh_registry(db_path)
+
+    town = Entity("Oakhaven").add_component(Vitals(hp=30, max_hp=30)).add_component(Logistics(population=250))
+    registry.add_entity(town)
+    registry.flush()
+    full_bytes = registry.bytes_written
+
+    # 1. Touching one component writes only that component
+    town.hp = 12
+    registry.flush()
+    delta_bytes = registry.bytes_written - full_bytes
+    assert delta_bytes < full_bytes
+    assert registry.db.load_entity(town.id)["data"]["components"]["Vitals"]["hp"] == 12
+    print(f"PASS: Delta write ({delta_bytes}B vs {full_bytes}B full)")
+
+    # 2. Loader rebuilds entities from blob + deltas
+    reloaded = ECSRegistry(db_path)
+    reloaded.load_all()
+    assert reloaded.get_entity(town.id).hp == 12
+    assert reloaded.get_entity(town.id).get_component(Logistics).population == 250
+    reloaded.db.close()
+    print("PASS: Entities rebuilt from deltas")
+
+    # 3. Compaction folds deltas into the blob
+    assert registry.compact() == 1
+    assert registry.db.load_component_deltas() == {}
+    assert registry.db.load_entity(town.id)["data"]["components"]["Vitals"]["hp"] == 12
+    print("PASS: Deltas compacted")
+
+    # 4. A full write supersedes stale deltas
+    town.hp = 5
+    registry.flush()
+    town.add_tag("besieged")
+    registry.flush()
+    assert registry.db.load_component_deltas() == {}
+    assert registry.db.load_entity(town.id)["data"]["components"]["Vitals"]["hp"] == 5
+    print("PASS: Full write clears deltas")
+
+    cleanup(registry, db_path)
+    print("ALL TESTS PASSED")
+
+def test_region_hydration():
+    print("Initializing Test Database...")
+    db_path = "test_ecs_regions.db"
+    registry = fresh_registry(db_path)
+
+    for zone in ("zone_a", "zone_b", "zone_c"):
+        for i in range(10):
+            e = Entity(f"{zone} Wolf {i}").add_component(Vitals(hp=8, max_hp=8))
+            e.layer_id, e.location_id = 2, zone
+            registry.add_entity(e)
+    capital = registry.add_entity(Entity("Capital").add_component(Logistics(population=900)))
+    registry.flush()
+
+    # 1. Only the requested region is hydrated
+    world = ECSRegistry(db_path, max_regions=2)
+    world.hydrate_region(0, None, pin=True)
+    assert list(world.entities) == [capital.id]
+    assert world.hydrate_region(2, "zone_a") == 10
+    assert len(world.entities) == 11
+    print("PASS: Region hydrated on demand")
+
+    # 2. Cold regions are evicted LRU, after flushing their changes
+    wolf = next(e for e in world.entities.values() if e.location_id == "zone_a")
+    wolf.hp = 1
+    world.hydrate_region(2, "zone_b")
+    world.hydrate_region(2, "zone_c")
+    assert (2, "zone_a") not in world.resident_regions()
+    assert (0, None) in world.resident_regions()
+    assert wolf.id not in world.entities and len(world.entities) == 21
+    print("PASS: LRU region evicted")
+
+    # 3. Misses fall back to a single-entity load
+    assert world.get_entity(wolf.id).hp == 1
+    # ...which opens a partial region: it takes an LRU slot and hydrate_region() fills it in
+    assert (2, "zone_a") in world.resident_regions() and (2, "zone_b") not in world.resident_regions()
+    assert world.hydrate_region(2, "zone_a") == 9 and len(world.entities) == 21
+    print("PASS: Evicted entity reloaded with its flushed state")
+
+    # 4. Relocation persists the new region
+    world.relocate(world.get_entity(wolf.id), 3, "map_01")
+    world.flush()
+    assert [row[0] for row in world.db.iter_entities(3, "map_01")] == [wolf.id]
+    print("PASS: Relocated entity indexed under its new region")
+
+    world.db.close()
+    cleanup(registry, db_path)
+    print("ALL TESTS PASSED")
+
+def test_component_index():
+    print("Initializing Test Database...")
+    db_path = "test_ecs_index.db"
+    registry = fresh_registry(db_path)
+
+    towns = [registry.add_entity(Entity(f"Town {i}").add_component(Logistics())) for i in range(5)]
+    for i in range(20):
+        registry.add_entity(Entity(f"Wolf {i}").add_component(Vitals()))
+
+    # 1. Queries only see matching entities
+    assert list(registry.get_entities_with(Logistics)) == towns
+    assert list(registry.get_entities_with(Demographics, Logistics)) == []
+    print("PASS: Indexed query")
+
+    # 2. Cached views follow component adds/removals and destruction
+    towns[0].add_component(Demographics())
+    assert list(registry.get_entities_with(Demographics, Logistics)) == [towns[0]]
+    towns[0].remove_component(Logistics)
+    registry.destroy_entity(towns[1].id)
+    assert list(registry.get_entities_with(Logistics)) == towns[2:]
+    assert list(registry.get_entities_with(Demographics, Logistics)) == []
+    print("PASS: Views updated incrementally")
+
+    # 3. Removal is persisted as a blob rewrite
+    registry.flush()
+    assert "Logistics" not in registry.db.load_entity(towns[0].id)["data"]["components"]
+    print("PASS: Removed component dropped from storage")
+
+    cleanup(registry, db_path)
+    print("ALL TESTS PASSED")
+
+def test_spatial_index():
+    print("Initializing Test Database...")
+    db_path = "test_ecs_spatial.db"
+    registry = fresh_registry(db_path)
+
+    grid = [registry.add_entity(Entity(f"Tree {x},{y}").add_component(Position(x * 10, y * 10)))
+            for x in range(10) for y in range(10)]
+    hero = registry.add_entity(Entity("Hero").add_component(Position(45, 45)))
+
+    # 1. Radius and rect queries match a brute-force scan
+    near = {e.id for e in registry.entities_in_radius(45, 45, 12)}
+    brute = {e.id for e in registry.entities.values() if (e.x - 45) ** 2 + (e.y - 45) ** 2 <= 144}
+    assert near == brute and hero.id in near and len(near) == 5
+    assert {e.name for e in registry.entities_in_rect(0, 0, 10, 10)} == {"Tree 0,0", "Tree 0,1", "Tree 1,0", "Tree 1,1"}
+    print("PASS: Radius/rect queries")
+
+    # 2. Position writes move the entity in the index and mark it dirty
+    registry.flush()
+    hero.get_component(Position).x = 300
+    assert hero.id not in {e.id for e in registry.entities_in_radius(45, 45, 12)}
+    assert registry.entities_in_radius(300, 45, 1) == [hero]
+    assert registry.pending_writes() == 1
+    print("PASS: Index follows Position writes")
+
+    # 3. Layers are indexed separately; removal drops the entity
+    registry.relocate(hero, 3, "map_01")
+    assert registry.entities_in_radius(300, 45, 1, layer_id=0) == []
+    assert registry.entities_in_radius(300, 45, 1, layer_id=3, location_id="map_01") == [hero]
+    registry.destroy_entity(grid[0].id)
+    assert registry.entities_in_rect(0, 0, 0, 0) == []
+    print("PASS: Layer-scoped and destroyed entities")
+
+    cleanup(registry, db_path)
+    print("ALL TESTS PASSED")
+
+def test_tag_and_name_index():
+    print("Initializing Test Database...")
+    db_path = "test_ecs_tags.db"
+    registry = fresh_registry(db_path)
+
+    lever = registry.add_entity(Entity("Rusty Lever").add_tag("lever").add_tag("link_vault"))
+    vault = registry.add_entity(Entity("Vault Door").add_tag("door").add_tag("link_vault"))
+    registry.add_entity(Entity("Cellar Door").add_tag("door"))
+    registry.add_entity(Entity("Goblin Chef"))
+    registry.flush()
+
+    # 1. Tag index, including direct set mutation
+    assert registry.entities_with_tag("door", "link_vault") == [vault]
+    vault.tags.add("locked")
+    lever.tags.discard("link_vault")
+    assert registry.entities_with_tag("locked") == [vault]
+    assert registry.entities_with_tag("link_vault") == [vault]
+    assert registry.pending_writes() == 2
+    print("PASS: Tag index follows tag mutations")
+
+    # 2. Name lookups: exact, prefix, substring, fuzzy
+    assert registry.find_by_name("vault door") == [vault]
+    assert [e.name for e in registry.match_name("rusty")] == ["Rusty Lever"]
+    assert [e.name for e in registry.match_name("door")] == ["Cellar Door", "Vault Door"]
+    assert [e.name for e in registry.match_name("goblin cheff")] == ["Goblin Chef"]
+    print("PASS: Name matcher")
+
+    # 3. Renames and destruction are reindexed
+    lever.name = "Golden Lever"
+    registry.destroy_entity(vault.id)
+    assert registry.find_by_name("Rusty Lever") == [] and registry.find_by_name("golden lever") == [lever]
+    assert registry.entities_with_tag("link_vault") == []
+    names = registry._names
+    assert names.prefix("g") == sorted(names.prefix("g"), key=names.names.get)
+    assert [names.names[e] for e in names.prefix("go")] == ["goblin chef", "golden lever"]
+    assert [names.names[e] for e in names.contains("ef")] == ["goblin chef"]
+    assert names.contains("va") == [] and len(names.contains("e")) == 3
+    print("PASS: Renames and removals reindexed")
+
+    # 4. Interaction targets resolve only within reach, fuzzily
+    from core.systems import interaction_engine
+    registry.add_entity(Entity("Gate Guard").add_component(Position(500, 500)))
+    registry.add_entity(Entity("Harbor Master").add_component(Position(900, 900)))
+    world, interaction_engine.world_ecs = interaction_engine.world_ecs, registry
+    try:
+        msg, _ = interaction_engine.InteractionEngine.resolve_interaction({"target": "gate gaurd"}, {"pos": [505, 500]})
+        assert "Could not find" not in msg
+        msg, _ = interaction_engine.InteractionEngine.resolve_interaction({"target": "harbor master"}, {"pos": [505, 500]})
+        assert "Could not find 'harbor master' nearby" in msg
+    finally:
+        interaction_engine.world_ecs = world
+    print("PASS: Interaction targets stay in reach")
+
+    cleanup(registry, db_path)
+    print("ALL TESTS PASSED")
+
+def test_columnar_storage():
+    print("Initializing Test Database...")
+    db_path = "test_ecs_columnar.db"
+    registry = fresh_registry(db_path, columnar=True)
+
+    towns = []
+    for i in range(3000): # Forces the columns to grow
+        e = Entity(f"Town {i}").add_component(Position(i, 0)).add_component(Vitals(hp=10, max_hp=20))
+        towns.append(registry.add_entity(e.add_component(Logistics(resources={"Food": i}, population=i))))
+    registry.flush()
+
+    # 1. Object API still works on top of the columns
+    town = towns[42]
+    assert town.hp == 10 and town.x == 42
+    assert town.get_component(Logistics).resources == {"Food": 42}
+    town.hp = 3
+    town.get_component(Position).y = 7
+    assert town.hp == 3 and registry.entities_in_radius(42, 7, 0.5) == [town]
+    assert type(town.hp) is int
+    town.hp = 8 * 1.15 # DamageMult-scaled pools stay exact Python floats
+    assert town.hp == 8 * 1.15 and type(town.hp) is float
+    town.hp = 3
+    print("PASS: Views over columns")
+
+    # 2. Vectorized update through bulk()
+    vitals = registry.bulk(Vitals)
+    vitals["hp"] = vitals["max_hp"]
+    assert vitals.commit() == 3000
+    assert town.hp == 20
+    registry.flush()
+    assert registry.db.load_entity(town.id)["data"]["components"]["Vitals"]["hp"] == 20
+    print("PASS: Bulk update persisted")
+
+    # 3. Removal hands back a plain component and frees the slot
+    vit = town.remove_component(Vitals)
+    assert type(vit) is Vitals and vit.hp == 20
+    assert len(registry.columns["Vitals"]) == 2999
+    print("PASS: Component detached from columns")
+
+    cleanup(registry, db_path)
+    print("ALL TESTS PASSED")
+
+def settlement_world(columnar, count=60):
+    registry = ECSRegistry(":memory:", columnar=columnar)
+    for i in range(count):
+        e = Entity(f"Town {i}", uid=f"town_{i}")
+        e.add_component(Demographics(pop_total=100 + 37 * i))
+        e.add_component(Economy(wealth=100 + i, primary_export=("Wood", "Iron")[i % 2], primary_import=("Iron", "Wood")[i % 2]))
+        e.add_component(Logistics(resources={"food": (i % 7) * 400, "Food": (i % 5) * 300, "Wood": 20}, population=100 + 37 * i))
+        e.metadata["species_id"] = ("human", "orc", "unknown")[i % 3]
+        registry.add_entity(e)
+    return registry
+
+def test_columnar_ticks():
+    print("--- Testing Columnar Settlement and Logistics Ticks ---")
+    from core.definition_registry import DefinitionRegistry
+    from core.models.definitions import SpeciesDefinition
+    from core.systems.settlement import SettlementSystem
+    from core.world.sim_manager import SimulationManager
+    definitions = DefinitionRegistry("unused")
+    definitions.species = {"human": SpeciesDefinition(id="human", name="Human", resource_needs={"food": 1.0}),
+                           "orc": SpeciesDefinition(id="orc", name="Orc", growth_rate=0.11, resource_needs={"food": 2.5})}
+    worlds = {}
+    for columnar in (False, True):
+        registry = settlement_world(columnar)
+        system, sim = SettlementSystem(registry, definitions), SimulationManager({})
+        for month in range(6):
+            system.grow_columnar() if columnar else system.grow()
+            system.economy_columnar() if columnar else system.economy()
+            sim.narrative_hours += 24
+            sim.batch_logistic_tick(24, registry)
+        worlds[columnar] = registry
+    assert worlds[True].pending_writes() == worlds[False].pending_writes() == 60
+    for eid, e in worlds[False].entities.items():
+        c = worlds[True].entities[eid]
+        for comp in (Demographics, Economy, Logistics):
+            assert c.get_component(comp).to_dict() == vars(e.get_component(comp)), (eid, comp.__name__)
+    print("PASS: Columnar ticks match the object ticks")
+
+def test_bulk_hydration():
+    print("--- Testing Component Registry + Batched Hydration ---")
+    db_path = "test_ecs_hydrate.db"
+    registry = fresh_registry(db_path)
+
+    # 1. from_state fills missing fields from defaults, never sharing mutables
+    assert COMPONENT_TYPES["Vitals"] is Vitals
+    a = Inventory.from_state({"gold": 5})
+    b = Inventory.from_state({})
+    assert a.gold == 5 and a.items == [] and a.items is not b.items
+    pos = Position.from_state({"x": 3, "y": 4})
+    assert (pos.x, pos.y, pos.z) == (3, 4, 0)
+    print("PASS: from_state constructors")
+
+    # 2. Round trip across several fetch batches
+    for i in range(1200):
+        e = registry.add_entity(Entity(f"Unit {i}", uid=f"unit_{i}"))
+        e.add_component(Position(i, -i))
+        e.add_component(Vitals(hp=i % 50, max_hp=50))
+        e.add_component(Inventory())
+        e.add_tag("unit")
+    registry.get_entity("unit_7").get_component(Inventory).gold = 70
+    registry.get_entity("unit_7").mark_dirty(Inventory)
+    registry.flush()
+
+    reloaded = ECSRegistry(db_path)
+    reloaded.load_all()
+    e = reloaded.get_entity("unit_7")
+    assert e.get_component(Position).x == 7 and e.get_component(Position)._owner is e
+    assert e.hp == 7 and e.get_component(Inventory).gold == 70
+    assert "unit" in e.tags and len(reloaded.entities_with_tag("unit")) == 1200
+    assert reloaded.entities_in_radius(7, -7, 0.5) == [e]
+    print("PASS: Batched load round trip")
+
+    # 3. Load stats cover every component type
+    stats = reloaded.last_load_stats
+    assert stats["entities"] == 1200
+    assert {c: s["count"] for c, s in stats["components"].items()} == {"Position": 1200, "Vitals": 1200, "Inventory": 1200}
+    print("PASS: Per-component load stats")
+
+    reloaded.db.close()
+    cleanup(registry, db_path)
+    print("ALL TESTS PASSED")
+
+def test_registry_fork():
+    print("--- Testing Copy-on-Write Forks ---")
+    db_path = "test_ecs_fork.db"
+    registry = fresh_registry(db_path, columnar=True)
+    for i in range(50):
+        e = registry.add_entity(Entity(f"Guard {i}", uid=f"guard_{i}"))
+        e.add_component(Position(i, 0))
+        e.add_component(Vitals(hp=10, max_hp=10))
+        e.add_component(Inventory())
+        e.add_tag("guard")
+    registry.flush()
+
+    # 1. Mutations stay inside the fork
+    sim = registry.fork()
+    g = sim.get_entity("guard_3")
+    g.x = 300
+    g.get_component(Vitals).hp = 4
+    g.get_component(Inventory).items.append("torch")
+    g.add_tag("captain")
+    sim.destroy_entity("guard_4")
+    spawned = sim.add_entity(Entity("Bandit", uid="bandit_1")).add_component(Position(301, 0))
+    live = registry.get_entity("guard_3")
+    assert live.x == 3 and live.hp == 10 and live.get_component(Inventory).items == []
+    assert registry.get_entity("guard_4") is not None and registry.get_entity("bandit_1") is None
+    with sim.lock: # A long fork run must not hold the live registry's lock
+        t = threading.Thread(target=registry.flush)
+        t.start(); t.join(timeout=5)
+        assert not t.is_alive()
+    print("PASS: Parent isolated from fork")
+
+    # 2. Fork queries see the fork's world
+    assert {e.id for e in sim.entities_in_radius(300, 0, 2)} == {"guard_3", "bandit_1"}
+    assert sim.entities_in_radius(3, 0, 0.5) == []
+    assert [e.id for e in sim.entities_with_tag("captain")] == ["guard_3"]
+    assert sim.count_with(Position) == 50 and len(sim.entities_with_tag("guard")) == 49
+    assert sim.match_name("bandit") == [spawned] and sim.get_entity("guard_4") is None
+    print("PASS: Fork indexes overlay the parent")
+
+    # 3. Components are only copied when read
+    assert sim.get_entity("guard_10")._shared == {"Position", "Vitals", "Inventory"}
+    sim.discard()
+    assert registry.pending_writes() == 0
+    print("PASS: Discard leaves no trace")
+
+    # 4. Commit applies the outcome and queues it for persistence
+    sim = registry.fork()
+    sim.get_entity("guard_3").get_component(Vitals).hp = 4
+    sim.get_entity("guard_5").get_component(Position) # Read-only copy: not written back
+    sim.destroy_entity("guard_4")
+    counts = sim.commit()
+    assert counts == {"created": 0, "updated": 1, "destroyed": 1}
+    assert registry.get_entity("guard_3").hp == 4 and registry._dirty == {"guard_3": {"Vitals"}}
+    registry.flush()
+    assert registry.db.load_entity("guard_4") is None
+    print("PASS: Commit applies diverged state")
+
+    cleanup(registry, db_path)
+    print("ALL TESTS PASSED")
+
+if __name__ == "__main__":
+    test_write_behind_flush()
+    test_component_deltas()
+    test_region_hydration()
+    test_component_index()
+    test_spatial_index()
+    test_tag_and_name_index()
+    test_columnar_storage()
+    test_columnar_ticks()
+    test_bulk_hydration()
+    test_registry_fork()
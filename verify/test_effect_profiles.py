@@ -0,0 +1,77 @@
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.abilities import engine_hooks
+
+class Unit:
+    def __init__(self, name, species="Human", skills=(), powers=(), traits=()):
+        self.name, self.species = name, species
+        self.skills, self.powers, self.traits = list(skills), list(powers), list(traits)
+
+class Recorder:
+    def __init__(self): self.seen = []
+    def resolve(self, eff, context):
+        self.seen.append(eff)
+        return True
+
+def test_effect_profiles():
+    print("--- Testing Compiled Effect Profiles ---")
+    loader = engine_hooks.loader
+    skill = loader.skills[0]["Skill_Name"]
+    added = [{"Talent_Name": "Iron Hide", "Effect": "Reduce incoming damage by 2"},
+             {"Talent_Name": "Keen Eye", "Effect": "See invisible creatures"}]
+    loader.talents.extend(added)
+    loader.schools.append({"Name": "Searing Bolt", "Description": "Deal 2d6 Fire Damage"})
+    loader.species_skills["TestKin"] = [{"Skill_Name": skill, "Effect": "Grapple on attack"}]
+    try:
+        # 1. Same effects, same order as the full scan
+        a = Unit("A", "TestKin", [skill], ["Searing Bolt"], ["Iron Hide", "Keen Eye"])
+        assert engine_hooks.get_entity_effects(a) == engine_hooks.collect_entity_effects(a)
+        assert engine_hooks.get_entity_effects(a)[0] == "Grapple on attack"
+        print("PASS: Effects match scan")
+
+        # 2. One profile per loadout, rebuilt when the loadout or the data changes
+        b = Unit("B", "TestKin", [skill], ["Searing Bolt"], ["Iron Hide", "Keen Eye"])
+        assert engine_hooks.entity_profile(a) is engine_hooks.entity_profile(b)
+        b.traits.remove("Keen Eye")
+        assert "See invisible creatures" not in engine_hooks.get_entity_effects(b)
+        before = engine_hooks.entity_profile(a)
+        loader.talents.append({"Talent_Name": "Keen Eye", "Effect": "Shadowed duplicate"})
+        assert engine_hooks.entity_profile(a) is not before
+        assert engine_hooks.get_entity_effects(a) == engine_hooks.collect_entity_effects(a)
+        loader.talents.pop()
+        print("PASS: Profile cache")
+
+        # 3. Hooks run the pre-bucketed lists; ON_ATTACK keeps only attack-relevant effects
+        recorder, real, real_effects = Recorder(), engine_hooks.registry, engine_hooks.get_entity_effects
+        engine_hooks.registry = recorder
+        try:
+            engine_hooks.apply_hooks(a, "ON_ATTACK", {})
+            attack = list(recorder.seen)
+            recorder.seen.clear()
+            engine_hooks.apply_hooks(a, "ON_DEFEND", {})
+            defend = list(recorder.seen)
+            # A patched get_entity_effects (as the legacy tests do) still drives the hooks
+            engine_hooks.get_entity_effects = lambda c: ["Stun the target", "Hum a tune"]
+            recorder.seen.clear()
+            engine_hooks.apply_hooks(a, "ON_ATTACK", {})
+            patched = list(recorder.seen)
+        finally:
+            engine_hooks.registry = real
+            engine_hooks.get_entity_effects = real_effects
+        effects = engine_hooks.collect_entity_effects(a)
+        assert defend == effects
+        assert attack == [e for e in effects if e != "See invisible creatures"]
+        assert patched == ["Stun the target"]
+        print("PASS: Hook buckets")
+    finally:
+        for row in added: loader.talents.remove(row)
+        loader.schools.pop()
+        del loader.species_skills["TestKin"]
+    print("ALL TESTS PASSED")
+
+if __name__ == "__main__":
+    test_effect_profiles()
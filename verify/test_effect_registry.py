@@ -0,0 +1,62 @@
+import sys
+import os
+import json
+import random
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.abilities.effects_registry import EffectRegistry, required_literals
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+def corpus():
+    descs = []
+    with open(os.path.join(ROOT, "core", "abilities", "EFFECTS_TODO.md"), encoding="utf-8") as f:
+        for line in f:
+            parts = line.strip().split(" -> ")
+            if line.strip().startswith("- [ ]") and len(parts) > 1: descs.append(parts[1])
+    with open(os.path.join(ROOT, "data", "tactical_data", "Schools_of_Power.json"), encoding="utf-8") as f:
+        for school in json.load(f)["schools"].values():
+            descs.extend(s["description"] for s in school.get("spells", []))
+    return descs
+
+def test_effect_registry():
+    print("--- Testing Effect Registry Prefilter ---")
+    # 1. Keywords read off the patterns
+    assert required_literals(r"Deal (\d+)?d?(\d+)? ?(\w+) Damage") == {" damage"}
+    assert required_literals(r"Stop Bleeding|Clot") == {"stop bleeding", "clot"}
+    assert required_literals(r"(\w+)+") is None
+    print("PASS: Required literals")
+
+    # 2. Prefiltered matching finds exactly what a full scan finds
+    registry = EffectRegistry()
+    rng = random.Random(3)
+    descs = corpus()
+    words = " ".join(descs).split()
+    descs += [" ".join(rng.choice(words) for _ in range(rng.randint(1, 10))).upper() for _ in range(1000)]
+    for text in descs:
+        full = [h for p, h in registry.patterns if p.search(text)]
+        assert [h for h, _ in registry.plan(text)] == full, text
+    assert registry.stats["candidates"] < len(descs) * len(registry.patterns) / 20
+    print("PASS: Prefilter matches full scan")
+
+    # 3. Plans are cached per description and dropped when patterns change
+    calls = []
+    registry = EffectRegistry()
+    registry.patterns = []
+    registry.register_pattern(r"Deal (\d+) (\w+) Damage", lambda m, ctx: calls.append(("dmg", m.groups())))
+    registry.register_pattern(r"Stun", lambda m, ctx: calls.append(("stun", m.group(0))))
+    registry.register_pattern(r"Explode", lambda m, ctx: 1 / 0)
+    assert registry.resolve("Deal 6 Fire Damage and stun", {})
+    assert registry.resolve("Deal 6 Fire Damage and stun", {})
+    assert calls == [("dmg", ("6", "Fire")), ("stun", "stun")] * 2
+    assert registry.stats["plans"] == 1 and registry.stats["plan_hits"] == 1
+    assert not registry.resolve("Explode", {}) and not registry.resolve("Nothing here", {})
+    registry.register_pattern(r"Nothing", lambda m, ctx: calls.append("new"))
+    assert registry.resolve("Nothing here", {}) and calls[-1] == "new"
+    print("PASS: Effect plans")
+    print("ALL TESTS PASSED")
+
+if __name__ == "__main__":
+    test_effect_registry()
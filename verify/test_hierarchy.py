@@ -54,6 +54,7 @@ def test_hierarchy():
     
     # Cleanup
     print("Cleaning up...")
+    db.close()
     os.remove(db_path)
     print("ALL TESTS PASSED")
 